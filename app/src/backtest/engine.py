@@ -0,0 +1,377 @@
+"""
+Offline replay of the ORB/VWAP/UW strategy.
+
+Recorded minute and daily bars plus recorded UW signal values (see
+``settings.UW_SIGNAL_RECORD_PATH``) are fed through the live
+``evaluate_ticker``. Time comes from a virtual clock, signals are captured
+instead of posted, and positions live in in-memory tables, so every trading
+day is independent and days run in parallel worker processes.
+
+    python -m app.src.backtest.engine --bars-1m minute.csv.gz --bars-daily daily.csv.gz \
+        --signals uw_signals.jsonl --start 2025-01-02 --end 2025-12-31 --output result.json
+"""
+
+import argparse
+import asyncio
+import bisect
+import gzip
+import json
+import multiprocessing
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
+from typing import Any, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.src.config.settings import settings
+from app.src.core.signaler import capture_signals
+from app.src.data.unusual_whales import set_signal_source
+from app.src.indicators.technical import (
+    DAILY_COLUMNS,
+    INTRADAY_COLUMNS,
+    session_snapshot_arrays,
+    snapshot_at,
+)
+from app.src.persistence.repository import InMemoryTableRepository, set_table_factory
+from app.src.position_tracker.dynamodb_tracker import (
+    _COMPLETED_TRADES_TABLE,
+    _OPEN_POSITIONS_TABLE,
+    PositionTracker,
+)
+from app.src.strategies.orb_vwap_uw import evaluate_ticker
+from app.src.utils.helpers import NY, now_ny, use_clock
+from app.src.utils.logger import logger
+
+# What the live API helpers return when there is nothing to report
+_SIGNAL_DEFAULTS = {"iv_rank": 0.0}
+# Daily bars the live scanner fetches per ticker
+_DAILY_LOOKBACK = 300
+
+
+class RecordedSignals:
+    """UW signal values over time; ``lookup`` answers as of the virtual clock."""
+
+    def __init__(self, series: dict[tuple[str, str], tuple[list[float], list]]):
+        self.series = series
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> "RecordedSignals":
+        points = defaultdict(list)
+        for record in records:
+            ts = datetime.fromisoformat(record["ts"]).timestamp()
+            points[(record["kind"], record["ticker"])].append((ts, record["value"]))
+        series = {}
+        for key, values in points.items():
+            values.sort(key=lambda point: point[0])
+            series[key] = ([ts for ts, _ in values], [value for _, value in values])
+        return cls(series)
+
+    @classmethod
+    def load(cls, path: str) -> "RecordedSignals":
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt") as f:
+            return cls.from_records(json.loads(line) for line in f if line.strip())
+
+    def lookup(self, kind: str, ticker: str) -> Any:
+        default = _SIGNAL_DEFAULTS.get(kind)
+        entry = self.series.get((kind, ticker))
+        if entry is None:
+            return default
+        times, values = entry
+        index = bisect.bisect_right(times, now_ny().timestamp()) - 1
+        return values[index] if index >= 0 else default
+
+
+def load_bars(path: str) -> pd.DataFrame:
+    """
+    Bars as a (symbol, timestamp) frame, the shape ``get_bars`` returns.
+    Accepts parquet or csv(.gz) with symbol, timestamp, open, high, low, close, volume.
+    """
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    if "symbol" in df.columns:
+        df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+        df = df.set_index(["symbol", "timestamp"])
+    return df.sort_index()
+
+
+@dataclass
+class DayResult:
+    day: date
+    evaluations: int = 0
+    completed: Optional[dict] = None  # the CompletedTradesForAlgoTrader item
+    signals: list[dict] = field(default_factory=list)
+
+    @property
+    def trades(self) -> list[dict]:
+        return self.completed["completed_trades"] if self.completed else []
+
+
+@dataclass
+class BacktestResult:
+    days: list[DayResult]
+    elapsed: float = 0.0
+
+    @property
+    def trades(self) -> list[dict]:
+        return [trade for day in self.days for trade in day.trades]
+
+    def summary(self) -> dict:
+        pnl = [float(trade["profit_or_loss"]) for trade in self.trades]
+        cumulative = np.cumsum(pnl) if pnl else np.zeros(1)
+        drawdown = float((np.maximum.accumulate(cumulative) - cumulative).max())
+        long_pnl = sum(
+            float(t["profit_or_loss"])
+            for t in self.trades
+            if "buy_to_open" in t["action"]
+        )
+        return {
+            "days": len(self.days),
+            "evaluations": sum(day.evaluations for day in self.days),
+            "trades": len(pnl),
+            "win_rate": (sum(1 for p in pnl if p > 0) / len(pnl)) if pnl else 0.0,
+            "overall_profit_loss": float(sum(pnl)),
+            "overall_profit_loss_long": long_pnl,
+            "overall_profit_loss_short": float(sum(pnl)) - long_pnl,
+            "max_drawdown": drawdown,
+            "elapsed_seconds": round(self.elapsed, 2),
+        }
+
+
+class _VirtualClock:
+    def __init__(self):
+        self.now: Optional[datetime] = None
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+def _scan_times(day: date) -> list[datetime]:
+    """When the live scheduler would scan: every minute-bar close + offset, then the session end."""
+    start = NY.localize(
+        datetime.combine(day, time.fromisoformat(settings.TRADING_START))
+    )
+    end = NY.localize(datetime.combine(day, time.fromisoformat(settings.TRADING_END)))
+    offset = timedelta(seconds=settings.SCAN_BAR_CLOSE_OFFSET_SECONDS)
+    times = []
+    current = start + offset
+    while current <= end:
+        times.append(current)
+        current += timedelta(seconds=settings.SCAN_PERIOD_SECONDS)
+    times.append(end)  # lets the strategy's own end-of-day exit fire
+    return times
+
+
+async def replay_day(
+    day: date,
+    intraday: dict[str, dict[str, np.ndarray]],
+    daily: dict[str, dict[str, np.ndarray]],
+) -> DayResult:
+    """Run one session through ``evaluate_ticker`` and return its completed trades."""
+    series = {}
+    for ticker in intraday:
+        arrays = session_snapshot_arrays(
+            intraday[ticker], daily[ticker], day, settings.ORB_MINUTES
+        )
+        series[ticker] = SnapshotSeries(arrays)
+    return await replay_snapshots(day, series)
+
+
+class SnapshotSeries:
+    """One ticker's per-bar snapshots for a session; dicts are built on access."""
+
+    def __init__(self, arrays: dict[str, np.ndarray]):
+        self.arrays = arrays
+        self.timestamps = arrays["timestamp"]
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, k: int) -> dict:
+        return snapshot_at(self.arrays, k)
+
+
+async def replay_snapshots(day: date, snapshots: dict[str, SnapshotSeries]) -> DayResult:
+    """``replay_day`` on precomputed snapshots (the parameter sweep shares them across runs)."""
+    tables: dict[str, InMemoryTableRepository] = {}
+
+    def factory(table_name, key_attributes):
+        tables[table_name] = InMemoryTableRepository(table_name, key_attributes)
+        return tables[table_name]
+
+    set_table_factory(factory)
+    result = DayResult(day=day)
+    last_price: dict[str, float] = {}
+    clock = _VirtualClock()
+    with use_clock(clock), capture_signals() as signals:
+        for scan_at in _scan_times(day):
+            clock.now = scan_at
+            # Bars that have closed by now: bar start <= scan time - 1 minute
+            cutoff = int(pd.Timestamp(scan_at - timedelta(minutes=1)).value)
+            for ticker, series in snapshots.items():
+                k = np.searchsorted(series.timestamps, cutoff, side="right")
+                if k == 0:
+                    continue
+                snapshot = series[k - 1]
+                await evaluate_ticker(ticker, None, None, snapshot)
+                last_price[ticker] = snapshot["price"]
+                result.evaluations += 1
+
+        # Positions the strategy left open (early returns skip its exit) are
+        # closed at the last price so each day stands alone.
+        open_table = tables.get(_OPEN_POSITIONS_TABLE)
+        for item in list(open_table.items.values()) if open_table else []:
+            ticker = item["ticker"]
+            exit_action = (
+                "sell_to_close" if "buy_to_open" in item["action"] else "buy_to_close"
+            )
+            await PositionTracker.close_position(
+                ticker, exit_action, last_price[ticker], "Backtest session end"
+            )
+    completed = tables.get(_COMPLETED_TRADES_TABLE)
+    if completed is not None and completed.items:
+        result.completed = next(iter(completed.items.values()))
+    result.signals = signals
+    return result
+
+
+def _ticker_arrays(df: pd.DataFrame, columns: tuple[str, ...]) -> dict[str, dict]:
+    arrays = {}
+    for ticker, frame in df.groupby(level=0, sort=False):
+        index = frame.index.get_level_values(1)
+        arrays[ticker] = {"timestamp": index.as_unit("ns").asi8}
+        for column in columns:
+            arrays[ticker][column] = frame[column].to_numpy(dtype=np.float64)
+    return arrays
+
+
+def _ny_day_start(day: date) -> int:
+    return int(pd.Timestamp(NY.localize(datetime.combine(day, time()))).value)
+
+
+def split_days(
+    bars_1m: pd.DataFrame,
+    bars_daily: pd.DataFrame,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> Iterator[tuple[date, dict, dict]]:
+    """Per-day inputs: each ticker's minute bars of the day and its daily bars before it."""
+    intraday = _ticker_arrays(bars_1m, INTRADAY_COLUMNS)
+    daily = _ticker_arrays(bars_daily, DAILY_COLUMNS)
+    timestamps = bars_1m.index.get_level_values(1)
+    days = sorted(set(timestamps.tz_convert(NY).date))
+    for day in days:
+        if (start and day < start) or (end and day > end):
+            continue
+        day_start, day_end = _ny_day_start(day), _ny_day_start(day + timedelta(days=1))
+        day_intraday, day_daily = {}, {}
+        for ticker, arrays in intraday.items():
+            lo, hi = np.searchsorted(arrays["timestamp"], [day_start, day_end])
+            if hi == lo:
+                continue
+            day_intraday[ticker] = {c: a[lo:hi] for c, a in arrays.items()}
+            history = daily.get(ticker)
+            if history is None:
+                cut = 0
+                history = {"timestamp": np.empty(0, dtype=np.int64)}
+                history.update({c: np.empty(0) for c in DAILY_COLUMNS})
+            else:
+                cut = np.searchsorted(history["timestamp"], day_start)
+            first = max(0, cut - _DAILY_LOOKBACK)
+            day_daily[ticker] = {c: a[first:cut] for c, a in history.items()}
+        yield day, day_intraday, day_daily
+
+
+def _init_worker(signals: RecordedSignals) -> None:
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    set_signal_source(signals)
+
+
+def _run_day(day: date, intraday: dict, daily: dict) -> DayResult:
+    return asyncio.run(replay_day(day, intraday, daily))
+
+
+def run_backtest(
+    bars_1m: pd.DataFrame,
+    bars_daily: pd.DataFrame,
+    signals: RecordedSignals,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    workers: Optional[int] = None,
+) -> BacktestResult:
+    """Replay every day in [start, end]; ``workers=1`` runs in this process."""
+    workers = workers or os.cpu_count() or 1
+    begin = perf_counter()
+    inputs = list(split_days(bars_1m, bars_daily, start, end))
+    if workers == 1:
+        set_signal_source(signals)
+        try:
+            days = [_run_day(*args) for args in inputs]
+        finally:
+            set_signal_source(None)
+            set_table_factory(None)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(signals,),
+        ) as pool:
+            days = list(pool.map(_run_day, *zip(*inputs))) if inputs else []
+    return BacktestResult(days=days, elapsed=perf_counter() - begin)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Replay recorded bars through the ORB/VWAP/UW strategy"
+    )
+    parser.add_argument("--bars-1m", required=True)
+    parser.add_argument("--bars-daily", required=True)
+    parser.add_argument(
+        "--signals", required=True, help="JSONL of recorded UW signal values"
+    )
+    parser.add_argument("--start", type=date.fromisoformat)
+    parser.add_argument("--end", type=date.fromisoformat)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument(
+        "--output", help="Write the per-day CompletedTrades items as JSON"
+    )
+    args = parser.parse_args(argv)
+
+    result = run_backtest(
+        load_bars(args.bars_1m),
+        load_bars(args.bars_daily),
+        RecordedSignals.load(args.signals),
+        args.start,
+        args.end,
+        args.workers,
+    )
+    summary = result.summary()
+    logger.info(f"Backtest summary: {json.dumps(summary)}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "summary": summary,
+                    "days": [
+                        {**asdict(day), "day": day.day.isoformat()}
+                        for day in result.days
+                    ],
+                },
+                f,
+                indent=2,
+                default=str,
+            )
+
+
+if __name__ == "__main__":
+    main()
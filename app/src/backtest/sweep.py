@@ -0,0 +1,314 @@
+"""
+Parameter sweep of the strategy thresholds over recorded history.
+
+The per-bar indicator snapshots are computed once per distinct ORB_MINUTES
+(in parallel) and placed in one shared memory block. Each configuration then
+replays them through ``evaluate_ticker`` with its settings applied, one pool
+task per configuration and day, so nothing is recomputed per configuration.
+Results are ranked by P&L, then by drawdown:
+
+    python -m app.src.backtest.sweep --bars-1m minute.csv.gz --bars-daily daily.csv.gz \
+        --signals uw_signals.jsonl --param ORB_MINUTES=5,15,30 --param MIN_IV_RANK=10,20,30 \
+        --output sweep.csv
+
+Values are JSON, so a ``--grid`` file can also sweep MIN_RVOL_SCHEDULE, e.g.
+``{"MIN_RVOL_SCHEDULE": [[["09:30", 0.3], ["10:30", 0.8]], [["09:30", 0.5]]]}``.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import random
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from time import perf_counter
+from typing import Any, Optional
+
+import pandas as pd
+
+from app.src.backtest.engine import (
+    BacktestResult,
+    DayResult,
+    RecordedSignals,
+    SnapshotSeries,
+    _init_worker,
+    load_bars,
+    replay_snapshots,
+    split_days,
+)
+from app.src.config.settings import settings
+from app.src.core.compute import SharedFrame, share_arrays
+from app.src.data.unusual_whales import set_signal_source
+from app.src.indicators.technical import SNAPSHOT_COLUMNS, session_snapshot_arrays
+from app.src.persistence.repository import set_table_factory
+from app.src.utils.logger import logger
+
+# Applied inside the UW fetchers; recorded signals are already classified, so a
+# sweep over these would report identical results for every value
+_LIVE_ONLY = {
+    "MIN_FLOW_PREMIUM",
+    "MIN_DARK_POOL_PREMIUM",
+    "MIN_DARK_POOL_SIZE",
+    "MIN_CONGRESS_TRADE_AMOUNT",
+}
+_RANK_COLUMNS = [
+    "trades",
+    "win_rate",
+    "overall_profit_loss",
+    "overall_profit_loss_long",
+    "overall_profit_loss_short",
+    "max_drawdown",
+]
+
+
+def _parse_value(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+
+def parse_param(spec: str) -> tuple[str, list]:
+    """``NAME=v1,v2,...`` -> (NAME, [v1, v2, ...]) with JSON-decoded values."""
+    name, _, values = spec.partition("=")
+    return name.strip(), [_parse_value(value.strip()) for value in values.split(",")]
+
+
+def validate_grid(grid: dict[str, list]) -> None:
+    for name, values in grid.items():
+        if not hasattr(settings, name):
+            raise ValueError(f"Unknown setting {name}")
+        if name in _LIVE_ONLY:
+            raise ValueError(
+                f"{name} is applied when UW data is fetched; recorded signals cannot be re-thresholded"
+            )
+        if not values:
+            raise ValueError(f"No values given for {name}")
+
+
+def configurations(
+    grid: dict[str, list], samples: Optional[int] = None, seed: int = 0
+) -> list[dict]:
+    """Every grid combination, or ``samples`` of them drawn at random."""
+    names = list(grid)
+    configs = [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+    if samples and samples < len(configs):
+        configs = random.Random(seed).sample(configs, samples)
+    return configs
+
+
+def _snapshot_key(orb_minutes: int, day: date, ticker: str) -> str:
+    return f"{orb_minutes}|{day.isoformat()}|{ticker}"
+
+
+def _precompute_day(
+    day: date, intraday: dict, daily: dict, orb_values: list[int]
+) -> dict[str, dict]:
+    return {
+        _snapshot_key(orb, day, ticker): session_snapshot_arrays(
+            intraday[ticker], daily[ticker], day, orb
+        )
+        for orb in orb_values
+        for ticker in intraday
+    }
+
+
+# Worker-side attachments to the shared snapshot block, by name
+_attached: dict[str, tuple] = {}
+
+
+def _shared_arrays(frame: SharedFrame) -> dict:
+    attached = _attached.get(frame.shm_name)
+    if attached is None:
+        attached = _attached[frame.shm_name] = frame.attach()
+    return attached[1]
+
+
+def _detach_all() -> None:
+    for shm, arrays in _attached.values():
+        arrays.clear()
+        shm.close()
+    _attached.clear()
+
+
+def _sweep_day(
+    params: dict, day: date, frame: SharedFrame, tickers: list[str]
+) -> DayResult:
+    for name, value in params.items():
+        setattr(settings, name, value)
+    arrays = _shared_arrays(frame)
+    series = {
+        ticker: SnapshotSeries(
+            frame.symbol_arrays(
+                arrays, _snapshot_key(settings.ORB_MINUTES, day, ticker)
+            )
+        )
+        for ticker in tickers
+    }
+    result = asyncio.run(replay_snapshots(day, series))
+    # Only the trades are needed for ranking
+    result.signals = []
+    return result
+
+
+def _rank(configs: list[dict], results: dict[int, list[DayResult]]) -> pd.DataFrame:
+    rows = []
+    for index, config in enumerate(configs):
+        days = sorted(results[index], key=lambda day: day.day)
+        summary = BacktestResult(days=days).summary()
+        row = {
+            name: value if isinstance(value, (int, float, str)) else json.dumps(value)
+            for name, value in config.items()
+        }
+        row.update({column: summary[column] for column in _RANK_COLUMNS})
+        rows.append(row)
+    table = pd.DataFrame(rows)
+    if table.empty:
+        return table
+    table = table.sort_values(
+        ["overall_profit_loss", "max_drawdown"], ascending=[False, True], kind="stable"
+    ).reset_index(drop=True)
+    table.insert(0, "rank", range(1, len(table) + 1))
+    return table
+
+
+def run_sweep(
+    bars_1m: pd.DataFrame,
+    bars_daily: pd.DataFrame,
+    signals: RecordedSignals,
+    grid: dict[str, list],
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    workers: Optional[int] = None,
+    samples: Optional[int] = None,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Replay every configuration of ``grid`` over [start, end]; ``workers=1`` runs in this process."""
+    validate_grid(grid)
+    configs = configurations(grid, samples, seed)
+    orb_values = sorted(
+        {config.get("ORB_MINUTES", settings.ORB_MINUTES) for config in configs}
+    )
+    workers = workers or os.cpu_count() or 1
+    begin = perf_counter()
+
+    tickers: dict[date, list[str]] = {}
+    precompute_args = []
+    for day, intraday, daily in split_days(bars_1m, bars_daily, start, end):
+        tickers[day] = list(intraday)
+        precompute_args.append((day, intraday, daily, orb_values))
+    tasks = [(index, day) for index in range(len(configs)) for day in tickers]
+    logger.info(
+        f"Sweeping {len(configs)} configurations over {len(tickers)} days "
+        f"({len(tasks)} replays, {workers} workers)"
+    )
+
+    pool = None
+    if workers == 1:
+        set_signal_source(signals)
+        mapper = map
+        saved = {name: getattr(settings, name) for name in grid}
+    else:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(signals,),
+        )
+        mapper = pool.map
+    try:
+        groups = {}
+        for part in (
+            mapper(_precompute_day, *zip(*precompute_args)) if precompute_args else []
+        ):
+            groups.update(part)
+        precompute_args.clear()
+        shm, frame = share_arrays(groups, SNAPSHOT_COLUMNS)
+        del groups
+        logger.info(f"Snapshots precomputed in {perf_counter() - begin:.1f}s")
+        try:
+            replay_args = [
+                (configs[index], day, frame, tickers[day]) for index, day in tasks
+            ]
+            if pool is not None:
+                chunksize = max(1, len(replay_args) // (workers * 4))
+                days = pool.map(_sweep_day, *zip(*replay_args), chunksize=chunksize)
+            else:
+                days = map(_sweep_day, *zip(*replay_args)) if replay_args else []
+            results: dict[int, list[DayResult]] = defaultdict(list)
+            for (index, _), day_result in zip(tasks, days):
+                results[index].append(day_result)
+        finally:
+            _detach_all()
+            shm.close()
+            shm.unlink()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        else:
+            for name, value in saved.items():
+                setattr(settings, name, value)
+            set_signal_source(None)
+            set_table_factory(None)
+
+    table = _rank(configs, results)
+    logger.info(f"Sweep finished in {perf_counter() - begin:.1f}s")
+    return table
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Sweep strategy settings over recorded bars and UW signals"
+    )
+    parser.add_argument("--bars-1m", required=True)
+    parser.add_argument("--bars-daily", required=True)
+    parser.add_argument("--signals", required=True)
+    parser.add_argument(
+        "--param",
+        action="append",
+        default=[],
+        help="NAME=v1,v2,... (JSON values); repeat per setting",
+    )
+    parser.add_argument("--grid", help="JSON file mapping setting names to value lists")
+    parser.add_argument(
+        "--samples", type=int, help="Random search: try this many configurations"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start", type=date.fromisoformat)
+    parser.add_argument("--end", type=date.fromisoformat)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--output", help="Write the ranked table as CSV")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    grid: dict[str, list] = {}
+    if args.grid:
+        with open(args.grid, encoding="utf-8") as f:
+            grid.update(json.load(f))
+    grid.update(parse_param(spec) for spec in args.param)
+    if not grid:
+        parser.error("give at least one --param or a --grid file")
+
+    table = run_sweep(
+        load_bars(args.bars_1m),
+        load_bars(args.bars_daily),
+        RecordedSignals.load(args.signals),
+        grid,
+        args.start,
+        args.end,
+        args.workers,
+        args.samples,
+        args.seed,
+    )
+    logger.info(f"Top configurations:\n{table.head(args.top).to_string(index=False)}")
+    if args.output:
+        table.to_csv(args.output, index=False)
+        logger.info(f"Sweep results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
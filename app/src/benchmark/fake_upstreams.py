@@ -0,0 +1,457 @@
+"""
+Local stand-ins for the Alpaca data, Alpaca trading and Unusual Whales APIs.
+
+Every response is synthetic but shaped like the real one and deterministic per
+ticker, so a benchmark run is repeatable. Latency, 429 rate and payload sizes
+are configurable; ``/_stats`` on any of the servers returns request counts.
+"""
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import random
+from collections import Counter
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+import numpy as np
+from aiohttp import web
+
+from app.src.utils.helpers import NY
+from app.src.utils.http_client import ALPACA_DATA, ALPACA_TRADING, UNUSUAL_WHALES
+
+_SESSION_OPEN = time(9, 30)
+_SESSION_MINUTES = 390
+
+
+@dataclass
+class FakeUpstreamConfig:
+    # Virtual "now" of the scan; bars end at the minute before it
+    scan_time: str = "2025-11-04T11:00:00-05:00"
+    latency_ms: float = 20.0
+    jitter_ms: float = 10.0
+    # Probability that any request is answered with 429 Too Many Requests
+    rate_429: float = 0.0
+    # Payload sizes: bar history per symbol, records per UW response, contracts per chain
+    minute_bars: int = 1000
+    daily_bars: int = 300
+    uw_records: int = 10
+    option_contracts: int = 100
+    # Share of tickers that gap in the stock snapshots; the rest barely move
+    mover_rate: float = 0.1
+    seed: int = 7
+
+    @property
+    def now(self) -> datetime:
+        return datetime.fromisoformat(self.scan_time).astimezone(NY)
+
+
+def _iso(dt: datetime) -> str:
+    return dt.astimezone(NY).isoformat()
+
+
+def _previous_weekdays(day: date, count: int) -> list[date]:
+    days = []
+    while len(days) < count:
+        day -= timedelta(days=1)
+        if day.weekday() < 5:
+            days.append(day)
+    return days[::-1]
+
+
+def _minute_times(now: datetime, count: int) -> list[str]:
+    """Timestamps of the ``count`` regular-session minute bars closed before ``now``."""
+    today_open = NY.localize(datetime.combine(now.date(), _SESSION_OPEN))
+    today = min(max(int((now - today_open).total_seconds() // 60), 0), _SESSION_MINUTES)
+    times = [today_open + timedelta(minutes=i) for i in range(today)]
+    sessions = -(-max(count - today, 0) // _SESSION_MINUTES)
+    earlier = []
+    for day in _previous_weekdays(now.date(), sessions):
+        opened = NY.localize(datetime.combine(day, _SESSION_OPEN))
+        earlier.extend(opened + timedelta(minutes=i) for i in range(_SESSION_MINUTES))
+    return [_iso(t) for t in (earlier + times)[-count:]]
+
+
+def _ticker_rng(ticker: str, seed: int) -> np.random.Generator:
+    digest = hashlib.blake2b(f"{seed}:{ticker}".encode(), digest_size=8).digest()
+    return np.random.default_rng(int.from_bytes(digest, "big"))
+
+
+class FakeUpstreams:
+    """The three fake servers; run in-process with ``start``/``stop`` or via ``FakeUpstreamProcess``."""
+
+    def __init__(self, config: FakeUpstreamConfig):
+        self.config = config
+        self.requests: Counter = Counter()
+        self.throttled: Counter = Counter()
+        self._rng = random.Random(config.seed)
+        self._bodies: dict[tuple, bytes] = {}
+        now = config.now
+        self._minute_times = _minute_times(now, config.minute_bars)
+        self._today_prefix = now.date().isoformat()
+        self._daily_times = [
+            _iso(NY.localize(datetime.combine(day, time(0, 0))))
+            for day in _previous_weekdays(now.date(), config.daily_bars)
+        ]
+        self._runners: list[web.AppRunner] = []
+        # Tickers the screener and assets endpoints return
+        self.universe: list[str] = []
+        self.urls: dict[str, str] = {}
+
+    # -- synthetic data -------------------------------------------------
+
+    def _profile(self, ticker: str) -> tuple[np.random.Generator, float, float]:
+        """Per-ticker generator, base price and trend direction."""
+        rng = _ticker_rng(ticker, self.config.seed)
+        return rng, float(rng.uniform(20, 400)), float(rng.choice((-1.0, 1.0)))
+
+    def _bars(self, ticker: str, daily: bool) -> list[dict]:
+        rng, base, trend = self._profile(ticker)
+        times = self._daily_times if daily else self._minute_times
+        n = len(times)
+        if daily:
+            closes = base * np.exp(
+                np.linspace(-0.3 * trend, 0.0, n) + rng.normal(0, 0.01, n)
+            )
+            volume = rng.integers(2_000_000, 6_000_000, n)
+        else:
+            closes = base * np.exp(np.cumsum(rng.normal(trend * 2e-5, 1e-3, n)))
+            volume = rng.integers(1_000, 20_000, n)
+            # A busy session: today's volume so far is near a full average day, so RVOL filters pass
+            today = np.fromiter(
+                (t.startswith(self._today_prefix) for t in times), bool, n
+            )
+            volume = np.where(today, volume * 4, volume)
+        spread = closes * rng.uniform(0.0005, 0.003, n)
+        return [
+            {
+                "t": t,
+                "o": round(c - s / 2, 4),
+                "h": round(c + s, 4),
+                "l": round(c - s, 4),
+                "c": round(c, 4),
+                "v": int(v),
+                "n": int(v // 50),
+                "vw": round(c, 4),
+            }
+            for t, c, s, v in zip(
+                times, closes.tolist(), spread.tolist(), volume.tolist()
+            )
+        ]
+
+    def _bars_body(
+        self, symbols: list[str], timeframe: str, limit: int, start: Optional[str]
+    ) -> bytes:
+        daily = "day" in timeframe.lower()
+        key = ("bars", tuple(symbols), daily, limit, start)
+        body = self._bodies.get(key)
+        if body is None:
+            since = datetime.fromisoformat(start) if start else None
+            bars = {}
+            for symbol in symbols:
+                series = self._bars(symbol, daily)
+                if since is not None:
+                    series = [
+                        bar
+                        for bar in series
+                        if datetime.fromisoformat(bar["t"]) >= since
+                    ]
+                bars[symbol] = series[-limit:]
+            body = json.dumps({"bars": bars, "next_page_token": None}).encode()
+            self._bodies[key] = body
+        return body
+
+    def _stock_snapshot(self, ticker: str) -> dict:
+        # Own generator, so snapshots do not shift the ticker's bars
+        rng = _ticker_rng(f"snapshot:{ticker}", self.config.seed)
+        _, base, _ = self._profile(ticker)
+        mover = rng.random() < self.config.mover_rate
+        gap = float(rng.normal(0, 0.05 if mover else 0.005))
+        prev_close = base / (1 + gap)
+        volume = int(rng.integers(200_000, 5_000_000) * (3 if mover else 1))
+        return {
+            "latestTrade": {"p": round(base, 4)},
+            "dailyBar": {"o": round(base, 4), "c": round(base, 4), "v": volume},
+            "prevDailyBar": {"c": round(prev_close, 4), "v": volume},
+        }
+
+    def _stock_snapshots(self, request: web.Request) -> dict:
+        symbols = request.query.get("symbols", "").split(",")
+        return {symbol: self._stock_snapshot(symbol) for symbol in symbols}
+
+    def _assets(self, request: web.Request) -> list[dict]:
+        return [
+            {"symbol": ticker, "tradable": True, "exchange": "NASDAQ"}
+            for ticker in self.universe
+        ]
+
+    def _flow_alerts(self, ticker: str) -> list[dict]:
+        rng, _, trend = self._profile(ticker)
+        bullish = trend > 0
+        return [
+            {
+                "type": "call" if bullish else "put",
+                "has_sweep": bool(rng.random() < 0.3),
+                "total_premium": f"{rng.uniform(20_000, 500_000):.2f}",
+                "total_bid_side_prem": f"{rng.uniform(0, 200_000) * (2 if bullish else 1):.2f}",
+                "total_ask_side_prem": f"{rng.uniform(0, 200_000) * (1 if bullish else 2):.2f}",
+            }
+            for _ in range(self.config.uw_records)
+        ]
+
+    def _congress_trades(self, ticker: str) -> list[dict]:
+        rng, _, trend = self._profile(ticker)
+        return [
+            {
+                "txn_type": "BUY" if trend > 0 else "SELL",
+                "amounts": "$15,001 - $50,000",
+                "is_active": bool(rng.random() < 0.5),
+            }
+            for _ in range(self.config.uw_records)
+        ]
+
+    def _dark_pool(self, ticker: str) -> list[dict]:
+        rng, base, _ = self._profile(ticker)
+        return [
+            {
+                "price": f"{base * rng.uniform(0.999, 1.001):.4f}",
+                "nbbo_bid": f"{base * 0.999:.4f}",
+                "nbbo_ask": f"{base * 1.001:.4f}",
+                "premium": f"{rng.uniform(10_000, 1_000_000):.2f}",
+                "size": int(rng.integers(100, 10_000)),
+                "canceled": False,
+            }
+            for _ in range(self.config.uw_records)
+        ]
+
+    def _option_snapshots(self, ticker: str, option_type: str) -> dict:
+        rng, base, _ = self._profile(ticker)
+        letter = "P" if option_type == "put" else "C"
+        today = date.today()
+        snapshots = {}
+        for i in range(self.config.option_contracts):
+            expiry = today + timedelta(days=7 * (1 + i % 7))
+            strike = base * (
+                0.8 + 0.4 * (i // 7) / max(self.config.option_contracts // 7, 1)
+            )
+            symbol = f"{ticker[:5]}{expiry:%y%m%d}{letter}{int(strike * 1000):08d}"
+            bid = round(float(rng.uniform(0.2, 8.0)), 2)
+            snapshots[symbol] = {"latestQuote": {"bp": bid, "ap": round(bid * 1.05, 2)}}
+        return snapshots
+
+    # -- handlers ---------------------------------------------------------
+
+    def _handler(self, upstream: str, route: str, respond):
+        async def handle(request: web.Request) -> web.Response:
+            self.requests[(upstream, route)] += 1
+            config = self.config
+            delay = (config.latency_ms + self._rng.random() * config.jitter_ms) / 1000
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if config.rate_429 and self._rng.random() < config.rate_429:
+                self.throttled[(upstream, route)] += 1
+                return web.json_response(
+                    {"message": "too many requests"},
+                    status=429,
+                    headers={"Retry-After": "1"},
+                )
+            body = respond(request)
+            if isinstance(body, bytes):
+                return web.Response(body=body, content_type="application/json")
+            return web.json_response(body)
+
+        return handle
+
+    def _bars_response(self, request: web.Request) -> bytes:
+        symbols = request.query.get("symbols", "").split(",")
+        limit = int(request.query.get("limit", "1000"))
+        return self._bars_body(
+            symbols,
+            request.query.get("timeframe", "1Min"),
+            limit,
+            request.query.get("start"),
+        )
+
+    def _option_quotes(self, request: web.Request) -> dict:
+        # Leave the quotes empty so the chain falls back to each snapshot's latestQuote
+        return {"quotes": {}}
+
+    def _calendar(self, request: web.Request) -> list[dict]:
+        start = date.fromisoformat(request.query["start"])
+        end = date.fromisoformat(request.query["end"])
+        days = (start + timedelta(days=i) for i in range((end - start).days + 1))
+        return [
+            {"date": day.isoformat(), "open": "09:30", "close": "16:00"}
+            for day in days
+            if day.weekday() < 5
+        ]
+
+    def _screener(self, request: web.Request) -> dict:
+        universe = self.universe
+        limit = int(request.query.get("limit", "50"))
+        return {
+            "data": [
+                {
+                    "ticker": ticker,
+                    "relative_volume": 1.5,
+                    "call_premium": "0",
+                    "put_premium": "0",
+                }
+                for ticker in universe[:limit]
+            ]
+        }
+
+    async def _stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats())
+
+    def stats(self) -> dict:
+        return {
+            "requests": {f"{u} {r}": n for (u, r), n in sorted(self.requests.items())},
+            "throttled": {
+                f"{u} {r}": n for (u, r), n in sorted(self.throttled.items())
+            },
+            "total": sum(self.requests.values()),
+            "total_throttled": sum(self.throttled.values()),
+        }
+
+    def _apps(self) -> dict[str, web.Application]:
+        h = self._handler
+        data = web.Application()
+        data.router.add_get(
+            "/v2/stocks/bars", h(ALPACA_DATA, "/v2/stocks/bars", self._bars_response)
+        )
+        data.router.add_get(
+            "/v2/stocks/snapshots",
+            h(ALPACA_DATA, "/v2/stocks/snapshots", self._stock_snapshots),
+        )
+        data.router.add_get(
+            "/v1beta1/options/snapshots/{ticker}",
+            h(
+                ALPACA_DATA,
+                "/v1beta1/options/snapshots/{ticker}",
+                lambda r: {
+                    "snapshots": self._option_snapshots(
+                        r.match_info["ticker"], r.query.get("type", "put")
+                    )
+                },
+            ),
+        )
+        data.router.add_get(
+            "/v1beta1/options/quotes/latest",
+            h(ALPACA_DATA, "/v1beta1/options/quotes/latest", self._option_quotes),
+        )
+
+        trading = web.Application()
+        trading.router.add_get(
+            "/v2/calendar", h(ALPACA_TRADING, "/v2/calendar", self._calendar)
+        )
+        trading.router.add_get(
+            "/v2/assets", h(ALPACA_TRADING, "/v2/assets", self._assets)
+        )
+
+        uw = web.Application()
+        uw.router.add_get(
+            "/api/option-trades/flow-alerts",
+            h(
+                UNUSUAL_WHALES,
+                "/api/option-trades/flow-alerts",
+                lambda r: {"data": self._flow_alerts(r.query["ticker_symbol"])},
+            ),
+        )
+        uw.router.add_get(
+            "/api/congress/recent-trades",
+            h(
+                UNUSUAL_WHALES,
+                "/api/congress/recent-trades",
+                lambda r: {"data": self._congress_trades(r.query["ticker"])},
+            ),
+        )
+        uw.router.add_get(
+            "/api/darkpool/{ticker}",
+            h(
+                UNUSUAL_WHALES,
+                "/api/darkpool/{ticker}",
+                lambda r: {"data": self._dark_pool(r.match_info["ticker"])},
+            ),
+        )
+        uw.router.add_get(
+            "/api/stock/{ticker}/iv-rank",
+            h(
+                UNUSUAL_WHALES,
+                "/api/stock/{ticker}/iv-rank",
+                lambda r: {"data": [{"iv_rank_1y": "75.0"}]},
+            ),
+        )
+        uw.router.add_get(
+            "/api/screener/stocks",
+            h(UNUSUAL_WHALES, "/api/screener/stocks", self._screener),
+        )
+
+        apps = {ALPACA_DATA: data, ALPACA_TRADING: trading, UNUSUAL_WHALES: uw}
+        for app in apps.values():
+            app.router.add_get("/_stats", self._stats)
+        return apps
+
+    async def start(self, universe: Optional[list[str]] = None) -> dict[str, str]:
+        """Start all servers on free local ports; returns the base URL per upstream."""
+        self.universe = universe or []
+        for name, app in self._apps().items():
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            self._runners.append(runner)
+            self.urls[name] = f"http://127.0.0.1:{runner.addresses[0][1]}"
+        return self.urls
+
+    async def stop(self) -> None:
+        for runner in self._runners:
+            await runner.cleanup()
+        self._runners.clear()
+
+
+async def _serve(config: FakeUpstreamConfig, universe: list[str], conn) -> None:
+    upstreams = FakeUpstreams(config)
+    conn.send(await upstreams.start(universe))
+    # Block (off the loop) until the parent says stop
+    await asyncio.get_running_loop().run_in_executor(None, conn.recv)
+    await upstreams.stop()
+
+
+def _serve_process(config: dict, universe: list[str], conn) -> None:
+    asyncio.run(_serve(FakeUpstreamConfig(**config), universe, conn))
+
+
+class FakeUpstreamProcess:
+    """
+    Runs ``FakeUpstreams`` in its own process, so serving (JSON encoding, the
+    server's event loop) does not count against the scanner being measured.
+    """
+
+    def __init__(self, config: FakeUpstreamConfig, universe: list[str]):
+        self.config = config
+        self.universe = universe
+        self.urls: dict[str, str] = {}
+        self._process = None
+        self._conn = None
+
+    def __enter__(self) -> "FakeUpstreamProcess":
+        context = multiprocessing.get_context("spawn")
+        self._conn, child = context.Pipe()
+        self._process = context.Process(
+            target=_serve_process,
+            args=(asdict(self.config), self.universe, child),
+            name="fake-upstreams",
+            daemon=True,
+        )
+        self._process.start()
+        self.urls = self._conn.recv()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._conn.send("stop")
+        self._process.join(timeout=10)
+        if self._process.is_alive():
+            self._process.kill()
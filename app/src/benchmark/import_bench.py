@@ -0,0 +1,149 @@
+"""
+Import-time benchmark for the entry points.
+
+Each module is imported in a fresh interpreter under ``python -X importtime``,
+with every credential removed from the environment, so a module that needs
+.env just to be imported fails here. The report gives the best-of-N import
+time and the packages that took longest (self time summed per top-level
+package). The run fails if a module pulls in a package listed for it in
+DEFERRED, or if it exceeds ``--budget-ms``:
+
+    python -m app.src.benchmark.import_bench
+    python -m app.src.benchmark.import_bench app.src.main --runs 5 --budget-ms 1500
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+from app.src.utils.logger import logger
+
+DEFAULT_MODULES = (
+    "app.src.main",
+    "app.src.core.scanner",
+    "app.src.indicators.technical",
+    "app.src.backtest.engine",
+)
+
+# Packages a module must not import up front; they are loaded on first use
+DEFERRED = {
+    "app.src.main": ("alpaca", "boto3", "redis"),
+    "app.src.core.scanner": ("alpaca", "boto3", "redis"),
+    "app.src.indicators.technical": ("aiohttp", "alpaca", "boto3", "redis"),
+}
+
+_CREDENTIALS = (
+    "APCA_API_KEY_ID",
+    "APCA_API_SECRET_KEY",
+    "UNUSUAL_WHALES_API_KEY",
+    "REDIS_URL",
+    "AWS_ACCESS_KEY_ID",
+    "AWS_SECRET_ACCESS_KEY",
+)
+_REPO_ROOT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+
+
+@dataclass
+class ImportProfile:
+    module: str
+    total_ms: float
+    # Top-level package -> self time (ms), heaviest first
+    packages: dict[str, float] = field(default_factory=dict)
+    deferred_loaded: list[str] = field(default_factory=list)
+
+
+def parse_importtime(stderr: str, module: str) -> ImportProfile:
+    """Profile of ``module`` from ``-X importtime`` output (times in microseconds)."""
+    total_us = 0
+    self_us: Counter[str] = Counter()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|", 2)
+        if not own.strip().isdigit():
+            continue  # the header line
+        name = name.strip()
+        self_us[name.split(".")[0]] += int(own)
+        if name == module:
+            total_us = int(cumulative)
+    deferred = DEFERRED.get(module, ())
+    return ImportProfile(
+        module=module,
+        total_ms=round(total_us / 1000, 1),
+        packages={
+            package: round(us / 1000, 1) for package, us in self_us.most_common(8)
+        },
+        deferred_loaded=sorted(p for p in deferred if p in self_us),
+    )
+
+
+def measure(module: str, runs: int = 3) -> ImportProfile:
+    """Best of ``runs`` imports of ``module``, each in a new interpreter without credentials."""
+    # Empty, not unset: load_dotenv never overrides a set variable, so a local
+    # .env cannot hide a module that needs credentials at import
+    env = {**os.environ, **{k: "" for k in _CREDENTIALS}, "PYTHONPATH": _REPO_ROOT}
+    best: Optional[ImportProfile] = None
+    for _ in range(runs):
+        try:
+            result = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                cwd=_REPO_ROOT,
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        except subprocess.CalledProcessError as e:
+            tail = "\n".join(e.stderr.strip().splitlines()[-5:])
+            raise RuntimeError(f"import {module} failed:\n{tail}") from e
+        profile = parse_importtime(result.stderr, module)
+        if best is None or profile.total_ms < best.total_ms:
+            best = profile
+    return best
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure import time of the entry points without credentials"
+    )
+    parser.add_argument("modules", nargs="*", default=list(DEFAULT_MODULES))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument(
+        "--budget-ms", type=float, help="Fail when a module takes longer to import"
+    )
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args(argv)
+
+    profiles = [measure(module, args.runs) for module in args.modules]
+    failures = []
+    for profile in profiles:
+        heaviest = ", ".join(f"{p} {ms:.0f}" for p, ms in profile.packages.items())
+        logger.info(f"{profile.module}: {profile.total_ms:.0f} ms ({heaviest})")
+        if profile.deferred_loaded:
+            failures.append(
+                f"{profile.module} imports {', '.join(profile.deferred_loaded)} up front"
+            )
+        if args.budget_ms and profile.total_ms > args.budget_ms:
+            failures.append(
+                f"{profile.module}: {profile.total_ms:.0f} ms > {args.budget_ms:.0f} ms"
+            )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump([asdict(p) for p in profiles], f, indent=2)
+
+    if failures:
+        for failure in failures:
+            logger.error(failure)
+        sys.exit(1)
+    logger.success("Import times within budget")
+
+
+if __name__ == "__main__":
+    main()
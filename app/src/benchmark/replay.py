@@ -0,0 +1,61 @@
+"""
+Replay a recorded HTTP cassette (see app.src.utils.cassette) through a job,
+with no network, optionally under cProfile:
+
+    python -m app.src.benchmark.replay data/cassettes/2025-11-03.jsonl.gz --job scan_once --timing fast
+"""
+
+import argparse
+import asyncio
+import cProfile
+import time
+from datetime import datetime
+from typing import Optional
+
+from app.src.core.scanner import scan_once
+from app.src.strategies.wheel_master import run_weekly_put_wheel
+from app.src.utils.cassette import FAST, ORIGINAL, REPLAY, start_cassette, stop_cassette
+from app.src.utils.helpers import NY, use_clock
+from app.src.utils.http_client import close_sessions
+from app.src.utils.logger import logger
+
+
+async def _replay_job(path: str, job: str, timing: str, profile: Optional[str]) -> None:
+    server = await start_cassette(REPLAY, path, timing)
+    # Strategy code sees the recording's wall-clock time, advancing in real time
+    offset = server.started_at - time.time() if server.started_at else 0.0
+    profiler = cProfile.Profile() if profile else None
+    try:
+        with use_clock(lambda: datetime.fromtimestamp(time.time() + offset, NY)):
+            run = scan_once if job == "scan_once" else run_weekly_put_wheel
+            started = time.perf_counter()
+            if profiler:
+                profiler.enable()
+            await run()
+            if profiler:
+                profiler.disable()
+            logger.info(f"Replayed {job} in {time.perf_counter() - started:.3f}s")
+    finally:
+        await close_sessions()
+        await stop_cassette()
+    if profiler:
+        profiler.dump_stats(profile)
+        logger.info(f"Profile written to {profile}")
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded HTTP cassette through a job"
+    )
+    parser.add_argument("path")
+    parser.add_argument(
+        "--job", choices=("scan_once", "put_wheel"), default="scan_once"
+    )
+    parser.add_argument("--timing", choices=(ORIGINAL, FAST), default=ORIGINAL)
+    parser.add_argument("--profile", help="Write cProfile stats here")
+    args = parser.parse_args(argv)
+    asyncio.run(_replay_job(args.path, args.job, args.timing, args.profile))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""
+Scan-path benchmark on synthetic universes against local fake upstreams.
+
+Each universe size runs in a fresh process (so peak RSS is per universe):
+a warm-up ``scan_once``, ``--scans`` measured scans, then one put-wheel pass.
+The virtual clock starts inside the session and moves one scan period per
+scan, so the measured scans are steady-state scans: bars are topped up and UW
+signals expire as they would live. Results are compared with a
+baseline and the run fails if any gated metric regressed:
+
+    python -m app.src.benchmark.scan_bench --update-baseline
+    python -m app.src.benchmark.scan_bench --universes 80 500 3000 --latency-ms 40 --rate-429 0.02
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import resource
+import string
+import sys
+from dataclasses import asdict, fields
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Optional
+
+import aiohttp
+import numpy as np
+
+from app.src.benchmark.fake_upstreams import FakeUpstreamConfig, FakeUpstreamProcess
+from app.src.config.settings import settings
+from app.src.utils.http_client import ALPACA_DATA, ALPACA_TRADING, UNUSUAL_WHALES
+from app.src.utils.logger import logger
+
+DEFAULT_UNIVERSES = (80, 500, 3000)
+DEFAULT_BASELINE = "data/benchmarks/scan_baseline.json"
+
+# metric -> (relative tolerance, absolute slack); exceeding baseline * (1 + rel) + slack fails
+TOLERANCES = {
+    "scan_p50_s": (0.25, 0.05),
+    "scan_p99_s": (0.25, 0.10),
+    "skipped_per_scan": (0.0, 0.0),
+    "timed_out_per_scan": (0.0, 0.5),
+    "requests_per_scan": (0.02, 1),
+    "peak_rss_mb": (0.15, 25),
+    "loop_lag_max_ms": (0.50, 25),
+    "loop_stalls_per_scan": (0.0, 0.5),
+    "wheel_s": (0.25, 0.10),
+    "wheel_requests": (0.02, 1),
+}
+
+
+def synthetic_universe(size: int) -> list[str]:
+    """``size`` distinct four-letter tickers (valid in OCC option symbols)."""
+    letters = itertools.product(string.ascii_uppercase, repeat=4)
+    return ["".join(chars) for chars in itertools.islice(letters, size)]
+
+
+def benchmark_settings(
+    urls: dict[str, str], universe: list[str], compute: str, prescreen: bool = False
+) -> dict:
+    """Settings overrides that point the app at the fake upstreams."""
+    return {
+        "ALPACA_DATA_URL": urls[ALPACA_DATA],
+        "ALPACA_TRADING_URL": urls[ALPACA_TRADING],
+        "UW_BASE_URL": urls[UNUSUAL_WHALES],
+        "WATCHLIST": universe,
+        "SCAN_UNIVERSE": "watchlist",
+        "SCAN_PRESCREEN": prescreen,
+        "BLOCKED_TICKERS": set(),
+        "PERSISTENCE_BACKEND": "memory",
+        "COMPUTE_EXECUTOR": compute,
+        "DEBUG_OPTION": True,
+        "WHEEL_TICKER_PAUSE_SECONDS": 0.0,
+        "UW_SIGNAL_RECORD_PATH": "",
+        "HTTP_CASSETTE_MODE": "",
+        # Measure the whole universe; peak_rss_mb is gated separately
+        "RSS_BUDGET_MB": 0,
+        # The fake upstreams accept any key
+        "ALPACA_KEY": settings.ALPACA_KEY or "bench",
+        "ALPACA_SECRET": settings.ALPACA_SECRET or "bench",
+    }
+
+
+async def _request_total(
+    session: aiohttp.ClientSession, urls: dict[str, str]
+) -> tuple[int, int]:
+    async with session.get(f"{urls[ALPACA_DATA]}/_stats") as resp:
+        stats = await resp.json()
+    return stats["total"], stats["total_throttled"]
+
+
+async def run_jobs(
+    urls: dict[str, str], scan_time: datetime, scans: int, wheel: bool = True
+) -> dict:
+    """
+    Measure ``scan_once`` and the put wheel in this process. Settings must
+    already point at the fake upstreams (see ``benchmark_settings``).
+    """
+    from app.src.core.loop_monitor import loop_monitor
+    from app.src.core.scanner import scan_once
+    from app.src.core.signaler import capture_signals
+    from app.src.persistence.repository import (
+        InMemoryTableRepository,
+        set_table_factory,
+    )
+    from app.src.strategies.wheel_master import run_weekly_put_wheel
+    from app.src.utils.helpers import use_clock
+
+    latencies, requests, lags = [], [], []
+    throttled = timed_out = failed = skipped = stalls = scanned = 0
+    metrics: dict = {}
+    clock = [scan_time]
+    async with aiohttp.ClientSession() as stats_session:
+        # Signals are captured rather than queued; the outbox is not on the measured path
+        with use_clock(lambda: clock[0]), capture_signals() as signals:
+            # Warm-up: calendar, HTTP pools, compute workers and the servers' payload caches
+            set_table_factory(InMemoryTableRepository)
+            await scan_once()
+            for _ in range(scans):
+                clock[0] += timedelta(seconds=settings.SCAN_PERIOD_SECONDS)
+                # Fresh tables, so every scan sees the same (flat) positions
+                set_table_factory(InMemoryTableRepository)
+                before, throttled_before = await _request_total(stats_session, urls)
+                started = perf_counter()
+                summary = await scan_once()
+                latencies.append(perf_counter() - started)
+                after, throttled_after = await _request_total(stats_session, urls)
+                requests.append(after - before)
+                throttled += throttled_after - throttled_before
+                if summary is None:
+                    # Bars did not arrive within the scan budget
+                    skipped += 1
+                    continue
+                scanned += summary.scanned
+                lags.append(summary.loop_lag.max_ms)
+                stalls += summary.loop_lag.stalls
+                timed_out += len(summary.timed_out)
+                failed += len(summary.failed)
+            scan_signals = len(signals)
+
+            if wheel:
+                set_table_factory(InMemoryTableRepository)
+                loop_monitor.start()
+                loop_monitor.snapshot(reset=True)
+                before, _ = await _request_total(stats_session, urls)
+                started = perf_counter()
+                await run_weekly_put_wheel()
+                metrics["wheel_s"] = round(perf_counter() - started, 4)
+                after, _ = await _request_total(stats_session, urls)
+                metrics["wheel_requests"] = after - before
+                metrics["wheel_loop_lag_max_ms"] = round(
+                    loop_monitor.snapshot(reset=True).max_ms, 1
+                )
+                metrics["wheel_signals"] = len(signals) - scan_signals
+                loop_monitor.stop()
+    set_table_factory(None)
+
+    metrics.update(
+        scan_p50_s=round(float(np.percentile(latencies, 50)), 4),
+        scan_p99_s=round(float(np.percentile(latencies, 99)), 4),
+        requests_per_scan=round(sum(requests) / len(requests), 1),
+        scanned_per_scan=round(scanned / scans, 1),
+        loop_lag_max_ms=round(max(lags, default=0.0), 1),
+        loop_stalls_per_scan=round(stalls / scans, 1),
+        skipped_per_scan=round(skipped / scans, 1),
+        throttled_per_scan=round(throttled / scans, 1),
+        timed_out_per_scan=round(timed_out / scans, 1),
+        failed_per_scan=round(failed / scans, 1),
+        scan_signals=scan_signals,
+    )
+    return metrics
+
+
+async def _bench_universe(size: int, urls: dict[str, str], options: dict) -> dict:
+    for name, value in benchmark_settings(
+        urls, synthetic_universe(size), options["compute"], options["prescreen"]
+    ).items():
+        setattr(settings, name, value)
+
+    import fakeredis
+
+    from app.src.core.compute import get_compute_executor
+    from app.src.utils.clients import REDIS, set_client
+    from app.src.utils.http_client import close_sessions
+
+    set_client(REDIS, fakeredis.FakeRedis(decode_responses=True))
+    scan_time = FakeUpstreamConfig(**options["upstreams"]).now
+    try:
+        metrics = await run_jobs(urls, scan_time, options["scans"], options["wheel"])
+    finally:
+        await close_sessions()
+        get_compute_executor().shutdown()
+    # Scanner process only (ru_maxrss is in kilobytes on Linux)
+    metrics["peak_rss_mb"] = round(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+    )
+    return metrics
+
+
+def _universe_process(size: int, urls: dict[str, str], options: dict, queue) -> None:
+    try:
+        queue.put(("ok", asyncio.run(_bench_universe(size, urls, options))))
+    except Exception as e:
+        logger.exception(f"Benchmark for {size} tickers failed")
+        queue.put(("error", repr(e)))
+
+
+def run_suite(universes: list[int], config: FakeUpstreamConfig, options: dict) -> dict:
+    """Run every universe size in its own process against one fake upstream process."""
+    context = multiprocessing.get_context("spawn")
+    options = {**options, "upstreams": asdict(config)}
+    results = {}
+    with FakeUpstreamProcess(config, synthetic_universe(max(universes))) as upstreams:
+        for size in universes:
+            logger.info(f"Benchmarking {size} tickers...")
+            queue = context.Queue()
+            process = context.Process(
+                target=_universe_process,
+                args=(size, upstreams.urls, options, queue),
+                name=f"bench-{size}",
+            )
+            process.start()
+            status, value = queue.get()
+            process.join()
+            if status != "ok":
+                raise RuntimeError(f"Benchmark for {size} tickers failed: {value}")
+            results[str(size)] = value
+            logger.info(f"{size} tickers: {json.dumps(value)}")
+    return results
+
+
+def compare(results: dict, baseline: dict) -> list[str]:
+    """Human-readable regressions of ``results`` against ``baseline`` (both keyed by universe size)."""
+    regressions = []
+    for size, metrics in results.items():
+        reference = baseline.get(size)
+        if reference is None:
+            continue
+        for metric, (relative, slack) in TOLERANCES.items():
+            if metric not in metrics or metric not in reference:
+                continue
+            limit = reference[metric] * (1 + relative) + slack
+            if metrics[metric] > limit:
+                regressions.append(
+                    f"{size} tickers: {metric} {metrics[metric]} > {limit:.4g} "
+                    f"(baseline {reference[metric]})"
+                )
+    return regressions
+
+
+def load_baseline(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(
+    path: str, results: dict, config: FakeUpstreamConfig, options: dict
+) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"config": asdict(config), "options": options, "results": results},
+            f,
+            indent=2,
+        )
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark scan_once and the put wheel on synthetic universes"
+    )
+    parser.add_argument(
+        "--universes", type=int, nargs="+", default=list(DEFAULT_UNIVERSES)
+    )
+    parser.add_argument(
+        "--scans", type=int, default=5, help="Measured scans per universe"
+    )
+    parser.add_argument("--no-wheel", action="store_true")
+    parser.add_argument(
+        "--prescreen",
+        action="store_true",
+        help="Filter each universe by stock snapshots before fetching bars",
+    )
+    parser.add_argument(
+        "--compute", choices=("process", "inline"), default=settings.COMPUTE_EXECUTOR
+    )
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", help="Write the results as JSON")
+    defaults = FakeUpstreamConfig()
+    for field in fields(FakeUpstreamConfig):
+        parser.add_argument(
+            f"--{field.name.replace('_', '-')}",
+            type=type(getattr(defaults, field.name)),
+            default=getattr(defaults, field.name),
+        )
+    args = parser.parse_args(argv)
+
+    config = FakeUpstreamConfig(
+        **{
+            field.name: getattr(args, field.name)
+            for field in fields(FakeUpstreamConfig)
+        }
+    )
+    options = {
+        "scans": args.scans,
+        "wheel": not args.no_wheel,
+        "compute": args.compute,
+        "prescreen": args.prescreen,
+    }
+    results = run_suite(args.universes, config, options)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        save_baseline(args.baseline, results, config, options)
+        logger.info(f"Baseline written to {args.baseline}")
+        return
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        logger.warning(
+            f"No baseline at {args.baseline}; run with --update-baseline to record one"
+        )
+        return
+    if baseline.get("config") != asdict(config) or baseline.get("options") != options:
+        logger.warning(
+            "Baseline was recorded with different upstream settings or options"
+        )
+    regressions = compare(results, baseline["results"])
+    if regressions:
+        for regression in regressions:
+            logger.error(f"Regression: {regression}")
+        sys.exit(1)
+    logger.success(f"No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,13 +19,76 @@ class Settings:
     ALPACA_SECRET = os.getenv("APCA_API_SECRET_KEY")
     UW_API_KEY = os.getenv("UNUSUAL_WHALES_API_KEY")
     REDIS_URL = os.getenv("REDIS_URL", "")
+    ALPACA_DATA_URL = os.getenv("ALPACA_DATA_URL", "https://data.alpaca.markets")
+    ALPACA_TRADING_URL = os.getenv(
+        "ALPACA_TRADING_URL", "https://paper-api.alpaca.markets"
+    )
+    UW_BASE_URL = os.getenv("UW_BASE_URL", "https://api.unusualwhales.com")
+    # JSONL log of live UW signal values, replayed by the backtest engine (off when empty)
+    UW_SIGNAL_RECORD_PATH = os.getenv("UW_SIGNAL_RECORD_PATH", "")
+    # Per-ticker UW signals are reused for this long (congress trades and IV rank:
+    # the slow TTL); see unusual_whales.SignalCache
+    UW_SIGNAL_TTL_SECONDS = float(os.getenv("UW_SIGNAL_TTL_SECONDS", "60"))
+    UW_SLOW_SIGNAL_TTL_SECONDS = float(os.getenv("UW_SLOW_SIGNAL_TTL_SECONDS", "3600"))
+    # Shared HTTP pool tuning (see app.src.utils.http_client)
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_LIMIT_PER_HOST = int(os.getenv("HTTP_LIMIT_PER_HOST", "20"))
+    HTTP_DNS_CACHE_TTL = 300
+    HTTP_KEEPALIVE_SECONDS = 60.0
+    # Bars are stored as float32 while every price in a chunk is below this (see alpaca_client._compact)
+    BAR_FLOAT32_MAX_PRICE = float(os.getenv("BAR_FLOAT32_MAX_PRICE", "100000"))
+    # Scans are cut to the tickers whose bars fit under this RSS (MB; 0: no budget).
+    # A standard Heroku dyno has 512 MB; fetching takes ~BAR_FETCH_OVERHEAD x the stored bars.
+    RSS_BUDGET_MB = float(os.getenv("RSS_BUDGET_MB", "400"))
+    BAR_FETCH_OVERHEAD = float(os.getenv("BAR_FETCH_OVERHEAD", "4"))
+    # Symbols per request when topping up the bar buffers (see data.bar_buffer)
+    BAR_INCREMENTAL_CHUNK = int(os.getenv("BAR_INCREMENTAL_CHUNK", "100"))
+    # Universe scanned: "watchlist" (WATCHLIST) or "assets" (every active, tradable US equity)
+    SCAN_UNIVERSE = os.getenv("SCAN_UNIVERSE", "watchlist").lower()
+    # Pre-screen (see core.prescreen): batched snapshots filter the universe by
+    # MIN_PRICE, day volume and gap before any bars are fetched
+    SCAN_PRESCREEN = os.getenv("SCAN_PRESCREEN", "false").lower() == "true"
+    PRESCREEN_MIN_VOLUME = float(os.getenv("PRESCREEN_MIN_VOLUME", "100000"))
+    # Minimum move from the previous close, at the open or now (%)
+    PRESCREEN_MIN_GAP_PCT = float(os.getenv("PRESCREEN_MIN_GAP_PCT", "1.0"))
+    SNAPSHOT_CHUNK = int(os.getenv("SNAPSHOT_CHUNK", "1000"))
+    # Warm-restart snapshot (see core.state_snapshot): "file", "redis" or "" (off).
+    # Saved every N seconds and on SIGTERM; ignored at boot once older than the max age
+    STATE_SNAPSHOT_BACKEND = os.getenv("STATE_SNAPSHOT_BACKEND", "")
+    STATE_SNAPSHOT_PATH = os.getenv("STATE_SNAPSHOT_PATH", "data/state_snapshot.pkl")
+    STATE_SNAPSHOT_REDIS_KEY = os.getenv("STATE_SNAPSHOT_REDIS_KEY", "algo:state_snapshot")
+    STATE_SNAPSHOT_SECONDS = float(os.getenv("STATE_SNAPSHOT_SECONDS", "300"))
+    STATE_SNAPSHOT_MAX_AGE_SECONDS = float(
+        os.getenv("STATE_SNAPSHOT_MAX_AGE_SECONDS", str(4 * 24 * 3600))
+    )
+    # Per-endpoint request stats (see app.src.utils.http_stats): rolling window, samples kept per endpoint
+    HTTP_STATS_WINDOW_SECONDS = float(os.getenv("HTTP_STATS_WINDOW_SECONDS", "300"))
+    HTTP_STATS_MAX_SAMPLES = int(os.getenv("HTTP_STATS_MAX_SAMPLES", "5000"))
+    ALPACA_BARS_CONCURRENCY = int(os.getenv("ALPACA_BARS_CONCURRENCY", "8"))
+    # Upstream traffic cassette: "record", "replay" or off (see app.src.utils.cassette)
+    HTTP_CASSETTE_MODE = os.getenv("HTTP_CASSETTE_MODE", "")
+    HTTP_CASSETTE_PATH = os.getenv("HTTP_CASSETTE_PATH", "data/cassettes/session.jsonl.gz")
+    HTTP_CASSETTE_TIMING = os.getenv("HTTP_CASSETTE_TIMING", "original")
     WEBHOOK_URL = (
         "https://tradingview-webhook-maverick-d375f5273444.herokuapp.com/webhook"
     )
     INDICATOR_NAME = "AlgoTrader_Elite_2025"
+    # Signals are persisted here before the dispatcher posts them to WEBHOOK_URL
+    SIGNAL_OUTBOX_PATH = os.getenv("SIGNAL_OUTBOX_PATH", "data/signal_outbox.db")
+    SIGNAL_OUTBOX_RETENTION_DAYS = 7
+    SIGNAL_DISPATCH_CONCURRENCY = int(os.getenv("SIGNAL_DISPATCH_CONCURRENCY", "4"))
+    SIGNAL_MAX_ATTEMPTS = 8
+    SIGNAL_RETRY_BASE_SECONDS = 2.0
+    SIGNAL_RETRY_MAX_SECONDS = 300.0
     AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
     AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
     AWS_DEFAULT_REGION = os.getenv("AWS_DEFAULT_REGION", "us-east-1")
+    # "dynamodb" in production; "memory" keeps everything in-process (local runs, backtests)
+    PERSISTENCE_BACKEND = os.getenv("PERSISTENCE_BACKEND", "dynamodb").lower()
+    # Point at DynamoDB Local or a moto server instead of AWS
+    DYNAMODB_ENDPOINT_URL = os.getenv("DYNAMODB_ENDPOINT_URL") or None
+    # Size of the executor (and HTTP pool) that runs DynamoDB calls off the event loop
+    DYNAMODB_MAX_WORKERS = int(os.getenv("DYNAMODB_MAX_WORKERS", "8"))
 
     WATCHLIST = [
         "SPY",
@@ -165,6 +228,17 @@ class Settings:
 
     MIN_PRICE = 0.5
     MIN_RVOL = 0.2 if _now_ny().hour < 11 else 0.7  # Low in early, higher later
+    # Minimum RVOL by time of day (ET), see get_dynamic_min_rvol: each threshold
+    # applies from its start time until the next one, the last until the end time
+    MIN_RVOL_SCHEDULE = [
+        ("09:30", 0.3),  # early morning, low volume
+        ("10:30", 0.8),  # mid-morning
+        ("12:00", 1.2),  # lunch/afternoon
+        ("14:00", 1.2),  # early power hour
+        ("15:00", 2.0),  # power hour peak
+    ]
+    MIN_RVOL_SCHEDULE_END = "16:00"
+    MIN_RVOL_OUTSIDE_SCHEDULE = 0.7
     ORB_MINUTES = 15
     # Flow alert thresholds - more realistic for actual trading
     MIN_FLOW_PREMIUM = 50000  # $50k minimum premium for significant flow
@@ -175,6 +249,67 @@ class Settings:
     MIN_DARK_POOL_SIZE = 5000  # 5k shares minimum
     # IV rank threshold - allow lower IV for more opportunities
     MIN_IV_RANK = 10.0  # Lowered from 15.0 to 10.0 for more trades
+    # Scans start this many seconds after each minute-bar close so the bar is published
+    SCAN_PERIOD_SECONDS = int(os.getenv("SCAN_PERIOD_SECONDS", "60"))
+    SCAN_BAR_CLOSE_OFFSET_SECONDS = float(os.getenv("SCAN_BAR_CLOSE_OFFSET_SECONDS", "3"))
+    # A scan may use this fraction of the period; one ticker at most the smaller one
+    SCAN_DEADLINE_FRACTION = float(os.getenv("SCAN_DEADLINE_FRACTION", "0.8"))
+    SCAN_TICKER_DEADLINE_FRACTION = float(
+        os.getenv("SCAN_TICKER_DEADLINE_FRACTION", "0.5")
+    )
+    SCAN_MAX_CONCURRENCY = int(os.getenv("SCAN_MAX_CONCURRENCY", "16"))
+    # Seconds between exit checks of the open positions at their latest trade
+    # price (see core.exit_monitor); 0 leaves exits to the scan
+    EXIT_MONITOR_SECONDS = float(os.getenv("EXIT_MONITOR_SECONDS", "5"))
+    # Reuse a ticker's last decision while its bars, cached UW signals,
+    # position and time-of-day rules are unchanged (see orb_vwap_uw)
+    SCAN_SKIP_UNCHANGED = os.getenv("SCAN_SKIP_UNCHANGED", "true").lower() == "true"
+    # Adaptive cadence (see core.priority): the scan job runs every SCAN_TICK_SECONDS
+    # and evaluates the tickers whose tier is due. Hot tickers (near an ORB level or
+    # VWAP with RVOL, or holding a position) are due every SCAN_HOT_SECONDS, warm
+    # ones every SCAN_PERIOD_SECONDS, and cold ones (RVOL too low or far from every
+    # level) every SCAN_COLD_SECONDS
+    SCAN_PRIORITY = os.getenv("SCAN_PRIORITY", "false").lower() == "true"
+    SCAN_TICK_SECONDS = float(os.getenv("SCAN_TICK_SECONDS", "10"))
+    SCAN_HOT_SECONDS = float(os.getenv("SCAN_HOT_SECONDS", "10"))
+    SCAN_COLD_SECONDS = float(os.getenv("SCAN_COLD_SECONDS", "300"))
+    # Distance from the nearest level, % of price
+    SCAN_HOT_DISTANCE_PCT = float(os.getenv("SCAN_HOT_DISTANCE_PCT", "0.3"))
+    SCAN_COLD_DISTANCE_PCT = float(os.getenv("SCAN_COLD_DISTANCE_PCT", "2.0"))
+    # Alpaca and UW requests per minute, across all jobs, that ticks may fill (0: no budget)
+    SCAN_REQUEST_BUDGET_PER_MINUTE = int(
+        os.getenv("SCAN_REQUEST_BUDGET_PER_MINUTE", "0")
+    )
+    # CPU-bound indicator/chain work: "process" (worker pool) or "inline" (loop thread)
+    COMPUTE_EXECUTOR = os.getenv("COMPUTE_EXECUTOR", "process").lower()
+    COMPUTE_WORKERS = int(
+        os.getenv("COMPUTE_WORKERS", str(min(4, os.cpu_count() or 1)))
+    )
+    LOOP_LAG_SAMPLE_SECONDS = 0.1
+    # Lag at which the loop watchdog samples the loop thread's stack and logs the blocking call
+    LOOP_STALL_THRESHOLD_MS = float(os.getenv("LOOP_STALL_THRESHOLD_MS", "250"))
+    # Latency histograms (app.src.utils.metrics): Prometheus /metrics on this
+    # port (off when 0) and a p50/p95/p99 summary log every N seconds (off when 0)
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+    METRICS_HOST = os.getenv("METRICS_HOST", "0.0.0.0")
+    METRICS_SUMMARY_SECONDS = float(os.getenv("METRICS_SUMMARY_SECONDS", "300"))
+    # Span traces of each scan and its slowest tickers, appended as JSONL (off when empty)
+    TRACE_PATH = os.getenv("TRACE_PATH", "")
+    TRACE_SLOWEST_K = int(os.getenv("TRACE_SLOWEST_K", "5"))
+    # Per-ticker decision records as JSONL, e.g. logs/decisions.jsonl (off when
+    # empty, the default); a ticker's NO TRADE repeating the same code within
+    # N seconds is counted, not written
+    DECISION_LOG_PATH = os.getenv("DECISION_LOG_PATH", "")
+    DECISION_LOG_REPEAT_SECONDS = float(os.getenv("DECISION_LOG_REPEAT_SECONDS", "300"))
+    # Sharded scanning: workers split the watchlist through Redis leases
+    SCAN_SHARDING = os.getenv("SCAN_SHARDING", "false").lower() == "true"
+    SCAN_WORKER_PROCESSES = int(os.getenv("SCAN_WORKER_PROCESSES", "1"))
+    SHARD_LEASE_TTL_SECONDS = float(os.getenv("SHARD_LEASE_TTL_SECONDS", "30"))
+    SHARD_HEARTBEAT_SECONDS = float(os.getenv("SHARD_HEARTBEAT_SECONDS", "10"))
+    WHEEL_PERIOD_SECONDS = 60
+    # Pause between wheel tickers to stay under the upstream rate limits
+    WHEEL_TICKER_PAUSE_SECONDS = float(os.getenv("WHEEL_TICKER_PAUSE_SECONDS", "8"))
+    MARKET_CALENDAR_LOOKAHEAD_DAYS = 14
     TRADING_START = "09:30"
     TRADING_END = "15:55"
     ORB_PHASE_END = "10:30"
@@ -182,9 +317,14 @@ class Settings:
     # Debug flag to force options strategies to run immediately (e.g., on laptop)
     DEBUG_OPTION = os.getenv("DEBUG_OPTION", "false").lower() == "true"
 
+    def validate(self) -> None:
+        """
+        Fail fast on missing credentials. Called by the trading entry point,
+        not at import, so tools and tests can import modules without them.
+        """
+        if not all([self.ALPACA_KEY, self.ALPACA_SECRET]):
+            logger.error("Missing Alpaca keys in .env")
+            raise ValueError("Configure .env")
 
-settings = Settings()
 
-if not all([settings.ALPACA_KEY, settings.ALPACA_SECRET]):
-    logger.error("Missing Alpaca keys in .env")
-    raise ValueError("Configure .env")
+settings = Settings()
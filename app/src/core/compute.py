@@ -0,0 +1,229 @@
+import asyncio
+import multiprocessing
+from abc import ABC, abstractmethod
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from multiprocessing import shared_memory
+from typing import Any, Callable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from app.src.config.settings import settings
+from app.src.data.bar_store import BarStore, as_bar_store, float64_column
+from app.src.indicators.technical import (
+    DAILY_COLUMNS,
+    INTRADAY_COLUMNS,
+    indicator_snapshot,
+)
+from app.src.utils.logger import logger
+
+
+class ComputeExecutor(ABC):
+    """Where CPU-bound work runs. ``run`` is awaited from the event loop."""
+
+    name = "base"
+
+    @abstractmethod
+    async def run(self, fn: Callable, *args) -> Any:
+        """Return ``fn(*args)``, computed wherever this executor runs work."""
+
+    @property
+    def workers(self) -> int:
+        return 1
+
+    def shutdown(self) -> None:
+        pass
+
+
+class InlineComputeExecutor(ComputeExecutor):
+    """Runs the work on the loop thread; the baseline to compare the pool against."""
+
+    name = "inline"
+
+    async def run(self, fn: Callable, *args) -> Any:
+        return fn(*args)
+
+
+class ProcessPoolComputeExecutor(ComputeExecutor):
+    """Runs the work in worker processes so the loop keeps serving I/O."""
+
+    name = "process"
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def workers(self) -> int:
+        return self.max_workers
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    async def run(self, fn: Callable, *args) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_pool(), fn, *args)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+@lru_cache(maxsize=1)
+def get_compute_executor() -> ComputeExecutor:
+    if settings.COMPUTE_EXECUTOR == "process":
+        return ProcessPoolComputeExecutor(settings.COMPUTE_WORKERS)
+    return InlineComputeExecutor()
+
+
+@dataclass(frozen=True)
+class SharedFrame:
+    """
+    A (symbol, timestamp) bar frame laid out column by column in one shared
+    memory block. Only this small descriptor is pickled to the workers.
+    """
+
+    shm_name: str
+    columns: tuple[str, ...]
+    length: int
+    slices: dict[str, tuple[int, int]]
+
+    def views(self, shm: shared_memory.SharedMemory) -> dict[str, np.ndarray]:
+        """Zero-copy column arrays over ``shm``."""
+        arrays = {}
+        for i, column in enumerate(("timestamp",) + self.columns):
+            dtype = np.int64 if column == "timestamp" else np.float64
+            arrays[column] = np.ndarray(
+                (self.length,), dtype=dtype, buffer=shm.buf, offset=i * self.length * 8
+            )
+        return arrays
+
+    def attach(self) -> tuple[shared_memory.SharedMemory, dict[str, np.ndarray]]:
+        if sys.version_info >= (3, 13):
+            # The creating process owns the block; a worker must not unlink it on exit
+            shm = shared_memory.SharedMemory(name=self.shm_name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=self.shm_name)
+        return shm, self.views(shm)
+
+    def symbol_arrays(
+        self, arrays: dict[str, np.ndarray], symbol: str
+    ) -> dict[str, np.ndarray]:
+        start, stop = self.slices.get(symbol, (0, 0))
+        return {column: values[start:stop] for column, values in arrays.items()}
+
+
+def share_frame(
+    bars: Union[BarStore, pd.DataFrame], columns: tuple[str, ...]
+) -> tuple[shared_memory.SharedMemory, SharedFrame]:
+    """
+    Copy the bars into shared memory once, widened to float64 for TA-Lib; the
+    caller must close and unlink the block.
+    """
+    store = as_bar_store(bars)
+    length = len(store)
+    shm = shared_memory.SharedMemory(
+        create=True, size=max(1, length * 8 * (len(columns) + 1))
+    )
+    frame = SharedFrame(shm.name, columns, length, dict(store.slices))
+    arrays = frame.views(shm)
+    arrays["timestamp"][:] = store.timestamps
+    for column in columns:
+        arrays[column][:] = float64_column(store.columns[column])
+    del arrays
+    return shm, frame
+
+
+def share_arrays(
+    groups: dict[str, dict[str, np.ndarray]], columns: tuple[str, ...]
+) -> tuple[shared_memory.SharedMemory, SharedFrame]:
+    """``share_frame`` for column arrays already grouped by key (each with a "timestamp")."""
+    slices, length = {}, 0
+    for key, arrays in groups.items():
+        size = len(arrays["timestamp"])
+        slices[key] = (length, length + size)
+        length += size
+    shm = shared_memory.SharedMemory(
+        create=True, size=max(1, length * 8 * (len(columns) + 1))
+    )
+    frame = SharedFrame(shm.name, columns, length, slices)
+    shared = frame.views(shm)
+    for key, (start, stop) in slices.items():
+        for column in ("timestamp",) + columns:
+            shared[column][start:stop] = groups[key][column]
+    del shared
+    return shm, frame
+
+
+def indicator_batch(
+    intraday: SharedFrame,
+    daily: SharedFrame,
+    symbols: list[str],
+    today: date,
+    orb_minutes: int,
+) -> dict[str, dict]:
+    """Worker entry point: indicator snapshots for ``symbols`` read from shared memory."""
+    intraday_shm, intraday_arrays = intraday.attach()
+    daily_shm, daily_arrays = daily.attach()
+    try:
+        return {
+            symbol: indicator_snapshot(
+                intraday.symbol_arrays(intraday_arrays, symbol),
+                daily.symbol_arrays(daily_arrays, symbol),
+                today,
+                orb_minutes,
+            )
+            for symbol in symbols
+        }
+    finally:
+        # Drop the views before closing the mapping
+        del intraday_arrays, daily_arrays
+        intraday_shm.close()
+        daily_shm.close()
+
+
+async def compute_indicator_snapshots(
+    df_1m: Union[BarStore, pd.DataFrame],
+    df_daily: Union[BarStore, pd.DataFrame],
+    symbols: list[str],
+    today: date,
+) -> dict[str, dict]:
+    """
+    Indicator snapshots for every symbol, computed on the compute executor in
+    one batch per worker. The bars are shared with the workers, not pickled.
+    """
+    executor = get_compute_executor()
+    intraday_shm, intraday = share_frame(df_1m, INTRADAY_COLUMNS)
+    daily_shm, daily = share_frame(df_daily, DAILY_COLUMNS)
+    try:
+        batches = [symbols[i :: executor.workers] for i in range(executor.workers)]
+        results = await asyncio.gather(
+            *(
+                executor.run(
+                    indicator_batch, intraday, daily, batch, today, settings.ORB_MINUTES
+                )
+                for batch in batches
+                if batch
+            )
+        )
+    finally:
+        for shm in (intraday_shm, daily_shm):
+            shm.close()
+            shm.unlink()
+    snapshots = {}
+    for result in results:
+        snapshots.update(result)
+    logger.debug(
+        f"Indicators for {len(snapshots)} tickers computed on the {executor.name} executor"
+    )
+    return snapshots
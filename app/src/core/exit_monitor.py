@@ -0,0 +1,57 @@
+"""
+Exit checks for open positions between scans.
+
+The scan applies the exit rule once per minute bar, after the bar fetch and
+alongside every entry evaluation. Every EXIT_MONITOR_SECONDS, ``monitor_exits``
+applies the same rule (``orb_vwap_uw.exit_signal``) to the open positions in
+the position cache. It prices them with one latest-trade request per
+SNAPSHOT_CHUNK positions and reads their UW flow from the signal cache, so a
+position that hits its exit closes within seconds rather than at the next
+scan. With no open positions it makes no requests.
+
+With sharded scanning there is no position cache (a ticker's writer can move
+between workers), so exits are left to the scan.
+"""
+
+import asyncio
+
+from app.src.config.settings import settings
+from app.src.data.alpaca_client import get_latest_trades
+from app.src.position_tracker.dynamodb_tracker import PositionTracker, position_cache
+from app.src.strategies.orb_vwap_uw import evaluate_exit
+from app.src.utils.logger import logger
+
+
+async def _check(ticker: str, price: float, traded_at) -> bool:
+    position = await PositionTracker.get_position(ticker)
+    if not position:
+        return False
+    try:
+        # The signal key's bar is the minute of the trade
+        return await evaluate_exit(ticker, position, price, traded_at.floor("min"))
+    except Exception:
+        logger.exception(f"Exit check failed for {ticker}")
+        return False
+
+
+async def monitor_exits() -> int:
+    """One pass over the open positions; returns the number closed."""
+    cache = position_cache()
+    if cache is None:
+        return 0
+    if settings.INDICATOR_NAME not in cache.complete:
+        if not await PositionTracker.load_positions():
+            return 0
+    tickers = await PositionTracker.get_open_positions()
+    if not tickers:
+        return 0
+    trades = await get_latest_trades(tickers, settings.SNAPSHOT_CHUNK)
+    if trades is None:
+        logger.warning(f"Exit monitor: no latest trades for {len(tickers)} positions")
+        return 0
+    closed = await asyncio.gather(
+        *(_check(ticker, *trades[ticker]) for ticker in tickers if ticker in trades)
+    )
+    if any(closed):
+        logger.info(f"Exit monitor: closed {sum(closed)}/{len(tickers)} positions")
+    return sum(closed)
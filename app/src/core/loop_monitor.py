@@ -0,0 +1,204 @@
+import asyncio
+import sys
+import threading
+import traceback
+from collections import Counter
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Optional
+
+from app.src.config.settings import settings
+from app.src.utils.logger import logger
+from app.src.utils.metrics import LatencyHistogram, registry
+
+# Frames from these files are the monitor itself, not the blocking call
+_SELF = (__file__, threading.__file__)
+
+
+@dataclass
+class LagStats:
+    samples: int = 0
+    max_ms: float = 0.0
+    mean_ms: float = 0.0
+    stalls: int = 0
+    # Call site -> watchdog samples that caught the loop thread there
+    blockers: dict[str, int] = field(default_factory=dict)
+
+    def __str__(self) -> str:
+        text = f"max {self.max_ms:.0f} ms, mean {self.mean_ms:.1f} ms over {self.samples} samples"
+        if self.stalls:
+            top = ", ".join(
+                f"{site} x{n}" for site, n in list(self.blockers.items())[:3]
+            )
+            text += f", {self.stalls} stalls (blocked in {top or 'unknown'})"
+        return text
+
+
+def _call_site(frame) -> str:
+    """The innermost app frame on the stack, and the frame actually running if it is elsewhere."""
+    stack = [
+        entry for entry in traceback.extract_stack(frame) if entry.filename not in _SELF
+    ]
+    if not stack:
+        return "unknown"
+    innermost = stack[-1]
+    app_frames = [entry for entry in stack if "/app/src/" in entry.filename]
+    site = app_frames[-1] if app_frames else innermost
+
+    def where(entry) -> str:
+        path = entry.filename
+        if "/app/src/" in path:
+            path = "app/src/" + path.split("/app/src/", 1)[1]
+        else:
+            path = path.rsplit("/", 1)[-1]
+        return f"{path}:{entry.lineno} in {entry.name}"
+
+    if site is innermost:
+        return where(site)
+    return f"{where(site)} -> {where(innermost)}"
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag: how late a ``sleep(interval)`` wakes up. Anything
+    blocking the loop (pandas, TA-Lib, sync I/O) shows up as lag, and while it
+    lasts no HTTP response is read.
+
+    A watchdog thread checks the heartbeat of the sampling task. Once the loop
+    is ``stall_threshold`` overdue it samples the loop thread's stack (every
+    half interval while the stall lasts), so each stall is logged with the
+    call site that blocked it.
+    """
+
+    def __init__(self, interval: float = 0.1, stall_threshold: float = 0.25):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+        self._stalls = 0
+        self._blockers: Counter[str] = Counter()
+        self._task: Optional[asyncio.Task] = None
+        # Cumulative, for /metrics
+        self.histogram = LatencyHistogram()
+        self.total_stalls = 0
+        self.total_blockers: Counter[str] = Counter()
+        # Shared with the watchdog thread
+        self._lock = threading.Lock()
+        self._beat: Optional[float] = None
+        self._loop_thread: Optional[int] = None
+        self._stall_sites: list[str] = []
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def record(self, lag: float, sites: Optional[list[str]] = None) -> None:
+        self._count += 1
+        self._total += lag
+        self._max = max(self._max, lag)
+        self.histogram.record(lag)
+        if lag < self.stall_threshold:
+            return
+        counts = Counter(sites or ["unknown"])
+        self._stalls += 1
+        self._blockers.update(counts)
+        self.total_stalls += 1
+        self.total_blockers.update(counts)
+        logger.warning(
+            f"Event loop blocked for {lag * 1000:.0f} ms in "
+            f"{', '.join(site for site, _ in counts.most_common(3))}"
+        )
+
+    def snapshot(self, reset: bool = False) -> LagStats:
+        """Stats since the last reset."""
+        stats = LagStats(
+            samples=self._count,
+            max_ms=self._max * 1000,
+            mean_ms=(self._total / self._count * 1000) if self._count else 0.0,
+            stalls=self._stalls,
+            blockers=dict(self._blockers.most_common()),
+        )
+        if reset:
+            self._count, self._total, self._max = 0, 0.0, 0.0
+            self._stalls = 0
+            self._blockers = Counter()
+        return stats
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            with self._lock:
+                self._beat = perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+            with self._lock:
+                sites, self._stall_sites = self._stall_sites, []
+            self.record(lag, sites)
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.interval / 2):
+            with self._lock:
+                beat = self._beat
+            if beat is None:
+                continue
+            overdue = perf_counter() - beat - self.interval
+            if overdue < self.stall_threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            site = _call_site(frame)
+            del frame
+            with self._lock:
+                if self._beat == beat:
+                    self._stall_sites.append(site)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._loop_thread = threading.get_ident()
+            self._task = asyncio.create_task(self._sample())
+        if self._watchdog is None or not self._watchdog.is_alive():
+            self._stopped.clear()
+            self._watchdog = threading.Thread(
+                target=self._watch, name="loop-lag-watchdog", daemon=True
+            )
+            self._watchdog.start()
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._stopped.set()
+        self._watchdog = None
+        with self._lock:
+            self._beat = None
+            self._stall_sites = []
+
+    def prometheus_lines(self) -> list[str]:
+        lines = [
+            "# HELP algo_event_loop_lag_seconds Event-loop scheduling lag",
+            "# TYPE algo_event_loop_lag_seconds summary",
+        ]
+        for q in (0.5, 0.95, 0.99):
+            lines.append(
+                f'algo_event_loop_lag_seconds{{quantile="{q}"}} {self.histogram.quantile(q):.6f}'
+            )
+        lines += [
+            f"algo_event_loop_lag_seconds_sum {self.histogram.total:.6f}",
+            f"algo_event_loop_lag_seconds_count {self.histogram.count}",
+            "# HELP algo_event_loop_stalls_total Lag samples over LOOP_STALL_THRESHOLD_MS",
+            "# TYPE algo_event_loop_stalls_total counter",
+            f"algo_event_loop_stalls_total {self.total_stalls}",
+            "# HELP algo_event_loop_blocked_samples_total Watchdog stack samples per blocking call site",
+            "# TYPE algo_event_loop_blocked_samples_total counter",
+        ]
+        for site, n in self.total_blockers.most_common(20):
+            label = site.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'algo_event_loop_blocked_samples_total{{site="{label}"}} {n}')
+        return lines
+
+
+loop_monitor = LoopLagMonitor(
+    settings.LOOP_LAG_SAMPLE_SECONDS, settings.LOOP_STALL_THRESHOLD_MS / 1000
+)
+registry.add_collector(loop_monitor.prometheus_lines)
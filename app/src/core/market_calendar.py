@@ -0,0 +1,171 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from app.src.config.settings import settings
+from app.src.utils.helpers import NY, now_ny
+from app.src.utils.http_client import ALPACA_TRADING, get_session
+from app.src.utils.logger import logger
+
+_CALENDAR_PATH = "/v2/calendar"
+# Never sleep longer than this in one go, so a stale calendar gets refreshed
+_MAX_SLEEP_SECONDS = 3600.0
+# After a failed fetch, callers go on with what is loaded for this long
+_RETRY_SECONDS = 60.0
+
+
+@dataclass(frozen=True)
+class TradingSession:
+    day: date
+    open: datetime
+    close: datetime
+
+
+def _parse_session(entry: dict) -> TradingSession:
+    day = date.fromisoformat(entry["date"])
+    return TradingSession(
+        day=day,
+        open=NY.localize(datetime.combine(day, time.fromisoformat(entry["open"]))),
+        close=NY.localize(datetime.combine(day, time.fromisoformat(entry["close"]))),
+    )
+
+
+def _weekday_sessions(start: date, days: int) -> list[TradingSession]:
+    """Regular 9:30-16:00 weekday sessions; used only when the calendar API is unreachable."""
+    sessions = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        if day.weekday() < 5:
+            sessions.append(
+                _parse_session(
+                    {"date": day.isoformat(), "open": "09:30", "close": "16:00"}
+                )
+            )
+    return sessions
+
+
+class MarketCalendar:
+    """
+    Trading sessions (holidays and half days included) fetched once per day.
+    When a fetch fails the fallback sessions are not marked fetched, so the
+    fetch is retried after ``_RETRY_SECONDS`` rather than the next day.
+
+    ``is_open``, ``next_open`` and ``next_close`` are answered locally from the
+    cached sessions, so callers never hit the clock endpoint per scan.
+    """
+
+    def __init__(self, lookahead_days: int = 14):
+        self.lookahead_days = lookahead_days
+        self.sessions: dict[date, TradingSession] = {}
+        self.fetched_on: Optional[date] = None
+        self.retry_after: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+
+    def load(self, sessions: list[TradingSession], fetched_on: Optional[date]) -> None:
+        """Install ``sessions``; ``fetched_on`` None marks them as a stand-in to refetch."""
+        self.sessions = {s.day: s for s in sessions}
+        self.fetched_on = fetched_on
+
+    async def _fetch(self, start: date) -> list[TradingSession]:
+        end = start + timedelta(days=self.lookahead_days)
+        params = {"start": start.isoformat(), "end": end.isoformat()}
+        async with get_session(ALPACA_TRADING).get(
+            _CALENDAR_PATH, params=params
+        ) as resp:
+            if resp.status != 200:
+                text = await resp.text()
+                raise RuntimeError(f"status {resp.status}: {text[:200]}")
+            entries = await resp.json()
+        return [_parse_session(entry) for entry in entries]
+
+    async def ensure_fresh(self) -> None:
+        """Refetch the calendar if it was not fetched today (NY)."""
+        now = now_ny()
+        today = now.date()
+        if self.fetched_on == today or (
+            self.retry_after is not None and now < self.retry_after
+        ):
+            return
+        async with self._lock:
+            if self.fetched_on == today:
+                return
+            try:
+                sessions = await self._fetch(today)
+                logger.info(
+                    f"Market calendar refreshed: {len(sessions)} sessions through "
+                    f"{sessions[-1].day if sessions else 'n/a'}"
+                )
+            except Exception as e:
+                self.retry_after = now + timedelta(seconds=_RETRY_SECONDS)
+                if self.sessions and max(self.sessions) >= today:
+                    logger.warning(
+                        f"Market calendar refresh failed, keeping cached: {e}"
+                    )
+                    return
+                logger.error(
+                    f"Market calendar unavailable, assuming regular hours "
+                    f"until a retry succeeds: {e}"
+                )
+                self.load(_weekday_sessions(today, self.lookahead_days), None)
+                return
+            self.retry_after = None
+            self.load(sessions, today)
+
+    def session_for(self, day: date) -> Optional[TradingSession]:
+        return self.sessions.get(day)
+
+    def is_open(self, now: Optional[datetime] = None) -> bool:
+        now = now or now_ny()
+        session = self.session_for(now.astimezone(NY).date())
+        return session is not None and session.open <= now < session.close
+
+    def next_open(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """Open of the first session starting after ``now``."""
+        now = now or now_ny()
+        opens = [s.open for s in self.sessions.values() if s.open > now]
+        return min(opens) if opens else None
+
+    def next_close(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """Close of the current session, or of the next one when the market is closed."""
+        now = now or now_ny()
+        closes = [s.close for s in self.sessions.values() if s.close > now]
+        return min(closes) if closes else None
+
+    def seconds_until_active(
+        self, lead: float, lag: float, now: Optional[datetime] = None
+    ) -> float:
+        """
+        Seconds until ``now`` falls inside [open - lead, close + lag] of a session,
+        0 when it already does. Capped so the caller re-checks at least hourly.
+        """
+        now = now or now_ny()
+        for session in self.sessions.values():
+            if (
+                session.open - timedelta(seconds=lead)
+                <= now
+                <= session.close + timedelta(seconds=lag)
+            ):
+                return 0.0
+        next_open = self.next_open(now)
+        if next_open is None:
+            return _MAX_SLEEP_SECONDS
+        wait = (next_open - timedelta(seconds=lead) - now).total_seconds()
+        return min(max(wait, 0.0), _MAX_SLEEP_SECONDS)
+
+    async def wait_for_session(self, name: str, lead: float = 0.0, lag: float = 0.0):
+        """Sleep until the market session (widened by ``lead``/``lag`` seconds) is active."""
+        while True:
+            await self.ensure_fresh()
+            wait = self.seconds_until_active(lead, lag)
+            if wait <= 0:
+                return
+            next_open = self.next_open()
+            logger.info(
+                f"{name}: market closed; sleeping {wait / 60:.0f} min "
+                f"(next open {next_open.strftime('%a %Y-%m-%d %H:%M') if next_open else 'unknown'} ET)"
+            )
+            await asyncio.sleep(wait)
+
+
+market_calendar = MarketCalendar(settings.MARKET_CALENDAR_LOOKAHEAD_DAYS)
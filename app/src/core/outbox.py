@@ -0,0 +1,221 @@
+import asyncio
+import json
+import os
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from app.src.config.settings import settings
+from app.src.utils.logger import logger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    idempotency_key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    extra TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    next_attempt_at REAL NOT NULL,
+    delivered_at REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_signals_due ON signals (status, next_attempt_at);
+"""
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DELIVERED = "delivered"
+DEAD = "dead"
+
+
+@dataclass
+class OutboxRecord:
+    idempotency_key: str
+    payload: Dict[str, Any]
+    extra: Optional[Dict[str, Any]]
+    attempts: int
+    enqueued_at: float
+
+
+class SignalOutbox:
+    """
+    Durable local queue of webhook signals (SQLite in WAL mode).
+
+    A signal is committed to disk before ``enqueue`` returns, so it survives a
+    crash or a slow/failed webhook. All SQLite work runs on one dedicated
+    thread that owns the connection.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="outbox")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            # Anything in flight when the previous process died is due again
+            conn.execute(
+                "UPDATE signals SET status = ? WHERE status = ?", (PENDING, IN_FLIGHT)
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    @property
+    def wakeup(self) -> asyncio.Event:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        return self._wakeup
+
+    def _enqueue_sync(self, key: str, payload: dict, extra: Optional[dict], now: float):
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR IGNORE INTO signals "
+            "(idempotency_key, payload, extra, status, enqueued_at, next_attempt_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                json.dumps(payload),
+                json.dumps(extra) if extra else None,
+                PENDING,
+                now,
+                now,
+            ),
+        )
+        conn.commit()
+
+    async def enqueue(
+        self,
+        payload: Dict[str, Any],
+        extra: Optional[Dict[str, Any]] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> str:
+        """Persist a signal for delivery and return its idempotency key."""
+        key = idempotency_key or uuid.uuid4().hex
+        await self._run(self._enqueue_sync, key, payload, extra, time.time())
+        self.wakeup.set()
+        return key
+
+    def _claim_due_sync(self, limit: int, now: float) -> list[OutboxRecord]:
+        conn = self._connection()
+        rows = conn.execute(
+            "SELECT idempotency_key, payload, extra, attempts, enqueued_at FROM signals "
+            "WHERE status = ? AND next_attempt_at <= ? ORDER BY enqueued_at LIMIT ?",
+            (PENDING, now, limit),
+        ).fetchall()
+        conn.executemany(
+            "UPDATE signals SET status = ? WHERE idempotency_key = ?",
+            [(IN_FLIGHT, row[0]) for row in rows],
+        )
+        conn.commit()
+        return [
+            OutboxRecord(
+                idempotency_key=row[0],
+                payload=json.loads(row[1]),
+                extra=json.loads(row[2]) if row[2] else None,
+                attempts=row[3],
+                enqueued_at=row[4],
+            )
+            for row in rows
+        ]
+
+    async def claim_due(self, limit: int) -> list[OutboxRecord]:
+        """Mark up to ``limit`` due signals in flight and return them, oldest first."""
+        if limit <= 0:
+            return []
+        return await self._run(self._claim_due_sync, limit, time.time())
+
+    def _mark_delivered_sync(self, key: str, now: float):
+        conn = self._connection()
+        conn.execute(
+            "UPDATE signals SET status = ?, attempts = attempts + 1, delivered_at = ?, "
+            "last_error = NULL WHERE idempotency_key = ?",
+            (DELIVERED, now, key),
+        )
+        conn.commit()
+
+    async def mark_delivered(self, key: str):
+        await self._run(self._mark_delivered_sync, key, time.time())
+
+    def _mark_failed_sync(self, key: str, error: str, retry_at: Optional[float]):
+        conn = self._connection()
+        if retry_at is None:
+            conn.execute(
+                "UPDATE signals SET status = ?, attempts = attempts + 1, last_error = ? "
+                "WHERE idempotency_key = ?",
+                (DEAD, error, key),
+            )
+        else:
+            conn.execute(
+                "UPDATE signals SET status = ?, attempts = attempts + 1, last_error = ?, "
+                "next_attempt_at = ? WHERE idempotency_key = ?",
+                (PENDING, error, retry_at, key),
+            )
+        conn.commit()
+
+    async def mark_failed(self, key: str, error: str, retry_at: Optional[float]):
+        """Record a failed attempt; ``retry_at=None`` moves the signal to the dead letters."""
+        await self._run(self._mark_failed_sync, key, error, retry_at)
+
+    def _next_due_in_sync(self, now: float) -> Optional[float]:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT MIN(next_attempt_at) FROM signals WHERE status = ?", (PENDING,)
+            )
+            .fetchone()
+        )
+        return None if row[0] is None else max(0.0, row[0] - now)
+
+    async def next_due_in(self) -> Optional[float]:
+        """Seconds until the next pending signal is due, or None when the queue is empty."""
+        return await self._run(self._next_due_in_sync, time.time())
+
+    def _counts_sync(self) -> dict[str, int]:
+        rows = (
+            self._connection()
+            .execute("SELECT status, COUNT(*) FROM signals GROUP BY status")
+            .fetchall()
+        )
+        return {status: count for status, count in rows}
+
+    async def counts(self) -> dict[str, int]:
+        """Number of signals per status."""
+        return await self._run(self._counts_sync)
+
+    def _purge_sync(self, cutoff: float) -> int:
+        conn = self._connection()
+        cursor = conn.execute(
+            "DELETE FROM signals WHERE status = ? AND delivered_at < ?",
+            (DELIVERED, cutoff),
+        )
+        conn.commit()
+        return cursor.rowcount
+
+    async def purge_delivered(self, older_than_seconds: float) -> int:
+        purged = await self._run(self._purge_sync, time.time() - older_than_seconds)
+        if purged:
+            logger.debug(f"Outbox purged {purged} delivered signals")
+        return purged
+
+
+@lru_cache(maxsize=1)
+def get_outbox() -> SignalOutbox:
+    return SignalOutbox(settings.SIGNAL_OUTBOX_PATH)
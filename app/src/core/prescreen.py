@@ -0,0 +1,135 @@
+"""
+Cheap first stage of a scan: snapshots before bars.
+
+``prescreen`` fetches one multi-symbol snapshot per SNAPSHOT_CHUNK symbols
+(last price, day volume, open and previous close). It applies MIN_PRICE,
+PRESCREEN_MIN_VOLUME and PRESCREEN_MIN_GAP_PCT to the whole universe as
+column operations. Only the survivors have their bar history fetched, so a
+universe of thousands costs a few requests more than the watchlist did.
+
+A ticker that survives once stays in for the rest of the session, so its
+bars keep being topped up rather than refetched whenever it dips under a
+threshold. Tickers with an open position always pass, since their exits need
+bars.
+"""
+
+from datetime import date
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from app.src.config.settings import settings
+from app.src.data.alpaca_client import get_snapshots, get_tradable_symbols
+from app.src.position_tracker.dynamodb_tracker import PositionTracker
+from app.src.utils.helpers import now_ny
+from app.src.utils.logger import logger
+
+
+class Universe:
+    """The symbols a scan starts from, listed once per day in "assets" mode."""
+
+    def __init__(self):
+        self.assets: list[str] = []
+        self.fetched_on: Optional[date] = None
+
+    async def ensure_fresh(self) -> None:
+        today = now_ny().date()
+        if settings.SCAN_UNIVERSE != "assets" or self.fetched_on == today:
+            return
+        try:
+            self.assets = await get_tradable_symbols()
+            self.fetched_on = today
+            logger.info(f"Scan universe: {len(self.assets)} tradable US equities")
+        except Exception as e:
+            logger.error(f"Asset list fetch failed, keeping the last one: {e}")
+
+    def symbols(self) -> list[str]:
+        """Unblocked symbols; the watchlist until the asset list is first fetched."""
+        listed = (
+            self.assets
+            if settings.SCAN_UNIVERSE == "assets" and self.assets
+            else settings.WATCHLIST
+        )
+        # dict.fromkeys: drop duplicates, keep the order
+        return [
+            ticker
+            for ticker in dict.fromkeys(listed)
+            if ticker not in settings.BLOCKED_TICKERS
+        ]
+
+
+def screen(snapshots: pd.DataFrame) -> pd.Series:
+    """
+    Move from the previous close (%, the larger of the gap at the open and the
+    change since) for each symbol passing the filters, largest first.
+    """
+    prev_close = snapshots["prev_close"].where(snapshots["prev_close"] > 0)
+    gap = (snapshots["open"] / prev_close - 1).abs()
+    change = (snapshots["price"] / prev_close - 1).abs()
+    move = np.fmax(gap, change).fillna(0.0) * 100
+    passed = (
+        (snapshots["price"] >= settings.MIN_PRICE)
+        & (snapshots["day_volume"] >= settings.PRESCREEN_MIN_VOLUME)
+        & (move >= settings.PRESCREEN_MIN_GAP_PCT)
+    )
+    return move[passed].sort_values(ascending=False, kind="stable")
+
+
+class Prescreen:
+    def __init__(self):
+        # Survivors so far this session, in the order they first passed
+        self.survivors: dict[str, None] = {}
+        self.session: Optional[date] = None
+        # (now_ny timestamp, symbols, result) of the last run
+        self.last: Optional[tuple[float, list[str], list[str]]] = None
+
+    async def run(self, symbols: list[str], max_age: float = 0) -> list[str]:
+        """
+        The tickers of ``symbols`` to fetch bars for: open positions, then
+        this snapshot's survivors by move, then earlier survivors. If no
+        snapshot could be fetched, the earlier survivors are scanned again.
+        A run over the same symbols less than ``max_age`` seconds ago is
+        returned as it was.
+        """
+        now = now_ny()
+        if (
+            self.last is not None
+            and self.last[1] == symbols
+            and now.timestamp() - self.last[0] < max_age
+        ):
+            return self.last[2]
+        today = now.date()
+        if self.session != today:
+            self.survivors, self.session = {}, today
+        snapshots = await get_snapshots(symbols, settings.SNAPSHOT_CHUNK)
+        if snapshots is None:
+            logger.warning("Snapshot pre-screen failed; rescanning earlier survivors")
+            passed = []
+        else:
+            passed = screen(snapshots).index.tolist()
+            self.survivors.update(dict.fromkeys(passed))
+
+        universe = set(symbols)
+        ordered = dict.fromkeys(
+            ticker
+            for ticker in await PositionTracker.get_open_positions()
+            if ticker in universe
+        )
+        ordered.update(dict.fromkeys(passed))
+        ordered.update(
+            (ticker, None) for ticker in self.survivors if ticker in universe
+        )
+        logger.info(
+            f"Pre-screen: {len(passed)}/{len(symbols)} pass, "
+            f"{len(ordered)} to scan"
+        )
+        self.last = (now.timestamp(), symbols, list(ordered))
+        return list(ordered)
+
+    def clear(self) -> None:
+        self.survivors, self.session, self.last = {}, None, None
+
+
+universe = Universe()
+prescreen = Prescreen()
@@ -0,0 +1,166 @@
+"""
+Per-ticker scan cadence under a global request budget.
+
+With SCAN_PRIORITY on, the scan job ticks every SCAN_TICK_SECONDS and
+evaluates only the tickers that are due. Each evaluation puts its ticker in
+a tier:
+
+* hot: holds an open position, or is within SCAN_HOT_DISTANCE_PCT of its ORB
+  high, ORB low or VWAP with RVOL above the threshold (twice that distance
+  when its cached UW flow is directional); due every SCAN_HOT_SECONDS
+* cold: RVOL below the threshold, or SCAN_COLD_DISTANCE_PCT or more from
+  every level; due every SCAN_COLD_SECONDS
+* warm: the rest, and tickers not evaluated yet; due every SCAN_PERIOD_SECONDS
+
+Due tickers are taken in order of urgency: open positions first, then score
+(RVOL over its threshold, divided by the distance to the nearest level) times
+how overdue they are. When SCAN_REQUEST_BUDGET_PER_MINUTE is set, a tick
+takes only as many as the requests left in the last minute pay for, at the
+requests per evaluated ticker observed over that minute. A hot re-evaluation
+within the same minute bar costs no requests: the bar top-up covers every
+due ticker in one request per chunk, and UW signals come from their cache.
+"""
+
+import math
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+from app.src.config.settings import settings
+from app.src.data.unusual_whales import signal_cache
+from app.src.utils.helpers import get_dynamic_min_rvol, now_ny
+from app.src.utils.http_client import ALPACA_DATA, UNUSUAL_WHALES
+from app.src.utils.http_stats import requests_in
+
+HOT = "hot"
+WARM = "warm"
+COLD = "cold"
+
+_BUDGET_WINDOW_SECONDS = 60.0
+# Keeps the score finite for a price sitting on a level
+_MIN_DISTANCE_PCT = 0.05
+
+
+@dataclass
+class TickerPriority:
+    tier: str = WARM
+    score: float = 0.0
+    position: bool = False
+    # now_ny() timestamp of the last tick that evaluated the ticker
+    last_scan: float = -math.inf
+
+
+def _interval(tier: str) -> float:
+    if tier == HOT:
+        return settings.SCAN_HOT_SECONDS
+    if tier == COLD:
+        return settings.SCAN_COLD_SECONDS
+    return settings.SCAN_PERIOD_SECONDS
+
+
+def classify(ticker: str, snapshot: dict, position: bool) -> tuple[str, float]:
+    """Tier and score of ``ticker`` from its indicator snapshot."""
+    if position:
+        return HOT, math.inf
+    price, rvol = snapshot.get("price"), snapshot.get("rvol")
+    if not price or rvol is None:
+        # Too early in the session for indicators
+        return WARM, 0.0
+    levels = [
+        level
+        for level in (
+            snapshot.get("orb_high"),
+            snapshot.get("orb_low"),
+            snapshot.get("vwap"),
+        )
+        if level
+    ]
+    distance = (
+        min(abs(price - level) for level in levels) / price * 100
+        if levels
+        else math.inf
+    )
+    min_rvol = get_dynamic_min_rvol()
+    entry = signal_cache.entries.get(("flow", ticker))
+    flow = entry is not None and str(entry[1]).lower() in ("bullish", "bearish")
+    score = (rvol / min_rvol if min_rvol > 0 else rvol) / max(
+        distance, _MIN_DISTANCE_PCT
+    )
+    if flow:
+        score *= 2
+    if rvol < min_rvol or distance >= settings.SCAN_COLD_DISTANCE_PCT:
+        return COLD, score
+    if distance <= settings.SCAN_HOT_DISTANCE_PCT * (2 if flow else 1):
+        return HOT, score
+    return WARM, score
+
+
+class ScanPriority:
+    def __init__(self):
+        self.tickers: dict[str, TickerPriority] = {}
+        # (now_ny timestamp, tickers evaluated) per tick, for the cost estimate
+        self._evaluated: deque[tuple[float, int]] = deque()
+        # When the last ``due`` ran; ``update`` stamps it as the tickers' last scan
+        self._taken_at: Optional[float] = None
+
+    def cost_per_ticker(self, now: float) -> Optional[float]:
+        """Requests per evaluated ticker over the last minute; None before any."""
+        while self._evaluated and self._evaluated[0][0] < now - _BUDGET_WINDOW_SECONDS:
+            self._evaluated.popleft()
+        evaluated = sum(count for _, count in self._evaluated)
+        if not evaluated:
+            return None
+        requests = requests_in(_BUDGET_WINDOW_SECONDS, (ALPACA_DATA, UNUSUAL_WHALES))
+        return requests / evaluated
+
+    def due(self, symbols: list[str]) -> list[str]:
+        """
+        The tickers of ``symbols`` this tick evaluates, most urgent first.
+        They count as scanned only once ``update`` reports the scan done, so
+        a scan that bails out leaves them due.
+        """
+        now = now_ny().timestamp()
+        ranked = []
+        for ticker in symbols:
+            state = self.tickers.get(ticker) or TickerPriority()
+            overdue = (now - state.last_scan) / _interval(state.tier)
+            if overdue >= 1:
+                ranked.append((state.position, overdue * (1 + state.score), ticker))
+        ranked.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        selected = [ticker for _, _, ticker in ranked]
+
+        budget = settings.SCAN_REQUEST_BUDGET_PER_MINUTE
+        cost = self.cost_per_ticker(now) if budget else None
+        if cost:
+            used = requests_in(_BUDGET_WINDOW_SECONDS, (ALPACA_DATA, UNUSUAL_WHALES))
+            room = int(max(0, budget - used) / cost)
+            positions = sum(position for position, _, _ in ranked)
+            selected = selected[: max(room, positions)]
+
+        self._taken_at = now
+        return selected
+
+    def update(self, snapshots: dict[str, dict], open_tickers: set[str]) -> None:
+        """Mark the tickers this tick evaluated as scanned, and re-tier them."""
+        now = now_ny().timestamp()
+        taken_at = self._taken_at if self._taken_at is not None else now
+        self._evaluated.append((now, len(snapshots)))
+        for ticker, snapshot in snapshots.items():
+            state = self.tickers.setdefault(ticker, TickerPriority())
+            state.last_scan = taken_at
+            state.position = ticker in open_tickers
+            state.tier, state.score = classify(ticker, snapshot, state.position)
+
+    def tiers(self) -> dict[str, int]:
+        counts = {HOT: 0, WARM: 0, COLD: 0}
+        for state in self.tickers.values():
+            counts[state.tier] += 1
+        return counts
+
+    def clear(self) -> None:
+        self.tickers.clear()
+        self._evaluated.clear()
+        self._taken_at = None
+
+
+scan_priority = ScanPriority()
@@ -1,42 +1,162 @@
 import asyncio
+from dataclasses import dataclass, field
 
-from alpaca.data import TimeFrame
-from alpaca.trading.client import TradingClient
 
 from app.src.config.settings import settings
-from app.src.data.alpaca_client import get_bars
-from app.src.strategies.orb_vwap_uw import evaluate_ticker
-from app.src.utils.helpers import is_trading_hours, measure_latency
+from app.src.core.compute import compute_indicator_snapshots, get_compute_executor
+from app.src.core.loop_monitor import LagStats, loop_monitor
+from app.src.core.market_calendar import market_calendar
+from app.src.core.prescreen import prescreen, universe
+from app.src.core.priority import scan_priority
+from app.src.core.sharding import get_coordinator, in_flight
+from app.src.data.bar_buffer import daily_buffer, minute_buffer
+from app.src.data.bar_store import BarStore, bar_budget, current_rss_mb
+from app.src.position_tracker.dynamodb_tracker import PositionTracker
+from app.src.strategies.orb_vwap_uw import evaluate_ticker, evaluation_memo
+from app.src.utils.helpers import is_trading_hours, measure_latency, now_ny
 from app.src.utils.logger import logger
+from app.src.utils.tracing import Span, span, start_trace, write_traces
 
-trading_client = TradingClient(settings.ALPACA_KEY, settings.ALPACA_SECRET, paper=True)
 
-@measure_latency
-async def scan_once(session):
-    clock = trading_client.get_clock()
-    if not clock.is_open or not is_trading_hours(
+@dataclass
+class ScanSummary:
+    scanned: int = 0
+    completed: int = 0
+    # Completed by reusing the ticker's last decision (inputs unchanged)
+    reused: int = 0
+    timed_out: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+    loop_lag_before: LagStats = field(default_factory=LagStats)
+    loop_lag: LagStats = field(default_factory=LagStats)
+    bars_mb: float = 0.0
+    rss_mb: float = 0.0
+    # Root span of each ticker evaluation, when tracing is on
+    traces: list[Span] = field(default_factory=list)
+
+
+def _scan_budget() -> float:
+    """Seconds a whole scan may take: a fraction of the scan period."""
+    return settings.SCAN_PERIOD_SECONDS * settings.SCAN_DEADLINE_FRACTION
+
+
+def _ticker_budget() -> float:
+    """Seconds a single ticker evaluation may take."""
+    return settings.SCAN_PERIOD_SECONDS * settings.SCAN_TICKER_DEADLINE_FRACTION
+
+
+async def _evaluate_with_deadline(
+    ticker: str,
+    bars_1m: BarStore,
+    bars_daily: BarStore,
+    snapshot: dict | None,
+    semaphore: asyncio.Semaphore,
+    scan_deadline: float,
+    summary: ScanSummary,
+):
+    loop = asyncio.get_running_loop()
+    queued = loop.time()
+    async with semaphore:
+        deadline = min(loop.time() + _ticker_budget(), scan_deadline)
+        try:
+            with start_trace(
+                "evaluate_ticker",
+                ticker=ticker,
+                queued_ms=round((loop.time() - queued) * 1000, 1),
+            ) as root:
+                if root is not None:
+                    summary.traces.append(root)
+                # The ticker's lease is not handed over mid-evaluation
+                async with in_flight(ticker), asyncio.timeout_at(deadline):
+                    await evaluate_ticker(ticker, bars_1m, bars_daily, snapshot)
+            summary.completed += 1
+        except TimeoutError:
+            summary.timed_out.append(ticker)
+        except Exception as e:
+            logger.error(f"Evaluation failed for {ticker}: {e}")
+            summary.failed.append(ticker)
+
+
+@measure_latency(log_calls=True)
+async def scan_once() -> ScanSummary | None:
+    scan_time = now_ny().isoformat()
+    with start_trace("scan_once") as root:
+        summary = await _scan()
+    if summary is not None:
+        write_traces(root, summary.traces, scan_time)
+    return summary
+
+
+async def _scan() -> ScanSummary | None:
+    await market_calendar.ensure_fresh()
+    if not market_calendar.is_open() or not is_trading_hours(
         settings.TRADING_START, settings.TRADING_END
     ):
         logger.info("Skipping scan: Market closed or outside hours")
-        return
+        return None
 
-    symbols = [ticker for ticker in settings.WATCHLIST if ticker not in settings.BLOCKED_TICKERS]
+    await universe.ensure_fresh()
+    symbols = universe.symbols()
     if not symbols:
         logger.warning("No symbols available to scan after applying block list")
-        return
+        return None
+
+    coordinator = get_coordinator()
+    if coordinator is not None:
+        symbols = [ticker for ticker in symbols if ticker in coordinator.owned]
+        if not symbols:
+            logger.info(f"Shard {coordinator.worker_id} holds no ticker leases yet")
+            return None
+
+    if settings.SCAN_PRESCREEN:
+        with span("prescreen", tickers=len(symbols)):
+            # Ticks between scan periods reuse the period's snapshot
+            symbols = await prescreen.run(
+                symbols,
+                max_age=settings.SCAN_PERIOD_SECONDS if settings.SCAN_PRIORITY else 0,
+            )
+        if not symbols:
+            logger.info("No tickers passed the pre-screen")
+            return None
+
+    symbols = bar_budget.admit(symbols, held=minute_buffer.store() or ())
+    if not symbols:
+        logger.error(
+            "No room under the RSS budget for any ticker's bars; skipping scan"
+        )
+        return None
+
+    # Bars of admitted tickers that are not due this tick stay in the buffers
+    admitted = symbols
+    if settings.SCAN_PRIORITY:
+        symbols = scan_priority.due(admitted)
+        if not symbols:
+            return None
 
     logger.info(f"Scanning {len(symbols)} tickers...")
-    df_1m = await get_bars(symbols, TimeFrame.Minute, 1000, chunk_size=1)
-    df_daily = await get_bars(symbols, TimeFrame.Day, 300, chunk_size=1)
+    loop_monitor.start()
+    lag_before = loop_monitor.snapshot(reset=True)
+    loop = asyncio.get_running_loop()
+    scan_deadline = loop.time() + _scan_budget()
+    try:
+        async with asyncio.timeout_at(scan_deadline):
+            df_1m, df_daily = await asyncio.gather(
+                minute_buffer.refresh(symbols, retain=admitted),
+                daily_buffer.refresh(symbols, retain=admitted),
+            )
+    except TimeoutError:
+        logger.warning(
+            f"Bar fetch exceeded the {_scan_budget():.0f}s scan budget, skipping scan"
+        )
+        return None
 
     if df_1m is None or df_daily is None:
         logger.warning("Failed to fetch bars, skipping scan")
-        return
+        return None
 
-    idx_1m = df_1m.index.get_level_values(0)
-    idx_daily = df_daily.index.get_level_values(0)
-    missing_intraday = [ticker for ticker in symbols if ticker not in idx_1m]
-    missing_daily = [ticker for ticker in symbols if ticker not in idx_daily]
+    # Column views with per-ticker row ranges; the buffers keep the frames for the next top-up
+    bars_1m, bars_daily = minute_buffer.store(), daily_buffer.store()
+    missing_intraday = [ticker for ticker in symbols if ticker not in bars_1m]
+    missing_daily = [ticker for ticker in symbols if ticker not in bars_daily]
 
     if missing_intraday:
         logger.warning(f"Intraday data missing for: {', '.join(missing_intraday)}")
@@ -51,8 +171,77 @@ async def scan_once(session):
 
     if not active_symbols:
         logger.warning("No symbols have both intraday and daily data; skipping scan")
-        return
+        return None
+
+    # Indicators for the whole batch run on the compute executor; a ticker
+    # without a snapshot falls back to computing its own in evaluate_ticker.
+    try:
+        with span("compute_indicator_snapshots", tickers=len(active_symbols)):
+            async with asyncio.timeout_at(scan_deadline):
+                snapshots = await compute_indicator_snapshots(
+                    bars_1m, bars_daily, active_symbols, now_ny().date()
+                )
+    except TimeoutError:
+        logger.warning("Indicator batch exceeded the scan budget, skipping scan")
+        return None
+    except Exception as e:
+        logger.error(f"Indicator batch failed, computing per ticker: {e}")
+        snapshots = {}
 
-    tasks = [evaluate_ticker(ticker, df_1m, df_daily, session) for ticker in active_symbols]
-    await asyncio.gather(*tasks, return_exceptions=True)
-    logger.debug("Scan complete")
+    # Every evaluation is cancelled at its own deadline or at the scan deadline,
+    # whichever comes first, so the scan period bounds the scan latency.
+    summary = ScanSummary(
+        scanned=len(active_symbols),
+        loop_lag_before=lag_before,
+        bars_mb=bar_budget.observe(bars_1m, bars_daily),
+        rss_mb=current_rss_mb(),
+    )
+    semaphore = asyncio.Semaphore(settings.SCAN_MAX_CONCURRENCY)
+    reused_before = evaluation_memo.reused
+    with span("evaluate", tickers=len(active_symbols)):
+        await asyncio.gather(
+            *(
+                _evaluate_with_deadline(
+                    ticker,
+                    bars_1m,
+                    bars_daily,
+                    snapshots.get(ticker),
+                    semaphore,
+                    scan_deadline,
+                    summary,
+                )
+                for ticker in active_symbols
+            )
+        )
+    summary.reused = evaluation_memo.reused - reused_before
+    if settings.SCAN_PRIORITY:
+        open_tickers = set(await PositionTracker.get_open_positions())
+        # Tickers without bars count as scanned too, and stay warm until they have some
+        scan_priority.update(
+            {ticker: snapshots.get(ticker) or {} for ticker in symbols},
+            open_tickers,
+        )
+    summary.loop_lag = loop_monitor.snapshot(reset=True)
+    if summary.timed_out:
+        logger.warning(
+            f"Scan deadline: {len(summary.timed_out)}/{summary.scanned} tickers timed out "
+            f"({', '.join(summary.timed_out)})"
+        )
+    logger.info(
+        f"Scan complete: {summary.completed}/{summary.scanned} evaluated "
+        f"({summary.reused} unchanged), "
+        f"{len(summary.timed_out)} timed out, {len(summary.failed)} failed | "
+        f"bars {summary.bars_mb:.1f} MB, RSS {summary.rss_mb:.0f} MB"
+        + (f" of {settings.RSS_BUDGET_MB:.0f} MB" if settings.RSS_BUDGET_MB else "")
+        + (
+            " | tiers "
+            + ", ".join(f"{n} {t}" for t, n in scan_priority.tiers().items())
+            if settings.SCAN_PRIORITY
+            else ""
+        )
+    )
+    logger.info(
+        f"Loop lag ({get_compute_executor().name} compute): before scan "
+        f"{summary.loop_lag_before} | during scan {summary.loop_lag}"
+    )
+    return summary
@@ -0,0 +1,164 @@
+import asyncio
+import math
+import time
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Awaitable, Callable, Optional
+
+from app.src.utils.logger import logger
+
+SKIP = "skip"
+COALESCE = "coalesce"
+SERIAL = "serial"
+
+
+@dataclass
+class JobStats:
+    runs: int = 0
+    skipped: int = 0
+    coalesced: int = 0
+    overruns: int = 0
+    last_duration: float = 0.0
+    max_duration: float = 0.0
+    last_start_lag: float = 0.0
+
+
+@dataclass
+class ScheduledJob:
+    """
+    A coroutine run on a wall-clock grid: at every ``k * period + offset`` seconds
+    since the epoch. With ``period=60`` and ``offset=3`` a job starts three
+    seconds after each minute-bar close.
+
+    ``overlap`` decides what happens when a tick arrives while the previous run
+    is still going: ``skip`` drops the tick, ``coalesce`` runs once more as soon
+    as the current run finishes (however many ticks were missed), ``serial``
+    waits for the run and fires at the first grid point after it. Serial jobs
+    pace themselves, so a run longer than ``period`` is not an overrun.
+
+    ``gate``, if set, is awaited before every tick and returns once the job may
+    run (e.g. it sleeps through market closures).
+    """
+
+    name: str
+    func: Callable[[], Awaitable[object]]
+    period: float
+    offset: float = 0.0
+    overlap: str = SKIP
+    gate: Optional[Callable[[], Awaitable[None]]] = None
+    stats: JobStats = field(default_factory=JobStats)
+    _task: Optional[asyncio.Task] = field(default=None, repr=False)
+    _pending: bool = field(default=False, repr=False)
+
+    def next_fire(self, now: float) -> float:
+        """First grid point strictly after ``now``; recomputed each tick so sleeps never drift."""
+        return (
+            math.floor((now - self.offset) / self.period) + 1
+        ) * self.period + self.offset
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+
+class Scheduler:
+    """Runs each job as its own aligned task so one slow job never delays another."""
+
+    def __init__(self):
+        self.jobs: list[ScheduledJob] = []
+
+    def add_job(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[object]],
+        period: float,
+        offset: float = 0.0,
+        overlap: str = SKIP,
+        gate: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> ScheduledJob:
+        job = ScheduledJob(
+            name=name,
+            func=func,
+            period=period,
+            offset=offset,
+            overlap=overlap,
+            gate=gate,
+        )
+        self.jobs.append(job)
+        return job
+
+    def _tick(self, job: ScheduledJob, scheduled_at: float) -> None:
+        if not job.running:
+            job._task = asyncio.create_task(self._run_job(job, scheduled_at))
+            return
+        if job.overlap == COALESCE:
+            if not job._pending:
+                job.stats.coalesced += 1
+            job._pending = True
+            logger.warning(f"Scheduler: {job.name} still running; next run coalesced")
+        else:
+            job.stats.skipped += 1
+            logger.warning(
+                f"Scheduler: {job.name} still running; skipped tick "
+                f"({job.stats.skipped} skipped so far)"
+            )
+
+    async def _run_job(self, job: ScheduledJob, scheduled_at: float) -> None:
+        while True:
+            job.stats.last_start_lag = max(0.0, time.time() - scheduled_at)
+            start = perf_counter()
+            try:
+                await job.func()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f"Scheduler: {job.name} failed")
+            duration = perf_counter() - start
+            self._record(job, duration)
+
+            if not job._pending:
+                return
+            job._pending = False
+            scheduled_at = time.time()
+
+    @staticmethod
+    def _record(job: ScheduledJob, duration: float) -> None:
+        stats = job.stats
+        stats.runs += 1
+        stats.last_duration = duration
+        stats.max_duration = max(stats.max_duration, duration)
+        utilization = duration / job.period
+        message = (
+            f"⏱️  {job.name} took {duration:.2f}s of {job.period:.0f}s period "
+            f"({utilization:.0%}) | start lag {stats.last_start_lag * 1000:.0f} ms"
+        )
+        if duration > job.period and job.overlap != SERIAL:
+            stats.overruns += 1
+            logger.warning(f"{message} | OVERRUN #{stats.overruns}")
+        else:
+            logger.debug(message)
+
+    async def _job_loop(self, job: ScheduledJob) -> None:
+        while True:
+            if job.gate is not None:
+                await job.gate()
+            fire_at = job.next_fire(time.time())
+            await asyncio.sleep(max(0.0, fire_at - time.time()))
+            self._tick(job, fire_at)
+            if job.overlap == SERIAL:
+                await asyncio.wait([job._task])
+
+    async def run(self) -> None:
+        """Run every job until cancelled."""
+        for job in self.jobs:
+            logger.info(
+                f"Scheduler: {job.name} every {job.period:.0f}s at +{job.offset:.0f}s ({job.overlap})"
+            )
+        loops = [asyncio.create_task(self._job_loop(job)) for job in self.jobs]
+        try:
+            await asyncio.gather(*loops)
+        finally:
+            tasks = loops + [job._task for job in self.jobs if job.running]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,279 @@
+import asyncio
+import bisect
+import hashlib
+import os
+import socket
+import time
+import uuid
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Callable, Iterable, Optional
+
+from app.src.config.settings import settings
+from app.src.core.prescreen import universe
+from app.src.utils.logger import logger
+
+_WORKERS_KEY = "scan:workers"
+_LEADER_KEY = "scan:leader"
+_LEASE_PREFIX = "scan:lease:"
+
+# Take every free lease in KEYS and extend the ones already held by ARGV[1].
+# Returns one fencing token per key, in order: 0 when another worker holds
+# the lease. Each take of a lease increments its token, so a later owner
+# always writes with a larger one.
+_ACQUIRE_LUA = """
+local tokens = {}
+for i, key in ipairs(KEYS) do
+    local owner = redis.call('GET', key)
+    if owner == false then
+        redis.call('SET', key, ARGV[1], 'PX', ARGV[2])
+        tokens[i] = redis.call('INCR', key .. ':fence')
+    elseif owner == ARGV[1] then
+        redis.call('PEXPIRE', key, ARGV[2])
+        tokens[i] = tonumber(redis.call('GET', key .. ':fence') or '0')
+    else
+        tokens[i] = 0
+    end
+end
+return tokens
+"""
+
+# Delete the leases in KEYS that are still held by ARGV[1].
+_RELEASE_LUA = """
+local released = 0
+for _, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[1] then
+        redis.call('DEL', key)
+        released = released + 1
+    end
+end
+return released
+"""
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(value.encode(), digest_size=8).digest(), "big"
+    )
+
+
+class HashRing:
+    """Consistent-hash ring: adding or removing a worker only moves that worker's tickers."""
+
+    def __init__(self, members: Iterable[str], replicas: int = 64):
+        points = sorted(
+            (_hash(f"{member}#{i}"), member)
+            for member in members
+            for i in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._members = [member for _, member in points]
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self._hashes:
+            return None
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._members[index]
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class ShardCoordinator:
+    """
+    Splits the watchlist between scan workers.
+
+    Every heartbeat a worker registers itself in ``scan:workers`` (a sorted set
+    scored by expiry), builds a consistent-hash ring over the live workers and
+    holds a Redis lease (``SET NX PX``) for each ticker the ring assigns to it.
+    Leases it no longer wants are released so the new owner can take them,
+    but only once no evaluation or position write of the ticker is in flight
+    here (see ``in_flight``); until then they are renewed as ``draining``. A
+    dead worker's leases simply expire after ``lease_ttl``. A ticker is
+    therefore owned by at most one live worker at a time, and position writes
+    carry the lease's fencing token (``tokens``) so the table rejects a write
+    from an owner whose lease has since been taken.
+    """
+
+    def __init__(
+        self,
+        redis,
+        universe: Callable[[], list[str]],
+        worker_id: Optional[str] = None,
+        lease_ttl: float = 30.0,
+        heartbeat: float = 10.0,
+    ):
+        self.redis = redis
+        self.universe = universe
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_ttl = lease_ttl
+        self.heartbeat = heartbeat
+        self.owned: set[str] = set()
+        # Leases no longer wanted, kept until their in-flight work finishes
+        self.draining: set[str] = set()
+        self.tokens: dict[str, int] = {}
+        self.busy: dict[str, int] = {}
+        self.leader = False
+        self.members: list[str] = []
+        self._acquire = redis.register_script(_ACQUIRE_LUA)
+        self._release = redis.register_script(_RELEASE_LUA)
+
+    @staticmethod
+    def _lease_key(ticker: str) -> str:
+        return f"{_LEASE_PREFIX}{ticker}"
+
+    async def _live_members(self) -> list[str]:
+        now = time.time()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(_WORKERS_KEY, {self.worker_id: now + self.lease_ttl})
+            pipe.zremrangebyscore(_WORKERS_KEY, "-inf", now)
+            pipe.zrange(_WORKERS_KEY, 0, -1)
+            _, _, members = await pipe.execute()
+        return sorted(members)
+
+    async def refresh(self) -> set[str]:
+        """Heartbeat, rebalance and renew leases; returns the tickers this worker owns."""
+        self.members = await self._live_members()
+        ring = HashRing(self.members)
+        wanted = [t for t in self.universe() if ring.owner(t) == self.worker_id]
+        ttl_ms = int(self.lease_ttl * 1000)
+
+        unwanted = (self.owned | self.draining) - set(wanted)
+        dropped = [t for t in unwanted if not self.busy.get(t)]
+        if dropped:
+            await self._release(
+                keys=[self._lease_key(t) for t in dropped], args=[self.worker_id]
+            )
+            for ticker in dropped:
+                self.tokens.pop(ticker, None)
+        draining = [t for t in unwanted if self.busy.get(t)]
+
+        held = []
+        if wanted or draining:
+            keys = wanted + draining
+            tokens = await self._acquire(
+                keys=[self._lease_key(t) for t in keys], args=[self.worker_id, ttl_ms]
+            )
+            for ticker, token in zip(keys, tokens):
+                if token:
+                    self.tokens[ticker] = int(token)
+                else:
+                    self.tokens.pop(ticker, None)
+            held = [t for t, token in zip(wanted, tokens) if token]
+            draining = [t for t, token in zip(draining, tokens[len(wanted) :]) if token]
+        self.draining = set(draining)
+
+        leader = await self._acquire(keys=[_LEADER_KEY], args=[self.worker_id, ttl_ms])
+        self.leader = bool(leader[0])
+
+        owned = set(held)
+        if owned != self.owned:
+            logger.info(
+                f"Shard {self.worker_id}: owns {len(owned)}/{len(self.universe())} tickers "
+                f"across {len(self.members)} workers"
+                + (
+                    f" ({len(wanted) - len(owned)} awaiting handover)"
+                    if len(owned) < len(wanted)
+                    else ""
+                )
+            )
+        self.owned = owned
+        return owned
+
+    async def confirm(self, ticker: str) -> bool:
+        """Check with Redis that this worker still holds the lease; used right before a write."""
+        return await self.redis.get(self._lease_key(ticker)) == self.worker_id
+
+    @asynccontextmanager
+    async def hold(self, ticker: str) -> AsyncIterator[None]:
+        """Keep ``ticker``'s lease from being handed over while the block runs."""
+        self.busy[ticker] = self.busy.get(ticker, 0) + 1
+        try:
+            yield
+        finally:
+            self.busy[ticker] -= 1
+            if not self.busy[ticker]:
+                del self.busy[ticker]
+
+    async def release_all(self) -> None:
+        keys = [self._lease_key(t) for t in self.owned | self.draining]
+        keys.append(_LEADER_KEY)
+        await self._release(keys=keys, args=[self.worker_id])
+        await self.redis.zrem(_WORKERS_KEY, self.worker_id)
+        self.owned, self.draining, self.tokens = set(), set(), {}
+        self.leader = False
+
+    async def run(self) -> None:
+        """Refresh every ``heartbeat`` seconds until cancelled, then hand every lease back."""
+        try:
+            while True:
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    # Leases lapse on their own if Redis stays unreachable
+                    logger.error(f"Shard {self.worker_id}: refresh failed: {e}")
+                await asyncio.sleep(self.heartbeat)
+        finally:
+            try:
+                await asyncio.shield(self.release_all())
+            except Exception as e:
+                logger.warning(
+                    f"Shard {self.worker_id}: release on shutdown failed: {e}"
+                )
+
+
+def _scan_universe() -> list[str]:
+    return universe.symbols()
+
+
+@lru_cache(maxsize=1)
+def get_coordinator() -> Optional[ShardCoordinator]:
+    """The process-wide coordinator, or None when sharded scanning is off."""
+    if not settings.SCAN_SHARDING:
+        return None
+    from redis.asyncio import Redis
+
+    return ShardCoordinator(
+        Redis.from_url(settings.REDIS_URL, decode_responses=True),
+        _scan_universe,
+        lease_ttl=settings.SHARD_LEASE_TTL_SECONDS,
+        heartbeat=settings.SHARD_HEARTBEAT_SECONDS,
+    )
+
+
+async def owns_ticker(ticker: str) -> bool:
+    """True unless sharding is on and this worker has lost the ticker's lease."""
+    coordinator = get_coordinator()
+    if coordinator is None:
+        return True
+    try:
+        return await coordinator.confirm(ticker)
+    except Exception as e:
+        logger.error(f"Lease check failed for {ticker}: {e}")
+        return False
+
+
+@asynccontextmanager
+async def in_flight(ticker: str) -> AsyncIterator[None]:
+    """Mark work on ``ticker`` that its lease must outlive (no-op without sharding)."""
+    coordinator = get_coordinator()
+    if coordinator is None:
+        yield
+        return
+    async with coordinator.hold(ticker):
+        yield
+
+
+def lease_token(ticker: str) -> Optional[int]:
+    """Fencing token of this worker's lease on ``ticker``; None without sharding or a lease."""
+    coordinator = get_coordinator()
+    if coordinator is None:
+        return None
+    return coordinator.tokens.get(ticker)
+
+
+def is_leader() -> bool:
+    """Whether this worker runs the singleton jobs (always true without sharding)."""
+    coordinator = get_coordinator()
+    return coordinator is None or coordinator.leader
@@ -1,6 +1,9 @@
 import asyncio
-from datetime import datetime
-from functools import lru_cache
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
 from typing import Any, Dict, Optional
 from zoneinfo import ZoneInfo
 
@@ -16,10 +19,13 @@ try:
 except ImportError:
     pass  # Not needed for Python < 3.13
 
-import boto3
 from botocore.exceptions import BotoCoreError, ClientError
 
 from app.src.config.settings import settings
+from app.src.core.outbox import OutboxRecord, SignalOutbox, get_outbox
+from app.src.persistence.repository import PersistenceUnavailableError, get_table
+from app.src.utils.helpers import measure_latency, now_ny
+from app.src.utils.http_client import WEBHOOK, get_session
 from app.src.utils.logger import logger
 
 _DYNAMO_TABLE_NAME = "AlgoOptions"
@@ -29,24 +35,6 @@ _OPTION_ACTION_MAPPING = {
 }
 
 
-@lru_cache(maxsize=1)
-def _get_dynamo_table():
-    if not settings.AWS_ACCESS_KEY_ID or not settings.AWS_SECRET_ACCESS_KEY:
-        logger.warning("AWS credentials not configured; skipping DynamoDB logging")
-        return None
-    try:
-        dynamodb = boto3.resource(
-            "dynamodb",
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_DEFAULT_REGION,
-        )
-        return dynamodb.Table(_DYNAMO_TABLE_NAME)
-    except Exception as exc:
-        logger.error(f"Unable to initialize DynamoDB table {_DYNAMO_TABLE_NAME}: {exc}")
-        return None
-
-
 def _coerce_profit(value: Optional[Any]) -> Optional[float]:
     if value is None:
         return None
@@ -62,7 +50,7 @@ def _build_option_entry(
     reason: str,
     extra: Optional[Dict[str, Any]],
 ) -> Dict[str, Any]:
-    est_now = datetime.now(ZoneInfo("America/New_York"))
+    est_now = now_ny().astimezone(ZoneInfo("America/New_York"))
     profit_value = None
     expiry_value = None
     if extra:
@@ -79,7 +67,7 @@ def _build_option_entry(
     }
 
 
-def _write_option_signal(
+async def _write_option_signal(
     ticker: str,
     action: str,
     reason: str,
@@ -89,48 +77,45 @@ def _write_option_signal(
     if action not in _OPTION_ACTION_MAPPING:
         return
 
-    table = _get_dynamo_table()
-    if table is None:
-        return
-
     entry = _build_option_entry(ticker, action, reason, extra)
     date_key = entry["timestamp"][:10]
     action_column = _OPTION_ACTION_MAPPING[action]
 
     try:
-        table.update_item(
-            Key={"date": date_key, "indicator": indicator},
-            UpdateExpression=(
-                f"SET #{action_column} = list_append("
-                f"if_not_exists(#{action_column}, :empty_list), :entry)"
-            ),
-            ExpressionAttributeNames={f"#{action_column}": action_column},
-            ExpressionAttributeValues={
-                ":entry": [entry],
-                ":empty_list": [],
-            },
+        await get_table(_DYNAMO_TABLE_NAME, ("date", "indicator")).append_to_list(
+            {"date": date_key, "indicator": indicator}, action_column, [entry]
         )
+    except PersistenceUnavailableError:
+        logger.warning("AWS credentials not configured; skipping DynamoDB logging")
     except (ClientError, BotoCoreError) as exc:
         logger.error(f"DynamoDB write failed for {ticker} {action}: {exc}")
 
 
-async def send_signal(
+# When set (backtests), signals are appended here instead of going to the outbox
+_captured_signals: ContextVar[Optional[list]] = ContextVar(
+    "captured_signals", default=None
+)
+
+
+@contextmanager
+def capture_signals():
+    """Collect every signal sent in this context in a list instead of delivering it."""
+    captured: list = []
+    token = _captured_signals.set(captured)
+    try:
+        yield captured
+    finally:
+        _captured_signals.reset(token)
+
+
+def _build_payload(
     ticker: str,
     action: str,
     reason: str,
-    price: Optional[float] = None,
-    session: Optional[aiohttp.ClientSession] = None,
-    extra: Optional[Dict[str, Any]] = None,
-    indicator: Optional[str] = None,
-):
-    """
-    Send signal to your execution app.
-    extra = any dict (e.g., option contract symbol, strike, etc.)
-    indicator = indicator name (defaults to settings.INDICATOR_NAME)
-    """
-    if indicator is None:
-        indicator = settings.INDICATOR_NAME
-    
+    indicator: str,
+    price: Optional[float],
+    extra: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
     payload = {
         "ticker_symbol": ticker,
         "action": action,
@@ -143,35 +128,155 @@ async def send_signal(
 
     if extra:
         payload.update(extra)  # Merges option_contract, strike, etc.
+    return payload
 
-    try:
-        if session is None:
-            timeout = aiohttp.ClientTimeout(total=10)
-            async with aiohttp.ClientSession(timeout=timeout) as sess:
-                async with sess.post(settings.WEBHOOK_URL, json=payload) as resp:
-                    if resp.status == 200:
-                        logger.info(f"SIGNAL → {ticker} {action} | {reason}")
-                    else:
-                        text = await resp.text()
-                        logger.error(f"Webhook failed {resp.status}: {text}")
+
+@measure_latency
+async def send_signal(
+    ticker: str,
+    action: str,
+    reason: str,
+    price: Optional[float] = None,
+    extra: Optional[Dict[str, Any]] = None,
+    indicator: Optional[str] = None,
+    idempotency_key: Optional[str] = None,
+) -> str:
+    """
+    Queue a signal for your execution app and return its idempotency key.
+    extra = any dict (e.g., option contract symbol, strike, etc.)
+    indicator = indicator name (defaults to settings.INDICATOR_NAME)
+    idempotency_key = stable key for the signal (random when omitted)
+
+    The signal is durably written to the outbox and delivered by SignalDispatcher,
+    so callers never wait on the webhook.
+    """
+    if indicator is None:
+        indicator = settings.INDICATOR_NAME
+
+    payload = _build_payload(ticker, action, reason, indicator, price, extra)
+    captured = _captured_signals.get()
+    if captured is not None:
+        key = idempotency_key or uuid.uuid4().hex
+        captured.append(
+            {"idempotency_key": key, "timestamp": now_ny().isoformat(), **payload}
+        )
+        return key
+    key = await get_outbox().enqueue(payload, extra, idempotency_key)
+    logger.debug(f"SIGNAL QUEUED → {ticker} {action} | key {key}")
+    return key
+
+
+def _retry_delay(attempts: int) -> float:
+    """Exponential backoff after ``attempts`` failed deliveries."""
+    return min(
+        settings.SIGNAL_RETRY_BASE_SECONDS * (2 ** (attempts - 1)),
+        settings.SIGNAL_RETRY_MAX_SECONDS,
+    )
+
+
+class SignalDispatcher:
+    """Delivers outbox signals to the webhook with bounded concurrency and retries."""
+
+    def __init__(
+        self,
+        session: Optional[aiohttp.ClientSession] = None,
+        outbox: Optional[SignalOutbox] = None,
+        concurrency: Optional[int] = None,
+    ):
+        self.session = session
+        self.outbox = outbox or get_outbox()
+        self.concurrency = concurrency or settings.SIGNAL_DISPATCH_CONCURRENCY
+        self._inflight: set[asyncio.Task] = set()
+
+    async def _post(self, record: OutboxRecord) -> None:
+        """POST one signal; raises on any non-200 response."""
+        session = self.session or get_session(WEBHOOK)
+        async with session.post(
+            settings.WEBHOOK_URL,
+            json=record.payload,
+            headers={"Idempotency-Key": record.idempotency_key},
+            trace_request_ctx={"attempt": record.attempts},
+        ) as resp:
+            if resp.status != 200:
+                text = await resp.text()
+                raise RuntimeError(f"Webhook failed {resp.status}: {text}")
+
+    async def _deliver(self, record: OutboxRecord) -> None:
+        payload = record.payload
+        ticker, action = payload.get("ticker_symbol"), payload.get("action")
+        attempt = record.attempts + 1
+        start = perf_counter()
+        try:
+            await self._post(record)
+        except Exception as e:
+            post_ms = (perf_counter() - start) * 1000
+            if attempt >= settings.SIGNAL_MAX_ATTEMPTS:
+                await self.outbox.mark_failed(record.idempotency_key, str(e), None)
+                logger.error(
+                    f"SIGNAL DEAD → {ticker} {action} after {attempt} attempts "
+                    f"| key {record.idempotency_key} | {e}"
+                )
+            else:
+                delay = _retry_delay(attempt)
+                await self.outbox.mark_failed(
+                    record.idempotency_key, str(e), time.time() + delay
+                )
+                logger.warning(
+                    f"Signal send error {ticker} {action} (attempt {attempt}, "
+                    f"{post_ms:.0f} ms): {e}; retrying in {delay:.0f}s"
+                )
+                return
         else:
-            timeout = aiohttp.ClientTimeout(total=10)
-            async with session.post(
-                settings.WEBHOOK_URL, json=payload, timeout=timeout
-            ) as resp:
-                if resp.status == 200:
-                    logger.info(f"SIGNAL → {ticker} {action} | {reason}")
-                else:
-                    text = await resp.text()
-                    logger.error(f"Webhook failed {resp.status}: {text}")
-    except Exception as e:
-        logger.error(f"Signal send error: {e}")
-    finally:
-        await asyncio.to_thread(
-            _write_option_signal,
+            post_ms = (perf_counter() - start) * 1000
+            await self.outbox.mark_delivered(record.idempotency_key)
+            queued_ms = (time.time() - record.enqueued_at) * 1000
+            logger.info(
+                f"SIGNAL → {ticker} {action} | {payload.get('reason')} "
+                f"| attempt {attempt} | post {post_ms:.0f} ms | enqueue→ack {queued_ms:.0f} ms"
+            )
+
+        # Delivered or given up: record option signals exactly once
+        await _write_option_signal(
             ticker,
             action,
-            reason,
-            indicator,
-            extra,
+            payload.get("reason", ""),
+            payload.get("indicator", settings.INDICATOR_NAME),
+            record.extra,
         )
+
+    async def dispatch_once(self) -> int:
+        """Deliver every signal that is currently due; returns how many were attempted."""
+        records = await self.outbox.claim_due(self.concurrency)
+        await asyncio.gather(*(self._deliver(record) for record in records))
+        return len(records)
+
+    async def _fill(self) -> None:
+        records = await self.outbox.claim_due(self.concurrency - len(self._inflight))
+        for record in records:
+            task = asyncio.create_task(self._deliver(record))
+            self._inflight.add(task)
+            task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self._inflight.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Signal dispatcher task failed: {task.exception()}")
+        self.outbox.wakeup.set()
+
+    async def run(self) -> None:
+        """Deliver signals forever; woken by new signals, finished deliveries and retries."""
+        await self.outbox.purge_delivered(settings.SIGNAL_OUTBOX_RETENTION_DAYS * 86400)
+        logger.info(f"Signal dispatcher started (concurrency {self.concurrency})")
+        try:
+            while True:
+                self.outbox.wakeup.clear()
+                await self._fill()
+                next_due = await self.outbox.next_due_in()
+                wait_for = 1.0 if next_due is None else min(max(next_due, 0.05), 1.0)
+                try:
+                    await asyncio.wait_for(self.outbox.wakeup.wait(), timeout=wait_for)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in list(self._inflight):
+                task.cancel()
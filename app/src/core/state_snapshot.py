@@ -0,0 +1,187 @@
+"""
+Warm-restart snapshot of the worker's in-memory state.
+
+Each piece of state is a section with a ``dump`` and a ``load`` callable.
+This module registers the bar buffers, the UW signal cache, the position
+cache and the pre-screen survivors; other modules add theirs with ``register_section``. ``save_snapshot``
+dumps every section on the event loop, then pickles and writes the result in
+a thread. The target is a local file or Redis (STATE_SNAPSHOT_BACKEND).
+``restore_snapshot`` runs at boot. It checks the snapshot's version and age,
+then hands each section to its loader, which keeps only what is still fresh.
+
+The snapshot is a pickle: point it only at a file or Redis key that this
+worker alone writes.
+"""
+
+import asyncio
+import os
+import pickle
+import zlib
+from datetime import datetime
+from time import perf_counter
+from typing import Any, Callable, Optional
+
+from app.src.config.settings import settings
+from app.src.core.prescreen import prescreen
+from app.src.data.bar_buffer import daily_buffer, minute_buffer
+from app.src.data.unusual_whales import signal_cache
+from app.src.position_tracker.dynamodb_tracker import position_cache
+from app.src.utils.clients import REDIS, get_client
+from app.src.utils.helpers import now_ny
+from app.src.utils.logger import logger
+
+SNAPSHOT_VERSION = 1
+
+_sections: dict[str, tuple[Callable[[], Any], Callable[[Any], Any]]] = {}
+
+
+def register_section(
+    name: str, dump: Callable[[], Any], load: Callable[[Any], Any]
+) -> None:
+    """``dump()`` must return picklable data not mutated afterwards; ``load(data)`` restores it."""
+    _sections[name] = (dump, load)
+
+
+def _dump_bars() -> dict:
+    return {
+        "minute": (minute_buffer.frame, minute_buffer.session),
+        "daily": (daily_buffer.frame, daily_buffer.session),
+    }
+
+
+def _load_bars(data: dict) -> list[str]:
+    return [
+        name
+        for name, buffer in (("minute", minute_buffer), ("daily", daily_buffer))
+        if buffer.restore(*data[name])
+    ]
+
+
+def _dump_positions() -> dict:
+    cache = position_cache()
+    if cache is None:
+        return {}
+    return {key: dict(p) for key, p in cache.positions.items() if p is not None}
+
+
+def _load_positions(positions: dict) -> int:
+    """Open positions as last seen; ``PositionTracker.load_positions`` then checks them."""
+    cache = position_cache()
+    if cache is None:
+        return 0
+    cache.positions.update(positions)
+    return len(positions)
+
+
+def _load_survivors(data: dict) -> int:
+    """Today's survivors, so their bars keep being topped up after a restart."""
+    if data["session"] != now_ny().date():
+        return 0
+    prescreen.survivors, prescreen.session = dict(data["survivors"]), data["session"]
+    return len(prescreen.survivors)
+
+
+register_section("bars", _dump_bars, _load_bars)
+register_section("uw_signals", lambda: dict(signal_cache.entries), signal_cache.restore)
+register_section("positions", _dump_positions, _load_positions)
+register_section(
+    "prescreen",
+    lambda: {"session": prescreen.session, "survivors": dict(prescreen.survivors)},
+    _load_survivors,
+)
+
+
+def enabled() -> bool:
+    return settings.STATE_SNAPSHOT_BACKEND in ("file", "redis")
+
+
+def _write(blob: bytes) -> None:
+    if settings.STATE_SNAPSHOT_BACKEND == "redis":
+        get_client(REDIS).set(settings.STATE_SNAPSHOT_REDIS_KEY, blob)
+        return
+    path = settings.STATE_SNAPSHOT_PATH
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Atomic: a SIGKILL mid-write leaves the previous snapshot intact
+    with open(f"{path}.tmp", "wb") as f:
+        f.write(blob)
+    os.replace(f"{path}.tmp", path)
+
+
+def _read() -> Optional[bytes]:
+    if settings.STATE_SNAPSHOT_BACKEND == "redis":
+        return get_client(REDIS).get(settings.STATE_SNAPSHOT_REDIS_KEY)
+    try:
+        with open(settings.STATE_SNAPSHOT_PATH, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _encode(snapshot: dict) -> bytes:
+    return zlib.compress(pickle.dumps(snapshot, pickle.HIGHEST_PROTOCOL), 1)
+
+
+def _decode(blob: bytes) -> dict:
+    return pickle.loads(zlib.decompress(blob))
+
+
+async def save_snapshot() -> bool:
+    """Write every section; False when the snapshot is off or the write failed."""
+    if not enabled():
+        return False
+    started = perf_counter()
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "saved_at": now_ny(),
+        "sections": {name: dump() for name, (dump, _) in _sections.items()},
+    }
+    try:
+        blob = await asyncio.to_thread(_encode, snapshot)
+        await asyncio.to_thread(_write, blob)
+    except Exception as e:
+        logger.error(f"State snapshot failed: {e}")
+        return False
+    logger.info(
+        f"State snapshot saved ({len(blob) / 1024 / 1024:.1f} MB, "
+        f"{perf_counter() - started:.2f}s)"
+    )
+    return True
+
+
+async def restore_snapshot() -> bool:
+    """Load the last snapshot if it is recent enough; False when none was restored."""
+    if not enabled():
+        return False
+    try:
+        blob = await asyncio.to_thread(_read)
+        if blob is None:
+            logger.info("No state snapshot to restore")
+            return False
+        snapshot = await asyncio.to_thread(_decode, blob)
+    except Exception as e:
+        logger.error(f"State snapshot unreadable, starting cold: {e}")
+        return False
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        logger.warning(
+            f"State snapshot version {snapshot.get('version')} != {SNAPSHOT_VERSION}, "
+            "starting cold"
+        )
+        return False
+    saved_at: datetime = snapshot["saved_at"]
+    age = (now_ny() - saved_at).total_seconds()
+    if age > settings.STATE_SNAPSHOT_MAX_AGE_SECONDS:
+        logger.info(f"State snapshot from {saved_at} is too old, starting cold")
+        return False
+
+    restored = {}
+    for name, data in snapshot["sections"].items():
+        if name not in _sections:
+            continue
+        try:
+            restored[name] = _sections[name][1](data)
+        except Exception as e:
+            logger.warning(f"State snapshot section {name} not restored: {e}")
+    logger.success(f"Restored state snapshot from {age:.0f}s ago: {restored}")
+    return True
@@ -1,13 +1,45 @@
+import asyncio
 from collections.abc import Iterable
 from datetime import datetime, timedelta, timezone
 
+import numpy as np
 import pandas as pd  # type: ignore[import-untyped]
-from alpaca.data import StockBarsRequest, StockHistoricalDataClient, TimeFrame
 
 from app.src.config.settings import settings
+from app.src.utils.helpers import measure_latency, now_ny
+from app.src.utils.http_client import ALPACA_DATA, ALPACA_TRADING, get_session
 from app.src.utils.logger import logger
 
-client = StockHistoricalDataClient(settings.ALPACA_KEY, settings.ALPACA_SECRET)
+_BARS_PATH = "/v2/stocks/bars"
+_SNAPSHOTS_PATH = "/v2/stocks/snapshots"
+_LATEST_TRADES_PATH = "/v2/stocks/trades/latest"
+_ASSETS_PATH = "/v2/assets"
+_MAX_PAGE_LIMIT = 10000
+# Alpaca's compact bar keys -> the column names alpaca-py's BarSet.df exposes
+_BAR_COLUMNS = {
+    "t": "timestamp",
+    "o": "open",
+    "h": "high",
+    "l": "low",
+    "c": "close",
+    "v": "volume",
+    "n": "trade_count",
+    "vw": "vwap",
+}
+_PRICE_COLUMNS = ("open", "high", "low", "close", "vwap")
+_COUNT_COLUMNS = ("volume", "trade_count")
+_UINT32_MAX = np.iinfo(np.uint32).max
+
+
+class TimeFrame:
+    """
+    The request strings of alpaca-py's ``TimeFrame.Minute`` and ``TimeFrame.Day``.
+    Importing alpaca-py for them alone costs ~0.5 s of startup. alpaca-py
+    TimeFrame objects are still accepted, since they format the same way.
+    """
+
+    Minute = "1Min"
+    Day = "1Day"
 
 
 def _chunk_symbols(symbols: list[str], chunk_size: int) -> Iterable[list[str]]:
@@ -16,24 +48,88 @@ def _chunk_symbols(symbols: list[str], chunk_size: int) -> Iterable[list[str]]:
 
 
 def _is_daily_timeframe(timeframe) -> bool:
-    if isinstance(timeframe, TimeFrame):
-        # TimeFrame objects have a string value like '1Min' or '1Day'
-        timeframe_str = str(timeframe).lower()
-        return "day" in timeframe_str
-    if isinstance(timeframe, str):
-        normalized = timeframe.strip().lower()
-        return normalized in {"1day", "day", "1d"}
-    return False
+    # Strings and alpaca-py TimeFrame objects alike format as '1Min' or '1Day'
+    timeframe_str = str(timeframe).strip().lower()
+    return "day" in timeframe_str or timeframe_str == "1d"
 
 
-def _default_start(timeframe: TimeFrame | str) -> datetime | None:
+def _default_start(timeframe) -> datetime | None:
     if _is_daily_timeframe(timeframe):
-        return (datetime.now(timezone.utc) - timedelta(days=400)).replace(
+        return (now_ny().astimezone(timezone.utc) - timedelta(days=400)).replace(
             hour=0, minute=0, second=0, microsecond=0
         )
     return None
 
 
+def _bars_to_frame(bars_by_symbol: dict[str, list[dict]]) -> pd.DataFrame | None:
+    """Build the (symbol, timestamp)-indexed frame alpaca-py's BarSet.df returns."""
+    records = [
+        {"symbol": symbol, **bar}
+        for symbol, bars in bars_by_symbol.items()
+        for bar in bars
+    ]
+    if not records:
+        return None
+    df = pd.DataFrame.from_records(records).rename(columns=_BAR_COLUMNS)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+    columns = [c for c in _BAR_COLUMNS.values() if c in df.columns and c != "timestamp"]
+    return _compact(df.set_index(["symbol", "timestamp"])[columns].sort_index())
+
+
+def _compact(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Narrow the bar columns: float32 prices while every price is below
+    BAR_FLOAT32_MAX_PRICE (float32 then resolves well under a cent), uint32
+    volume and trade counts while they fit. Symbols are already dictionary
+    encoded as the first index level.
+    """
+    prices = [c for c in _PRICE_COLUMNS if c in df.columns]
+    dtypes = {}
+    if prices and df[prices].max().max() < settings.BAR_FLOAT32_MAX_PRICE:
+        dtypes.update({column: np.float32 for column in prices})
+    for column in _COUNT_COLUMNS:
+        if column in df.columns:
+            values = df[column]
+            whole = (values % 1 == 0).all()
+            if whole and values.min() >= 0 and values.max() <= _UINT32_MAX:
+                dtypes[column] = np.uint32
+    return df.astype(dtypes) if dtypes else df
+
+
+async def _fetch_chunk(
+    chunk: list[str], timeframe, limit: int, start: datetime | None
+) -> pd.DataFrame | None:
+    """Fetch up to ``limit`` bars for a chunk of symbols, following page tokens."""
+    session = get_session(ALPACA_DATA)
+    params = {
+        "symbols": ",".join(chunk),
+        "timeframe": str(timeframe),
+        "adjustment": "all",
+    }
+    if start is not None:
+        params["start"] = start.isoformat()
+
+    bars_by_symbol: dict[str, list[dict]] = {}
+    fetched = 0
+    while fetched < limit:
+        params["limit"] = str(min(limit - fetched, _MAX_PAGE_LIMIT))
+        async with session.get(_BARS_PATH, params=params) as resp:
+            if resp.status != 200:
+                text = await resp.text()
+                raise RuntimeError(f"status {resp.status}: {text[:200]}")
+            data = await resp.json()
+        for symbol, bars in (data.get("bars") or {}).items():
+            bars_by_symbol.setdefault(symbol, []).extend(bars)
+            fetched += len(bars)
+        page_token = data.get("next_page_token")
+        if not page_token:
+            break
+        params["page_token"] = page_token
+
+    return _bars_to_frame(bars_by_symbol)
+
+
+@measure_latency
 async def get_bars(
     symbols,
     timeframe=TimeFrame.Minute,
@@ -50,34 +146,150 @@ async def get_bars(
 
     if start is None:
         start = _default_start(timeframe)
+    # Chunks of sorted symbols come back as consecutive, already sorted blocks
+    symbols = sorted(symbols)
 
-    frames: list[pd.DataFrame] = []
-    for chunk in _chunk_symbols(symbols, chunk_size):
-        try:
-            request_kwargs = dict(
-                symbol_or_symbols=chunk,
-                timeframe=timeframe,
-                limit=limit,
-                adjustment="all",
-            )
-            if start is not None:
-                request_kwargs["start"] = start.isoformat()
-
-            request = StockBarsRequest(**request_kwargs)
-            bars = client.get_stock_bars(request)
-            df = getattr(bars, "df", None)
-            if df is not None and not df.empty:
-                frames.append(df)
-            else:
-                logger.warning(
-                    f"Alpaca returned no data for chunk {chunk} ({timeframe})"
-                )
-        except Exception as e:
-            logger.error(f"Alpaca bars error for chunk {chunk}: {e}")
+    semaphore = asyncio.Semaphore(settings.ALPACA_BARS_CONCURRENCY)
+
+    async def fetch(chunk: list[str]) -> pd.DataFrame | None:
+        async with semaphore:
+            try:
+                df = await _fetch_chunk(chunk, timeframe, limit, start)
+            except Exception as e:
+                logger.error(f"Alpaca bars error for chunk {chunk}: {e}")
+                return None
+        if df is None or df.empty:
+            logger.warning(f"Alpaca returned no data for chunk {chunk} ({timeframe})")
+            return None
+        return df
+
+    results = await asyncio.gather(
+        *(fetch(chunk) for chunk in _chunk_symbols(symbols, chunk_size))
+    )
+    frames = [df for df in results if df is not None]
 
     if not frames:
         logger.error("Alpaca bars fetch produced no data across all chunks")
         return None
 
-    combined = pd.concat(frames).sort_index()
+    combined = pd.concat(frames)
+    if not combined.index.is_monotonic_increasing:
+        combined = combined.sort_index()
     return combined
+
+
+def _snapshot_row(snapshot: dict) -> dict:
+    """Price, day volume and previous close of one Alpaca stock snapshot."""
+    trade = snapshot.get("latestTrade") or {}
+    day = snapshot.get("dailyBar") or {}
+    prev = snapshot.get("prevDailyBar") or {}
+    return {
+        "price": trade.get("p", day.get("c", np.nan)),
+        "open": day.get("o", np.nan),
+        "day_volume": day.get("v", 0),
+        "prev_close": prev.get("c", np.nan),
+    }
+
+
+async def _fetch_snapshots(chunk: list[str]) -> dict[str, dict]:
+    async with get_session(ALPACA_DATA).get(
+        _SNAPSHOTS_PATH, params={"symbols": ",".join(chunk)}
+    ) as resp:
+        if resp.status != 200:
+            text = await resp.text()
+            raise RuntimeError(f"status {resp.status}: {text[:200]}")
+        data = await resp.json()
+    # Symbols without a snapshot are left out or null
+    return {symbol: _snapshot_row(s) for symbol, s in data.items() if s}
+
+
+@measure_latency
+async def get_snapshots(
+    symbols: list[str], chunk_size: int = 1000
+) -> pd.DataFrame | None:
+    """
+    One row per symbol (price, open, day_volume, prev_close) from the
+    multi-symbol snapshot endpoint, ``chunk_size`` symbols per request.
+    Returns None when no chunk could be fetched.
+    """
+    semaphore = asyncio.Semaphore(settings.ALPACA_BARS_CONCURRENCY)
+
+    async def fetch(chunk: list[str]) -> dict[str, dict] | None:
+        async with semaphore:
+            try:
+                return await _fetch_snapshots(chunk)
+            except Exception as e:
+                logger.error(f"Alpaca snapshots error for {len(chunk)} symbols: {e}")
+                return None
+
+    results = await asyncio.gather(
+        *(fetch(chunk) for chunk in _chunk_symbols(symbols, chunk_size))
+    )
+    rows = {
+        symbol: row
+        for result in results
+        if result is not None
+        for symbol, row in result.items()
+    }
+    if all(result is None for result in results):
+        return None
+    frame = pd.DataFrame.from_dict(
+        rows, orient="index", columns=["price", "open", "day_volume", "prev_close"]
+    )
+    return frame.astype(
+        {"price": float, "open": float, "day_volume": float, "prev_close": float}
+    )
+
+
+@measure_latency
+async def get_latest_trades(
+    symbols: list[str], chunk_size: int = 1000
+) -> dict[str, tuple[float, pd.Timestamp]] | None:
+    """
+    Price and time of each symbol's latest trade, ``chunk_size`` symbols per
+    request. Symbols without a trade are left out; returns None when no
+    chunk could be fetched.
+    """
+
+    async def fetch(chunk: list[str]) -> dict[str, dict] | None:
+        try:
+            async with get_session(ALPACA_DATA).get(
+                _LATEST_TRADES_PATH, params={"symbols": ",".join(chunk)}
+            ) as resp:
+                if resp.status != 200:
+                    text = await resp.text()
+                    raise RuntimeError(f"status {resp.status}: {text[:200]}")
+                data = await resp.json()
+            return data.get("trades") or {}
+        except Exception as e:
+            logger.error(f"Alpaca latest trades error for {len(chunk)} symbols: {e}")
+            return None
+
+    results = await asyncio.gather(
+        *(fetch(chunk) for chunk in _chunk_symbols(symbols, chunk_size))
+    )
+    if all(result is None for result in results):
+        return None
+    return {
+        symbol: (float(trade["p"]), pd.Timestamp(trade["t"]))
+        for result in results
+        if result is not None
+        for symbol, trade in result.items()
+        if trade and trade.get("p") is not None and trade.get("t")
+    }
+
+
+async def get_tradable_symbols() -> list[str]:
+    """Active, tradable US equities listed on an exchange (OTC excluded)."""
+    async with get_session(ALPACA_TRADING).get(
+        _ASSETS_PATH, params={"status": "active", "asset_class": "us_equity"}
+    ) as resp:
+        if resp.status != 200:
+            text = await resp.text()
+            raise RuntimeError(f"status {resp.status}: {text[:200]}")
+        assets = await resp.json()
+    return sorted(
+        asset["symbol"]
+        for asset in assets
+        if asset.get("tradable") and asset.get("exchange") != "OTC"
+    )
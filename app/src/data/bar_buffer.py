@@ -0,0 +1,170 @@
+"""
+Bars of one timeframe, kept between scans and topped up incrementally.
+
+A symbol's first refresh fetches its full history, as every scan used to.
+Later refreshes fetch only from the newest bar held, which comes back again
+in case it was still forming. These fetches use multi-symbol chunks of
+BAR_INCREMENTAL_CHUNK. The merged frame keeps the last ``limit`` bars per
+symbol. Intraday buffers are dropped when the New York date changes, so each
+session starts with a full fetch.
+
+Higher timeframes are not fetched: ``minute_buffer.resampled("5Min")``
+follows the minute bars (see data.resample).
+"""
+
+import asyncio
+from collections.abc import Iterable
+from datetime import date
+from typing import Optional
+
+import pandas as pd
+
+from app.src.config.settings import settings
+from app.src.data.alpaca_client import TimeFrame, get_bars
+from app.src.data.bar_store import BarStore, symbol_slices
+from app.src.data.resample import ResampledBars
+from app.src.utils.helpers import now_ny
+from app.src.utils.logger import logger
+
+
+def _last_timestamps(frame: pd.DataFrame) -> dict[str, pd.Timestamp]:
+    timestamps = frame.index.get_level_values(1)
+    return {
+        symbol: timestamps[stop - 1]
+        for symbol, (_, stop) in symbol_slices(frame.index.get_level_values(0)).items()
+    }
+
+
+class BarBuffer:
+    def __init__(self, timeframe: str, limit: int, intraday: bool):
+        self.timeframe = timeframe
+        self.limit = limit
+        self.intraday = intraday
+        self.frame: Optional[pd.DataFrame] = None
+        # New York date of the last refresh
+        self.session: Optional[date] = None
+        self._resampled: dict[str, ResampledBars] = {}
+        self._store: Optional[BarStore] = None
+
+    def last_timestamps(self) -> dict[str, pd.Timestamp]:
+        """Timestamp of the newest bar held for each symbol."""
+        if self.frame is None:
+            return {}
+        return _last_timestamps(self.frame)
+
+    async def refresh(
+        self, symbols: list[str], retain: Iterable[str] = ()
+    ) -> Optional[pd.DataFrame]:
+        """
+        Bars for ``symbols``, topped up from Alpaca. Returns None when nothing
+        could be fetched. A failed top-up would leave stale bars, so the
+        caller skips the scan in that case. A symbol whose part of the top-up
+        failed (no bars came back, or none as new as those held) is dropped
+        instead, so it is missing from this scan and fetched in full by the
+        next. Bars held for other symbols are dropped, except those of
+        ``retain``, which are kept as they are.
+        """
+        today = now_ny().date()
+        if self.intraday and self.session != today:
+            self.clear()
+        last = self.last_timestamps()
+        held = [symbol for symbol in symbols if symbol in last]
+        new = [symbol for symbol in symbols if symbol not in last]
+
+        fetches = []
+        if new:
+            fetches.append(get_bars(new, self.timeframe, self.limit, chunk_size=1))
+        if held:
+            chunk = settings.BAR_INCREMENTAL_CHUNK
+            start = min(last[symbol] for symbol in held).to_pydatetime()
+            # ``limit`` counts bars across a chunk's symbols
+            fetches.append(
+                get_bars(
+                    held,
+                    self.timeframe,
+                    self.limit * chunk,
+                    chunk_size=chunk,
+                    start=start,
+                )
+            )
+        results = await asyncio.gather(*fetches)
+        stale = []
+        if held:
+            if results[-1] is None:
+                logger.warning(f"Incremental {self.timeframe} bar fetch failed")
+                return None
+            fetched = _last_timestamps(results[-1])
+            stale = [
+                symbol
+                for symbol in held
+                if symbol not in fetched or fetched[symbol] < last[symbol]
+            ]
+            if stale:
+                logger.warning(
+                    f"Incremental {self.timeframe} bars missing for "
+                    f"{', '.join(stale)}; refetching them in full next scan"
+                )
+                topped_up = results[-1]
+                results[-1] = topped_up[
+                    ~topped_up.index.get_level_values(0).isin(stale)
+                ]
+
+        frames = [df for df in results if df is not None]
+        keep = set(held).union(retain).difference(stale)
+        if self.frame is not None and keep.intersection(last):
+            kept = self.frame
+            if not keep.issuperset(last):
+                kept = kept[kept.index.get_level_values(0).isin(keep)]
+            frames.insert(0, kept)
+        if not frames:
+            return None
+        self._set_frame(self._merge(frames), since=start if held else None)
+        self.session = today
+        return self.frame
+
+    def _set_frame(self, frame: pd.DataFrame, since=None) -> None:
+        self.frame, self._store = frame, None
+        for bars in self._resampled.values():
+            bars.update(frame, None if since is None else pd.Timestamp(since))
+
+    def resampled(self, timeframe: str) -> ResampledBars:
+        """Bars of ``timeframe`` aggregated from these, kept current on every refresh."""
+        bars = self._resampled.get(timeframe)
+        if bars is None:
+            bars = self._resampled[timeframe] = ResampledBars(timeframe, self.limit)
+            bars.update(self.frame)
+        return bars
+
+    def store(self) -> Optional[BarStore]:
+        """Column view of ``frame``, built once per refresh."""
+        if self._store is None and self.frame is not None:
+            self._store = BarStore(self.frame)
+        return self._store
+
+    def _merge(self, frames: list[pd.DataFrame]) -> pd.DataFrame:
+        merged = pd.concat(frames) if len(frames) > 1 else frames[0]
+        # A re-fetched bar replaces the one held
+        merged = merged[~merged.index.duplicated(keep="last")]
+        if not merged.index.is_monotonic_increasing:
+            merged = merged.sort_index()
+        by_symbol = merged.groupby(level=0, sort=False)
+        if by_symbol.size().max() > self.limit:
+            merged = by_symbol.tail(self.limit)
+        return merged
+
+    def restore(self, frame: Optional[pd.DataFrame], session: Optional[date]) -> bool:
+        """Adopt bars from a snapshot unless they belong to an earlier session."""
+        if frame is None or (self.intraday and session != now_ny().date()):
+            return False
+        self._set_frame(frame)
+        self.session = session
+        return True
+
+    def clear(self) -> None:
+        self.frame, self.session, self._store = None, None, None
+        for bars in self._resampled.values():
+            bars.clear()
+
+
+minute_buffer = BarBuffer(TimeFrame.Minute, 1000, intraday=True)
+daily_buffer = BarBuffer(TimeFrame.Day, 300, intraday=False)
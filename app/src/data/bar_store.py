@@ -0,0 +1,176 @@
+"""
+Read-only column arrays over a ``get_bars`` frame, and the RSS budget for them.
+
+The frame is sorted by (symbol, timestamp), so each symbol's bars are one
+contiguous row range. ``BarStore`` finds those ranges once per frame. After
+that, a ticker's bars are zero-copy slices of the column arrays, not an
+``xs`` copy of the frame.
+"""
+
+import os
+import resource
+import sys
+from collections.abc import Container
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from app.src.config.settings import settings
+from app.src.utils.logger import logger
+from app.src.utils.metrics import registry
+
+_MB = 1024 * 1024
+
+
+def symbol_slices(symbols: pd.Index) -> dict[str, tuple[int, int]]:
+    """Row range of each symbol in a symbol-sorted index level."""
+    if not len(symbols):
+        return {}
+    codes, _ = pd.factorize(symbols)
+    boundaries = np.flatnonzero(np.diff(codes)) + 1
+    starts = np.concatenate(([0], boundaries))
+    stops = np.concatenate((boundaries, [len(symbols)]))
+    return {
+        str(symbols[start]): (int(start), int(stop))
+        for start, stop in zip(starts, stops)
+    }
+
+
+class BarStore:
+    def __init__(self, df: pd.DataFrame):
+        self.timestamps = df.index.get_level_values(1).as_unit("ns").asi8
+        self.columns = {column: df[column].to_numpy() for column in df.columns}
+        self.slices = symbol_slices(df.index.get_level_values(0))
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.slices
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def symbols(self) -> list[str]:
+        return list(self.slices)
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamps.nbytes + sum(a.nbytes for a in self.columns.values())
+
+    def symbol_arrays(
+        self, symbol: str, columns: tuple[str, ...]
+    ) -> dict[str, np.ndarray]:
+        """Views of ``symbol``'s "timestamp" (epoch ns) and ``columns`` (empty when absent)."""
+        start, stop = self.slices.get(symbol, (0, 0))
+        arrays = {"timestamp": self.timestamps[start:stop]}
+        for column in columns:
+            arrays[column] = self.columns[column][start:stop]
+        return arrays
+
+
+def float64_column(values: np.ndarray) -> np.ndarray:
+    """
+    A column widened for TA-Lib. float32 prices are rounded back to the
+    4 decimals Alpaca quotes, so 187.23 comes back as 187.23 and not as
+    187.22999572753906.
+    """
+    if values.dtype == np.float32:
+        return np.round(values.astype(np.float64), 4)
+    return values.astype(np.float64)
+
+
+def as_bar_store(bars: Union[BarStore, pd.DataFrame]) -> BarStore:
+    return bars if isinstance(bars, BarStore) else BarStore(bars)
+
+
+_STATM_PATH = "/proc/self/statm"
+
+
+def rss_is_current() -> bool:
+    """Whether ``current_rss_mb`` reads the current RSS rather than the peak."""
+    return os.path.exists(_STATM_PATH)
+
+
+def current_rss_mb() -> float:
+    """Current RSS in MB; the peak RSS where /proc is unavailable (see rss_is_current)."""
+    try:
+        with open(_STATM_PATH, encoding="utf-8") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / _MB
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is in bytes on macOS, in KB elsewhere
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / _MB if sys.platform == "darwin" else peak / 1024
+
+
+class BarMemoryBudget:
+    """
+    Keeps a scan's bars within RSS_BUDGET_MB. The memory per symbol is learned
+    from the stores of the previous scan. Bars already held by the buffers
+    are inside the current RSS: topping a held symbol up costs about one more
+    copy of its arrays while the merged frame replaces the old one. A symbol
+    not held yet is fetched in full, which takes about BAR_FETCH_OVERHEAD
+    times the final arrays. When the headroom left under the budget cannot
+    cover every symbol, the scan is cut to the symbols that fit, in
+    watchlist order. Without /proc only the peak RSS is known, so the budget
+    is not enforced.
+    """
+
+    def __init__(self):
+        self.bytes_per_symbol: Optional[float] = None
+        self.last_bars_bytes = 0
+        self._warned_peak = False
+
+    def admit(self, symbols: list[str], held: Container[str] = ()) -> list[str]:
+        """The leading ``symbols`` whose bars fit; ``held`` are those already buffered."""
+        if not settings.RSS_BUDGET_MB or not self.bytes_per_symbol:
+            return symbols
+        if not rss_is_current():
+            if not self._warned_peak:
+                logger.warning(
+                    "Current RSS unavailable (no /proc); RSS budget not enforced"
+                )
+                self._warned_peak = True
+            return symbols
+        headroom = (settings.RSS_BUDGET_MB - current_rss_mb()) * _MB
+        top_up = self.bytes_per_symbol
+        fetch = self.bytes_per_symbol * settings.BAR_FETCH_OVERHEAD
+        fit = 0
+        for symbol in symbols:
+            headroom -= top_up if symbol in held else fetch
+            if headroom < 0:
+                break
+            fit += 1
+        if fit >= len(symbols):
+            return symbols
+        logger.warning(
+            f"RSS budget {settings.RSS_BUDGET_MB:.0f} MB: room for bars of {fit} of "
+            f"{len(symbols)} tickers ({current_rss_mb():.0f} MB in use)"
+        )
+        return symbols[:fit]
+
+    def observe(self, *stores: BarStore) -> float:
+        """Record this scan's bar memory; returns it in MB."""
+        self.last_bars_bytes = sum(store.nbytes for store in stores)
+        symbols = max((len(store.slices) for store in stores), default=0)
+        if symbols:
+            self.bytes_per_symbol = self.last_bars_bytes / symbols
+        return self.last_bars_bytes / _MB
+
+    def prometheus_lines(self) -> list[str]:
+        return [
+            "# HELP algo_process_rss_bytes Resident set size (the peak where "
+            "/proc is unavailable)",
+            "# TYPE algo_process_rss_bytes gauge",
+            f"algo_process_rss_bytes {current_rss_mb() * _MB:.0f}",
+            "# HELP algo_rss_budget_bytes RSS_BUDGET_MB (0: no budget)",
+            "# TYPE algo_rss_budget_bytes gauge",
+            f"algo_rss_budget_bytes {settings.RSS_BUDGET_MB * _MB:.0f}",
+            "# HELP algo_scan_bars_bytes Bar arrays held by the last scan",
+            "# TYPE algo_scan_bars_bytes gauge",
+            f"algo_scan_bars_bytes {self.last_bars_bytes}",
+        ]
+
+
+bar_budget = BarMemoryBudget()
+registry.add_collector(bar_budget.prometheus_lines)
@@ -2,9 +2,8 @@ import re
 from datetime import datetime, timedelta
 from typing import Optional
 
-import aiohttp
-
 from app.src.config.settings import settings
+from app.src.utils.http_client import ALPACA_DATA, get_session
 from app.src.utils.logger import logger
 
 
@@ -45,9 +44,7 @@ def _parse_contract_symbol(contract_symbol: str) -> Optional[dict]:
     }
 
 
-async def get_option_chain(
-    ticker: str, option_type: str = "put", days: int = 45, session: Optional[aiohttp.ClientSession] = None
-) -> list:
+async def get_option_chain(ticker: str, option_type: str = "put", days: int = 45) -> list:
     """
     Fetch real option chain from Alpaca REST API for puts/calls.
     Uses /v1beta1/options/snapshots endpoint and parses contract symbols.
@@ -60,15 +57,11 @@ async def get_option_chain(
         # Map option_type to API format
         api_type = "put" if option_type.lower() == "put" else "call"
         
-        url = f"https://data.alpaca.markets/v1beta1/options/snapshots/{ticker}"
+        url = f"/v1beta1/options/snapshots/{ticker}"
         if not settings.ALPACA_KEY or not settings.ALPACA_SECRET:
             logger.error("Alpaca credentials not configured")
             return []
-        headers = {
-            "accept": "application/json",
-            "APCA-API-KEY-ID": str(settings.ALPACA_KEY),
-            "APCA-API-SECRET-KEY": str(settings.ALPACA_SECRET),
-        }
+        session = get_session(ALPACA_DATA)
         params = {
             "feed": "opra",
             "type": api_type,
@@ -77,21 +70,11 @@ async def get_option_chain(
             "limit": "100",
         }
         
-        # Use provided session or create a temporary one
-        timeout = aiohttp.ClientTimeout(total=10)
-        if session is None:
-            async with aiohttp.ClientSession(timeout=timeout) as temp_session:
-                async with temp_session.get(url, headers=headers, params=params) as resp:
-                    if resp.status != 200:
-                        logger.warning(f"Alpaca options API error for {ticker}: status {resp.status}")
-                        return []
-                    data = await resp.json()
-        else:
-            async with session.get(url, headers=headers, params=params) as resp:
-                if resp.status != 200:
-                    logger.warning(f"Alpaca options API error for {ticker}: status {resp.status}")
-                    return []
-                data = await resp.json()
+        async with session.get(url, params=params) as resp:
+            if resp.status != 200:
+                logger.warning(f"Alpaca options API error for {ticker}: status {resp.status}")
+                return []
+            data = await resp.json()
         
         snapshots = data.get("snapshots", {})
         if not snapshots:
@@ -104,23 +87,16 @@ async def get_option_chain(
         
         # Fetch quotes for all contracts to get bid prices
         if contract_symbols:
-            quotes_url = "https://data.alpaca.markets/v1beta1/options/quotes/latest"
+            quotes_url = "/v1beta1/options/quotes/latest"
             quotes_params = {
                 "symbols": ",".join(contract_symbols),
                 "feed": "opra",
             }
-            
-            if session is None:
-                async with aiohttp.ClientSession(timeout=timeout) as temp_session:
-                    async with temp_session.get(quotes_url, headers=headers, params=quotes_params) as quotes_resp:
-                        if quotes_resp.status == 200:
-                            quotes_data = await quotes_resp.json()
-                            quotes = quotes_data.get("quotes", {})
-            else:
-                async with session.get(quotes_url, headers=headers, params=quotes_params) as quotes_resp:
-                    if quotes_resp.status == 200:
-                        quotes_data = await quotes_resp.json()
-                        quotes = quotes_data.get("quotes", {})
+
+            async with session.get(quotes_url, params=quotes_params) as quotes_resp:
+                if quotes_resp.status == 200:
+                    quotes_data = await quotes_resp.json()
+                    quotes = quotes_data.get("quotes", {})
         
         # Parse each contract symbol and build chain
         for contract_symbol, snapshot in snapshots.items():
@@ -0,0 +1,147 @@
+"""
+Higher-timeframe bars built from the minute bars already held.
+
+``ResampledBars`` follows a minute ``BarBuffer``. After each top-up it
+re-aggregates only the bins that the new minute bars can have changed. Those
+are the bins from the one holding the earliest re-fetched minute onward, plus
+every bin of a newly added symbol. Older bins are kept as they are. The
+frame has the same (symbol, timestamp) index and columns as the frame
+``get_bars`` returns for that timeframe. A bar is labelled with its bin's
+start, as Alpaca labels its own. 5- and 15-minute bins line up with the 9:30
+open. "1Day" is the New York session date, so today's bar is the running
+daily bar.
+
+A symbol's oldest bin is dropped when its minute history was cut at the
+buffer's limit, since that bin may be missing minutes.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from app.src.data.alpaca_client import _compact, _is_daily_timeframe
+from app.src.data.bar_store import BarStore
+from app.src.utils.helpers import NY
+
+_AGGREGATIONS = {
+    "open": "first",
+    "high": "max",
+    "low": "min",
+    "close": "last",
+    "volume": "sum",
+    "trade_count": "sum",
+}
+_SESSION_MINUTES = 390
+
+
+def bin_minutes(timeframe: str) -> int:
+    """Length of a ``timeframe`` bar in minutes (a regular session for "1Day")."""
+    if _is_daily_timeframe(timeframe):
+        return _SESSION_MINUTES
+    value = str(timeframe).strip()
+    for unit, minutes in (("Min", 1), ("Hour", 60)):
+        if value.endswith(unit) and value[: -len(unit)].isdigit():
+            return int(value[: -len(unit)]) * minutes
+    raise ValueError(f"Cannot resample minute bars to {timeframe!r}")
+
+
+def bin_starts(timestamps: pd.DatetimeIndex, timeframe: str) -> pd.DatetimeIndex:
+    if _is_daily_timeframe(timeframe):
+        return timestamps.tz_convert(NY).normalize().tz_convert("UTC")
+    return timestamps.floor(f"{bin_minutes(timeframe)}min")
+
+
+def aggregate_bars(minutes: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """Bars of ``timeframe`` from a symbol-sorted frame of minute bars."""
+    keys = [
+        minutes.index.get_level_values(0),
+        bin_starts(minutes.index.get_level_values(1), timeframe),
+    ]
+    grouped = minutes.groupby(keys, sort=True)
+    bars = grouped.agg({c: f for c, f in _AGGREGATIONS.items() if c in minutes})
+    if "vwap" in minutes:
+        # Volume-weighted mean of the minute VWAPs
+        volume = minutes["volume"].to_numpy(np.float64)
+        traded = (
+            pd.Series(
+                minutes["vwap"].to_numpy(np.float64) * volume, index=minutes.index
+            )
+            .groupby(keys, sort=True)
+            .sum()
+        )
+        total = bars["volume"].to_numpy(np.float64)
+        bars["vwap"] = np.where(
+            total > 0,
+            traded.to_numpy() / np.where(total > 0, total, 1),
+            bars["close"].to_numpy(np.float64),
+        )
+    bars.index.names = ["symbol", "timestamp"]
+    return _compact(bars[[c for c in minutes.columns if c in bars]])
+
+
+class ResampledBars:
+    def __init__(self, timeframe: str, minute_limit: int):
+        self.timeframe = timeframe
+        self.minute_limit = minute_limit
+        # Enough bins to cover the minute history held
+        self.limit = max(1, -(-minute_limit // bin_minutes(timeframe)))
+        self.frame: Optional[pd.DataFrame] = None
+        self._store: Optional[BarStore] = None
+
+    def update(
+        self,
+        minutes: Optional[pd.DataFrame],
+        since: Optional[pd.Timestamp] = None,
+    ) -> None:
+        """
+        Follow the minute frame after a top-up. ``since`` is the earliest
+        minute re-fetched for symbols already held; None rebuilds every bin.
+        """
+        self._store = None
+        if minutes is None or minutes.empty:
+            self.frame = None
+            return
+        symbols = minutes.index.get_level_values(0)
+        timestamps = minutes.index.get_level_values(1)
+        if self.frame is None or since is None:
+            changed = np.ones(len(minutes), dtype=bool)
+            kept = None
+        else:
+            cutoff = bin_starts(pd.DatetimeIndex([since]), self.timeframe)[0]
+            held = self.frame.index.get_level_values(0)
+            changed = np.asarray((timestamps >= cutoff) | ~symbols.isin(held.unique()))
+            kept = self.frame[
+                (self.frame.index.get_level_values(1) < cutoff)
+                & held.isin(symbols.unique())
+            ]
+
+        fresh = aggregate_bars(minutes[changed], self.timeframe)
+        # Drop the first, possibly partial, bin of symbols cut at the limit,
+        # unless it was complete when first built (a kept bin)
+        counts = symbols.value_counts()
+        truncated = set(counts.index[counts >= self.minute_limit])
+        if truncated:
+            fresh_symbols = fresh.index.get_level_values(0)
+            first = ~pd.Series(fresh_symbols).duplicated().to_numpy()
+            rebuilt = ~fresh_symbols.isin(
+                [] if kept is None else kept.index.get_level_values(0).unique()
+            )
+            fresh = fresh[~(first & rebuilt & fresh_symbols.isin(truncated))]
+
+        frame = fresh if kept is None or kept.empty else pd.concat([kept, fresh])
+        if not frame.index.is_monotonic_increasing:
+            frame = frame.sort_index()
+        by_symbol = frame.groupby(level=0, sort=False)
+        if len(frame) and by_symbol.size().max() > self.limit:
+            frame = by_symbol.tail(self.limit)
+        self.frame = frame if len(frame) else None
+
+    def store(self) -> Optional[BarStore]:
+        """Column view of ``frame``, built once per update."""
+        if self._store is None and self.frame is not None:
+            self._store = BarStore(self.frame)
+        return self._store
+
+    def clear(self) -> None:
+        self.frame, self._store = None, None
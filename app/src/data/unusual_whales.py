@@ -1,29 +1,177 @@
 import asyncio
+import functools
+import json
+import os
 import re
 from datetime import datetime
+from functools import lru_cache
+from typing import Any, Optional, Protocol
 
 import aiohttp
 
 from app.src.config.settings import settings
+from app.src.utils.helpers import measure_latency, now_ny
+from app.src.utils.http_client import UNUSUAL_WHALES, get_session
 from app.src.utils.logger import logger
 
+_SCREENER_TIMEOUT = aiohttp.ClientTimeout(total=15, connect=5)
 
-async def get_flow_signal(
-    ticker: str, session: aiohttp.ClientSession, max_retries: int = 3
-):
+
+class SignalSource(Protocol):
+    def lookup(self, kind: str, ticker: str) -> Any: ...
+
+
+_signal_source: Optional[SignalSource] = None
+
+
+def set_signal_source(source: Optional[SignalSource]) -> None:
+    """Answer the per-ticker signal lookups from ``source`` (e.g. a backtest replay); ``None`` restores the API."""
+    global _signal_source
+    _signal_source = source
+
+
+@lru_cache(maxsize=1)
+def _record_file():
+    directory = os.path.dirname(settings.UW_SIGNAL_RECORD_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return open(settings.UW_SIGNAL_RECORD_PATH, "a", buffering=1, encoding="utf-8")
+
+
+def _record(kind: str, ticker: str, value: Any) -> None:
+    """Append a live signal to UW_SIGNAL_RECORD_PATH so backtests can replay it."""
+    if not settings.UW_SIGNAL_RECORD_PATH:
+        return
+    try:
+        line = {"ts": now_ny().isoformat(), "kind": kind, "ticker": ticker, "value": value}
+        _record_file().write(json.dumps(line) + "\n")
+    except Exception as e:
+        logger.warning(f"Failed to record UW {kind} signal for {ticker}: {e}")
+
+
+# Congress disclosures and the 1-year IV rank change at most daily
+_SLOW_SIGNALS = ("congress", "iv_rank")
+
+
+class SignalCache:
+    """
+    Per-ticker signal values kept for UW_SIGNAL_TTL_SECONDS, or for
+    UW_SLOW_SIGNAL_TTL_SECONDS for the slow-moving ones. Entries carry their
+    fetch time (``now_ny``), so a warm restart can keep the ones still fresh.
+    A signal's version changes only when a fetch returns a different value.
+    """
+
+    def __init__(self):
+        self.entries: dict[tuple[str, str], tuple[datetime, Any]] = {}
+        # (kind, ticker) -> (version, last value); outlives expired entries
+        self.versions: dict[tuple[str, str], tuple[int, Any]] = {}
+
+    @staticmethod
+    def ttl(kind: str) -> float:
+        if kind in _SLOW_SIGNALS:
+            return settings.UW_SLOW_SIGNAL_TTL_SECONDS
+        return settings.UW_SIGNAL_TTL_SECONDS
+
+    def is_fresh(self, kind: str, fetched_at: datetime) -> bool:
+        return (now_ny() - fetched_at).total_seconds() < self.ttl(kind)
+
+    def get(self, kind: str, ticker: str) -> tuple[bool, Any]:
+        """(hit, value)."""
+        entry = self.entries.get((kind, ticker))
+        if entry is None:
+            return False, None
+        if not self.is_fresh(kind, entry[0]):
+            del self.entries[(kind, ticker)]
+            return False, None
+        return True, entry[1]
+
+    def put(self, kind: str, ticker: str, value: Any) -> None:
+        key = (kind, ticker)
+        self.entries[key] = (now_ny(), value)
+        version, last = self.versions.get(key, (0, None))
+        if key not in self.versions or last != value:
+            self.versions[key] = (version + 1, value)
+
+    def version(self, kind: str, ticker: str) -> Optional[int]:
+        """Version of the cached value; None when none is cached or it expired."""
+        entry = self.entries.get((kind, ticker))
+        if entry is None or not self.is_fresh(kind, entry[0]):
+            return None
+        return self.versions.get((kind, ticker), (0, None))[0]
+
+    def restore(self, entries: dict[tuple[str, str], tuple[datetime, Any]]) -> int:
+        """Adopt the still-fresh ``entries``; returns how many were kept."""
+        kept = {
+            key: entry
+            for key, entry in entries.items()
+            if self.is_fresh(key[0], entry[0])
+        }
+        self.entries.update(kept)
+        return len(kept)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.versions.clear()
+
+
+signal_cache = SignalCache()
+
+SIGNAL_KINDS = ("flow", "congress", "dark_pool", "iv_rank")
+
+
+def signal_versions(ticker: str) -> Optional[tuple]:
+    """
+    Version of each of ``ticker``'s cached signals (None for one not cached).
+    None when signals are replayed, since those are not cached.
+    """
+    if _signal_source is not None:
+        return None
+    return tuple(signal_cache.version(kind, ticker) for kind in SIGNAL_KINDS)
+
+
+# Returned by a fetcher whose request failed (as opposed to finding no signal)
+_FAILED = object()
+
+
+def _replayable(kind: str, fallback: Any = None):
+    """
+    Cache and record a signal fetcher. A fetch that returns ``_FAILED`` is
+    answered with ``fallback`` and not cached, so the next call retries it.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(ticker: str, *args, **kwargs):
+            if _signal_source is not None:
+                return _signal_source.lookup(kind, ticker)
+            hit, value = signal_cache.get(kind, ticker)
+            if hit:
+                return value
+            value = await func(ticker, *args, **kwargs)
+            if value is _FAILED:
+                value = fallback
+            else:
+                signal_cache.put(kind, ticker, value)
+            _record(kind, ticker, value)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+@_replayable("flow")
+@measure_latency
+async def get_flow_signal(ticker: str, max_retries: int = 3):
     """Enhanced flow with sweeps, openers, and sentiment using new API."""
-    url = "https://api.unusualwhales.com/api/option-trades/flow-alerts"
-    headers = {
-        "Accept": "application/json, text/plain",
-        "Authorization": f"Bearer {settings.UW_API_KEY}",
-    }
+    url = "/api/option-trades/flow-alerts"
+    session = get_session(UNUSUAL_WHALES)
     params = {"ticker_symbol": ticker}
 
     for attempt in range(max_retries):
         try:
-            timeout = aiohttp.ClientTimeout(total=10)
             async with session.get(
-                url, headers=headers, params=params, timeout=timeout
+                url, params=params, trace_request_ctx={"attempt": attempt}
             ) as resp:
                 if resp.status == 200:
                     data = await resp.json()
@@ -100,12 +248,12 @@ async def get_flow_signal(
                         logger.error(
                             f"UW flow failed for {ticker} after {max_retries} attempts: status {resp.status}"
                         )
-                        return None
+                        return _FAILED
                 else:
                     logger.warning(
                         f"UW flow fetch error for {ticker}: status {resp.status}"
                     )
-                    return None
+                    return _FAILED
         except Exception as e:
             if attempt < max_retries - 1:
                 logger.warning(
@@ -117,29 +265,25 @@ async def get_flow_signal(
                 logger.warning(
                     f"UW flow fetch error for {ticker} after {max_retries} attempts: {e}"
                 )
-                return None
+                return _FAILED
 
-    return None
+    return _FAILED
 
 
-async def get_congress_trades(
-    ticker: str, session: aiohttp.ClientSession, max_retries: int = 3
-):
+@_replayable("congress")
+@measure_latency
+async def get_congress_trades(ticker: str, max_retries: int = 3):
     """Politician trades for edge (buy if they buy) using new API."""
     # Use today's date for the query
     today = datetime.now().strftime("%Y-%m-%d")
-    url = "https://api.unusualwhales.com/api/congress/recent-trades"
-    headers = {
-        "Accept": "application/json, text/plain",
-        "Authorization": f"Bearer {settings.UW_API_KEY}",
-    }
+    url = "/api/congress/recent-trades"
+    session = get_session(UNUSUAL_WHALES)
     params = {"ticker": ticker, "date": today}
 
     for attempt in range(max_retries):
         try:
-            timeout = aiohttp.ClientTimeout(total=10)
             async with session.get(
-                url, headers=headers, params=params, timeout=timeout
+                url, params=params, trace_request_ctx={"attempt": attempt}
             ) as resp:
                 if resp.status == 200:
                     data = await resp.json()
@@ -205,12 +349,12 @@ async def get_congress_trades(
                         logger.error(
                             f"UW congress failed for {ticker} after {max_retries} attempts: status {resp.status}"
                         )
-                        return None
+                        return _FAILED
                 else:
                     logger.warning(
                         f"UW congress error for {ticker}: status {resp.status}"
                     )
-                    return None
+                    return _FAILED
         except Exception as e:
             if attempt < max_retries - 1:
                 logger.warning(
@@ -222,25 +366,21 @@ async def get_congress_trades(
                 logger.warning(
                     f"UW congress error for {ticker} after {max_retries} attempts: {e}"
                 )
-                return None
+                return _FAILED
 
-    return None
+    return _FAILED
 
 
-async def get_dark_pool(
-    ticker: str, session: aiohttp.ClientSession, max_retries: int = 3
-):
+@_replayable("dark_pool")
+@measure_latency
+async def get_dark_pool(ticker: str, max_retries: int = 3):
     """Dark pool volume for institutional support using new API."""
-    url = f"https://api.unusualwhales.com/api/darkpool/{ticker}"
-    headers = {
-        "Accept": "application/json, text/plain",
-        "Authorization": f"Bearer {settings.UW_API_KEY}",
-    }
+    url = f"/api/darkpool/{ticker}"
+    session = get_session(UNUSUAL_WHALES)
 
     for attempt in range(max_retries):
         try:
-            timeout = aiohttp.ClientTimeout(total=10)
-            async with session.get(url, headers=headers, timeout=timeout) as resp:
+            async with session.get(url, trace_request_ctx={"attempt": attempt}) as resp:
                 if resp.status == 200:
                     data = await resp.json()
                     trades = data.get("data", [])
@@ -321,12 +461,12 @@ async def get_dark_pool(
                         logger.error(
                             f"UW dark pool failed for {ticker} after {max_retries} attempts: status {resp.status}"
                         )
-                        return None
+                        return _FAILED
                 else:
                     logger.warning(
                         f"UW dark pool error for {ticker}: status {resp.status}"
                     )
-                    return None
+                    return _FAILED
         except Exception as e:
             if attempt < max_retries - 1:
                 logger.warning(
@@ -338,23 +478,21 @@ async def get_dark_pool(
                 logger.warning(
                     f"UW dark pool error for {ticker} after {max_retries} attempts: {e}"
                 )
-                return None
+                return _FAILED
 
-    return None
+    return _FAILED
 
 
-async def get_iv_rank(ticker: str, session: aiohttp.ClientSession, max_retries: int = 3):
+@_replayable("iv_rank", fallback=0.0)
+@measure_latency
+async def get_iv_rank(ticker: str, max_retries: int = 3):
     """IV percentile for volatility filter using new API."""
-    url = f"https://api.unusualwhales.com/api/stock/{ticker}/iv-rank"
-    headers = {
-        "Accept": "application/json, text/plain",
-        "Authorization": f"Bearer {settings.UW_API_KEY}",
-    }
+    url = f"/api/stock/{ticker}/iv-rank"
+    session = get_session(UNUSUAL_WHALES)
 
     for attempt in range(max_retries):
         try:
-            timeout = aiohttp.ClientTimeout(total=10)
-            async with session.get(url, headers=headers, timeout=timeout) as resp:
+            async with session.get(url, trace_request_ctx={"attempt": attempt}) as resp:
                 if resp.status == 200:
                     data = await resp.json()
                     # Response has a "data" array with most recent entry first
@@ -381,11 +519,11 @@ async def get_iv_rank(ticker: str, session: aiohttp.ClientSession, max_retries:
                         continue
                     else:
                         logger.error(f"UW IV rank failed for {ticker} after {max_retries} attempts: status {resp.status}")
-                        return 0.0
+                        return _FAILED
                 else:
                     # Non-4xx error, don't retry
                     logger.warning(f"UW IV rank error for {ticker}: status {resp.status}")
-                    return 0.0
+                    return _FAILED
         except Exception as e:
             if attempt < max_retries - 1:
                 logger.warning(f"UW IV rank exception for {ticker}: {e}, retrying ({attempt + 1}/{max_retries})")
@@ -393,20 +531,18 @@ async def get_iv_rank(ticker: str, session: aiohttp.ClientSession, max_retries:
                 continue
             else:
                 logger.warning(f"UW IV rank error for {ticker} after {max_retries} attempts: {e}")
-                return 0.0
+                return _FAILED
     
-    return 0.0
+    return _FAILED
 
 
-async def get_screener_tickers(session: aiohttp.ClientSession):
+@measure_latency
+async def get_screener_tickers():
     """Dynamic watchlist from stock screener using new API."""
     # Use today's date for the query
     today = datetime.now().strftime("%Y-%m-%d")
-    url = "https://api.unusualwhales.com/api/screener/stocks"
-    headers = {
-        "Accept": "application/json, text/plain",
-        "Authorization": f"Bearer {settings.UW_API_KEY}",
-    }
+    url = "/api/screener/stocks"
+    session = get_session(UNUSUAL_WHALES)
     # Screen for S&P 500 stocks with high volume and unusual flow
     params = {
         "is_s_p_500": "true",  # String value for API
@@ -415,13 +551,7 @@ async def get_screener_tickers(session: aiohttp.ClientSession):
     }
 
     try:
-        timeout = aiohttp.ClientTimeout(total=15)
-        async with session.get(
-            url,
-            headers=headers,
-            params=params,
-            timeout=timeout,
-        ) as resp:
+        async with session.get(url, params=params, timeout=_SCREENER_TIMEOUT) as resp:
             if resp.status == 200:
                 data = await resp.json()
                 stocks = data.get("data", [])
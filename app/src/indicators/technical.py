@@ -1,10 +1,12 @@
-from datetime import datetime, time, timedelta
+from datetime import date, datetime, time, timedelta
 
+import numpy as np
 import pandas as pd
 import talib
 
 from app.src.config.settings import settings
 from app.src.utils.helpers import NY, now_ny
+from app.src.utils.tracing import span
 
 
 def calculate_rvol(df_1m: pd.DataFrame, df_daily: pd.DataFrame | None = None) -> float:
@@ -80,3 +82,202 @@ def is_downtrend(daily_df: pd.DataFrame) -> bool:
     sma50 = talib.SMA(close, timeperiod=50)
     sma200 = talib.SMA(close, timeperiod=200)
     return close[-1] < sma50[-1] < sma200[-1]
+
+
+INTRADAY_COLUMNS = ("high", "low", "close", "volume")
+DAILY_COLUMNS = ("close", "volume")
+
+
+def frame_arrays(df: pd.DataFrame, columns: tuple[str, ...]) -> dict[str, np.ndarray]:
+    """One ticker's bars as plain arrays: UTC epoch-ns ``timestamp`` plus float64 columns."""
+    arrays = {"timestamp": df.index.as_unit("ns").asi8}
+    for column in columns:
+        arrays[column] = df[column].to_numpy(dtype=np.float64)
+    return arrays
+
+
+def indicator_snapshot(
+    intraday: dict[str, np.ndarray],
+    daily: dict[str, np.ndarray],
+    today: date,
+    orb_minutes: int,
+) -> dict:
+    """
+    Everything ``evaluate_ticker`` needs from the bars, computed from plain
+    arrays (see ``frame_arrays``) so it can run in a worker process.
+
+    Mirrors calculate_rvol, get_opening_range, calculate_vwap, is_uptrend and
+    is_downtrend.
+    """
+    with span("session_mask"):
+        times = pd.to_datetime(intraday["timestamp"], unit="ns", utc=True).tz_convert(NY)
+        today_mask = np.asarray(times.date == today)
+        volume = intraday["volume"]
+        daily_close = daily["close"]
+        snapshot = {
+            "today_bars": int(today_mask.sum()),
+            "daily_bars": len(daily_close),
+        }
+    if not today_mask.any():
+        return snapshot
+
+    today_close = intraday["close"][today_mask]
+    today_volume = volume[today_mask]
+    snapshot["price"] = float(today_close[-1])
+    snapshot["bar_time"] = int(intraday["timestamp"][today_mask][-1])
+
+    # RVOL: today's volume over the average daily volume of the last 20 days
+    with span("rvol"):
+        rvol = 0.0
+        today_vol = today_volume.sum()
+        if len(volume) >= 10:
+            if len(daily_close) >= 20:
+                daily_dates = (
+                    pd.to_datetime(daily["timestamp"], unit="ns", utc=True).tz_convert(NY).date
+                )
+                historical = daily["volume"][np.asarray(daily_dates < today)]
+                if len(historical) < 20:
+                    historical = daily["volume"][-20:]
+                avg_daily_vol = historical.mean()
+                rvol = today_vol / avg_daily_vol if avg_daily_vol > 0 else 0.0
+            elif (~today_mask).sum() >= 10:
+                avg_vol_per_min = (
+                    pd.Series(volume[~today_mask])
+                    .rolling(window=20 * 390, min_periods=10)
+                    .mean()
+                    .iloc[-1]
+                )
+                avg_daily_vol = avg_vol_per_min * 390
+                rvol = today_vol / avg_daily_vol if avg_daily_vol > 0 else 0.0
+        snapshot["rvol"] = float(rvol)
+
+    # Opening range
+    with span("opening_range"):
+        market_open = NY.localize(datetime.combine(today, time(9, 30)))
+        orb_end = market_open + timedelta(minutes=orb_minutes)
+        today_times = times[today_mask]
+        orb_mask = np.asarray((today_times >= market_open) & (today_times <= orb_end))
+        if orb_mask.any():
+            snapshot["orb_high"] = float(intraday["high"][today_mask][orb_mask].max())
+            snapshot["orb_low"] = float(intraday["low"][today_mask][orb_mask].min())
+        else:
+            snapshot["orb_high"] = snapshot["orb_low"] = None
+
+    # VWAP
+    with span("vwap"):
+        snapshot["vwap"] = float(
+            today_close[-1]
+            if today_vol == 0
+            else (today_close * today_volume).sum() / today_vol
+        )
+
+    # Daily trend
+    with span("trend"):
+        snapshot["is_uptrend"] = snapshot["is_downtrend"] = False
+        if len(daily_close) >= 200:
+            sma50 = talib.SMA(daily_close, timeperiod=50)
+            sma200 = talib.SMA(daily_close, timeperiod=200)
+            last = daily_close[-1]
+            snapshot["is_uptrend"] = bool(last > sma50[-1] > sma200[-1])
+            snapshot["is_downtrend"] = bool(last < sma50[-1] < sma200[-1])
+    return snapshot
+
+
+# Per-bar columns of ``session_snapshot_arrays`` besides "timestamp" (the bar time)
+SNAPSHOT_COLUMNS = (
+    "today_bars",
+    "daily_bars",
+    "price",
+    "rvol",
+    "orb_high",
+    "orb_low",
+    "vwap",
+    "is_uptrend",
+    "is_downtrend",
+)
+
+
+def session_snapshot_arrays(
+    intraday: dict[str, np.ndarray],
+    daily: dict[str, np.ndarray],
+    day: date,
+    orb_minutes: int,
+) -> dict[str, np.ndarray]:
+    """
+    ``indicator_snapshot`` after every bar of one session, in a single pass,
+    as float columns (NaN for a missing opening range, 0/1 for the trend flags).
+
+    ``intraday`` holds only ``day``'s minute bars and ``daily`` only the days
+    before it; row ``k`` equals ``indicator_snapshot`` over the first ``k + 1``
+    bars (see ``snapshot_at``). Used by the backtest, which evaluates every minute.
+    """
+    n = len(intraday["close"])
+    timestamps = np.asarray(intraday["timestamp"], dtype=np.int64)
+    if n == 0:
+        arrays = {column: np.empty(0) for column in SNAPSHOT_COLUMNS}
+        arrays["timestamp"] = timestamps
+        return arrays
+    times = pd.to_datetime(timestamps, unit="ns", utc=True).tz_convert(NY)
+    close = intraday["close"]
+    volume = intraday["volume"]
+    daily_close = daily["close"]
+
+    cum_volume = np.cumsum(volume)
+    cum_pv = np.cumsum(close * volume)
+
+    # Every daily bar predates ``day``, so this is calculate_rvol's historical mean
+    avg_daily_vol = daily["volume"].mean() if len(daily_close) >= 20 else 0.0
+    if avg_daily_vol > 0:
+        rvol = cum_volume / avg_daily_vol
+    else:
+        rvol = np.zeros(n)
+    rvol[: min(9, n)] = 0.0  # fewer than 10 bars
+
+    market_open = NY.localize(datetime.combine(day, time(9, 30)))
+    orb_end = market_open + timedelta(minutes=orb_minutes)
+    in_orb = np.asarray((times >= market_open) & (times <= orb_end))
+    orb_seen = np.cumsum(in_orb) > 0
+    orb_high = np.maximum.accumulate(np.where(in_orb, intraday["high"], -np.inf))
+    orb_low = np.minimum.accumulate(np.where(in_orb, intraday["low"], np.inf))
+
+    uptrend = downtrend = False
+    if len(daily_close) >= 200:
+        sma50 = talib.SMA(daily_close, timeperiod=50)
+        sma200 = talib.SMA(daily_close, timeperiod=200)
+        last = daily_close[-1]
+        uptrend = bool(last > sma50[-1] > sma200[-1])
+        downtrend = bool(last < sma50[-1] < sma200[-1])
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        vwap = np.where(cum_volume == 0, close, cum_pv / cum_volume)
+    return {
+        "timestamp": timestamps,
+        "today_bars": np.arange(1, n + 1, dtype=np.float64),
+        "daily_bars": np.full(n, float(len(daily_close))),
+        "price": np.asarray(close, dtype=np.float64),
+        "rvol": rvol.astype(np.float64),
+        "orb_high": np.where(orb_seen, orb_high, np.nan),
+        "orb_low": np.where(orb_seen, orb_low, np.nan),
+        "vwap": vwap.astype(np.float64),
+        "is_uptrend": np.full(n, float(uptrend)),
+        "is_downtrend": np.full(n, float(downtrend)),
+    }
+
+
+def snapshot_at(arrays: dict[str, np.ndarray], k: int) -> dict:
+    """Row ``k`` of ``session_snapshot_arrays`` as an ``indicator_snapshot`` dict."""
+    orb_high = float(arrays["orb_high"][k])
+    orb_low = float(arrays["orb_low"][k])
+    return {
+        "today_bars": int(arrays["today_bars"][k]),
+        "daily_bars": int(arrays["daily_bars"][k]),
+        "price": float(arrays["price"][k]),
+        "bar_time": int(arrays["timestamp"][k]),
+        "rvol": float(arrays["rvol"][k]),
+        "orb_high": None if np.isnan(orb_high) else orb_high,
+        "orb_low": None if np.isnan(orb_low) else orb_low,
+        "vwap": float(arrays["vwap"][k]),
+        "is_uptrend": bool(arrays["is_uptrend"][k]),
+        "is_downtrend": bool(arrays["is_downtrend"][k]),
+    }
+
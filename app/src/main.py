@@ -1,49 +1,226 @@
 import asyncio
-from datetime import time
-
-import aiohttp
+import multiprocessing
+import signal
+from datetime import date, time
 
+from app.src.config.settings import settings
+from app.src.core.compute import get_compute_executor
+from app.src.core.exit_monitor import monitor_exits
+from app.src.core.loop_monitor import loop_monitor
+from app.src.core.market_calendar import market_calendar
 from app.src.core.scanner import scan_once
+from app.src.core.scheduler import COALESCE, SERIAL, SKIP, Scheduler
+from app.src.core.sharding import get_coordinator, is_leader
+from app.src.core.signaler import SignalDispatcher
+from app.src.core.state_snapshot import (
+    register_section,
+    restore_snapshot,
+    save_snapshot,
+)
+from app.src.position_tracker.dynamodb_tracker import PositionTracker
+from app.src.strategies import orb_vwap_uw
 from app.src.strategies.orb_vwap_uw import refresh_watchlist
 from app.src.strategies.wheel_master import run_weekly_put_wheel
 from app.src.utils.helpers import now_ny
+from app.src.utils.cassette import start_cassette, stop_cassette
+from app.src.utils.decision_log import decision_log
+from app.src.utils.http_client import close_sessions
 from app.src.utils.logger import logger
+from app.src.utils.metrics import (
+    log_metrics_summary,
+    start_metrics_server,
+    stop_metrics_server,
+)
+
+# Track last refresh date to ensure daily refresh at 9:30 AM ET
+_last_refresh_date = None
+
+
+async def refresh_watchlist_if_due():
+    """Refresh the watchlist once per day between 9:29 and 9:31 AM ET."""
+    global _last_refresh_date
+    now = now_ny()
+    if (
+        time(hour=9, minute=29) <= now.time() <= time(hour=9, minute=31)
+        and _last_refresh_date != now.date()
+    ):
+        logger.info("Refreshing watchlist at 9:30 AM ET")
+        await refresh_watchlist()
+        _last_refresh_date = now.date()
+
+
+def _dump_watchlist() -> dict:
+    return {"date": _last_refresh_date, "tickers": list(orb_vwap_uw.WATCHLIST)}
+
+
+def _load_watchlist(data: dict) -> bool:
+    """Today's refreshed watchlist, so a restart does not refresh it again."""
+    global _last_refresh_date
+    refreshed_on: date | None = data["date"]
+    if refreshed_on != now_ny().date():
+        return False
+    _last_refresh_date = refreshed_on
+    orb_vwap_uw.WATCHLIST[:] = data["tickers"]
+    return True
+
+
+register_section("watchlist", _dump_watchlist, _load_watchlist)
+
+
+def _session_gate(name: str, lead: float = 0.0, lag: float = 0.0):
+    """Gate that parks a job until the market session (widened by lead/lag) is active."""
+
+    async def gate():
+        await market_calendar.wait_for_session(name, lead=lead, lag=lag)
+
+    return gate
+
+
+def _leader_only(func):
+    """With sharding on, run ``func`` only on the worker holding the leader lease."""
+
+    async def job():
+        if is_leader():
+            await func()
+
+    return job
+
+
+def build_scheduler() -> Scheduler:
+    scheduler = Scheduler()
+    offset = settings.SCAN_BAR_CLOSE_OFFSET_SECONDS
+    scheduler.add_job(
+        "watchlist_refresh",
+        _leader_only(refresh_watchlist_if_due),
+        60,
+        offset=0,
+        overlap=SKIP,
+        gate=_session_gate("watchlist_refresh", lead=120),
+    )
+    scheduler.add_job(
+        "orb_scan",
+        scan_once,
+        # With adaptive cadence the job only ticks; core.priority picks the tickers due
+        (
+            settings.SCAN_TICK_SECONDS
+            if settings.SCAN_PRIORITY
+            else settings.SCAN_PERIOD_SECONDS
+        ),
+        offset=offset,
+        overlap=COALESCE,
+        gate=_session_gate("orb_scan"),
+    )
+    if settings.EXIT_MONITOR_SECONDS > 0:
+        scheduler.add_job(
+            "exit_monitor",
+            monitor_exits,
+            settings.EXIT_MONITOR_SECONDS,
+            overlap=SKIP,
+            gate=_session_gate("exit_monitor"),
+        )
+    # The wheel paces itself with long sleeps inside its window, so it runs
+    # serially rather than warning about every tick it sleeps through.
+    # Its window runs until 16:10 ET, past the close.
+    scheduler.add_job(
+        "put_wheel",
+        _leader_only(run_weekly_put_wheel),
+        settings.WHEEL_PERIOD_SECONDS,
+        offset=offset,
+        overlap=SERIAL,
+        gate=None if settings.DEBUG_OPTION else _session_gate("put_wheel", lag=15 * 60),
+    )
+    if settings.STATE_SNAPSHOT_BACKEND and settings.STATE_SNAPSHOT_SECONDS > 0:
+        # Half a period away from the scans' bar-close offset
+        scheduler.add_job(
+            "state_snapshot",
+            save_snapshot,
+            settings.STATE_SNAPSHOT_SECONDS,
+            offset=offset + settings.SCAN_PERIOD_SECONDS / 2,
+            overlap=SKIP,
+        )
+    if settings.METRICS_SUMMARY_SECONDS > 0:
+        scheduler.add_job(
+            "metrics_summary",
+            log_metrics_summary,
+            settings.METRICS_SUMMARY_SECONDS,
+            offset=0,
+            overlap=SKIP,
+        )
+    return scheduler
 
 
 async def main():
     logger.success(
         f"[{now_ny()}] Algo Trader 2025 Bot Started | Max UW Flow + Congress + Dark Pool"
     )
-    async with aiohttp.ClientSession() as session:
-        # Track last refresh date to ensure daily refresh at 9:30 AM ET
-        last_refresh_date = None
-
-        while True:
-            try:
-                # Check if it's time to refresh watchlist (9:30 AM ET daily)
-                now = now_ny()
-                current_date = now.date()
-                current_time = now.time()
-                refresh_time_start = time(hour=9, minute=29)
-                refresh_time_end = time(hour=9, minute=31)
-
-                # Refresh if it's between 9:29-9:31 AM ET and we haven't refreshed today
-                if (
-                    refresh_time_start <= current_time <= refresh_time_end
-                    and last_refresh_date != current_date
-                ):
-                    logger.info("Refreshing watchlist at 9:30 AM ET")
-                    await refresh_watchlist(session)
-                    last_refresh_date = current_date
-                    await asyncio.sleep(60)  # Prevent double refresh
-
-                await scan_once(session)
-                await run_weekly_put_wheel(session)
-                await asyncio.sleep(25)
-            except Exception as e:
-                logger.critical(f"Main loop error: {e}")
-                await asyncio.sleep(60)
+    await start_cassette()
+    await start_metrics_server()
+    await restore_snapshot()
+    # One scan of the open-positions table; it also checks the restored positions
+    await PositionTracker.load_positions()
+    # Heroku stops dynos with SIGTERM: cancel the scheduler so the snapshot below is saved
+    terminating = asyncio.Event()
 
+    def on_sigterm():
+        terminating.set()
+        main_task.cancel()
 
-if __name__ == "__main__":
+    main_task = asyncio.current_task()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, on_sigterm)
+    except NotImplementedError:
+        pass  # No signal handlers on Windows event loops
+    # Lag is watched for the life of the process, not only during scans
+    loop_monitor.start()
+    background = [asyncio.create_task(SignalDispatcher().run())]
+    coordinator = get_coordinator()
+    if coordinator is not None:
+        await coordinator.refresh()
+        background.append(asyncio.create_task(coordinator.run()))
+    try:
+        await build_scheduler().run()
+    except asyncio.CancelledError:
+        if not terminating.is_set():
+            raise
+        logger.warning("SIGTERM received, shutting down")
+    finally:
+        await save_snapshot()
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        get_compute_executor().shutdown()
+        await close_sessions()
+        await stop_cassette()
+        await stop_metrics_server()
+        loop_monitor.stop()
+        decision_log.close()
+        await logger.complete()
+
+
+def _worker_process(index: int):
+    # Each local worker gets its own outbox file; SQLite claims are per process
+    settings.SIGNAL_OUTBOX_PATH = f"{settings.SIGNAL_OUTBOX_PATH}.{index}"
+    settings.STATE_SNAPSHOT_PATH = f"{settings.STATE_SNAPSHOT_PATH}.{index}"
+    settings.STATE_SNAPSHOT_REDIS_KEY = f"{settings.STATE_SNAPSHOT_REDIS_KEY}:{index}"
     asyncio.run(main())
+
+
+def run_workers(count: int):
+    """Run ``count`` sharded scan workers on this machine (one per core)."""
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_worker_process, args=(i,), name=f"scan-worker-{i}")
+        for i in range(count)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    settings.validate()
+    if settings.SCAN_SHARDING and settings.SCAN_WORKER_PROCESSES > 1:
+        run_workers(settings.SCAN_WORKER_PROCESSES)
+    else:
+        asyncio.run(main())
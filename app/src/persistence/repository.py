@@ -0,0 +1,387 @@
+import asyncio
+import copy
+from abc import ABC, abstractmethod
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+# Import legacy_cgi before boto3 to provide cgi module for Python 3.13+
+try:
+    import sys
+
+    import legacy_cgi  # noqa: F401
+
+    if "cgi" not in sys.modules:
+        sys.modules["cgi"] = legacy_cgi
+except ImportError:
+    pass  # Not needed for Python < 3.13
+
+from app.src.config.settings import settings
+from app.src.utils.clients import DYNAMODB, get_client
+
+
+@lru_cache(maxsize=1)
+def _codec():
+    """(TypeSerializer, TypeDeserializer); importing boto3 is deferred to first use."""
+    from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+    return TypeSerializer(), TypeDeserializer()
+
+
+class PersistenceUnavailableError(RuntimeError):
+    """Raised when the configured backend cannot be reached or is not configured."""
+
+
+class ConditionFailedError(RuntimeError):
+    """Raised when a conditional write finds the stored item in another state."""
+
+
+@dataclass(frozen=True)
+class WriteCondition:
+    """
+    What a conditional ``put_item``/``delete_item`` requires of the stored
+    item. ``exists``: True requires the item, False its absence, None either.
+    ``at_most``: (attribute, value) the stored attribute must not exceed; an
+    item without the attribute passes.
+    """
+
+    exists: Optional[bool] = None
+    at_most: Optional[tuple[str, Any]] = None
+
+
+def _to_dynamodb_compatible(value):
+    """
+    Recursively convert Python types into DynamoDB-compatible types.
+
+    In particular, convert all float instances into Decimal, including inside
+    nested dicts/lists, so that boto3's TypeSerializer accepts them.
+    """
+    if isinstance(value, float):
+        # Use string conversion to preserve precision expected by boto3
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {k: _to_dynamodb_compatible(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_to_dynamodb_compatible(v) for v in value]
+    # For other types (str, int, bool, None, Decimal, etc.) just return as-is
+    return value
+
+
+def _serialize(item: dict) -> dict:
+    serializer = _codec()[0]
+    return {
+        k: serializer.serialize(v) for k, v in _to_dynamodb_compatible(item).items()
+    }
+
+
+def _deserialize(item: dict) -> dict:
+    deserializer = _codec()[1]
+    return {k: deserializer.deserialize(v) for k, v in item.items()}
+
+
+@lru_cache(maxsize=1)
+def _get_executor() -> ThreadPoolExecutor:
+    """Dedicated, bounded pool so DynamoDB I/O never runs on the event-loop thread."""
+    return ThreadPoolExecutor(
+        max_workers=settings.DYNAMODB_MAX_WORKERS, thread_name_prefix="dynamodb"
+    )
+
+
+class TableRepository(ABC):
+    """
+    Async key-value access to a single table.
+
+    Keys and items are plain dicts. Implementations must never block the
+    event loop.
+    """
+
+    def __init__(self, table_name: str, key_attributes: tuple[str, ...]):
+        self.table_name = table_name
+        self.key_attributes = key_attributes
+
+    @abstractmethod
+    async def get_item(self, key: dict) -> Optional[dict]:
+        """Return the item stored under ``key``, or None."""
+
+    @abstractmethod
+    async def put_item(
+        self, item: dict, condition: Optional[WriteCondition] = None
+    ) -> None:
+        """Write ``item``; raises ConditionFailedError when ``condition`` fails."""
+
+    @abstractmethod
+    async def delete_item(
+        self, key: dict, condition: Optional[WriteCondition] = None
+    ) -> None:
+        """Delete the item; raises ConditionFailedError when ``condition`` fails."""
+
+    @abstractmethod
+    async def scan(self, filters: Optional[dict] = None) -> list[dict]:
+        """Return every item whose attributes equal all values in ``filters``."""
+
+    @abstractmethod
+    async def append_to_list(self, key: dict, attribute: str, values: list) -> None:
+        """Atomically append ``values`` to a list attribute, creating it if missing."""
+
+    @abstractmethod
+    async def append_and_add(
+        self, key: dict, attribute: str, values: list, increments: dict
+    ) -> None:
+        """
+        Atomically append ``values`` to a list attribute and add each of
+        ``increments`` to its numeric attribute, creating any that are missing.
+        """
+
+
+class DynamoTableRepository(TableRepository):
+    """DynamoDB-backed repository running the synchronous client on a bounded executor.
+
+    Set ``DYNAMODB_ENDPOINT_URL`` to point it at DynamoDB Local or a moto server.
+    """
+
+    async def _run(self, fn: Callable, *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), functools.partial(fn, *args))
+
+    def _client(self):
+        client = get_client(DYNAMODB)
+        if client is None:
+            raise PersistenceUnavailableError(
+                f"DynamoDB not available for table {self.table_name}"
+            )
+        return client
+
+    def _get_item_sync(self, key: dict) -> Optional[dict]:
+        response = self._client().get_item(
+            TableName=self.table_name, Key=_serialize(key)
+        )
+        item = response.get("Item")
+        return _deserialize(item) if item else None
+
+    def _condition_kwargs(self, condition: Optional[WriteCondition]) -> dict:
+        if condition is None:
+            return {}
+        names, values, clauses = {"#k": self.key_attributes[0]}, {}, []
+        if condition.exists is True:
+            clauses.append("attribute_exists(#k)")
+        elif condition.exists is False:
+            clauses.append("attribute_not_exists(#k)")
+        if condition.at_most is not None:
+            attr, value = condition.at_most
+            names["#c"] = attr
+            values[":c"] = _codec()[0].serialize(_to_dynamodb_compatible(value))
+            clauses.append("(attribute_not_exists(#c) OR #c <= :c)")
+        kwargs = {
+            "ConditionExpression": " AND ".join(clauses),
+            "ExpressionAttributeNames": names,
+        }
+        if values:
+            kwargs["ExpressionAttributeValues"] = values
+        return kwargs
+
+    def _conditional(self, fn: Callable, **kwargs) -> None:
+        from botocore.exceptions import ClientError
+
+        try:
+            fn(**kwargs)
+        except ClientError as exc:
+            code = exc.response.get("Error", {}).get("Code")
+            if code == "ConditionalCheckFailedException":
+                raise ConditionFailedError(
+                    f"Condition failed on {self.table_name}"
+                ) from exc
+            raise
+
+    def _put_item_sync(self, item: dict, condition: Optional[WriteCondition]) -> None:
+        self._conditional(
+            self._client().put_item,
+            TableName=self.table_name,
+            Item=_serialize(item),
+            **self._condition_kwargs(condition),
+        )
+
+    def _delete_item_sync(self, key: dict, condition: Optional[WriteCondition]) -> None:
+        self._conditional(
+            self._client().delete_item,
+            TableName=self.table_name,
+            Key=_serialize(key),
+            **self._condition_kwargs(condition),
+        )
+
+    def _scan_sync(self, filters: Optional[dict]) -> list[dict]:
+        client = self._client()
+        scan_kwargs: dict[str, Any] = {"TableName": self.table_name}
+        if filters:
+            names, values, clauses = {}, {}, []
+            for idx, (attr, value) in enumerate(filters.items()):
+                names[f"#f{idx}"] = attr
+                values[f":v{idx}"] = _codec()[0].serialize(
+                    _to_dynamodb_compatible(value)
+                )
+                clauses.append(f"#f{idx} = :v{idx}")
+            scan_kwargs["FilterExpression"] = " AND ".join(clauses)
+            scan_kwargs["ExpressionAttributeNames"] = names
+            scan_kwargs["ExpressionAttributeValues"] = values
+
+        items: list[dict] = []
+        while True:
+            response = client.scan(**scan_kwargs)
+            items.extend(_deserialize(item) for item in response.get("Items", []))
+            if "LastEvaluatedKey" not in response:
+                return items
+            scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def _append_to_list_sync(self, key: dict, attribute: str, values: list) -> None:
+        self._client().update_item(
+            TableName=self.table_name,
+            Key=_serialize(key),
+            UpdateExpression="SET #attr = list_append(if_not_exists(#attr, :empty_list), :entry)",
+            ExpressionAttributeNames={"#attr": attribute},
+            ExpressionAttributeValues={
+                ":entry": _codec()[0].serialize(_to_dynamodb_compatible(values)),
+                ":empty_list": {"L": []},
+            },
+        )
+
+    def _append_and_add_sync(
+        self, key: dict, attribute: str, values: list, increments: dict
+    ) -> None:
+        serializer = _codec()[0]
+        names = {"#attr": attribute}
+        expression_values = {
+            ":entry": serializer.serialize(_to_dynamodb_compatible(values)),
+            ":empty_list": {"L": []},
+        }
+        additions = []
+        for idx, (name, amount) in enumerate(increments.items()):
+            names[f"#n{idx}"] = name
+            expression_values[f":n{idx}"] = serializer.serialize(
+                _to_dynamodb_compatible(amount)
+            )
+            additions.append(f"#n{idx} :n{idx}")
+        expression = (
+            "SET #attr = list_append(if_not_exists(#attr, :empty_list), :entry)"
+        )
+        if additions:
+            expression += " ADD " + ", ".join(additions)
+        self._client().update_item(
+            TableName=self.table_name,
+            Key=_serialize(key),
+            UpdateExpression=expression,
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=expression_values,
+        )
+
+    async def get_item(self, key: dict) -> Optional[dict]:
+        return await self._run(self._get_item_sync, key)
+
+    async def put_item(
+        self, item: dict, condition: Optional[WriteCondition] = None
+    ) -> None:
+        await self._run(self._put_item_sync, item, condition)
+
+    async def delete_item(
+        self, key: dict, condition: Optional[WriteCondition] = None
+    ) -> None:
+        await self._run(self._delete_item_sync, key, condition)
+
+    async def scan(self, filters: Optional[dict] = None) -> list[dict]:
+        return await self._run(self._scan_sync, filters)
+
+    async def append_to_list(self, key: dict, attribute: str, values: list) -> None:
+        await self._run(self._append_to_list_sync, key, attribute, values)
+
+    async def append_and_add(
+        self, key: dict, attribute: str, values: list, increments: dict
+    ) -> None:
+        await self._run(self._append_and_add_sync, key, attribute, values, increments)
+
+
+class InMemoryTableRepository(TableRepository):
+    """Process-local repository for tests, backtests and credential-less local runs."""
+
+    def __init__(self, table_name: str, key_attributes: tuple[str, ...]):
+        super().__init__(table_name, key_attributes)
+        self.items: dict[tuple, dict] = {}
+
+    def _key(self, item: dict) -> tuple:
+        return tuple(item[attr] for attr in self.key_attributes)
+
+    async def get_item(self, key: dict) -> Optional[dict]:
+        item = self.items.get(self._key(key))
+        return copy.deepcopy(item) if item is not None else None
+
+    def _check(self, key: tuple, condition: Optional[WriteCondition]) -> None:
+        if condition is None:
+            return
+        stored = self.items.get(key)
+        if condition.exists is not None and condition.exists != (stored is not None):
+            raise ConditionFailedError(f"Condition failed on {self.table_name}")
+        if condition.at_most is not None and stored is not None:
+            attr, value = condition.at_most
+            if attr in stored and stored[attr] > value:
+                raise ConditionFailedError(f"Condition failed on {self.table_name}")
+
+    async def put_item(
+        self, item: dict, condition: Optional[WriteCondition] = None
+    ) -> None:
+        self._check(self._key(item), condition)
+        self.items[self._key(item)] = copy.deepcopy(item)
+
+    async def delete_item(
+        self, key: dict, condition: Optional[WriteCondition] = None
+    ) -> None:
+        self._check(self._key(key), condition)
+        self.items.pop(self._key(key), None)
+
+    async def scan(self, filters: Optional[dict] = None) -> list[dict]:
+        filters = filters or {}
+        return [
+            copy.deepcopy(item)
+            for item in self.items.values()
+            if all(item.get(attr) == value for attr, value in filters.items())
+        ]
+
+    async def append_to_list(self, key: dict, attribute: str, values: list) -> None:
+        item = self.items.setdefault(self._key(key), dict(key))
+        item.setdefault(attribute, []).extend(copy.deepcopy(values))
+
+    async def append_and_add(
+        self, key: dict, attribute: str, values: list, increments: dict
+    ) -> None:
+        item = self.items.setdefault(self._key(key), dict(key))
+        item.setdefault(attribute, []).extend(copy.deepcopy(values))
+        for name, amount in increments.items():
+            item[name] = item.get(name, 0) + amount
+
+
+TableFactory = Callable[[str, tuple[str, ...]], TableRepository]
+
+_BACKENDS: dict[str, TableFactory] = {
+    "dynamodb": DynamoTableRepository,
+    "memory": InMemoryTableRepository,
+}
+_table_factory: Optional[TableFactory] = None
+_tables: dict[str, TableRepository] = {}
+
+
+def set_table_factory(factory: Optional[TableFactory]) -> None:
+    """Swap the repository backend (e.g. in tests); ``None`` restores the configured one."""
+    global _table_factory
+    _table_factory = factory
+    _tables.clear()
+
+
+def get_table(table_name: str, key_attributes: tuple[str, ...]) -> TableRepository:
+    """Return the shared repository for ``table_name`` on the active backend."""
+    table = _tables.get(table_name)
+    if table is None:
+        factory = _table_factory or _BACKENDS.get(
+            settings.PERSISTENCE_BACKEND, DynamoTableRepository
+        )
+        table = factory(table_name, key_attributes)
+        _tables[table_name] = table
+    return table
@@ -1,7 +1,8 @@
+import asyncio
+import copy
 from datetime import datetime
-from decimal import Decimal
-from functools import lru_cache
 from typing import Optional
+from weakref import WeakKeyDictionary
 from zoneinfo import ZoneInfo
 
 # Import legacy_cgi before boto3 to provide cgi module for Python 3.13+
@@ -14,308 +15,389 @@ try:
 except ImportError:
     pass  # Not needed for Python < 3.13
 
-import boto3
 from botocore.exceptions import BotoCoreError, ClientError
 
 from app.src.config.settings import settings
+from app.src.persistence.repository import (
+    ConditionFailedError,
+    PersistenceUnavailableError,
+    TableRepository,
+    WriteCondition,
+    get_table,
+)
+from app.src.utils.helpers import measure_latency, now_ny
 from app.src.utils.logger import logger
 
 _OPEN_POSITIONS_TABLE = "AlgoTraderOpenPositions"
 _COMPLETED_TRADES_TABLE = "CompletedTradesForAlgoTrader"
 _INACTIVE_TICKERS_TABLE = "InactiveTickersForAlgoTrading"
 
+_PERSISTENCE_ERRORS = (ClientError, BotoCoreError, PersistenceUnavailableError)
+# A closed position's completed-trade write is retried with exponential backoff
+_COMPLETED_WRITE_ATTEMPTS = 3
+_COMPLETED_WRITE_BACKOFF_SECONDS = 0.5
+
 
 def _now_est() -> datetime:
-    """Return current time in US Eastern timezone."""
-    return datetime.now(ZoneInfo("America/New_York"))
+    """Return current time in US Eastern timezone (replayed time during a backtest)."""
+    return now_ny().astimezone(ZoneInfo("America/New_York"))
+
 
+def _open_positions_table() -> TableRepository:
+    return get_table(_OPEN_POSITIONS_TABLE, ("ticker", "indicator"))
 
-def _to_dynamodb_compatible(value):
+
+class PositionCache:
+    """
+    Open positions of one table, read through and written through. A key maps
+    to the position or to None (flat). An indicator in ``complete`` had all of
+    its open positions loaded at once, so a key missing for it means flat.
+    A key's version counts the changes to its cached entry.
     """
-    Recursively convert Python types into DynamoDB-compatible types.
 
-    In particular, convert all float instances into Decimal, including inside
-    nested dicts/lists, so that boto3's TypeSerializer accepts them.
+    def __init__(self):
+        self.positions: dict[tuple[str, str], Optional[dict]] = {}
+        self.complete: set[str] = set()
+        self.versions: dict[tuple[str, str], int] = {}
+
+    def changed(self, key: tuple[str, str]) -> None:
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    def lookup(self, ticker: str, indicator: str) -> tuple[bool, Optional[dict]]:
+        """(hit, position)."""
+        key = (ticker, indicator)
+        if key in self.positions:
+            return True, copy.deepcopy(self.positions[key])
+        return indicator in self.complete, None
+
+
+# One cache per table instance, so swapping the backend (tests, the benchmark)
+# starts empty
+_position_caches: "WeakKeyDictionary[TableRepository, PositionCache]" = (
+    WeakKeyDictionary()
+)
+
+
+def position_cache() -> Optional[PositionCache]:
+    """
+    The cache of the active open-positions table. It is None with sharded
+    scanning, where a ticker's lease (and so its writer) can move between workers.
     """
-    if isinstance(value, float):
-        # Use string conversion to preserve precision expected by boto3
-        return Decimal(str(value))
-    if isinstance(value, dict):
-        return {k: _to_dynamodb_compatible(v) for k, v in value.items()}
-    if isinstance(value, list):
-        return [_to_dynamodb_compatible(v) for v in value]
-    # For other types (str, int, bool, None, Decimal, etc.) just return as-is
-    return value
-
-
-@lru_cache(maxsize=1)
-def _get_dynamodb_resource():
-    if not settings.AWS_ACCESS_KEY_ID or not settings.AWS_SECRET_ACCESS_KEY:
-        logger.warning("AWS credentials not configured; DynamoDB operations will fail")
+    if settings.SCAN_SHARDING:
         return None
-    try:
-        return boto3.resource(
-            "dynamodb",
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_DEFAULT_REGION,
-        )
-    except Exception as exc:
-        logger.error(f"Unable to initialize DynamoDB resource: {exc}")
+    table = _open_positions_table()
+    cache = _position_caches.get(table)
+    if cache is None:
+        cache = _position_caches[table] = PositionCache()
+    return cache
+
+
+def position_version(ticker: str, indicator: Optional[str] = None) -> Optional[int]:
+    """Version of ``ticker``'s cached position; None without a position cache."""
+    cache = position_cache()
+    if cache is None:
         return None
+    return cache.versions.get((ticker, indicator or settings.INDICATOR_NAME), 0)
+
+
+def _format_position(item: dict) -> dict:
+    return {
+        "action": item.get("action"),
+        "entry_price": float(item.get("entry_price", 0)),
+        "reason": item.get("enter_reason"),
+        "timestamp": item.get("enter_timestamp"),
+    }
+
+
+def _cache_position(ticker: str, indicator: str, position: Optional[dict]) -> None:
+    cache = position_cache()
+    if cache is not None:
+        cache.positions[(ticker, indicator)] = position
+        cache.changed((ticker, indicator))
+
+
+def _forget_position(ticker: str, indicator: str) -> None:
+    """After a failed write the table's state is unknown; read it again next time."""
+    cache = position_cache()
+    if cache is not None:
+        cache.positions.pop((ticker, indicator), None)
+        cache.complete.discard(indicator)
+        cache.changed((ticker, indicator))
+
+
+def _completed_trades_table() -> TableRepository:
+    return get_table(_COMPLETED_TRADES_TABLE, ("date", "indicator"))
+
+
+def _inactive_tickers_table() -> TableRepository:
+    return get_table(_INACTIVE_TICKERS_TABLE, ("ticker", "indicator"))
+
+
+async def _record_completed_trade(
+    indicator: str, completed_trade: dict, profit_or_loss: float, is_long: bool
+) -> None:
+    """
+    Add a closed trade to the day's CompletedTradesForAlgoTrader item, retrying
+    failed writes. One atomic update, so concurrent closes on a day never lose
+    each other. A trade that still cannot be written is logged in full.
+    """
+    # Get current date for partition key (EST)
+    date_key = _now_est().date().isoformat()
+    for attempt in range(1, _COMPLETED_WRITE_ATTEMPTS + 1):
+        try:
+            await _completed_trades_table().append_and_add(
+                {
+                    "date": date_key,
+                    "indicator": indicator,
+                },
+                "completed_trades",
+                [completed_trade],
+                {
+                    "completed_trade_count": 1,
+                    "overall_profit_loss": profit_or_loss,
+                    "overall_profit_loss_long": profit_or_loss if is_long else 0.0,
+                    "overall_profit_loss_short": 0.0 if is_long else profit_or_loss,
+                },
+            )
+            return
+        except _PERSISTENCE_ERRORS as exc:
+            if attempt == _COMPLETED_WRITE_ATTEMPTS:
+                logger.error(
+                    f"Completed trade for {completed_trade['ticker']} NOT recorded "
+                    f"after {attempt} attempts: {exc} | {completed_trade}"
+                )
+                return
+            delay = _COMPLETED_WRITE_BACKOFF_SECONDS * 2 ** (attempt - 1)
+            logger.warning(
+                f"Recording completed trade for {completed_trade['ticker']} failed "
+                f"(attempt {attempt}): {exc}; retrying in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
 
 
 class PositionTracker:
     @staticmethod
-    def add_position(
+    @measure_latency
+    async def add_position(
         ticker: str,
         action: str,
         price: float,
         reason: str,
         indicator: Optional[str] = None,
-    ):
-        """Add a new open position to AlgoTraderOpenPositions table."""
+        fence: Optional[int] = None,
+    ) -> bool:
+        """
+        Add a new open position to AlgoTraderOpenPositions table. The write
+        only creates: it returns False, writing nothing, when the position is
+        already open (e.g. opened by another shard worker) or the table cannot
+        be reached. ``fence`` is the writer's lease token, stored for
+        ``close_position`` to check.
+        """
         if indicator is None:
             indicator = settings.INDICATOR_NAME
 
-        dynamodb = _get_dynamodb_resource()
-        if dynamodb is None:
-            logger.error("Cannot add position: DynamoDB not available")
-            return
-
-        table = dynamodb.Table(_OPEN_POSITIONS_TABLE)
         entry_timestamp = _now_est().isoformat()
+        item = {
+            "ticker": ticker,
+            "indicator": indicator,
+            "action": action,
+            "entry_price": str(price),
+            "enter_reason": reason,
+            "enter_timestamp": entry_timestamp,
+        }
+        if fence is not None:
+            item["fence"] = fence
 
         try:
-            table.put_item(
-                Item={
-                    "ticker": ticker,
-                    "indicator": indicator,
-                    "action": action,
-                    "entry_price": str(price),
-                    "enter_reason": reason,
-                    "enter_timestamp": entry_timestamp,
-                }
-            )
+            await _open_positions_table().put_item(item, WriteCondition(exists=False))
+            _cache_position(ticker, indicator, _format_position(item))
             logger.info(f"POSITION ADDED: {ticker} {action} @ ${price:.2f} | {reason}")
-        except (ClientError, BotoCoreError) as exc:
+        except ConditionFailedError:
+            _forget_position(ticker, indicator)
+            logger.warning(f"{ticker}: position already open, not opening it again")
+            return False
+        except _PERSISTENCE_ERRORS as exc:
+            _forget_position(ticker, indicator)
             logger.error(f"DynamoDB write failed for position {ticker}: {exc}")
+            return False
+        return True
 
     @staticmethod
-    def get_position(ticker: str, indicator: Optional[str] = None) -> dict | None:
+    @measure_latency
+    async def get_position(ticker: str, indicator: Optional[str] = None) -> dict | None:
         """Get an open position from AlgoTraderOpenPositions table."""
         if indicator is None:
             indicator = settings.INDICATOR_NAME
 
-        dynamodb = _get_dynamodb_resource()
-        if dynamodb is None:
-            logger.error("Cannot get position: DynamoDB not available")
-            return None
-
-        table = dynamodb.Table(_OPEN_POSITIONS_TABLE)
+        cache = position_cache()
+        if cache is not None:
+            hit, position = cache.lookup(ticker, indicator)
+            if hit:
+                return position
 
         try:
-            response = table.get_item(
-                Key={
+            item = await _open_positions_table().get_item(
+                {
                     "ticker": ticker,
                     "indicator": indicator,
                 }
             )
-            if "Item" in response:
-                item = response["Item"]
-                return {
-                    "action": item.get("action"),
-                    "entry_price": float(item.get("entry_price", 0)),
-                    "reason": item.get("enter_reason"),
-                    "timestamp": item.get("enter_timestamp"),
-                }
-            return None
-        except (ClientError, BotoCoreError) as exc:
+            position = _format_position(item) if item is not None else None
+            _cache_position(ticker, indicator, copy.deepcopy(position))
+            return position
+        except _PERSISTENCE_ERRORS as exc:
             logger.error(f"DynamoDB read failed for position {ticker}: {exc}")
             return None
 
     @staticmethod
-    def close_position(
+    @measure_latency
+    async def close_position(
         ticker: str,
         exit_action: str,
         exit_price: float,
         reason: str,
         indicator: Optional[str] = None,
-    ):
-        """Close a position by moving it from AlgoTraderOpenPositions to CompletedTradesForAlgoTrader."""
+        fence: Optional[int] = None,
+    ) -> bool:
+        """
+        Close a position by moving it from AlgoTraderOpenPositions to
+        CompletedTradesForAlgoTrader. The open item is deleted first, on
+        condition that it still exists and was not written under a newer lease
+        than ``fence``; returns False when that fails (another writer closed
+        it, or took the ticker over) or the table cannot be reached, recording
+        nothing.
+        """
         if indicator is None:
             indicator = settings.INDICATOR_NAME
 
-        dynamodb = _get_dynamodb_resource()
-        if dynamodb is None:
-            logger.error("Cannot close position: DynamoDB not available")
-            return
-
-        open_table = dynamodb.Table(_OPEN_POSITIONS_TABLE)
-        completed_table = dynamodb.Table(_COMPLETED_TRADES_TABLE)
+        open_table = _open_positions_table()
+        key = {
+            "ticker": ticker,
+            "indicator": indicator,
+        }
 
         try:
             # Get the open position
-            response = open_table.get_item(
-                Key={
-                    "ticker": ticker,
-                    "indicator": indicator,
-                }
-            )
-
-            if "Item" not in response:
-                logger.info(f"No open position for {ticker} with indicator {indicator}")
-                return
-
-            item = response["Item"]
-            entry_price = float(item.get("entry_price", 0))
-            entry_action = item.get("action", "")
-
-            # Calculate profit/loss
-            if "buy_to_open" in entry_action:
-                profit_or_loss = exit_price - entry_price
-                pnl_pct = ((exit_price - entry_price) / entry_price) * 100
-            else:
-                profit_or_loss = entry_price - exit_price
-                pnl_pct = ((entry_price - exit_price) / entry_price) * 100
-
-            # Build completed trade entry
-            exit_timestamp = _now_est().isoformat()
-            completed_trade = {
-                "ticker": ticker,
-                "action": entry_action,
-                "entry_price": str(entry_price),
-                "enter_reason": item.get("enter_reason", ""),
-                "enter_timestamp": item.get("enter_timestamp", ""),
-                "exit_price": str(exit_price),
-                "exit_timestamp": exit_timestamp,
-                "exit_reason": reason,
-                "profit_or_loss": str(profit_or_loss),
-            }
-
-            # Get current date for partition key (EST)
-            date_key = _now_est().date().isoformat()
-
-            # Get existing completed trades data
-            try:
-                completed_response = completed_table.get_item(
-                    Key={
-                        "date": date_key,
-                        "indicator": indicator,
-                    }
-                )
-                if "Item" in completed_response:
-                    existing_item = completed_response["Item"]
-                    completed_trades = existing_item.get("completed_trades", [])
-                    completed_trade_count = existing_item.get(
-                        "completed_trade_count", 0
-                    )
-                    overall_profit_loss = float(
-                        existing_item.get("overall_profit_loss", "0")
-                    )
-                    overall_profit_loss_long = float(
-                        existing_item.get("overall_profit_loss_long", "0")
-                    )
-                    overall_profit_loss_short = float(
-                        existing_item.get("overall_profit_loss_short", "0")
-                    )
-                else:
-                    completed_trades = []
-                    completed_trade_count = 0
-                    overall_profit_loss = 0.0
-                    overall_profit_loss_long = 0.0
-                    overall_profit_loss_short = 0.0
-            except (ClientError, BotoCoreError) as exc:
-                logger.warning(f"Failed to get existing completed trades: {exc}")
-                completed_trades = []
-                completed_trade_count = 0
-                overall_profit_loss = 0.0
-                overall_profit_loss_long = 0.0
-                overall_profit_loss_short = 0.0
-
-            # Update completed trades
-            completed_trades.append(completed_trade)
-            completed_trade_count += 1
-            overall_profit_loss += profit_or_loss
-
-            if "buy_to_open" in entry_action:
-                overall_profit_loss_long += profit_or_loss
-            else:
-                overall_profit_loss_short += profit_or_loss
-
-            # Write to completed trades table
-            completed_table.put_item(
-                Item={
-                    "date": date_key,
-                    "indicator": indicator,
-                    "completed_trades": completed_trades,
-                    "completed_trade_count": completed_trade_count,
-                    "overall_profit_loss": str(overall_profit_loss),
-                    "overall_profit_loss_long": str(overall_profit_loss_long),
-                    "overall_profit_loss_short": str(overall_profit_loss_short),
-                }
-            )
+            item = await open_table.get_item(key)
+        except _PERSISTENCE_ERRORS as exc:
+            _forget_position(ticker, indicator)
+            logger.error(f"DynamoDB read failed for position {ticker}: {exc}")
+            return False
 
-            # Delete from open positions table
-            open_table.delete_item(
-                Key={
-                    "ticker": ticker,
-                    "indicator": indicator,
-                }
-            )
+        if item is None:
+            _cache_position(ticker, indicator, None)
+            logger.info(f"No open position for {ticker} with indicator {indicator}")
+            return False
 
-            logger.info(
-                f"POSITION CLOSED: {ticker} {exit_action} @ ${exit_price:.2f} | PnL: {pnl_pct:+.2f}% | {reason}"
+        # Claim the close before recording it, so only one writer records it
+        try:
+            await open_table.delete_item(
+                key,
+                WriteCondition(
+                    exists=True,
+                    at_most=None if fence is None else ("fence", fence),
+                ),
             )
-        except (ClientError, BotoCoreError) as exc:
+        except ConditionFailedError:
+            _forget_position(ticker, indicator)
+            logger.warning(f"{ticker}: position closed or taken over by another writer")
+            return False
+        except _PERSISTENCE_ERRORS as exc:
+            _forget_position(ticker, indicator)
             logger.error(f"DynamoDB close position failed for {ticker}: {exc}")
+            return False
+        _cache_position(ticker, indicator, None)
+
+        entry_price = float(item.get("entry_price", 0))
+        entry_action = item.get("action", "")
+
+        # Calculate profit/loss
+        if "buy_to_open" in entry_action:
+            profit_or_loss = exit_price - entry_price
+            pnl_pct = ((exit_price - entry_price) / entry_price) * 100
+        else:
+            profit_or_loss = entry_price - exit_price
+            pnl_pct = ((entry_price - exit_price) / entry_price) * 100
+
+        # Build completed trade entry
+        exit_timestamp = _now_est().isoformat()
+        completed_trade = {
+            "ticker": ticker,
+            "action": entry_action,
+            "entry_price": str(entry_price),
+            "enter_reason": item.get("enter_reason", ""),
+            "enter_timestamp": item.get("enter_timestamp", ""),
+            "exit_price": str(exit_price),
+            "exit_timestamp": exit_timestamp,
+            "exit_reason": reason,
+            "profit_or_loss": str(profit_or_loss),
+        }
+
+        # The position is closed from here on, even if recording it fails
+        await _record_completed_trade(
+            indicator, completed_trade, profit_or_loss, "buy_to_open" in entry_action
+        )
+
+        logger.info(
+            f"POSITION CLOSED: {ticker} {exit_action} @ ${exit_price:.2f} | PnL: {pnl_pct:+.2f}% | {reason}"
+        )
+        return True
 
     @staticmethod
-    def get_open_positions(indicator: Optional[str] = None) -> list[str]:
+    async def get_open_positions(indicator: Optional[str] = None) -> list[str]:
         """Get list of tickers with open positions."""
         if indicator is None:
             indicator = settings.INDICATOR_NAME
-
-        dynamodb = _get_dynamodb_resource()
-        if dynamodb is None:
-            logger.error("Cannot get open positions: DynamoDB not available")
-            return []
-
-        table = dynamodb.Table(_OPEN_POSITIONS_TABLE)
-        tickers = []
+        cache = position_cache()
+        if cache is not None and indicator in cache.complete:
+            return [
+                ticker
+                for (ticker, key_indicator), position in cache.positions.items()
+                if key_indicator == indicator and position is not None
+            ]
 
         try:
             # Scan table for all positions with the given indicator
             # Note: In production, consider using GSI if needed for better performance
-            response = table.scan(
-                FilterExpression="indicator = :ind",
-                ExpressionAttributeValues={":ind": indicator},
-            )
-
-            for item in response.get("Items", []):
-                tickers.append(item.get("ticker"))
-
-            # Handle pagination
-            while "LastEvaluatedKey" in response:
-                response = table.scan(
-                    FilterExpression="indicator = :ind",
-                    ExpressionAttributeValues={":ind": indicator},
-                    ExclusiveStartKey=response["LastEvaluatedKey"],
-                )
-                for item in response.get("Items", []):
-                    tickers.append(item.get("ticker"))
-
-            return tickers
-        except (ClientError, BotoCoreError) as exc:
+            items = await _open_positions_table().scan({"indicator": indicator})
+            return [item.get("ticker") for item in items]
+        except _PERSISTENCE_ERRORS as exc:
             logger.error(f"DynamoDB scan failed for open positions: {exc}")
             return []
 
+    @staticmethod
+    async def load_positions(indicator: Optional[str] = None) -> bool:
+        """
+        Replace the cached positions of ``indicator`` with one scan of the
+        table. Afterwards a ticker without a cached position is known to be
+        flat. Returns False, leaving the cache as it was, when the scan failed.
+        """
+        if indicator is None:
+            indicator = settings.INDICATOR_NAME
+        cache = position_cache()
+        if cache is None:
+            return False
+        try:
+            items = await _open_positions_table().scan({"indicator": indicator})
+        except _PERSISTENCE_ERRORS as exc:
+            logger.error(f"DynamoDB scan failed for open positions: {exc}")
+            return False
+        for key in [key for key in cache.positions if key[1] == indicator]:
+            del cache.positions[key]
+            cache.changed(key)
+        for item in items:
+            cache.positions[(item["ticker"], indicator)] = _format_position(item)
+            cache.changed((item["ticker"], indicator))
+        cache.complete.add(indicator)
+        return True
+
 
 class InactiveTickerTracker:
     """Track tickers that didn't enter trades with reasons and indicator values."""
 
     @staticmethod
-    def log_inactive_ticker(
+    @measure_latency
+    async def log_inactive_ticker(
         ticker: str,
         reason_not_to_enter_long: str = "",
         reason_not_to_enter_short: str = "",
@@ -335,21 +417,14 @@ class InactiveTickerTracker:
         if indicator is None:
             indicator = settings.INDICATOR_NAME
 
-        dynamodb = _get_dynamodb_resource()
-        if dynamodb is None:
-            logger.debug("Cannot log inactive ticker: DynamoDB not available")
-            return
-
-        table = dynamodb.Table(_INACTIVE_TICKERS_TABLE)
         last_updated = _now_est().isoformat()
 
         # Prepare indicators_values as a dict (DynamoDB supports maps)
-        raw_indicators_dict = indicators_values if indicators_values is not None else {}
-        indicators_dict = _to_dynamodb_compatible(raw_indicators_dict)
+        indicators_dict = indicators_values if indicators_values is not None else {}
 
         try:
-            table.put_item(
-                Item={
+            await _inactive_tickers_table().put_item(
+                {
                     "ticker": ticker,
                     "indicator": indicator,
                     "last_updated": last_updated,
@@ -359,11 +434,13 @@ class InactiveTickerTracker:
                 }
             )
             logger.debug(f"Logged inactive ticker {ticker} with indicator {indicator}")
+        except PersistenceUnavailableError:
+            logger.debug("Cannot log inactive ticker: DynamoDB not available")
         except (ClientError, BotoCoreError) as exc:
             logger.warning(f"DynamoDB write failed for inactive ticker {ticker}: {exc}")
 
     @staticmethod
-    def get_inactive_ticker(
+    async def get_inactive_ticker(
         ticker: str, indicator: Optional[str] = None
     ) -> dict | None:
         """
@@ -375,22 +452,14 @@ class InactiveTickerTracker:
         if indicator is None:
             indicator = settings.INDICATOR_NAME
 
-        dynamodb = _get_dynamodb_resource()
-        if dynamodb is None:
-            logger.debug("Cannot get inactive ticker: DynamoDB not available")
-            return None
-
-        table = dynamodb.Table(_INACTIVE_TICKERS_TABLE)
-
         try:
-            response = table.get_item(
-                Key={
+            item = await _inactive_tickers_table().get_item(
+                {
                     "ticker": ticker,
                     "indicator": indicator,
                 }
             )
-            if "Item" in response:
-                item = response["Item"]
+            if item is not None:
                 return {
                     "last_updated": item.get("last_updated"),
                     "reason_not_to_enter_long": item.get("reason_not_to_enter_long", ""),
@@ -398,6 +467,9 @@ class InactiveTickerTracker:
                     "indicators_values": item.get("indicators_values", {}),
                 }
             return None
+        except PersistenceUnavailableError:
+            logger.debug("Cannot get inactive ticker: DynamoDB not available")
+            return None
         except (ClientError, BotoCoreError) as exc:
             logger.warning(f"DynamoDB read failed for inactive ticker {ticker}: {exc}")
             return None
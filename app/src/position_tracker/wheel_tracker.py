@@ -1,13 +1,13 @@
 import json
 from datetime import datetime
 
-from redis import Redis
-
-from app.src.config.settings import settings
+from app.src.utils.clients import REDIS, get_client
 from app.src.utils.logger import logger
 
-# Connect to Heroku Redis (or local)
-redis_client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+def _redis():
+    """Heroku Redis (or local), connected on first use."""
+    return get_client(REDIS)
 
 
 class WheelTracker:
@@ -20,8 +20,8 @@ class WheelTracker:
         """Save sold put to Redis (persists forever)"""
         key = WheelTracker._key(ticker, "put")
         data = {**put_data, "sold_at": datetime.utcnow().isoformat(), "ticker": ticker}
-        redis_client.hset(key, mapping=data)
-        redis_client.expire(key, 60 * 60 * 24 * 90)  # 90 days
+        _redis().hset(key, mapping=data)
+        _redis().expire(key, 60 * 60 * 24 * 90)  # 90 days
         logger.success(
             f"WHEEL PUT SOLD → {ticker} {put_data['strike']} | Credit ${put_data['premium']:.2f}"
         )
@@ -31,26 +31,26 @@ class WheelTracker:
         """Save sold covered call"""
         key = WheelTracker._key(ticker, "call")
         data = {**call_data, "sold_at": datetime.utcnow().isoformat(), "ticker": ticker}
-        redis_client.hset(key, mapping=data)
-        redis_client.expire(key, 60 * 60 * 24 * 90)
+        _redis().hset(key, mapping=data)
+        _redis().expire(key, 60 * 60 * 24 * 90)
         logger.success(f"WHEEL CALL SOLD → {ticker} {call_data['strike']}")
 
     @staticmethod
     def record_assignment(ticker: str):
         """Remove put when assigned"""
         key = WheelTracker._key(ticker, "put")
-        if redis_client.exists(key):
-            redis_client.delete(key)
+        if _redis().exists(key):
+            _redis().delete(key)
             logger.warning(f"WHEEL ASSIGNMENT → {ticker} (put removed)")
 
     @staticmethod
     def get_open_puts() -> dict:
         """Return all active sold puts"""
-        keys = redis_client.keys("wheel:put:*")
+        keys = _redis().keys("wheel:put:*")
         puts = {}
         for key in keys:
             ticker = key.split(":")[-1]
-            data = redis_client.hgetall(key)
+            data = _redis().hgetall(key)
             if data:
                 puts[ticker] = data
         return puts
@@ -58,11 +58,11 @@ class WheelTracker:
     @staticmethod
     def get_open_calls() -> dict:
         """Return all active covered calls"""
-        keys = redis_client.keys("wheel:call:*")
+        keys = _redis().keys("wheel:call:*")
         calls = {}
         for key in keys:
             ticker = key.split(":")[-1]
-            data = redis_client.hgetall(key)
+            data = _redis().hgetall(key)
             if data:
                 calls[ticker] = data
         return calls
@@ -70,5 +70,5 @@ class WheelTracker:
     @staticmethod
     def clear_all():
         """Emergency cleanup (use carefully)"""
-        redis_client.delete(*redis_client.keys("wheel:*"))
+        _redis().delete(*_redis().keys("wheel:*"))
         logger.info("WHEEL TRACKER: All records cleared")
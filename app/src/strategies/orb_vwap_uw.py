@@ -1,39 +1,105 @@
+import asyncio
 from datetime import time
 
+import numpy as np
+import pandas as pd
+
 from app.src.config.settings import settings
+from app.src.core.sharding import in_flight, lease_token, owns_ticker
 from app.src.core.signaler import send_signal
+from app.src.data.bar_store import as_bar_store, float64_column
 from app.src.data.unusual_whales import (
     get_congress_trades,
     get_dark_pool,
     get_flow_signal,
     get_iv_rank,
     get_screener_tickers,
+    signal_versions,
 )
 from app.src.indicators.technical import (
-    calculate_rvol,
-    calculate_vwap,
-    get_opening_range,
-    is_downtrend,
-    is_uptrend,
+    DAILY_COLUMNS,
+    INTRADAY_COLUMNS,
+    indicator_snapshot,
 )
 from app.src.position_tracker.dynamodb_tracker import (
     InactiveTickerTracker,
     PositionTracker,
+    position_version,
 )
 from app.src.utils.helpers import get_dynamic_min_rvol, now_ny
+from app.src.utils.decision_log import NO_TRADE, decision_log
 from app.src.utils.logger import logger
+from app.src.utils.tracing import span
 
 WATCHLIST = settings.WATCHLIST.copy()
 
 
-async def refresh_watchlist(session):
+async def refresh_watchlist():
     """New: Daily refresh with screener."""
-    tickers = await get_screener_tickers(session)
+    tickers = await get_screener_tickers()
     WATCHLIST.clear()
     WATCHLIST.extend(tickers)
     logger.info(f"Watchlist refreshed: {len(WATCHLIST)} tickers")
 
 
+def _signal_key(ticker: str, action: str, bar_time) -> str:
+    """Same ticker, action and bar always yield the same key, so a re-sent signal is deduplicated."""
+    return f"{settings.INDICATOR_NAME}:{ticker}:{action}:{bar_time.isoformat()}"
+
+
+async def _open_position(ticker: str, action: str, price: float, reason: str, bar_time):
+    """
+    Record the position and emit its signal; callers shield this so a scan
+    deadline never splits the pair. The signal goes out only if this worker's
+    write created the position, so a ticker handed between shard workers
+    opens once.
+    """
+    async with in_flight(ticker):
+        if not await owns_ticker(ticker):
+            logger.warning(f"{ticker}: lease lost before {action}, leaving it to the new owner")
+            return
+        if not await PositionTracker.add_position(
+            ticker, action, price, reason, fence=lease_token(ticker)
+        ):
+            return
+        decision_log.record(ticker, action, reason=reason, price=price)
+        await send_signal(
+            ticker,
+            action,
+            reason,
+            price,
+            indicator=settings.INDICATOR_NAME,
+            idempotency_key=_signal_key(ticker, action, bar_time),
+        )
+
+
+async def _close_position(
+    ticker: str, action: str, price: float, reason: str, bar_time
+) -> bool:
+    """
+    As ``_open_position``: the signal follows only this worker's close.
+    Returns whether this call closed the position.
+    """
+    async with in_flight(ticker):
+        if not await owns_ticker(ticker):
+            logger.warning(f"{ticker}: lease lost before {action}, leaving it to the new owner")
+            return False
+        if not await PositionTracker.close_position(
+            ticker, action, price, reason, fence=lease_token(ticker)
+        ):
+            return False
+        decision_log.record(ticker, action, reason=reason, price=price)
+        await send_signal(
+            ticker,
+            action,
+            reason,
+            price,
+            indicator=settings.INDICATOR_NAME,
+            idempotency_key=_signal_key(ticker, action, bar_time),
+        )
+        return True
+
+
 def _normalize_signal(value) -> str:
     if value is None:
         return ""
@@ -50,60 +116,239 @@ def _safe_float(value) -> float:
         return 0.0
 
 
-def _log_skip(ticker: str, reason: str, **context):
-    extra = ""
-    if context:
-        kv = ", ".join(f"{k}={v}" for k, v in context.items())
-        extra = f" | {kv}"
-    logger.debug(f"NO TRADE {ticker}: {reason}{extra}")
+def _format_context(context: dict) -> str:
+    if not context:
+        return ""
+    return " | " + ", ".join(f"{k}={v}" for k, v in context.items())
+
+
+def _log_skip(ticker: str, code: str, reason: str, **context):
+    """
+    NO TRADE: a decision record, plus a debug line formatted only when DEBUG is
+    enabled. A ticker repeating the same code is sampled (see decision_log).
+    """
+    evaluation_memo.note(ticker, code, reason)
+    if decision_log.record(ticker, NO_TRADE, code, reason=reason, **context):
+        logger.opt(lazy=True).debug(
+            "NO TRADE {}: {}{}",
+            lambda: ticker,
+            lambda: reason,
+            lambda: _format_context(context),
+        )
 
 
-async def evaluate_ticker(ticker: str, df_1m, df_daily, session):
-    try:
-        if ticker not in df_1m.index.get_level_values(0):
-            reason = "No intraday data returned"
-            _log_skip(ticker, reason)
-            InactiveTickerTracker.log_inactive_ticker(
-                ticker=ticker,
-                reason_not_to_enter_long=reason,
-                reason_not_to_enter_short=reason,
-                indicators_values={"error": reason},
-            )
+class EvaluationMemo:
+    """
+    Per ticker, a fingerprint of what its last evaluation depended on, and the
+    NO TRADE it ended in. The fingerprint holds the indicator snapshot (last
+    bar, price and everything derived from the bars), the versions of the
+    cached UW signals, the position's version and the current values of the
+    time-of-day rules. It is taken after the evaluation, so it includes the
+    signals that evaluation fetched and any position it opened or closed. A
+    cached signal that expires, or has a new value, changes it, and so does a
+    new or revised bar. Without versions (replayed signals, no position cache)
+    there is no fingerprint and every evaluation runs.
+    """
+
+    def __init__(self):
+        self.fingerprints: dict[str, tuple] = {}
+        self.decisions: dict[str, tuple[str, str]] = {}
+        self.reused = 0
+        self._pending: set[str] = set()
+
+    @staticmethod
+    def fingerprint(ticker: str, snapshot: dict) -> tuple | None:
+        if not settings.SCAN_SKIP_UNCHANGED:
+            return None
+        signals = signal_versions(ticker)
+        position = position_version(ticker)
+        if signals is None or position is None:
+            return None
+        now = now_ny().time()
+        rules = (
+            now <= time.fromisoformat(settings.ORB_PHASE_END),
+            now >= time.fromisoformat(settings.TRADING_END),
+            get_dynamic_min_rvol(),
+        )
+        return tuple(sorted(snapshot.items())), signals, position, rules
+
+    def reuse(self, ticker: str, snapshot: dict) -> bool:
+        """True, re-recording its NO TRADE, when the ticker's inputs are unchanged."""
+        previous = self.fingerprints.get(ticker)
+        if previous is None or previous != self.fingerprint(ticker, snapshot):
+            return False
+        decision = self.decisions.get(ticker)
+        if decision is not None:
+            decision_log.record(ticker, NO_TRADE, decision[0], reason=decision[1])
+        self.reused += 1
+        return True
+
+    def begin(self, ticker: str) -> None:
+        self.fingerprints.pop(ticker, None)
+        self.decisions.pop(ticker, None)
+        self._pending.add(ticker)
+
+    def note(self, ticker: str, code: str, reason: str) -> None:
+        if ticker in self._pending:
+            self.decisions[ticker] = (code, reason)
+
+    def fail(self, ticker: str) -> None:
+        self._pending.discard(ticker)
+
+    def store(self, ticker: str, snapshot: dict) -> None:
+        """Fingerprint a completed evaluation (one that raised is not kept)."""
+        if ticker not in self._pending:
             return
-        df_1m_t = df_1m.xs(ticker, level=0)
-        df_daily_t = (
-            df_daily.xs(ticker, level=0)
-            if ticker in df_daily.index.get_level_values(0)
-            else None
+        self._pending.discard(ticker)
+        fingerprint = self.fingerprint(ticker, snapshot)
+        if fingerprint is not None:
+            self.fingerprints[ticker] = fingerprint
+
+    def clear(self) -> None:
+        self.fingerprints.clear()
+        self.decisions.clear()
+        self._pending.clear()
+        self.reused = 0
+
+
+evaluation_memo = EvaluationMemo()
+
+
+def exit_signal(
+    position: dict, price: float, flow: str, current_time: time
+) -> tuple[str, str] | None:
+    """(exit action, reason) when ``position`` should close at ``price``; None to hold."""
+    entry_action = position["action"]
+    entry_price = position["entry_price"]
+    pnl_pct = (
+        ((price - entry_price) / entry_price) * 100
+        if "buy_to_open" in entry_action
+        else ((entry_price - price) / entry_price) * 100
+    )
+    if (
+        (pnl_pct >= 2.0 and "buy_to_open" in entry_action and flow == "bearish")
+        or (pnl_pct <= -2.0 and "sell_to_open" in entry_action and flow == "bullish")
+        or current_time >= time.fromisoformat(settings.TRADING_END)
+    ):
+        exit_action = (
+            "sell_to_close" if "buy_to_open" in entry_action else "buy_to_close"
         )
-        if df_daily_t is None or df_daily_t.empty or len(df_daily_t) < 200:
-            reason = f"Insufficient daily history (bars: {len(df_daily_t) if df_daily_t is not None else 0})"
-            _log_skip(ticker, reason)
-            InactiveTickerTracker.log_inactive_ticker(
+        return exit_action, f"Target Hit + Flow Exit | PnL: {pnl_pct:+.2f}%"
+    return None
+
+
+# One close at a time per ticker, between the scan and the exit monitor;
+# a ticker's lock is dropped once its position is flat
+_exit_locks: dict[str, asyncio.Lock] = {}
+
+
+async def evaluate_exit(ticker: str, position: dict, price: float, bar_time) -> bool:
+    """
+    Apply the exit rule to an open ``position`` at ``price``, closing it when
+    the rule fires. Returns True when this call closed it.
+    """
+    flow = _normalize_signal(await get_flow_signal(ticker))
+    signal = exit_signal(position, price, flow, now_ny().time())
+    if signal is None:
+        return False
+    exit_action, reason = signal
+    lock = _exit_locks.setdefault(ticker, asyncio.Lock())
+    async with lock:
+        # The other caller may have closed it while this one waited
+        flat = await PositionTracker.get_position(ticker) is None
+        closed = False
+        if not flat:
+            # Shielded so a scan deadline cannot cancel between signal and close
+            closed = await asyncio.shield(
+                _close_position(ticker, exit_action, price, reason, bar_time)
+            )
+    if (flat or closed) and _exit_locks.get(ticker) is lock:
+        del _exit_locks[ticker]
+    return closed
+
+
+def _snapshot_from_frames(ticker: str, bars_1m, bars_daily) -> dict:
+    """Compute the indicator snapshot on the loop thread (no precomputed batch)."""
+    with span("bar_slice"):
+        intraday = _float64_arrays(bars_1m.symbol_arrays(ticker, INTRADAY_COLUMNS))
+        daily = _float64_arrays(bars_daily.symbol_arrays(ticker, DAILY_COLUMNS))
+    with span("indicators"):
+        return indicator_snapshot(intraday, daily, now_ny().date(), settings.ORB_MINUTES)
+
+
+def _float64_arrays(arrays: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    return {
+        name: values if name == "timestamp" else float64_column(values)
+        for name, values in arrays.items()
+    }
+
+
+async def evaluate_ticker(ticker: str, df_1m, df_daily, snapshot: dict | None = None):
+    """
+    Entry/exit decision for one ticker. ``snapshot`` holds the indicators
+    precomputed by the scanner's compute executor (or the backtest); without it
+    they are computed here from the bars (``BarStore``s, or frames).
+
+    While nothing the decision depends on has changed since the ticker's last
+    evaluation, that decision is reused instead (see ``EvaluationMemo``).
+    """
+    try:
+        if snapshot is None:
+            df_1m, df_daily = as_bar_store(df_1m), as_bar_store(df_daily)
+            if ticker not in df_1m:
+                reason = "No intraday data returned"
+                _log_skip(ticker, "no_intraday", reason)
+                await InactiveTickerTracker.log_inactive_ticker(
+                    ticker=ticker,
+                    reason_not_to_enter_long=reason,
+                    reason_not_to_enter_short=reason,
+                    indicators_values={"error": reason},
+                )
+                return
+            snapshot = _snapshot_from_frames(ticker, df_1m, df_daily)
+    except Exception:
+        logger.exception(f"Strategy error {ticker}")
+        return
+    if evaluation_memo.reuse(ticker, snapshot):
+        return
+    evaluation_memo.begin(ticker)
+    await _decide(ticker, snapshot)
+    evaluation_memo.store(ticker, snapshot)
+
+
+async def _decide(ticker: str, snapshot: dict):
+    """The entry and exit rules on one ticker's indicator snapshot."""
+    try:
+        daily_bars = snapshot["daily_bars"]
+        if daily_bars < 200:
+            reason = f"Insufficient daily history (bars: {daily_bars})"
+            _log_skip(ticker, "daily_history", reason, daily_bars=daily_bars)
+            await InactiveTickerTracker.log_inactive_ticker(
                 ticker=ticker,
                 reason_not_to_enter_long=reason,
                 reason_not_to_enter_short=reason,
-                indicators_values={"daily_bars": len(df_daily_t) if df_daily_t is not None else 0},
+                indicators_values={"daily_bars": daily_bars},
             )
             return
 
-        today_df = df_1m_t[df_1m_t.index.date == now_ny().date()]
-        if len(today_df) < 10:
-            reason = f"Not enough intraday bars for today (bars: {len(today_df)})"
-            _log_skip(ticker, reason)
-            InactiveTickerTracker.log_inactive_ticker(
+        today_bars = snapshot["today_bars"]
+        if today_bars < 10:
+            reason = f"Not enough intraday bars for today (bars: {today_bars})"
+            _log_skip(ticker, "today_bars", reason, today_bars=today_bars)
+            await InactiveTickerTracker.log_inactive_ticker(
                 ticker=ticker,
                 reason_not_to_enter_long=reason,
                 reason_not_to_enter_short=reason,
-                indicators_values={"today_bars": len(today_df)},
+                indicators_values={"today_bars": today_bars},
             )
             return
 
-        price = today_df["close"].iloc[-1]
+        price = snapshot["price"]
+        bar_time = pd.Timestamp(snapshot["bar_time"], tz="UTC")
         if price < settings.MIN_PRICE:
             reason = f"Price ({price:.2f}) below MIN_PRICE ({settings.MIN_PRICE})"
-            _log_skip(ticker, reason)
-            InactiveTickerTracker.log_inactive_ticker(
+            _log_skip(ticker, "min_price", reason, price=price)
+            await InactiveTickerTracker.log_inactive_ticker(
                 ticker=ticker,
                 reason_not_to_enter_long=reason,
                 reason_not_to_enter_short=reason,
@@ -111,12 +356,12 @@ async def evaluate_ticker(ticker: str, df_1m, df_daily, session):
             )
             return
 
-        rvol = calculate_rvol(df_1m_t, df_daily_t)
+        rvol = snapshot["rvol"]
         min_rvol = get_dynamic_min_rvol()
         if rvol < min_rvol:
             reason = f"RVOL ({rvol:.2f}) below threshold ({min_rvol:.2f})"
-            _log_skip(ticker, reason)
-            InactiveTickerTracker.log_inactive_ticker(
+            _log_skip(ticker, "rvol", reason, rvol=rvol, min_rvol=min_rvol)
+            await InactiveTickerTracker.log_inactive_ticker(
                 ticker=ticker,
                 reason_not_to_enter_long=reason,
                 reason_not_to_enter_short=reason,
@@ -124,11 +369,11 @@ async def evaluate_ticker(ticker: str, df_1m, df_daily, session):
             )
             return
 
-        orb_high, orb_low = get_opening_range(today_df)
+        orb_high, orb_low = snapshot["orb_high"], snapshot["orb_low"]
         if orb_high is None or orb_low is None:
             reason = "Opening range unavailable"
-            _log_skip(ticker, reason)
-            InactiveTickerTracker.log_inactive_ticker(
+            _log_skip(ticker, "opening_range", reason, price=price, rvol=rvol)
+            await InactiveTickerTracker.log_inactive_ticker(
                 ticker=ticker,
                 reason_not_to_enter_long=reason,
                 reason_not_to_enter_short=reason,
@@ -136,15 +381,17 @@ async def evaluate_ticker(ticker: str, df_1m, df_daily, session):
             )
             return
 
-        vwap_val = calculate_vwap(today_df)
+        vwap_val = snapshot["vwap"]
+        uptrend = snapshot["is_uptrend"]
+        downtrend = snapshot["is_downtrend"]
 
         # MAX UW USAGE
-        flow = _normalize_signal(await get_flow_signal(ticker, session))
-        congress = _normalize_signal(await get_congress_trades(ticker, session))
-        dark = _normalize_signal(await get_dark_pool(ticker, session))
-        high_iv = _safe_float(await get_iv_rank(ticker, session))
+        flow = _normalize_signal(await get_flow_signal(ticker))
+        congress = _normalize_signal(await get_congress_trades(ticker))
+        dark = _normalize_signal(await get_dark_pool(ticker))
+        high_iv = _safe_float(await get_iv_rank(ticker))
 
-        pos = PositionTracker.get_position(ticker)
+        pos = await PositionTracker.get_position(ticker)
         current_time = now_ny().time()
         orb_end_time = time.fromisoformat(settings.ORB_PHASE_END)
 
@@ -159,8 +406,8 @@ async def evaluate_ticker(ticker: str, df_1m, df_daily, session):
             "congress_signal": congress,
             "dark_pool_signal": dark,
             "iv_rank": float(high_iv),
-            "is_uptrend": bool(is_uptrend(df_daily_t)),
-            "is_downtrend": bool(is_downtrend(df_daily_t)),
+            "is_uptrend": bool(uptrend),
+            "is_downtrend": bool(downtrend),
             "current_time": str(current_time),
             "min_rvol": float(get_dynamic_min_rvol()),
             "min_iv_rank": float(settings.MIN_IV_RANK),
@@ -179,7 +426,7 @@ async def evaluate_ticker(ticker: str, df_1m, df_daily, session):
                     long_conditions.append(f"Price ({price:.2f}) not above ORB high ({orb_high:.2f})")
                 if price <= vwap_val:
                     long_conditions.append(f"Price ({price:.2f}) not above VWAP ({vwap_val:.2f})")
-                if not is_uptrend(df_daily_t):
+                if not uptrend:
                     long_conditions.append("Not in uptrend")
                 if flow != "bullish":
                     long_conditions.append(f"Flow signal not bullish (got: {flow})")
@@ -189,7 +436,7 @@ async def evaluate_ticker(ticker: str, df_1m, df_daily, session):
                 if (
                     price > orb_high
                     and price > vwap_val
-                    and is_uptrend(df_daily_t)
+                    and uptrend
                     and flow == "bullish"
                     and ("bullish" in congress or "bullish" in dark)
                 ):
@@ -200,8 +447,7 @@ async def evaluate_ticker(ticker: str, df_1m, df_daily, session):
                         signals.append("Dark Pool")
                     signal_str = " + ".join(signals) if signals else ""
                     reason = f"ORB Breakout + Bullish Flow + {signal_str} + High IV {rvol:.1f}x"
-                    PositionTracker.add_position(ticker, "buy_to_open", price, reason)
-                    await send_signal(ticker, "buy_to_open", reason, price, session, indicator=settings.INDICATOR_NAME)
+                    await asyncio.shield(_open_position(ticker, "buy_to_open", price, reason, bar_time))
                     return
                 else:
                     reason_not_to_enter_long = "; ".join(long_conditions) if long_conditions else "Conditions not met"
@@ -212,7 +458,7 @@ async def evaluate_ticker(ticker: str, df_1m, df_daily, session):
                     short_conditions.append(f"Price ({price:.2f}) not below ORB low ({orb_low:.2f})")
                 if price >= vwap_val:
                     short_conditions.append(f"Price ({price:.2f}) not below VWAP ({vwap_val:.2f})")
-                if not is_downtrend(df_daily_t):
+                if not downtrend:
                     short_conditions.append("Not in downtrend")
                 if flow != "bearish":
                     short_conditions.append(f"Flow signal not bearish (got: {flow})")
@@ -220,12 +466,11 @@ async def evaluate_ticker(ticker: str, df_1m, df_daily, session):
                 if (
                     price < orb_low
                     and price < vwap_val
-                    and is_downtrend(df_daily_t)
+                    and downtrend
                     and flow == "bearish"
                 ):
                     reason = f"ORB Breakdown + Bearish Flow + RVOL {rvol:.1f}x"
-                    PositionTracker.add_position(ticker, "sell_to_open", price, reason)
-                    await send_signal(ticker, "sell_to_open", reason, price, session, indicator=settings.INDICATOR_NAME)
+                    await asyncio.shield(_open_position(ticker, "sell_to_open", price, reason, bar_time))
                     return
                 else:
                     reason_not_to_enter_short = "; ".join(short_conditions) if short_conditions else "Conditions not met"
@@ -234,7 +479,7 @@ async def evaluate_ticker(ticker: str, df_1m, df_daily, session):
                 long_conditions = []
                 if price >= vwap_val:
                     long_conditions.append(f"Price ({price:.2f}) not below VWAP ({vwap_val:.2f})")
-                if not is_uptrend(df_daily_t):
+                if not uptrend:
                     long_conditions.append("Not in uptrend")
                 if flow != "bullish":
                     long_conditions.append(f"Flow signal not bullish (got: {flow})")
@@ -243,7 +488,7 @@ async def evaluate_ticker(ticker: str, df_1m, df_daily, session):
 
                 if (
                     price < vwap_val
-                    and is_uptrend(df_daily_t)
+                    and uptrend
                     and flow == "bullish"
                     and ("bullish" in congress or "bullish" in dark)
                 ):
@@ -254,8 +499,7 @@ async def evaluate_ticker(ticker: str, df_1m, df_daily, session):
                         signals.append("Dark Pool")
                     signal_str = " + ".join(signals) if signals else ""
                     reason = f"VWAP Dip + Bullish Flow + {signal_str} + High IV"
-                    PositionTracker.add_position(ticker, "buy_to_open", price, reason)
-                    await send_signal(ticker, "buy_to_open", reason, price, session, indicator=settings.INDICATOR_NAME)
+                    await asyncio.shield(_open_position(ticker, "buy_to_open", price, reason, bar_time))
                     return
                 else:
                     reason_not_to_enter_long = "; ".join(long_conditions) if long_conditions else "Conditions not met"
@@ -264,22 +508,28 @@ async def evaluate_ticker(ticker: str, df_1m, df_daily, session):
                 short_conditions = []
                 if price <= vwap_val:
                     short_conditions.append(f"Price ({price:.2f}) not above VWAP ({vwap_val:.2f})")
-                if not is_downtrend(df_daily_t):
+                if not downtrend:
                     short_conditions.append("Not in downtrend")
                 if flow != "bearish":
                     short_conditions.append(f"Flow signal not bearish (got: {flow})")
 
-                if price > vwap_val and is_downtrend(df_daily_t) and flow == "bearish":
+                if price > vwap_val and downtrend and flow == "bearish":
                     reason = "VWAP Rally Fade + Bearish Flow"
-                    PositionTracker.add_position(ticker, "sell_to_open", price, reason)
-                    await send_signal(ticker, "sell_to_open", reason, price, session, indicator=settings.INDICATOR_NAME)
+                    await asyncio.shield(_open_position(ticker, "sell_to_open", price, reason, bar_time))
                     return
                 else:
                     reason_not_to_enter_short = "; ".join(short_conditions) if short_conditions else "Conditions not met"
 
             # Log inactive ticker if no trade was entered
             if reason_not_to_enter_long or reason_not_to_enter_short:
-                InactiveTickerTracker.log_inactive_ticker(
+                _log_skip(
+                    ticker,
+                    "conditions",
+                    "Entry conditions not met",
+                    long=reason_not_to_enter_long,
+                    short=reason_not_to_enter_short,
+                )
+                await InactiveTickerTracker.log_inactive_ticker(
                     ticker=ticker,
                     reason_not_to_enter_long=reason_not_to_enter_long,
                     reason_not_to_enter_short=reason_not_to_enter_short,
@@ -290,12 +540,13 @@ async def evaluate_ticker(ticker: str, df_1m, df_daily, session):
             reason_not_to_enter_short = reason_not_to_enter_long
             _log_skip(
                 ticker,
+                "iv_rank",
                 "IV rank filter failed",
-                iv_rank=f"{high_iv:.1f}",
+                iv_rank=round(high_iv, 1),
                 required=settings.MIN_IV_RANK,
             )
             # Log inactive ticker due to IV rank
-            InactiveTickerTracker.log_inactive_ticker(
+            await InactiveTickerTracker.log_inactive_ticker(
                 ticker=ticker,
                 reason_not_to_enter_long=reason_not_to_enter_long,
                 reason_not_to_enter_short=reason_not_to_enter_short,
@@ -304,34 +555,8 @@ async def evaluate_ticker(ticker: str, df_1m, df_daily, session):
 
         # EXIT: PnL + unusual put/call flow
         if pos:
-            entry_action = pos["action"]
-            entry_price = pos["entry_price"]
-            pnl_pct = (
-                ((price - entry_price) / entry_price) * 100
-                if "buy_to_open" in entry_action
-                else ((entry_price - price) / entry_price) * 100
-            )
-
-            exit_flow = _normalize_signal(await get_flow_signal(ticker, session))
-            if (
-                (
-                    pnl_pct >= 2.0
-                    and "buy_to_open" in entry_action
-                    and exit_flow == "bearish"
-                )
-                or (
-                    pnl_pct <= -2.0
-                    and "sell_to_open" in entry_action
-                    and exit_flow == "bullish"
-                )
-                or current_time >= time.fromisoformat(settings.TRADING_END)
-            ):
-                reason = f"Target Hit + Flow Exit | PnL: {pnl_pct:+.2f}%"
-                exit_action = (
-                    "sell_to_close" if "buy_to_open" in entry_action else "buy_to_close"
-                )
-                await send_signal(ticker, exit_action, reason, price, session, indicator=settings.INDICATOR_NAME)
-                PositionTracker.close_position(ticker, exit_action, price, reason)
+            await evaluate_exit(ticker, pos, price, bar_time)
 
     except Exception:
+        evaluation_memo.fail(ticker)
         logger.exception(f"Strategy error {ticker}")
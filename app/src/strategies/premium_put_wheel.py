@@ -1,12 +1,15 @@
 # app/src/strategies/premium_put_wheel.py
+from app.src.core.compute import get_compute_executor
 from app.src.core.signaler import send_signal
 from app.src.indicators.options_selector import WheelOptionsSelector
 
 
 async def evaluate_premium_put(
-    ticker: str, spot_price: float, option_chain: list, iv_rank: float, session
+    ticker: str, spot_price: float, option_chain: list, iv_rank: float
 ):
-    best_put = WheelOptionsSelector.select_best_put(option_chain, spot_price, iv_rank)
+    best_put = await get_compute_executor().run(
+        WheelOptionsSelector.select_best_put, option_chain, spot_price, iv_rank
+    )
 
     if best_put:
         reason = (
@@ -20,7 +23,6 @@ async def evaluate_premium_put(
             "sell_to_open_put",
             reason,
             best_put["premium"],
-            session,
             extra={"option_contract": best_put["symbol"]},  # e.g., AAPL250617P00250000
             indicator="PremiumPutWheel_Pro",
         )
@@ -1,11 +1,11 @@
 import asyncio
 from datetime import datetime
 
-from alpaca.data.timeframe import TimeFrame
 
 from app.src.config.settings import settings
+from app.src.core.compute import get_compute_executor
 from app.src.core.signaler import send_signal
-from app.src.data.alpaca_client import get_bars
+from app.src.data.alpaca_client import TimeFrame, get_bars
 from app.src.data.option_chain import get_option_chain
 from app.src.data.unusual_whales import get_iv_rank, get_screener_tickers
 from app.src.indicators.options_selector import WheelOptionsSelector
@@ -19,13 +19,13 @@ async def get_spot_price(ticker: str) -> float:
     try:
         bars = await get_bars([ticker], TimeFrame.Minute, limit=1)
         if ticker in bars.index.get_level_values(0):
-            return float(bars.xs(ticker, level=0)["close"].iloc[-1])
+            return round(float(bars.xs(ticker, level=0)["close"].iloc[-1]), 4)
         return 0.0
     except:
         return 0.0
 
 
-async def run_weekly_put_wheel(session):
+async def run_weekly_put_wheel():
     """Runs every trading day 3:55–4:10 PM ET — sells the best cash-secured puts.
 
     When settings.DEBUG_OPTION is True, ignores the day/time window and runs on
@@ -58,7 +58,7 @@ async def run_weekly_put_wheel(session):
 
     # Every Friday, use Unusual Whales screener + your golden list
     tickers = list(
-        set(await get_screener_tickers(session) + settings.BEST_2025_WHEEL_TICKERS)
+        set(await get_screener_tickers() + settings.BEST_2025_WHEEL_TICKERS)
     )
 
     for ticker in tickers:
@@ -67,12 +67,14 @@ async def run_weekly_put_wheel(session):
             if spot < 100:
                 continue
 
-            iv_rank_val = await get_iv_rank(ticker, session)
-            chain = await get_option_chain(ticker, option_type="put", session=session)
+            iv_rank_val = await get_iv_rank(ticker)
+            chain = await get_option_chain(ticker, option_type="put")
             if not chain:
                 continue
 
-            best_put = WheelOptionsSelector.select_best_put(chain, spot, iv_rank_val)
+            best_put = await get_compute_executor().run(
+                WheelOptionsSelector.select_best_put, chain, spot, iv_rank_val
+            )
             if best_put is not None:
                 reason = (
                     f"Wheel Put | Δ{best_put['delta']} | {best_put['distance_pct']}% OTM | "
@@ -83,7 +85,6 @@ async def run_weekly_put_wheel(session):
                     "sell_to_open_put",
                     reason,
                     price=best_put["premium"],
-                    session=session,
                     extra={"contract": best_put["contract"]},
                     indicator="WheelMaster",
                 )
@@ -92,18 +93,20 @@ async def run_weekly_put_wheel(session):
         except Exception as e:
             print(f"Wheel error {ticker}: {e}")
 
-        await asyncio.sleep(8)  # Stay under rate limits
+        await asyncio.sleep(settings.WHEEL_TICKER_PAUSE_SECONDS)  # Stay under rate limits
 
 
-async def check_assignment_and_sell_call(session, alpaca_positions):
+async def check_assignment_and_sell_call(alpaca_positions):
     """If you got assigned shares → immediately sell covered call"""
     for pos in alpaca_positions:
         ticker = pos.symbol
         qty = int(pos.qty)
         if qty > 0 and ticker in WheelTracker.get_open_puts():
             spot = float(pos.avg_entry_price)
-            chain = await get_option_chain(ticker, option_type="call", session=session)
-            best_call = WheelOptionsSelector.select_best_call(chain, spot)
+            chain = await get_option_chain(ticker, option_type="call")
+            best_call = await get_compute_executor().run(
+                WheelOptionsSelector.select_best_call, chain, spot
+            )
             if best_call is not None:
                 reason = f"Wheel Call | Assigned @ ${spot:.2f} → Selling call for ${best_call['premium']:.2f}"
                 await send_signal(
@@ -111,7 +114,6 @@ async def check_assignment_and_sell_call(session, alpaca_positions):
                     "sell_to_open_call",
                     reason,
                     price=best_call["premium"],
-                    session=session,
                     extra={"contract": best_call["contract"]},
                     indicator="WheelMaster",
                 )
@@ -0,0 +1,317 @@
+"""
+Record-and-replay of upstream HTTP traffic.
+
+``record`` mode adds a client middleware to every pooled session that appends
+each request/response pair to a gzip JSONL cassette. ``replay`` mode starts a
+local aiohttp server that serves the recorded responses and points every
+session at it, so a scan can be re-run on a real day's traffic with no network:
+
+    HTTP_CASSETTE_MODE=record HTTP_CASSETTE_PATH=data/cassettes/2025-11-03.jsonl.gz python app/src/main.py
+    python -m app.src.benchmark.replay data/cassettes/2025-11-03.jsonl.gz --job scan_once --timing fast
+"""
+
+import asyncio
+import base64
+import gzip
+import json
+import os
+import time
+import zlib
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional
+
+import aiohttp
+from aiohttp import web
+from yarl import URL
+
+from app.src.config.settings import settings
+from app.src.utils.logger import logger
+
+RECORD = "record"
+REPLAY = "replay"
+ORIGINAL = "original"
+FAST = "fast"
+
+# Response headers worth keeping (content type and rate-limit state)
+_KEPT_HEADERS = ("content-type", "retry-after")
+_KEPT_HEADER_PREFIXES = ("x-ratelimit", "x-uw-")
+
+
+def _request_key(upstream: str, method: str, path: str, query: str) -> tuple:
+    """Query parameters are sorted so recorded and replayed requests match regardless of order."""
+    params = "&".join(sorted(query.split("&"))) if query else ""
+    return (upstream, method.upper(), path, params)
+
+
+def _kept_headers(headers) -> dict:
+    return {
+        name: value
+        for name, value in headers.items()
+        if name.lower() in _KEPT_HEADERS
+        or name.lower().startswith(_KEPT_HEADER_PREFIXES)
+    }
+
+
+class CassetteRecorder:
+    """
+    Appends exchanges to a gzip JSONL file. Each process start adds a new gzip
+    member, so the file is append-only. Every line is flushed, so a process
+    that dies without ``close`` loses at most its last line (see
+    ``load_cassette``). Writes happen on a dedicated thread in request order.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="cassette"
+        )
+        self._file = None
+
+    def _write(self, line: str) -> None:
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = gzip.open(self.path, "at", compresslevel=6, encoding="utf-8")
+        self._file.write(line)
+        self._file.flush()
+
+    def append(self, entry: dict) -> None:
+        self._executor.submit(
+            self._write, json.dumps(entry, separators=(",", ":")) + "\n"
+        )
+
+    def close(self) -> None:
+        def _close():
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+        self._executor.submit(_close).result()
+
+    def middleware(self, upstream: str):
+        async def record(req: aiohttp.ClientRequest, handler) -> aiohttp.ClientResponse:
+            started = time.time()
+            resp = await handler(req)
+            # Reading caches the body, so the caller can still read it
+            body = await resp.read()
+            entry = {
+                "ts": started,
+                "elapsed": round(time.time() - started, 4),
+                "upstream": upstream,
+                "method": req.method,
+                "path": req.url.path,
+                "query": req.url.query_string,
+                "status": resp.status,
+                "headers": _kept_headers(resp.headers),
+            }
+            try:
+                entry["body"] = body.decode("utf-8")
+            except UnicodeDecodeError:
+                entry["body_b64"] = base64.b64encode(body).decode("ascii")
+            self.append(entry)
+            return resp
+
+        return record
+
+
+_GZIP_MAGIC = b"\x1f\x8b\x08"
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+_SALVAGE_CHUNK = 1024
+
+
+def _salvage(data: bytes) -> bytes:
+    """Decompress a member cut short, keeping everything before the point it breaks."""
+    decompressor = zlib.decompressobj(wbits=_GZIP_WBITS)
+    out = []
+    for i in range(0, len(data), _SALVAGE_CHUNK):
+        chunk = data[i : i + _SALVAGE_CHUNK]
+        before = decompressor.copy()
+        try:
+            out.append(decompressor.decompress(chunk))
+        except zlib.error:
+            # Redo the chunk a byte at a time to keep what precedes the break
+            decompressor = before
+            for j in range(len(chunk)):
+                try:
+                    out.append(decompressor.decompress(chunk[j : j + 1]))
+                except zlib.error:
+                    break
+            break
+        if decompressor.eof:
+            break
+    return b"".join(out)
+
+
+def _gzip_members(data: bytes) -> Iterator[bytes]:
+    """
+    The decompressed members of a gzip file. A member cut short (the recording
+    process died before ``close``) yields what was flushed, and reading goes
+    on at the next member header after it.
+    """
+    start = 0
+    while start < len(data):
+        decompressor = zlib.decompressobj(wbits=_GZIP_WBITS)
+        try:
+            member = decompressor.decompress(data[start:])
+        except zlib.error:
+            member = None
+        if member is not None and decompressor.eof:
+            yield member
+            start = len(data) - len(decompressor.unused_data)
+            continue
+        following = data.find(_GZIP_MAGIC, start + 1)
+        yield _salvage(data[start : len(data) if following == -1 else following])
+        if following == -1:
+            return
+        start = following
+
+
+def load_cassette(path: str) -> list[dict]:
+    with open(path, "rb") as f:
+        data = f.read()
+    entries = []
+    for member in _gzip_members(data):
+        for line in member.decode("utf-8", errors="replace").splitlines():
+            if line.strip():
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A crash can leave the last line of a member truncated
+                    logger.warning(f"Skipping truncated cassette line in {path}")
+    entries.sort(key=lambda entry: entry["ts"])
+    return entries
+
+
+class CassetteServer:
+    """
+    Serves recorded responses at ``/<upstream>/<original path>``. Repeated
+    requests get the recorded responses in order, then the last one again.
+    With ``timing="original"`` each response is delayed by its recorded latency.
+    """
+
+    def __init__(self, entries: Iterable[dict], timing: str = ORIGINAL):
+        self.timing = timing
+        self._responses: dict[tuple, deque] = defaultdict(deque)
+        self._last: dict[tuple, dict] = {}
+        self.entries = list(entries)
+        for entry in self.entries:
+            key = _request_key(
+                entry["upstream"], entry["method"], entry["path"], entry["query"]
+            )
+            self._responses[key].append(entry)
+        self.served = 0
+        self.missed = 0
+        self._runner: Optional[web.AppRunner] = None
+        self.url: Optional[URL] = None
+
+    @property
+    def started_at(self) -> Optional[float]:
+        """Wall-clock time the recording started."""
+        return self.entries[0]["ts"] if self.entries else None
+
+    def _next(self, key: tuple) -> Optional[dict]:
+        queue = self._responses.get(key)
+        if queue:
+            self._last[key] = queue.popleft()
+        return self._last.get(key)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        upstream = request.match_info["upstream"]
+        path = "/" + request.match_info["tail"]
+        entry = self._next(
+            _request_key(upstream, request.method, path, request.query_string)
+        )
+        if entry is None:
+            self.missed += 1
+            logger.warning(
+                f"Cassette miss: {upstream} {request.method} {path}?{request.query_string}"
+            )
+            return web.json_response({"error": "not recorded"}, status=404)
+        self.served += 1
+        if self.timing == ORIGINAL and entry["elapsed"] > 0:
+            await asyncio.sleep(entry["elapsed"])
+        if "body_b64" in entry:
+            body = base64.b64decode(entry["body_b64"])
+        else:
+            body = entry.get("body", "").encode("utf-8")
+        return web.Response(status=entry["status"], body=body, headers=entry["headers"])
+
+    async def start(self) -> URL:
+        app = web.Application()
+        app.router.add_route("*", "/{upstream}/{tail:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = URL(f"http://127.0.0.1:{port}")
+        logger.info(
+            f"Cassette replay: {len(self.entries)} recorded responses at {self.url} ({self.timing} timing)"
+        )
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def middleware(self, upstream: str):
+        async def replay(req: aiohttp.ClientRequest, handler) -> aiohttp.ClientResponse:
+            if self.url is None:
+                raise RuntimeError("Cassette replay server is not running")
+            # Send the request to the local server instead of the upstream host
+            req.url = self.url.with_path(f"/{upstream}{req.url.path}").with_query(
+                req.url.query_string
+            )
+            return await handler(req)
+
+        return replay
+
+
+_recorder: Optional[CassetteRecorder] = None
+_server: Optional[CassetteServer] = None
+
+
+def session_middlewares(upstream: str) -> tuple:
+    """Middlewares ``http_client`` installs on the session for ``upstream``."""
+    if _server is not None:
+        return (_server.middleware(upstream),)
+    if _recorder is not None:
+        return (_recorder.middleware(upstream),)
+    return ()
+
+
+async def start_cassette(
+    mode: Optional[str] = None,
+    path: Optional[str] = None,
+    timing: Optional[str] = None,
+) -> Optional[CassetteServer]:
+    """Enable recording or replay (defaults from settings); call before any session is opened."""
+    global _recorder, _server
+    mode = (mode if mode is not None else settings.HTTP_CASSETTE_MODE).lower()
+    path = path or settings.HTTP_CASSETTE_PATH
+    if mode == RECORD:
+        _recorder = CassetteRecorder(path)
+        logger.info(f"Recording upstream HTTP traffic to {path}")
+    elif mode == REPLAY:
+        _server = CassetteServer(
+            load_cassette(path), timing or settings.HTTP_CASSETTE_TIMING
+        )
+        await _server.start()
+        return _server
+    return None
+
+
+async def stop_cassette() -> None:
+    global _recorder, _server
+    if _recorder is not None:
+        _recorder.close()
+        _recorder = None
+    if _server is not None:
+        logger.info(
+            f"Cassette replay served {_server.served} responses, {_server.missed} misses"
+        )
+        await _server.stop()
+        _server = None
@@ -0,0 +1,83 @@
+"""
+Process-wide clients for the non-HTTP backends, each built on first use.
+
+Importing a module that talks to Redis or DynamoDB neither connects nor loads
+the SDK. Every client has a factory here, and the SDK import happens inside
+that factory. HTTP sessions have their own registry in
+``http_client.get_session``. Tests and the benchmark put fakes in place with
+``set_client``.
+"""
+
+import threading
+from typing import Any, Callable
+
+from app.src.config.settings import settings
+from app.src.utils.logger import logger
+
+REDIS = "redis"
+DYNAMODB = "dynamodb"
+
+
+def _redis():
+    from redis import Redis
+
+    return Redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+
+def _dynamodb():
+    """The shared low-level client. botocore clients are thread-safe, so every
+    DynamoDB executor thread reuses the same HTTP connection pool."""
+    if not settings.AWS_ACCESS_KEY_ID or not settings.AWS_SECRET_ACCESS_KEY:
+        logger.warning("AWS credentials not configured; DynamoDB operations will fail")
+        return None
+    try:
+        import boto3
+        from botocore.config import Config
+
+        return boto3.client(
+            "dynamodb",
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            region_name=settings.AWS_DEFAULT_REGION,
+            endpoint_url=settings.DYNAMODB_ENDPOINT_URL,
+            config=Config(
+                max_pool_connections=settings.DYNAMODB_MAX_WORKERS,
+                retries={"max_attempts": 3, "mode": "standard"},
+            ),
+        )
+    except Exception as exc:
+        logger.error(f"Unable to initialize DynamoDB client: {exc}")
+        return None
+
+
+FACTORIES: dict[str, Callable[[], Any]] = {
+    REDIS: _redis,
+    DYNAMODB: _dynamodb,
+}
+
+_clients: dict[str, Any] = {}
+# DynamoDB clients are first requested from executor threads
+_lock = threading.Lock()
+
+
+def get_client(name: str) -> Any:
+    """Return the process-wide client ``name``, building it on first use."""
+    try:
+        return _clients[name]
+    except KeyError:
+        pass
+    with _lock:
+        if name not in _clients:
+            _clients[name] = FACTORIES[name]()
+        return _clients[name]
+
+
+def set_client(name: str, client: Any) -> None:
+    with _lock:
+        _clients[name] = client
+
+
+def reset_clients() -> None:
+    """Forget every built client; the next ``get_client`` builds a new one."""
+    with _lock:
+        _clients.clear()
@@ -0,0 +1,103 @@
+"""
+Structured per-ticker decision records, written off the event loop.
+
+``record`` timestamps the decision and puts it on a queue. A background
+thread serializes it and appends one JSON line to DECISION_LOG_PATH. A
+NO TRADE for a ticker that repeats its previous code within
+DECISION_LOG_REPEAT_SECONDS is counted instead of written. The next record
+that does get through carries that count as ``"suppressed"``. Trades and
+changes of code are always written.
+"""
+
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+from typing import Optional
+
+from app.src.config.settings import settings
+from app.src.utils.helpers import now_ny
+from app.src.utils.logger import logger
+
+NO_TRADE = "no_trade"
+_STOP = object()
+
+
+class DecisionLog:
+    def __init__(self):
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        # DECISION_LOG_PATH the writer thread appends to
+        self._path: Optional[str] = None
+        # ticker -> (code, time of the last written record)
+        self._last: dict[str, tuple[str, datetime]] = {}
+        self._suppressed: dict[str, int] = {}
+
+    def record(self, ticker: str, decision: str, code: str = "", **fields) -> bool:
+        """Queue a decision; returns False when a repeated NO TRADE was sampled out."""
+        now = now_ny()
+        if decision == NO_TRADE:
+            last = self._last.get(ticker)
+            if (
+                last is not None
+                and last[0] == code
+                and (now - last[1]).total_seconds()
+                < settings.DECISION_LOG_REPEAT_SECONDS
+            ):
+                self._suppressed[ticker] = self._suppressed.get(ticker, 0) + 1
+                return False
+        self._last[ticker] = (code if decision == NO_TRADE else decision, now)
+        if settings.DECISION_LOG_PATH:
+            self._ensure_writer()
+            suppressed = self._suppressed.pop(ticker, 0)
+            self._queue.put((now, ticker, decision, code, suppressed, fields))
+        return True
+
+    def _ensure_writer(self) -> None:
+        if self._path != settings.DECISION_LOG_PATH:
+            # Reconfigured: flush to the old file, then follow the new one
+            self.close()
+        if self._thread is None or not self._thread.is_alive():
+            self._path = settings.DECISION_LOG_PATH
+            self._thread = threading.Thread(
+                target=self._write, args=(self._path,), daemon=True
+            )
+            self._thread.start()
+
+    def _write(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as out:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    return
+                now, ticker, decision, code, suppressed, fields = item
+                line = {"ts": now.isoformat(), "ticker": ticker, "decision": decision}
+                if code:
+                    line["code"] = code
+                if suppressed:
+                    line["suppressed"] = suppressed
+                line.update(fields)
+                try:
+                    out.write(json.dumps(line, default=str) + "\n")
+                except Exception as e:
+                    logger.warning(f"Failed to write decision for {ticker}: {e}")
+                if self._queue.empty():
+                    out.flush()
+
+    def close(self) -> None:
+        """Flush queued records and stop the writer."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._thread, self._path = None, None
+
+    def reset(self) -> None:
+        self._last.clear()
+        self._suppressed.clear()
+
+
+decision_log = DecisionLog()
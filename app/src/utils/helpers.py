@@ -1,20 +1,43 @@
+import bisect
 import functools
 import inspect
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, time
 from time import perf_counter
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 
 import pytz
 
+from app.src.config.settings import settings
 from app.src.utils.logger import logger
+from app.src.utils.metrics import registry
+from app.src.utils.tracing import span
 
 NY = pytz.timezone("America/New_York")
 
 
+# Set by the backtest engine so strategy code sees replayed time instead of the wall clock
+_clock: ContextVar[Optional[Callable[[], datetime]]] = ContextVar("clock", default=None)
+
+
 def now_ny():
+    clock = _clock.get()
+    if clock is not None:
+        return clock()
     return datetime.now(NY)
 
 
+@contextmanager
+def use_clock(clock: Callable[[], datetime]):
+    """Make ``now_ny()`` return ``clock()`` in this context (and tasks created from it)."""
+    token = _clock.set(clock)
+    try:
+        yield
+    finally:
+        _clock.reset(token)
+
+
 def is_trading_hours(trading_start: str, trading_end: str) -> bool:
     now = now_ny().time()
     start = time.fromisoformat(trading_start)
@@ -24,113 +47,85 @@ def is_trading_hours(trading_start: str, trading_end: str) -> bool:
 
 def get_dynamic_min_rvol() -> float:
     """Calculate MIN_RVOL based on current time of day.
-    
-    RVOL varies throughout the trading day:
-    - 9:30-10:30: 0.3-0.8x (use 0.3)
-    - 10:30-12:00: 0.8-1.4x (use 0.8)
-    - 12:00-14:00: 1.4-2.5x (use 1.2)
-    - 14:00-15:00: Early power hour, 1.5-2.5x (use 1.5)
-    - 15:00-16:00: Power hour peak, 2.5-6.0x (use 2.0)
+
+    RVOL builds through the session, so the threshold rises with it. The
+    schedule is ``settings.MIN_RVOL_SCHEDULE``: (start time, threshold) pairs,
+    each in force until the next start, the last until MIN_RVOL_SCHEDULE_END.
+    Outside the schedule MIN_RVOL_OUTSIDE_SCHEDULE applies.
     """
     now = now_ny().time()
-    
-    # 9:30-10:30: Early morning, low volume
-    if time(9, 30) <= now < time(10, 30):
-        return 0.3
-    
-    # 10:30-12:00: Mid-morning, moderate volume
-    if time(10, 30) <= now < time(12, 0):
-        return 0.8
-    
-    # 12:00-14:00: Lunch/afternoon, higher volume
-    if time(12, 0) <= now < time(14, 0):
-        return 1.2
-    
-    # 14:00-15:00: Early power hour, volume building
-    if time(14, 0) <= now < time(15, 0):
-        return 1.2
-    
-    # 15:00-16:00: Power hour peak, highest volume
-    if time(15, 0) <= now <= time(16, 0):
-        return 2.0
-    
-    # Default fallback
-    return 0.7
-
-
-
-def measure_latency(func: Callable) -> Callable:
+    schedule = sorted(
+        (time.fromisoformat(start), float(threshold))
+        for start, threshold in settings.MIN_RVOL_SCHEDULE
+    )
+    if (
+        not schedule
+        or now < schedule[0][0]
+        or now > time.fromisoformat(settings.MIN_RVOL_SCHEDULE_END)
+    ):
+        return settings.MIN_RVOL_OUTSIDE_SCHEDULE
+    index = bisect.bisect_right([start for start, _ in schedule], now) - 1
+    return schedule[index][1]
+
+
+def measure_latency(func: Optional[Callable] = None, *, log_calls: bool = False):
     """
-    Decorator to measure and log the execution latency of async functions.
+    Decorator that records the latency of each call in the function's
+    histogram (see ``app.src.utils.metrics``).
 
     Usage:
         @measure_latency
         async def my_function():
             ...
 
-    Args:
-        func: The async function to measure
+        @measure_latency(log_calls=True)  # also log every call
+        async def my_job():
+            ...
 
-    Returns:
-        Wrapped function that logs execution time
+    The metric name is the function's qualified name (``Class.method`` for
+    methods), resolved once here rather than on every call. Inside a trace
+    each call is also a span of that name (see ``app.src.utils.tracing``).
     """
-    if not hasattr(func, "__name__"):
+    if func is None:
+        return functools.partial(measure_latency, log_calls=log_calls)
+    if not hasattr(func, "__qualname__"):
         return func
 
-    @functools.wraps(func)
-    async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
-        start_time = perf_counter()
-        func_name = func.__name__
-        # Handle both classmethods (args[0] is a class) and instance methods (args[0] is an instance)
-        if args and hasattr(args[0], "__class__"):
-            if inspect.isclass(args[0]):
-                # For classmethods, args[0] is the class itself
-                class_name = args[0].__name__
-            else:
-                # For instance methods, args[0] is an instance
-                class_name = args[0].__class__.__name__
-        else:
-            class_name = ""
-        display_name = f"{class_name}.{func_name}" if class_name else func_name
+    display_name = func.__qualname__
+    metrics = registry.register(display_name)
 
-        try:
-            result = await func(*args, **kwargs)
-            elapsed_time = perf_counter() - start_time
+    def done(start_time: float, error: Optional[Exception] = None) -> None:
+        elapsed_time = perf_counter() - start_time
+        registry.record(metrics, elapsed_time, error is not None)
+        if not log_calls:
+            return
+        if error is None:
             logger.info(f"⏱️  {display_name} completed in {elapsed_time:.3f}s")
+        else:
+            logger.warning(f"⏱️  {display_name} failed after {elapsed_time:.3f}s: {str(error)}")
+
+    @functools.wraps(func)
+    async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+        with span(display_name):
+            start_time = perf_counter()
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                done(start_time, e)
+                raise
+            done(start_time)
             return result
-        except Exception as e:
-            elapsed_time = perf_counter() - start_time
-            logger.warning(f"⏱️  {display_name} failed after {elapsed_time:.3f}s: {str(e)}")
-            raise
 
     @functools.wraps(func)
     def sync_wrapper(*args: Any, **kwargs: Any) -> Any:
-        start_time = perf_counter()
-        func_name = func.__name__
-        # Handle both classmethods (args[0] is a class) and instance methods (args[0] is an instance)
-        if args and hasattr(args[0], "__class__"):
-            if inspect.isclass(args[0]):
-                # For classmethods, args[0] is the class itself
-                class_name = args[0].__name__
-            else:
-                # For instance methods, args[0] is an instance
-                class_name = args[0].__class__.__name__
-        else:
-            class_name = ""
-        display_name = f"{class_name}.{func_name}" if class_name else func_name
-
-        try:
-            result = func(*args, **kwargs)
-            elapsed_time = perf_counter() - start_time
-            logger.info(f"⏱️  {display_name} completed in {elapsed_time:.3f}s")
+        with span(display_name):
+            start_time = perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                done(start_time, e)
+                raise
+            done(start_time)
             return result
-        except Exception as e:
-            elapsed_time = perf_counter() - start_time
-            logger.warning(f"⏱️  {display_name} failed after {elapsed_time:.3f}s: {str(e)}")
-            raise
-
-    # Check if function is a coroutine function (async)
-    if hasattr(func, "__code__") and func.__code__.co_flags & 0x80:  # CO_COROUTINE flag
-        return async_wrapper
-    else:
-        return sync_wrapper
+
+    return async_wrapper if inspect.iscoroutinefunction(func) else sync_wrapper
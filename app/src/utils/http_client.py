@@ -0,0 +1,125 @@
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import aiohttp
+
+from app.src.config.settings import settings
+from app.src.utils.cassette import session_middlewares
+from app.src.utils.http_stats import trace_config
+from app.src.utils.logger import logger
+
+try:
+    import brotli  # noqa: F401
+
+    _ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    _ACCEPT_ENCODING = "gzip, deflate"
+
+try:
+    import aiodns  # noqa: F401
+
+    _HAS_AIODNS = True
+except ImportError:
+    _HAS_AIODNS = False
+
+ALPACA_DATA = "alpaca_data"
+ALPACA_TRADING = "alpaca_trading"
+UNUSUAL_WHALES = "unusual_whales"
+WEBHOOK = "webhook"
+
+
+def _alpaca_headers() -> dict:
+    return {
+        "accept": "application/json",
+        "APCA-API-KEY-ID": str(settings.ALPACA_KEY),
+        "APCA-API-SECRET-KEY": str(settings.ALPACA_SECRET),
+    }
+
+
+def _uw_headers() -> dict:
+    return {
+        "Accept": "application/json, text/plain",
+        "Authorization": f"Bearer {settings.UW_API_KEY}",
+    }
+
+
+@dataclass(frozen=True)
+class Upstream:
+    """Connection policy for one upstream host."""
+
+    base_url: Callable[[], Optional[str]]
+    headers: Callable[[], dict] = dict
+    timeout: aiohttp.ClientTimeout = field(
+        default_factory=lambda: aiohttp.ClientTimeout(total=10, connect=5)
+    )
+    limit_per_host: int = 20
+
+
+UPSTREAMS: dict[str, Upstream] = {
+    ALPACA_DATA: Upstream(
+        base_url=lambda: settings.ALPACA_DATA_URL,
+        headers=_alpaca_headers,
+        limit_per_host=settings.HTTP_LIMIT_PER_HOST,
+    ),
+    ALPACA_TRADING: Upstream(
+        base_url=lambda: settings.ALPACA_TRADING_URL,
+        headers=_alpaca_headers,
+        limit_per_host=4,
+    ),
+    UNUSUAL_WHALES: Upstream(
+        base_url=lambda: settings.UW_BASE_URL,
+        headers=_uw_headers,
+        limit_per_host=settings.HTTP_LIMIT_PER_HOST,
+    ),
+    # Webhook posts use the absolute WEBHOOK_URL; few concurrent signals
+    WEBHOOK: Upstream(
+        base_url=lambda: None, limit_per_host=settings.SIGNAL_DISPATCH_CONCURRENCY
+    ),
+}
+
+_sessions: dict[str, aiohttp.ClientSession] = {}
+
+
+def _build_session(name: str, upstream: Upstream) -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=settings.HTTP_MAX_CONNECTIONS,
+        limit_per_host=upstream.limit_per_host,
+        ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+        keepalive_timeout=settings.HTTP_KEEPALIVE_SECONDS,
+        resolver=aiohttp.AsyncResolver() if _HAS_AIODNS else None,
+    )
+    headers = {"Accept-Encoding": _ACCEPT_ENCODING, **upstream.headers()}
+    base_url = upstream.base_url()
+    logger.debug(f"Opening HTTP session for {name} ({base_url or 'absolute URLs'})")
+    return aiohttp.ClientSession(
+        base_url=base_url,
+        connector=connector,
+        headers=headers,
+        timeout=upstream.timeout,
+        raise_for_status=False,
+        middlewares=session_middlewares(name),
+        trace_configs=[trace_config(name)],
+    )
+
+
+def get_session(name: str) -> aiohttp.ClientSession:
+    """
+    Return the process-wide pooled session for an upstream, creating it on first use.
+
+    Sessions carry the upstream's base URL, auth headers and default timeout, so
+    callers pass only the path and request-specific params. Must be called from
+    inside the running event loop.
+    """
+    session = _sessions.get(name)
+    if session is None or session.closed:
+        session = _build_session(name, UPSTREAMS[name])
+        _sessions[name] = session
+    return session
+
+
+async def close_sessions():
+    """Close every upstream session (call once on shutdown)."""
+    for name, session in list(_sessions.items()):
+        if not session.closed:
+            await session.close()
+        _sessions.pop(name, None)
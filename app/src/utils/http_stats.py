@@ -0,0 +1,253 @@
+"""
+Per-endpoint request statistics for the pooled upstream sessions.
+
+``http_client`` attaches ``trace_config(upstream)`` to every session. For each
+request it records DNS, connect, time to first byte (response headers) and
+total time (last body chunk), response bytes, status, whether the request was
+a retry and whether the connection was reused. Samples are kept per endpoint
+template (``GET /api/darkpool/{ticker}``) in a rolling window, together with
+the latest rate-limit headers, and ``endpoint_stats`` aggregates them on
+demand.
+
+Retries are reported by the callers through the request context:
+
+    session.get(url, trace_request_ctx={"attempt": attempt})
+
+which may also carry an explicit ``"endpoint"`` template for paths the
+default templating (upper-case segments become ``{ticker}``) would miss.
+"""
+
+import functools
+import re
+from collections import Counter, deque
+from threading import Lock
+from time import monotonic, perf_counter
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import aiohttp
+
+from app.src.config.settings import settings
+from app.src.utils.logger import logger
+
+# Tickers and OCC option symbols in paths, e.g. /api/stock/AAPL/iv-rank
+_TICKER_SEGMENT = re.compile(r"^[A-Z][A-Z0-9.\-]*$")
+_RATE_LIMIT_HEADERS = ("ratelimit", "retry-after", "x-uw-")
+
+
+class _Sample:
+    __slots__ = (
+        "at",
+        "status",
+        "error",
+        "retry",
+        "reused",
+        "dns",
+        "connect",
+        "ttfb",
+        "total",
+        "bytes",
+    )
+
+    def __init__(self, ctx: SimpleNamespace, status: Optional[int], error: str = ""):
+        self.at = monotonic()
+        self.status = status
+        self.error = error
+        self.retry = ctx.attempt > 0
+        self.reused = ctx.reused
+        self.dns = ctx.dns
+        self.connect = ctx.connect
+        self.ttfb = self.total = perf_counter() - ctx.start
+        self.bytes = 0
+
+
+class EndpointWindow:
+    def __init__(self):
+        self.samples: deque[_Sample] = deque(maxlen=settings.HTTP_STATS_MAX_SAMPLES)
+        self.rate_limits: dict[str, str] = {}
+
+    def recent(self, seconds: float) -> list[_Sample]:
+        cutoff = monotonic() - seconds
+        return [sample for sample in self.samples if sample.at >= cutoff]
+
+
+_windows: dict[str, EndpointWindow] = {}
+_lock = Lock()
+
+
+def endpoint_template(path: str) -> str:
+    return "/".join(
+        "{ticker}" if _TICKER_SEGMENT.match(segment) else segment
+        for segment in path.split("/")
+    )
+
+
+def _window(ctx: SimpleNamespace) -> EndpointWindow:
+    key = f"{ctx.upstream} {ctx.key}"
+    window = _windows.get(key)
+    if window is None:
+        with _lock:
+            window = _windows.setdefault(key, EndpointWindow())
+    return window
+
+
+async def _on_request_start(session, ctx, params: "aiohttp.TraceRequestStartParams"):
+    request = ctx.trace_request_ctx or {}
+    endpoint = request.get("endpoint") or endpoint_template(params.url.path)
+    ctx.key = f"{params.method} {endpoint}"
+    ctx.attempt = request.get("attempt", 0)
+    ctx.start = perf_counter()
+    ctx.dns = ctx.connect = None
+    ctx.reused = False
+    ctx.sample = None
+
+
+async def _on_dns_start(session, ctx, params):
+    ctx.dns_start = perf_counter()
+
+
+async def _on_dns_end(session, ctx, params):
+    ctx.dns = perf_counter() - ctx.dns_start
+
+
+async def _on_connection_start(session, ctx, params):
+    ctx.connect_start = perf_counter()
+
+
+async def _on_connection_end(session, ctx, params):
+    ctx.connect = perf_counter() - ctx.connect_start
+
+
+async def _on_connection_reused(session, ctx, params):
+    ctx.reused = True
+
+
+async def _on_request_end(session, ctx, params: "aiohttp.TraceRequestEndParams"):
+    ctx.sample = _Sample(ctx, params.response.status)
+    window = _window(ctx)
+    window.samples.append(ctx.sample)
+    for name, value in params.response.headers.items():
+        lowered = name.lower()
+        if any(marker in lowered for marker in _RATE_LIMIT_HEADERS):
+            window.rate_limits[lowered] = value
+
+
+async def _on_chunk(session, ctx, params: "aiohttp.TraceResponseChunkReceivedParams"):
+    # Body chunks arrive after on_request_end; the sample is already in the window
+    if ctx.sample is not None:
+        ctx.sample.bytes += len(params.chunk)
+        ctx.sample.total = perf_counter() - ctx.start
+
+
+async def _on_request_exception(session, ctx, params):
+    _window(ctx).samples.append(_Sample(ctx, None, type(params.exception).__name__))
+
+
+def trace_config(upstream: str) -> "aiohttp.TraceConfig":
+    import aiohttp
+
+    config = aiohttp.TraceConfig(
+        trace_config_ctx_factory=functools.partial(SimpleNamespace, upstream=upstream)
+    )
+    config.on_request_start.append(_on_request_start)
+    config.on_dns_resolvehost_start.append(_on_dns_start)
+    config.on_dns_resolvehost_end.append(_on_dns_end)
+    config.on_connection_create_start.append(_on_connection_start)
+    config.on_connection_create_end.append(_on_connection_end)
+    config.on_connection_reuseconn.append(_on_connection_reused)
+    config.on_request_end.append(_on_request_end)
+    config.on_response_chunk_received.append(_on_chunk)
+    config.on_request_exception.append(_on_request_exception)
+    return config
+
+
+def _percentiles_ms(values: list[float]) -> dict:
+    if not values:
+        return {}
+    values = sorted(values)
+    last = len(values) - 1
+    return {
+        "p50": round(values[min(last, int(0.5 * len(values)))] * 1000, 1),
+        "p95": round(values[min(last, int(0.95 * len(values)))] * 1000, 1),
+        "max": round(values[last] * 1000, 1),
+    }
+
+
+def endpoint_stats(window_seconds: Optional[float] = None) -> dict[str, dict]:
+    """
+    Aggregates per ``"<upstream> <METHOD> <template>"`` over the last
+    ``window_seconds`` (default HTTP_STATS_WINDOW_SECONDS).
+    """
+    seconds = window_seconds or settings.HTTP_STATS_WINDOW_SECONDS
+    stats = {}
+    for key, window in sorted(_windows.items()):
+        samples = window.recent(seconds)
+        if not samples:
+            continue
+        completed = [sample for sample in samples if not sample.error]
+        stats[key] = {
+            "requests": len(samples),
+            "per_second": round(len(samples) / seconds, 3),
+            "status": dict(
+                Counter(sample.status or sample.error for sample in samples)
+            ),
+            "errors": len(samples) - len(completed),
+            "retries": sum(sample.retry for sample in samples),
+            "reused_connections": sum(sample.reused for sample in samples),
+            "dns_ms": _percentiles_ms(
+                [sample.dns for sample in samples if sample.dns is not None]
+            ),
+            "connect_ms": _percentiles_ms(
+                [sample.connect for sample in samples if sample.connect is not None]
+            ),
+            "ttfb_ms": _percentiles_ms([sample.ttfb for sample in completed]),
+            "total_ms": _percentiles_ms([sample.total for sample in samples]),
+            "bytes_mean": round(
+                sum(sample.bytes for sample in completed) / max(1, len(completed))
+            ),
+            "rate_limits": dict(window.rate_limits),
+        }
+    return stats
+
+
+def requests_in(seconds: float, upstreams: Optional[tuple[str, ...]] = None) -> int:
+    """Requests answered or failed in the last ``seconds``, for ``upstreams`` or all."""
+    cutoff = monotonic() - seconds
+    count = 0
+    for key, window in list(_windows.items()):
+        if upstreams is not None and key.split(" ", 1)[0] not in upstreams:
+            continue
+        for sample in reversed(window.samples):
+            if sample.at < cutoff:
+                break
+            count += 1
+    return count
+
+
+def reset_endpoint_stats() -> None:
+    with _lock:
+        _windows.clear()
+
+
+def endpoint_summary_lines(window_seconds: Optional[float] = None) -> list[str]:
+    lines = []
+    for key, stats in endpoint_stats(window_seconds).items():
+        ttfb, total = stats["ttfb_ms"], stats["total_ms"]
+        line = (
+            f"{key}: n={stats['requests']} status={stats['status']} "
+            f"retries={stats['retries']} reused={stats['reused_connections']} "
+            f"ttfb p50/p95={ttfb.get('p50')}/{ttfb.get('p95')}ms "
+            f"total p50/p95={total.get('p50')}/{total.get('p95')}ms "
+            f"bytes~{stats['bytes_mean']}"
+        )
+        if stats["rate_limits"]:
+            line += f" limits={stats['rate_limits']}"
+        lines.append(line)
+    return lines
+
+
+def log_endpoint_summary() -> None:
+    lines = endpoint_summary_lines()
+    if lines:
+        logger.info("Upstream endpoints:\n  " + "\n  ".join(lines))
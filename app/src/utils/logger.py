@@ -3,19 +3,26 @@ import sys
 
 from loguru import logger
 
+# Sink I/O runs on loguru's background thread instead of the event loop;
+# call ``await logger.complete()`` before exit to flush it
+LOG_ENQUEUE = os.getenv("LOG_ENQUEUE", "true").lower() in ("1", "true", "yes")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
 os.makedirs("logs", exist_ok=True)
 logger.remove()
 logger.add(
     sys.stdout,
     format="<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}:{function}:{line}</cyan> | <white>{message}</white>",
-    level="INFO",
+    level=LOG_LEVEL,
+    enqueue=LOG_ENQUEUE,
 )
 logger.add(
     "logs/bot_{time:YYYY-MM-DD}.log",
     rotation="1 day",
     retention="7 days",
-    level="INFO",
+    level=LOG_LEVEL,
     compression="zip",
+    enqueue=LOG_ENQUEUE,
 )
 
 __all__ = ["logger"]
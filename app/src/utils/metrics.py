@@ -0,0 +1,203 @@
+"""
+Latency metrics for functions decorated with ``measure_latency``.
+
+Each function gets an HDR-style histogram: log-linear buckets with a fixed
+relative error (under 1.6%), so recording is O(1) and quantiles come from
+the bucket counts. Two views are kept: a cumulative one, exposed in the
+Prometheus text format on ``METRICS_PORT``, and an interval one that
+``log_metrics_summary`` writes out and resets every METRICS_SUMMARY_SECONDS.
+"""
+
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import TYPE_CHECKING, Callable, Optional
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+from app.src.config.settings import settings
+from app.src.utils.http_stats import log_endpoint_summary
+from app.src.utils.logger import logger
+
+# Buckets per power of two; values below 2 * _SUB_BUCKETS microseconds are exact
+_SUB_BITS = 6
+_SUB_BUCKETS = 1 << _SUB_BITS
+# Longest recordable latency: 2**36 us is about 19 hours
+_MAX_EXPONENT = 36 - _SUB_BITS
+_BUCKETS = _SUB_BUCKETS * (_MAX_EXPONENT + 2)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _bucket_index(micros: int) -> int:
+    if micros < 2 * _SUB_BUCKETS:
+        return micros
+    shift = min(micros.bit_length() - _SUB_BITS - 1, _MAX_EXPONENT)
+    mantissa = min(micros >> shift, 2 * _SUB_BUCKETS - 1)
+    return _SUB_BUCKETS * (shift + 1) + mantissa - _SUB_BUCKETS
+
+
+def _bucket_value(index: int) -> int:
+    """Midpoint (in microseconds) of the values that map to bucket ``index``."""
+    if index < 2 * _SUB_BUCKETS:
+        return index
+    shift = index // _SUB_BUCKETS - 1
+    mantissa = index % _SUB_BUCKETS + _SUB_BUCKETS
+    return (mantissa << shift) + (1 << shift) // 2
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[_bucket_index(max(0, int(seconds * 1_000_000)))] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """Latency in seconds at quantile ``q`` (0 when empty)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, round(q * self.count))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(_bucket_value(index) / 1_000_000, self.max)
+        return self.max
+
+
+@dataclass
+class FunctionMetrics:
+    cumulative: LatencyHistogram = field(default_factory=LatencyHistogram)
+    interval: LatencyHistogram = field(default_factory=LatencyHistogram)
+    errors: int = 0
+    interval_errors: int = 0
+
+
+class MetricsRegistry:
+    """Per-function latency; safe to record from executor threads too."""
+
+    def __init__(self):
+        self.functions: dict[str, FunctionMetrics] = {}
+        self.collectors: list[Callable[[], list[str]]] = []
+        self._lock = Lock()
+
+    def register(self, name: str) -> FunctionMetrics:
+        with self._lock:
+            return self.functions.setdefault(name, FunctionMetrics())
+
+    def add_collector(self, collector: Callable[[], list[str]]) -> None:
+        """Extra Prometheus lines (with their HELP/TYPE) appended to every render."""
+        self.collectors.append(collector)
+
+    def record(self, metrics: FunctionMetrics, seconds: float, failed: bool) -> None:
+        with self._lock:
+            metrics.cumulative.record(seconds)
+            metrics.interval.record(seconds)
+            if failed:
+                metrics.errors += 1
+                metrics.interval_errors += 1
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP algo_function_latency_seconds Latency of instrumented functions",
+            "# TYPE algo_function_latency_seconds summary",
+        ]
+        errors = [
+            "# HELP algo_function_errors_total Calls that raised",
+            "# TYPE algo_function_errors_total counter",
+        ]
+        with self._lock:
+            for name, metrics in sorted(self.functions.items()):
+                histogram = metrics.cumulative
+                label = f'function="{name}"'
+                for q in QUANTILES:
+                    lines.append(
+                        f'algo_function_latency_seconds{{{label},quantile="{q}"}} '
+                        f"{histogram.quantile(q):.6f}"
+                    )
+                lines.append(
+                    f"algo_function_latency_seconds_sum{{{label}}} {histogram.total:.6f}"
+                )
+                lines.append(
+                    f"algo_function_latency_seconds_count{{{label}}} {histogram.count}"
+                )
+                errors.append(f"algo_function_errors_total{{{label}}} {metrics.errors}")
+        for collector in self.collectors:
+            errors += collector()
+        return "\n".join(lines + errors) + "\n"
+
+    def interval_summary(self) -> list[str]:
+        """One line per function called since the last summary, slowest p99 first; resets the interval."""
+        rows = []
+        with self._lock:
+            for name, metrics in self.functions.items():
+                histogram = metrics.interval
+                if histogram.count:
+                    p50, p95, p99 = (histogram.quantile(q) for q in QUANTILES)
+                    rows.append(
+                        (
+                            p99,
+                            f"{name}: n={histogram.count} p50={p50 * 1000:.1f}ms "
+                            f"p95={p95 * 1000:.1f}ms p99={p99 * 1000:.1f}ms "
+                            f"max={histogram.max * 1000:.1f}ms errors={metrics.interval_errors}",
+                        )
+                    )
+                metrics.interval = LatencyHistogram()
+                metrics.interval_errors = 0
+        return [line for _, line in sorted(rows, reverse=True)]
+
+
+registry = MetricsRegistry()
+
+
+async def log_metrics_summary() -> None:
+    lines = registry.interval_summary()
+    if lines:
+        logger.info("Latency summary:\n  " + "\n  ".join(lines))
+    log_endpoint_summary()
+
+
+async def _metrics_handler(request: "web.Request") -> "web.Response":
+    from aiohttp import web
+
+    return web.Response(text=registry.render_prometheus(), content_type="text/plain")
+
+
+_runner: Optional["web.AppRunner"] = None
+
+
+def metrics_app() -> "web.Application":
+    # aiohttp.web is imported here, so importing metrics (via helpers) stays cheap
+    from aiohttp import web
+
+    app = web.Application()
+    app.router.add_get("/metrics", _metrics_handler)
+    return app
+
+
+async def start_metrics_server() -> None:
+    """Serve ``/metrics`` on METRICS_PORT (off when 0)."""
+    global _runner
+    if not settings.METRICS_PORT:
+        return
+    from aiohttp import web
+
+    _runner = web.AppRunner(metrics_app(), access_log=None)
+    await _runner.setup()
+    await web.TCPSite(_runner, settings.METRICS_HOST, settings.METRICS_PORT).start()
+    logger.info(
+        f"Prometheus metrics on http://{settings.METRICS_HOST}:{settings.METRICS_PORT}/metrics"
+    )
+
+
+async def stop_metrics_server() -> None:
+    global _runner
+    if _runner is not None:
+        await _runner.cleanup()
+        _runner = None
@@ -0,0 +1,141 @@
+"""
+Lightweight span tracing for the scan path.
+
+A trace is a tree of timed spans. The active span is held in a ContextVar, so
+it follows ``await`` and is inherited by tasks created under it. ``span`` opens
+a child of the active span; with no trace active (TRACE_PATH empty, or code
+outside ``start_trace``) it costs one ContextVar lookup and records nothing.
+
+``scan_once`` starts one trace for the scan stages and one per ticker
+evaluation, then ``write_traces`` appends the scan tree and the slowest
+TRACE_SLOWEST_K ticker trees to TRACE_PATH as JSON lines.
+"""
+
+import json
+import os
+from contextvars import ContextVar
+from functools import lru_cache
+from time import perf_counter
+from typing import Optional
+
+from app.src.config.settings import settings
+from app.src.utils.logger import logger
+
+# Children kept per span; more are counted in "dropped" (e.g. per-ticker
+# indicator spans when the batch runs inline)
+_MAX_CHILDREN = 64
+
+
+class Span:
+    __slots__ = ("name", "attrs", "start", "end", "children", "dropped", "error")
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+        self.start = perf_counter()
+        self.end: Optional[float] = None
+        self.children: list[Span] = []
+        self.dropped = 0
+        self.error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else perf_counter()) - self.start
+
+    def to_dict(self, origin: Optional[float] = None) -> dict:
+        """The span tree with times in milliseconds relative to ``origin`` (default: this span's start)."""
+        origin = self.start if origin is None else origin
+        node = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3),
+        }
+        if self.attrs:
+            node["attrs"] = self.attrs
+        if self.error:
+            node["error"] = self.error
+        if self.dropped:
+            node["dropped"] = self.dropped
+        if self.children:
+            node["children"] = [child.to_dict(origin) for child in self.children]
+        return node
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+
+
+class _ActiveSpan:
+    __slots__ = ("span", "token")
+
+    def __init__(self, span: Span):
+        self.span = span
+
+    def __enter__(self) -> Span:
+        self.token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.span.end = perf_counter()
+        if exc_type is not None:
+            # CancelledError here means the span was cut off by a scan deadline
+            self.span.error = exc_type.__name__
+        _current.reset(self.token)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def start_trace(name: str, **attrs):
+    """Context manager for a new root span; a no-op when TRACE_PATH is empty."""
+    if not settings.TRACE_PATH:
+        return _NO_SPAN
+    return _ActiveSpan(Span(name, attrs))
+
+
+def span(name: str, **attrs):
+    """Context manager for a child of the active span; a no-op outside a trace."""
+    parent = _current.get()
+    if parent is None:
+        return _NO_SPAN
+    child = Span(name, attrs)
+    if len(parent.children) < _MAX_CHILDREN:
+        parent.children.append(child)
+    else:
+        parent.dropped += 1
+    return _ActiveSpan(child)
+
+
+@lru_cache(maxsize=1)
+def _trace_file(path: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return open(path, "a", buffering=1, encoding="utf-8")
+
+
+def write_traces(
+    scan: Optional[Span], tickers: list[Span], scan_time: str, k: Optional[int] = None
+) -> None:
+    """Append the scan tree and the ``k`` slowest ticker trees (default TRACE_SLOWEST_K) to TRACE_PATH."""
+    if scan is None or not settings.TRACE_PATH:
+        return
+    k = settings.TRACE_SLOWEST_K if k is None else k
+    slowest = sorted(tickers, key=lambda root: root.duration, reverse=True)[:k]
+    try:
+        out = _trace_file(settings.TRACE_PATH)
+        for kind, root in [("scan", scan)] + [("ticker", root) for root in slowest]:
+            line = {"scan": scan_time, "kind": kind, **root.to_dict()}
+            out.write(json.dumps(line, default=str) + "\n")
+    except Exception as e:
+        logger.warning(f"Failed to write scan traces: {e}")
@@ -2,11 +2,44 @@ from datetime import datetime, timedelta
 
 import numpy as np
 import pandas as pd
+import boto3
 import pytest
 import pytz
+from moto import mock_aws
+
+from app.src.config.settings import settings
+from app.src.core.prescreen import prescreen
+from app.src.core.priority import scan_priority
+from app.src.data.bar_buffer import daily_buffer, minute_buffer
+from app.src.data.unusual_whales import signal_cache
+from app.src.persistence.repository import InMemoryTableRepository, set_table_factory
+from app.src.strategies.orb_vwap_uw import evaluation_memo
+from app.src.utils.clients import reset_clients
+from app.src.utils.decision_log import decision_log
 
 NY = pytz.timezone("America/New_York")
 
+
+@pytest.fixture(autouse=True)
+def cold_caches():
+    """Bars, UW signals, pre-screen survivors, decisions and scan tiers are kept between scans; every test starts cold."""
+    minute_buffer.clear()
+    daily_buffer.clear()
+    signal_cache.clear()
+    prescreen.clear()
+    evaluation_memo.clear()
+    scan_priority.clear()
+
+
+@pytest.fixture(autouse=True)
+def decision_log_path(tmp_path, monkeypatch):
+    """Decision records go to the test's tmp_path, never the repo's logs/."""
+    monkeypatch.setattr(settings, "DECISION_LOG_PATH", str(tmp_path / "decisions.jsonl"))
+    yield
+    decision_log.close()
+    decision_log.reset()
+
+
 @pytest.fixture
 def mock_boto3(mocker):
     mocker.patch('boto3.resource')
@@ -63,88 +96,47 @@ def sample_daily_data():
 
 
 @pytest.fixture
-def mock_dynamodb(monkeypatch):
-
-    # In-memory storage for tables
-    open_positions = {}  # {(ticker, indicator): item}
-    completed_trades = {}  # {(date, indicator): item}
-
-    class MockTable:
-        def __init__(self, table_name, store):
-            self.table_name = table_name
-            self.store = store
-
-        def get_item(self, Key):
-            key = (
-                (Key["ticker"], Key["indicator"])
-                if "ticker" in Key
-                else (Key["date"], Key["indicator"])
-            )
-            if key in self.store:
-                return {"Item": self.store[key].copy()}
-            return {}
-
-        def put_item(self, Item):
-            if "ticker" in Item:
-                key = (Item["ticker"], Item["indicator"])
-            else:
-                key = (Item["date"], Item["indicator"])
-            self.store[key] = Item.copy()
-
-        def delete_item(self, Key):
-            key = (
-                (Key["ticker"], Key["indicator"])
-                if "ticker" in Key
-                else (Key["date"], Key["indicator"])
-            )
-            if key in self.store:
-                del self.store[key]
-
-        def scan(
-            self,
-            FilterExpression=None,
-            ExpressionAttributeValues=None,
-            ExclusiveStartKey=None,
-        ):
-            items = []
-            for key, item in self.store.items():
-                # Simple filter matching for indicator
-                if FilterExpression and ExpressionAttributeValues:
-                    indicator_value = ExpressionAttributeValues.get(":ind")
-                    if item.get("indicator") == indicator_value:
-                        items.append(item.copy())
-                else:
-                    items.append(item.copy())
-
-            response = {"Items": items}
-            # No pagination in mock for simplicity
-            return response
-
-    class MockDynamoDBResource:
-        def Table(self, table_name):
-            if table_name == "AlgoTraderOpenPositions":
-                return MockTable(table_name, open_positions)
-            elif table_name == "CompletedTradesForAlgoTrader":
-                return MockTable(table_name, completed_trades)
-            return MockTable(table_name, {})
-
-    mock_resource = MockDynamoDBResource()
-
-    # Mock the _get_dynamodb_resource function
-    def mock_get_dynamodb_resource():
-        return mock_resource
-
-    monkeypatch.setattr(
-        "app.src.position_tracker.dynamodb_tracker._get_dynamodb_resource",
-        mock_get_dynamodb_resource,
-    )
+def mock_dynamodb():
+    """Back every table with the in-memory repository."""
+    tables = {}
+
+    def factory(table_name, key_attributes):
+        tables[table_name] = InMemoryTableRepository(table_name, key_attributes)
+        return tables[table_name]
 
-    # Clear stores before each test
-    open_positions.clear()
-    completed_trades.clear()
+    set_table_factory(factory)
+    yield tables
+    set_table_factory(None)
 
-    return {
-        "resource": mock_resource,
-        "open_positions": open_positions,
-        "completed_trades": completed_trades,
-    }
+
+@pytest.fixture
+def moto_dynamodb(monkeypatch):
+    """Back the DynamoDB repository with moto, exercising the real client path."""
+    monkeypatch.setattr(settings, "AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setattr(settings, "AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setattr(settings, "PERSISTENCE_BACKEND", "dynamodb")
+    with mock_aws():
+        reset_clients()
+        set_table_factory(None)
+        client = boto3.client("dynamodb", region_name=settings.AWS_DEFAULT_REGION)
+        for table_name, (hash_key, range_key) in {
+            "AlgoTraderOpenPositions": ("ticker", "indicator"),
+            "CompletedTradesForAlgoTrader": ("date", "indicator"),
+            "InactiveTickersForAlgoTrading": ("ticker", "indicator"),
+            "AlgoOptions": ("date", "indicator"),
+        }.items():
+            client.create_table(
+                TableName=table_name,
+                KeySchema=[
+                    {"AttributeName": hash_key, "KeyType": "HASH"},
+                    {"AttributeName": range_key, "KeyType": "RANGE"},
+                ],
+                AttributeDefinitions=[
+                    {"AttributeName": hash_key, "AttributeType": "S"},
+                    {"AttributeName": range_key, "AttributeType": "S"},
+                ],
+                BillingMode="PAY_PER_REQUEST",
+            )
+        yield client
+    reset_clients()
+    set_table_factory(None)
@@ -0,0 +1,130 @@
+import pandas as pd
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.src.config.settings import settings
+from app.src.data.alpaca_client import (
+    TimeFrame,
+    get_bars,
+    get_latest_trades,
+    get_snapshots,
+)
+from app.src.utils.http_client import close_sessions
+
+
+def _bar(minute: int, close: float) -> dict:
+    return {
+        "t": f"2025-11-24T14:{minute:02d}:00Z",
+        "o": close,
+        "h": close + 1,
+        "l": close - 1,
+        "c": close,
+        "v": 1000,
+        "n": 10,
+        "vw": close,
+    }
+
+
+@pytest_asyncio.fixture
+async def fake_alpaca(monkeypatch):
+    requests = []
+
+    async def bars(request):
+        requests.append(dict(request.query))
+        symbol = request.query["symbols"]
+        if "page_token" not in request.query:
+            return web.json_response(
+                {"bars": {symbol: [_bar(31, 100.0)]}, "next_page_token": "next"}
+            )
+        return web.json_response(
+            {"bars": {symbol: [_bar(30, 99.0)]}, "next_page_token": None}
+        )
+
+    async def snapshots(request):
+        requests.append(dict(request.query))
+        return web.json_response(
+            {
+                symbol: {
+                    "latestTrade": {"p": 10.5},
+                    "dailyBar": {"o": 10.2, "c": 10.4, "v": 250000},
+                    "prevDailyBar": {"c": 10.0},
+                }
+                for symbol in request.query["symbols"].split(",")
+                if symbol != "GONE"
+            }
+        )
+
+    async def latest_trades(request):
+        requests.append(dict(request.query))
+        return web.json_response(
+            {
+                "trades": {
+                    symbol: {"t": "2025-11-24T15:01:02.5Z", "p": 10.75, "s": 100}
+                    for symbol in request.query["symbols"].split(",")
+                    if symbol != "GONE"
+                }
+            }
+        )
+
+    app = web.Application()
+    app.router.add_get("/v2/stocks/bars", bars)
+    app.router.add_get("/v2/stocks/snapshots", snapshots)
+    app.router.add_get("/v2/stocks/trades/latest", latest_trades)
+    server = TestServer(app)
+    await server.start_server()
+    monkeypatch.setattr(settings, "ALPACA_DATA_URL", str(server.make_url("")))
+    yield requests
+    await close_sessions()
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_get_bars_builds_multiindex_frame(fake_alpaca):
+    df = await get_bars(["NVDA", "AMD"], TimeFrame.Minute, limit=1000, chunk_size=1)
+
+    assert list(df.index.names) == ["symbol", "timestamp"]
+    assert list(df.columns) == [
+        "open",
+        "high",
+        "low",
+        "close",
+        "volume",
+        "trade_count",
+        "vwap",
+    ]
+    nvda = df.xs("NVDA", level=0)
+    # Pages are merged and sorted by timestamp
+    assert list(nvda["close"]) == [99.0, 100.0]
+    assert str(nvda.index.tz) == "UTC"
+    assert {r["timeframe"] for r in fake_alpaca} == {"1Min"}
+    assert len(fake_alpaca) == 4
+    # Compact dtypes: float32 prices, uint32 counts
+    assert nvda["close"].dtype == "float32"
+    assert nvda["volume"].dtype == "uint32"
+    assert df.index.is_monotonic_increasing
+
+
+@pytest.mark.asyncio
+async def test_get_snapshots_batches_symbols(fake_alpaca):
+    df = await get_snapshots(["NVDA", "AMD", "GONE"], chunk_size=2)
+
+    assert len(fake_alpaca) == 2
+    # A symbol without a snapshot is left out
+    assert sorted(df.index) == ["AMD", "NVDA"]
+    assert df.loc["NVDA"].to_dict() == {
+        "price": 10.5,
+        "open": 10.2,
+        "day_volume": 250000.0,
+        "prev_close": 10.0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_latest_trades_batches_symbols(fake_alpaca):
+    trades = await get_latest_trades(["NVDA", "AMD", "GONE"], chunk_size=2)
+
+    assert len(fake_alpaca) == 2
+    assert sorted(trades) == ["AMD", "NVDA"]
+    assert trades["NVDA"] == (10.75, pd.Timestamp("2025-11-24 15:01:02.5", tz="UTC"))
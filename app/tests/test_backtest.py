@@ -0,0 +1,115 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.src.backtest.engine import RecordedSignals, run_backtest
+from app.src.backtest.sweep import run_sweep, validate_grid
+from app.src.config.settings import settings
+from app.src.utils.helpers import NY
+
+DAYS = [date(2025, 11, 3), date(2025, 11, 4)]
+TICKERS = ["AAA", "BBB"]
+
+
+def _minute_bars():
+    rows = []
+    for day in DAYS:
+        start = NY.localize(datetime.combine(day, datetime.min.time())) + timedelta(
+            hours=9, minutes=30
+        )
+        for ticker in TICKERS:
+            for i in range(390):
+                # Flat through the opening range, then a steady breakout
+                close = 100.0 if i < 20 else 100.0 + (i - 19) * 0.05
+                rows.append(
+                    (
+                        ticker,
+                        start + timedelta(minutes=i),
+                        close + 0.1,
+                        close - 0.1,
+                        close,
+                        1e5,
+                    )
+                )
+    df = pd.DataFrame(
+        rows, columns=["symbol", "timestamp", "high", "low", "close", "volume"]
+    )
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+    return df.set_index(["symbol", "timestamp"]).sort_index()
+
+
+def _daily_bars():
+    dates = pd.date_range(end="2025-11-04", periods=260, freq="B").tz_localize(NY)
+    frames = {
+        ticker: pd.DataFrame(
+            {"close": np.linspace(50, 99, len(dates)), "volume": 1e6}, index=dates
+        )
+        for ticker in TICKERS
+    }
+    df = pd.concat(frames, names=["symbol", "timestamp"])
+    return df.set_index(
+        df.index.set_levels(df.index.levels[1].tz_convert("UTC"), level=1)
+    )
+
+
+def _signals():
+    ts = "2025-11-01T00:00:00-04:00"
+    records = []
+    for ticker in TICKERS:
+        records += [
+            {"ts": ts, "kind": "flow", "ticker": ticker, "value": "bullish"},
+            {"ts": ts, "kind": "congress", "ticker": ticker, "value": None},
+            {"ts": ts, "kind": "dark_pool", "ticker": ticker, "value": "bullish"},
+            {"ts": ts, "kind": "iv_rank", "ticker": ticker, "value": 80.0},
+        ]
+    return RecordedSignals.from_records(records)
+
+
+def test_backtest_replays_days_and_reports_completed_trades():
+    result = run_backtest(_minute_bars(), _daily_bars(), _signals(), workers=1)
+
+    assert [day.day for day in result.days] == DAYS
+    for day in result.days:
+        # One breakout entry per ticker, closed by the end of the session
+        assert sorted(t["ticker"] for t in day.trades) == TICKERS
+        assert day.completed["completed_trade_count"] == 2
+        assert {s["action"] for s in day.signals} >= {"buy_to_open"}
+        for trade in day.trades:
+            assert trade["action"] == "buy_to_open"
+            assert trade["enter_timestamp"].startswith(day.day.isoformat())
+            assert float(trade["profit_or_loss"]) > 0
+    assert result.summary()["trades"] == 4
+
+
+@pytest.mark.parametrize("workers", [2])
+def test_parallel_days_match_sequential(workers):
+    bars, daily, signals = _minute_bars(), _daily_bars(), _signals()
+    sequential = run_backtest(bars, daily, signals, workers=1)
+    parallel = run_backtest(bars, daily, signals, workers=workers)
+    assert [d.completed for d in parallel.days] == [
+        d.completed for d in sequential.days
+    ]
+
+
+def test_sweep_ranks_configurations_and_matches_in_parallel():
+    bars, daily, signals = _minute_bars(), _daily_bars(), _signals()
+    grid = {"MIN_IV_RANK": [90.0, 50.0], "ORB_MINUTES": [15, 30]}
+
+    table = run_sweep(bars, daily, signals, grid, workers=1)
+
+    # Recorded IV rank is 80: only the 50 threshold trades, whatever the ORB window
+    assert list(table["rank"]) == [1, 2, 3, 4]
+    assert set(table["MIN_IV_RANK"][:2]) == {50.0}
+    assert (table["trades"][:2] == 4).all()
+    assert (table["trades"][2:] == 0).all()
+    assert settings.MIN_IV_RANK == 10.0
+
+    parallel = run_sweep(bars, daily, signals, grid, workers=2)
+    pd.testing.assert_frame_equal(parallel, table)
+
+
+def test_sweep_rejects_thresholds_baked_into_recorded_signals():
+    with pytest.raises(ValueError, match="MIN_FLOW_PREMIUM"):
+        validate_grid({"MIN_FLOW_PREMIUM": [1e5]})
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from app.src.config.settings import settings
+from app.src.data import bar_store
+from app.src.data.bar_store import BarMemoryBudget, BarStore
+
+
+def _bars(symbols, rows=5):
+    index = pd.MultiIndex.from_product(
+        [
+            symbols,
+            pd.date_range("2025-11-04 14:30", periods=rows, freq="min", tz="UTC"),
+        ],
+        names=["symbol", "timestamp"],
+    )
+    return pd.DataFrame(
+        {
+            "close": np.arange(len(index), dtype=np.float32),
+            "volume": np.full(len(index), 100, dtype=np.uint32),
+        },
+        index=index,
+    )
+
+
+def test_symbol_arrays_are_views_of_the_columns():
+    store = BarStore(_bars(["AAA", "BBB"]))
+
+    bbb = store.symbol_arrays("BBB", ("close", "volume"))
+
+    assert list(bbb["close"]) == [5, 6, 7, 8, 9]
+    assert np.shares_memory(bbb["close"], store.columns["close"])
+    assert bbb["timestamp"][0] == pd.Timestamp("2025-11-04 14:30", tz="UTC").value
+    assert "CCC" not in store
+    assert len(store.symbol_arrays("CCC", ("close",))["close"]) == 0
+    assert store.nbytes == 10 * (8 + 4 + 4)
+
+
+def test_budget_cuts_the_universe_to_what_fits(monkeypatch):
+    monkeypatch.setattr(bar_store, "current_rss_mb", lambda: 300.0)
+    monkeypatch.setattr(settings, "RSS_BUDGET_MB", 400.0)
+    monkeypatch.setattr(settings, "BAR_FETCH_OVERHEAD", 4.0)
+    budget = BarMemoryBudget()
+    symbols = [f"T{i}" for i in range(100)]
+
+    # Nothing learned yet: every symbol is admitted
+    assert budget.admit(symbols) == symbols
+
+    # 1 MB of stored bars per symbol, 4 MB while fetching: 25 fit in 100 MB
+    budget.bytes_per_symbol = 1024 * 1024
+    assert budget.admit(symbols) == symbols[:25]
+
+    # Held symbols cost a top-up (one copy of their bars), not a full fetch:
+    # 50 held take 50 MB, and the other 50 MB fit 12 more
+    assert budget.admit(symbols, held=set(symbols[:50])) == symbols[:62]
+
+    # Without /proc only the peak RSS is known; the budget is not enforced
+    monkeypatch.setattr(bar_store, "rss_is_current", lambda: False)
+    assert budget.admit(symbols) == symbols
+
+    monkeypatch.setattr(settings, "RSS_BUDGET_MB", 0)
+    assert budget.admit(symbols) == symbols
@@ -0,0 +1,65 @@
+import fakeredis
+import pytest
+
+from app.src.benchmark.fake_upstreams import FakeUpstreamConfig, FakeUpstreams
+from app.src.benchmark.scan_bench import (
+    benchmark_settings,
+    compare,
+    run_jobs,
+    synthetic_universe,
+)
+from app.src.config.settings import settings
+from app.src.core import compute, scanner
+from app.src.core.compute import InlineComputeExecutor
+from app.src.core.market_calendar import market_calendar
+from app.src.utils.http_client import close_sessions
+
+
+@pytest.mark.asyncio
+async def test_scan_and_wheel_run_against_fake_upstreams(monkeypatch):
+    universe = synthetic_universe(6)
+    config = FakeUpstreamConfig(latency_ms=0, jitter_ms=0, option_contracts=14)
+    upstreams = FakeUpstreams(config)
+    urls = await upstreams.start(universe)
+    for name, value in benchmark_settings(urls, universe, "inline").items():
+        monkeypatch.setattr(settings, name, value)
+    monkeypatch.setattr(settings, "BEST_2025_WHEEL_TICKERS", ["NVDA"])
+    monkeypatch.setattr(market_calendar, "sessions", {})
+    monkeypatch.setattr(market_calendar, "fetched_on", None)
+
+    from app.src.strategies import wheel_master
+    from app.src.utils import clients
+
+    monkeypatch.setitem(
+        clients._clients, clients.REDIS, fakeredis.FakeRedis(decode_responses=True)
+    )
+    for module in (compute, scanner, wheel_master):
+        monkeypatch.setattr(module, "get_compute_executor", InlineComputeExecutor)
+
+    try:
+        metrics = await run_jobs(urls, config.now, scans=2)
+    finally:
+        await close_sessions()
+        await upstreams.stop()
+
+    assert metrics["skipped_per_scan"] == 0
+    assert metrics["failed_per_scan"] == 0
+    # After the warm-up, one multi-symbol bar top-up per timeframe, plus the UW
+    # lookups whose TTL expired for each ticker past the filters
+    assert 2 <= metrics["requests_per_scan"] < 2 * len(universe) + 4 * len(universe)
+    assert upstreams.requests[("unusual_whales", "/api/darkpool/{ticker}")] > 0
+    assert metrics["wheel_requests"] > 0
+    assert metrics["wheel_signals"] > 0
+
+
+def test_compare_flags_only_metrics_beyond_tolerance():
+    baseline = {"80": {"scan_p50_s": 1.0, "requests_per_scan": 400, "peak_rss_mb": 150}}
+    results = {
+        "80": {"scan_p50_s": 1.2, "requests_per_scan": 480, "peak_rss_mb": 160},
+        "500": {"scan_p50_s": 9.0},
+    }
+
+    regressions = compare(results, baseline)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("80 tickers: requests_per_scan 480")
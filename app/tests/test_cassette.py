@@ -0,0 +1,98 @@
+import pandas as pd
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.src.config.settings import settings
+from app.src.data.alpaca_client import TimeFrame, get_bars
+from app.src.utils.cassette import (
+    REPLAY,
+    CassetteRecorder,
+    load_cassette,
+    start_cassette,
+    stop_cassette,
+)
+from app.src.utils.http_client import close_sessions
+
+
+async def _bars(request):
+    symbol = request.query["symbols"]
+    bar = {"t": "2025-11-24T14:31:00Z", "o": 1, "h": 2, "l": 0.5, "c": 1.5, "v": 10}
+    return web.json_response(
+        {"bars": {symbol: [bar]}, "next_page_token": None},
+        headers={"X-RateLimit-Remaining": "199"},
+    )
+
+
+@pytest.mark.asyncio
+async def test_recorded_session_replays_without_network(monkeypatch, tmp_path):
+    path = str(tmp_path / "session.jsonl.gz")
+    app = web.Application()
+    app.router.add_get("/v2/stocks/bars", _bars)
+    upstream = TestServer(app)
+    await upstream.start_server()
+    monkeypatch.setattr(settings, "ALPACA_DATA_URL", str(upstream.make_url("")))
+
+    await start_cassette("record", path)
+    recorded = await get_bars(["NVDA", "AMD"], TimeFrame.Minute, chunk_size=1)
+    await close_sessions()
+    await stop_cassette()
+    await upstream.close()  # the upstream is gone from here on
+
+    entries = load_cassette(path)
+    assert len(entries) == 2
+    assert entries[0]["headers"]["X-RateLimit-Remaining"] == "199"
+
+    server = await start_cassette(REPLAY, path, "fast")
+    try:
+        replayed = await get_bars(["NVDA", "AMD"], TimeFrame.Minute, chunk_size=1)
+    finally:
+        await close_sessions()
+        await stop_cassette()
+
+    pd.testing.assert_frame_equal(replayed, recorded)
+    assert server.served == 2 and server.missed == 0
+
+
+@pytest.mark.asyncio
+async def test_cassette_is_append_only(monkeypatch, tmp_path):
+    path = str(tmp_path / "session.jsonl.gz")
+    app = web.Application()
+    app.router.add_get("/v2/stocks/bars", _bars)
+    upstream = TestServer(app)
+    await upstream.start_server()
+    monkeypatch.setattr(settings, "ALPACA_DATA_URL", str(upstream.make_url("")))
+    try:
+        for _ in range(2):  # two process lifetimes
+            await start_cassette("record", path)
+            await get_bars(["NVDA"], TimeFrame.Minute, chunk_size=1)
+            await close_sessions()
+            await stop_cassette()
+    finally:
+        await upstream.close()
+
+    assert len(load_cassette(path)) == 2
+
+
+def test_cassette_survives_a_recorder_that_died_unclosed(tmp_path):
+    path = tmp_path / "session.jsonl.gz"
+    entry = {"upstream": "alpaca_data", "method": "GET", "path": "/v2/clock"}
+
+    recorder = CassetteRecorder(str(path))
+    for ts in range(3):
+        recorder.append({**entry, "ts": ts})
+    recorder.close()
+    crashed = CassetteRecorder(str(path))
+    for ts in range(3, 5):
+        crashed.append({**entry, "ts": ts})
+    # The process is killed here: the member keeps its flushed lines, no trailer
+    crashed._executor.submit(lambda: None).result()
+    unclosed = path.read_bytes()
+    crashed.close()
+    path.write_bytes(unclosed + b'{"ts": 5, "upstream"')
+
+    restarted = CassetteRecorder(str(path))
+    restarted.append({**entry, "ts": 6})
+    restarted.close()
+
+    assert [e["ts"] for e in load_cassette(str(path))] == [0, 1, 2, 3, 4, 6]
@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+
+from app.src.core import compute
+from app.src.core.compute import (
+    InlineComputeExecutor,
+    ProcessPoolComputeExecutor,
+    compute_indicator_snapshots,
+)
+
+
+def _stack(frame, symbols):
+    return pd.concat({symbol: frame for symbol in symbols}, names=["symbol"])
+
+
+@pytest.mark.asyncio
+async def test_process_pool_snapshots_match_inline(
+    monkeypatch, sample_1m_data, sample_daily_data
+):
+    symbols = ["AAA", "BBB", "CCC"]
+    df_1m = _stack(sample_1m_data, symbols)
+    df_daily = _stack(sample_daily_data, symbols[:2])  # CCC has no daily bars
+    today = sample_1m_data.index[-1].date()
+
+    monkeypatch.setattr(compute, "get_compute_executor", InlineComputeExecutor)
+    inline = await compute_indicator_snapshots(df_1m, df_daily, symbols, today)
+
+    pool = ProcessPoolComputeExecutor(max_workers=2)
+    monkeypatch.setattr(compute, "get_compute_executor", lambda: pool)
+    try:
+        pooled = await compute_indicator_snapshots(df_1m, df_daily, symbols, today)
+    finally:
+        pool.shutdown()
+
+    assert pooled == inline
+    assert set(pooled) == set(symbols)
+    assert pooled["AAA"]["today_bars"] == 390
+    assert pooled["CCC"]["daily_bars"] == 0
@@ -0,0 +1,85 @@
+import json
+from datetime import timedelta
+
+import pytest
+
+from app.src.config.settings import settings
+from app.src.utils.decision_log import NO_TRADE, DecisionLog
+from app.src.utils.helpers import now_ny, use_clock
+
+
+@pytest.fixture
+def log_path(tmp_path, monkeypatch):
+    path = tmp_path / "decisions.jsonl"
+    monkeypatch.setattr(settings, "DECISION_LOG_PATH", str(path))
+    monkeypatch.setattr(settings, "DECISION_LOG_REPEAT_SECONDS", 60)
+    return path
+
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_repeated_no_trade_is_sampled(log_path):
+    log = DecisionLog()
+    start = now_ny()
+    clock = [start]
+    with use_clock(lambda: clock[0]):
+        assert log.record("NVDA", NO_TRADE, "rvol", rvol=0.8)
+        assert not log.record("NVDA", NO_TRADE, "rvol", rvol=0.9)
+        assert not log.record("NVDA", NO_TRADE, "rvol", rvol=0.7)
+        # Another ticker is sampled on its own
+        assert log.record("AMD", NO_TRADE, "rvol", rvol=1.1)
+        # A new code is always written, and carries the suppressed count
+        assert log.record("NVDA", NO_TRADE, "opening_range")
+        clock[0] = start + timedelta(seconds=61)
+        assert log.record("NVDA", NO_TRADE, "opening_range")
+    log.close()
+
+    lines = _lines(log_path)
+    assert [(l["ticker"], l["code"]) for l in lines] == [
+        ("NVDA", "rvol"),
+        ("AMD", "rvol"),
+        ("NVDA", "opening_range"),
+        ("NVDA", "opening_range"),
+    ]
+    assert lines[0]["rvol"] == 0.8
+    assert "suppressed" not in lines[0]
+    assert lines[2]["suppressed"] == 2
+    assert "suppressed" not in lines[3]
+
+
+def test_trades_are_always_written(log_path):
+    log = DecisionLog()
+    log.record("NVDA", NO_TRADE, "conditions")
+    log.record("NVDA", "buy_to_open", reason="ORB long", price=101.5)
+    log.record("NVDA", "sell_to_close", reason="stop", price=99.0)
+    assert log.record("NVDA", NO_TRADE, "conditions")
+    log.close()
+
+    lines = _lines(log_path)
+    assert [l["decision"] for l in lines] == [
+        NO_TRADE,
+        "buy_to_open",
+        "sell_to_close",
+        NO_TRADE,
+    ]
+    assert lines[1] == {
+        "ts": lines[1]["ts"],
+        "ticker": "NVDA",
+        "decision": "buy_to_open",
+        "reason": "ORB long",
+        "price": 101.5,
+    }
+
+
+def test_writer_follows_a_new_path(tmp_path, monkeypatch):
+    log = DecisionLog()
+    first, second = tmp_path / "first.jsonl", tmp_path / "second.jsonl"
+    monkeypatch.setattr(settings, "DECISION_LOG_PATH", str(first))
+    log.record("NVDA", "buy_to_open")
+    monkeypatch.setattr(settings, "DECISION_LOG_PATH", str(second))
+    log.record("AMD", "buy_to_open")
+    log.close()
+    assert [line["ticker"] for line in _lines(first)] == ["NVDA"]
+    assert [line["ticker"] for line in _lines(second)] == ["AMD"]
@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+
+from app.src.config.settings import settings
+from app.src.data.unusual_whales import signal_cache
+from app.src.position_tracker.dynamodb_tracker import InactiveTickerTracker
+from app.src.strategies.orb_vwap_uw import evaluate_ticker, evaluation_memo
+from app.src.utils.helpers import NY, use_clock
+
+NOW = NY.localize(pd.Timestamp("2025-11-04 11:00:03").to_pydatetime())
+
+
+def _snapshot(minute: int = 59) -> dict:
+    return {
+        "daily_bars": 250,
+        "today_bars": 90,
+        "price": 101.0,
+        "bar_time": pd.Timestamp(f"2025-11-04 15:{minute}", tz="UTC").value,
+        "rvol": 3.0,
+        "orb_high": 102.0,
+        "orb_low": 98.0,
+        "vwap": 100.0,
+        "is_uptrend": True,
+        "is_downtrend": False,
+    }
+
+
+@pytest.mark.asyncio
+async def test_unchanged_inputs_reuse_the_last_decision(monkeypatch, mock_dynamodb):
+    monkeypatch.setattr(settings, "UW_SIGNAL_TTL_SECONDS", 7200)
+    monkeypatch.setattr(settings, "UW_SLOW_SIGNAL_TTL_SECONDS", 7200)
+    writes = []
+
+    async def log_inactive_ticker(**kwargs):
+        writes.append(kwargs["ticker"])
+
+    monkeypatch.setattr(
+        InactiveTickerTracker, "log_inactive_ticker", log_inactive_ticker
+    )
+    clock = [NOW]
+    with use_clock(lambda: clock[0]):
+        for kind, value in (
+            ("flow", "neutral"),
+            ("congress", None),
+            ("dark_pool", None),
+            ("iv_rank", 50.0),
+        ):
+            signal_cache.put(kind, "NVDA", value)
+
+        await evaluate_ticker("NVDA", None, None, _snapshot())
+        await evaluate_ticker("NVDA", None, None, _snapshot())
+        assert (len(writes), evaluation_memo.reused) == (1, 1)
+        assert evaluation_memo.decisions["NVDA"][0] == "conditions"
+
+        # A refetch returning the same value keeps the fingerprint
+        signal_cache.put("flow", "NVDA", "neutral")
+        await evaluate_ticker("NVDA", None, None, _snapshot())
+        assert len(writes) == 1
+
+        # Each of a new signal value, a new bar and a time-of-day threshold re-evaluates
+        signal_cache.put("flow", "NVDA", "bearish")
+        await evaluate_ticker("NVDA", None, None, _snapshot())
+        await evaluate_ticker("NVDA", None, None, _snapshot(minute=58))
+        clock[0] = NOW + timedelta(hours=1)
+        await evaluate_ticker("NVDA", None, None, _snapshot(minute=58))
+        await evaluate_ticker("NVDA", None, None, _snapshot(minute=58))
+        assert (len(writes), evaluation_memo.reused) == (4, 3)
+
+        # Switched off, every evaluation runs
+        monkeypatch.setattr(settings, "SCAN_SKIP_UNCHANGED", False)
+        await evaluate_ticker("NVDA", None, None, _snapshot(minute=58))
+        assert len(writes) == 5
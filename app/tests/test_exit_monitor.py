@@ -0,0 +1,90 @@
+import pandas as pd
+import pytest
+
+from app.src.config.settings import settings
+from app.src.core import exit_monitor
+from app.src.core.exit_monitor import monitor_exits
+from app.src.data.unusual_whales import signal_cache
+from app.src.position_tracker.dynamodb_tracker import PositionTracker
+from app.src.strategies import orb_vwap_uw
+from app.src.utils.helpers import NY, use_clock
+
+NOW = NY.localize(pd.Timestamp("2025-11-04 11:00:07").to_pydatetime())
+
+
+@pytest.mark.asyncio
+async def test_positions_close_at_their_latest_trade(monkeypatch, mock_dynamodb):
+    monkeypatch.setattr(settings, "UW_SIGNAL_TTL_SECONDS", 7200)
+    sent, requested = [], []
+
+    async def send_signal(ticker, action, reason, price, **kwargs):
+        sent.append((ticker, action, price, kwargs["idempotency_key"]))
+
+    async def get_latest_trades(symbols, chunk_size):
+        requested.append(sorted(symbols))
+        traded_at = pd.Timestamp("2025-11-04 16:00:05", tz="UTC")
+        return {"NVDA": (103.0, traded_at), "AMD": (100.5, traded_at)}
+
+    monkeypatch.setattr(orb_vwap_uw, "send_signal", send_signal)
+    monkeypatch.setattr(exit_monitor, "get_latest_trades", get_latest_trades)
+    with use_clock(lambda: NOW):
+        assert await monitor_exits() == 0
+        # Nothing open, nothing fetched
+        assert requested == []
+
+        await PositionTracker.add_position("NVDA", "buy_to_open", 100.0, "test")
+        await PositionTracker.add_position("AMD", "buy_to_open", 100.0, "test")
+        signal_cache.put("flow", "NVDA", "bearish")
+        signal_cache.put("flow", "AMD", "bearish")
+
+        # NVDA is up 3% into bearish flow; AMD is up 0.5% and holds
+        assert await monitor_exits() == 1
+        assert requested == [["AMD", "NVDA"]]
+        assert [(t, a, p) for t, a, p, _ in sent] == [("NVDA", "sell_to_close", 103.0)]
+        assert sent[0][3].endswith(":NVDA:sell_to_close:2025-11-04T16:00:00+00:00")
+        assert await PositionTracker.get_open_positions() == ["AMD"]
+
+
+def test_exit_signal_matches_the_scan_rule():
+    long = {"action": "buy_to_open", "entry_price": 100.0}
+    short = {"action": "sell_to_open", "entry_price": 100.0}
+    midday = pd.Timestamp("11:00").time()
+
+    assert orb_vwap_uw.exit_signal(long, 102.0, "bearish", midday)[0] == "sell_to_close"
+    assert orb_vwap_uw.exit_signal(long, 102.0, "bullish", midday) is None
+    assert orb_vwap_uw.exit_signal(short, 102.0, "bullish", midday)[0] == "buy_to_close"
+    # Everything closes at TRADING_END
+    end = pd.Timestamp(settings.TRADING_END).time()
+    assert orb_vwap_uw.exit_signal(long, 100.0, "", end)[0] == "sell_to_close"
+
+
+@pytest.mark.asyncio
+async def test_only_closes_that_happened_are_counted(monkeypatch, mock_dynamodb):
+    monkeypatch.setattr(settings, "UW_SIGNAL_TTL_SECONDS", 7200)
+    owned, sent = [False], []
+
+    async def send_signal(ticker, action, reason, price, **kwargs):
+        sent.append((ticker, action))
+
+    async def owns_ticker(ticker):
+        return owned[0]
+
+    async def get_latest_trades(symbols, chunk_size):
+        return {"NVDA": (103.0, pd.Timestamp("2025-11-04 16:00:05", tz="UTC"))}
+
+    monkeypatch.setattr(orb_vwap_uw, "send_signal", send_signal)
+    monkeypatch.setattr(orb_vwap_uw, "owns_ticker", owns_ticker)
+    monkeypatch.setattr(exit_monitor, "get_latest_trades", get_latest_trades)
+    with use_clock(lambda: NOW):
+        await PositionTracker.add_position("NVDA", "buy_to_open", 100.0, "test")
+        signal_cache.put("flow", "NVDA", "bearish")
+
+        # The rule fires, but the lease was lost: nothing closed, nothing sent
+        assert await monitor_exits() == 0
+        assert sent == []
+        assert await PositionTracker.get_open_positions() == ["NVDA"]
+
+        owned[0] = True
+        assert await monitor_exits() == 1
+        assert sent == [("NVDA", "sell_to_close")]
+    assert "NVDA" not in orb_vwap_uw._exit_locks
@@ -0,0 +1,94 @@
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.src.config.settings import settings
+from app.src.data.unusual_whales import get_iv_rank, signal_cache
+from app.src.utils.http_client import close_sessions
+from app.src.utils.http_stats import (
+    endpoint_stats,
+    endpoint_template,
+    reset_endpoint_stats,
+)
+
+
+@pytest_asyncio.fixture
+async def fake_uw(monkeypatch):
+    calls = []
+
+    async def iv_rank(request):
+        calls.append(request.match_info["ticker"])
+        headers = {"x-uw-daily-req-count": str(len(calls)), "Retry-After": "2"}
+        if len(calls) == 1:
+            return web.json_response({}, status=429, headers=headers)
+        return web.json_response({"data": [{"iv_rank_1y": "42.5"}]}, headers=headers)
+
+    app = web.Application()
+    app.router.add_get("/api/stock/{ticker}/iv-rank", iv_rank)
+    server = TestServer(app)
+    await server.start_server()
+    monkeypatch.setattr(settings, "UW_BASE_URL", str(server.make_url("")))
+    reset_endpoint_stats()
+    yield calls
+    await close_sessions()
+    await server.close()
+    reset_endpoint_stats()
+
+
+def test_endpoint_template_replaces_tickers():
+    assert (
+        endpoint_template("/api/stock/BRK.B/iv-rank") == "/api/stock/{ticker}/iv-rank"
+    )
+    assert (
+        endpoint_template("/v1beta1/options/snapshots/NVDA")
+        == "/v1beta1/options/snapshots/{ticker}"
+    )
+    assert endpoint_template("/v2/stocks/bars") == "/v2/stocks/bars"
+
+
+@pytest.mark.asyncio
+async def test_requests_are_aggregated_per_endpoint_template(fake_uw):
+    assert await get_iv_rank("NVDA") == 42.5
+    assert await get_iv_rank("AMD") == 42.5
+
+    stats = endpoint_stats()
+    assert list(stats) == ["unusual_whales GET /api/stock/{ticker}/iv-rank"]
+    iv = stats["unusual_whales GET /api/stock/{ticker}/iv-rank"]
+    assert iv["requests"] == 3
+    assert iv["status"] == {429: 1, 200: 2}
+    assert iv["retries"] == 1
+    # One new connection, then keep-alive reuse
+    assert iv["connect_ms"]["p50"] >= 0
+    assert iv["reused_connections"] == 2
+    assert iv["ttfb_ms"]["p50"] <= iv["total_ms"]["max"]
+    assert iv["bytes_mean"] > 0
+    assert iv["rate_limits"] == {"x-uw-daily-req-count": "3", "retry-after": "2"}
+
+
+@pytest.mark.asyncio
+async def test_failed_signal_fetches_are_not_cached(monkeypatch):
+    calls = []
+
+    async def iv_rank(request):
+        calls.append(request.match_info["ticker"])
+        if len(calls) <= 2:
+            return web.json_response({}, status=429)
+        return web.json_response({"data": [{"iv_rank_1y": "42.5"}]})
+
+    app = web.Application()
+    app.router.add_get("/api/stock/{ticker}/iv-rank", iv_rank)
+    server = TestServer(app)
+    await server.start_server()
+    monkeypatch.setattr(settings, "UW_BASE_URL", str(server.make_url("")))
+    try:
+        # A rate-limited fetch falls back to 0.0 without keeping it for an hour
+        assert await get_iv_rank("NVDA", max_retries=1) == 0.0
+        assert await get_iv_rank("NVDA", max_retries=1) == 0.0
+        assert await get_iv_rank("NVDA", max_retries=1) == 42.5
+        assert await get_iv_rank("NVDA", max_retries=1) == 42.5
+        assert len(calls) == 3
+        assert signal_cache.get("iv_rank", "NVDA") == (True, 42.5)
+    finally:
+        await close_sessions()
+        await server.close()
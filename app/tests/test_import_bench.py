@@ -0,0 +1,44 @@
+import pytest
+
+from app.src.benchmark.import_bench import measure, parse_importtime
+from app.src.config.settings import settings
+from app.src.utils import clients
+
+_SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       300 |        300 |   numpy.core
+import time:      1000 |       1300 | numpy
+import time:       200 |        200 |     redis.client
+import time:       400 |       1900 | app.src.tool
+"""
+
+
+def test_parse_importtime_sums_self_time_per_package():
+    profile = parse_importtime(_SAMPLE, "app.src.tool")
+    assert profile.total_ms == 1.9
+    assert profile.packages == {"numpy": 1.3, "app": 0.4, "redis": 0.2}
+
+
+def test_indicators_import_without_credentials_or_clients():
+    profile = measure("app.src.indicators.technical", runs=1)
+    assert profile.total_ms > 0
+    assert profile.deferred_loaded == []
+
+
+def test_clients_are_built_on_first_use(monkeypatch):
+    built = []
+    monkeypatch.setitem(clients.FACTORIES, "fake", lambda: built.append(1) or object())
+    from app.src.position_tracker import wheel_tracker  # noqa: F401
+
+    assert "fake" not in clients._clients
+    client = clients.get_client("fake")
+    assert clients.get_client("fake") is client
+    assert built == [1]
+    clients.reset_clients()
+    assert clients.get_client("fake") is not client
+
+
+def test_validate_requires_alpaca_keys(monkeypatch):
+    monkeypatch.setattr(settings, "ALPACA_KEY", None)
+    with pytest.raises(ValueError):
+        settings.validate()
@@ -4,8 +4,11 @@ from unittest.mock import patch
 import numpy as np
 import pytz
 
-from app.src.indicators.technical import (calculate_rvol, calculate_vwap,
-                                          get_opening_range, is_downtrend,
+from app.src.config.settings import settings
+from app.src.indicators.technical import (DAILY_COLUMNS, INTRADAY_COLUMNS,
+                                          calculate_rvol, calculate_vwap,
+                                          frame_arrays, get_opening_range,
+                                          indicator_snapshot, is_downtrend,
                                           is_uptrend)
 
 NY = pytz.timezone("America/New_York")
@@ -47,3 +50,27 @@ def test_is_downtrend(sample_daily_data):
     df = sample_daily_data.copy()
     df["close"] = np.linspace(200, 100, 300)
     assert is_downtrend(df)
+
+
+def test_indicator_snapshot_matches_frame_indicators(sample_1m_data, sample_daily_data):
+    df = sample_1m_data
+    today = df.index[-1].date()
+    today_df = df[df.index.date == today]
+    mock_now = datetime.combine(today, datetime.min.time()).replace(tzinfo=NY)
+
+    with patch("app.src.indicators.technical.now_ny", return_value=mock_now):
+        expected_rvol = calculate_rvol(df, sample_daily_data)
+    snapshot = indicator_snapshot(
+        frame_arrays(df, INTRADAY_COLUMNS),
+        frame_arrays(sample_daily_data, DAILY_COLUMNS),
+        today,
+        settings.ORB_MINUTES,
+    )
+
+    assert snapshot["today_bars"] == len(today_df)
+    assert snapshot["price"] == today_df["close"].iloc[-1]
+    assert abs(snapshot["rvol"] - expected_rvol) < 1e-9
+    assert (snapshot["orb_high"], snapshot["orb_low"]) == get_opening_range(today_df)
+    assert abs(snapshot["vwap"] - calculate_vwap(today_df)) < 1e-9
+    assert snapshot["is_uptrend"] == is_uptrend(sample_daily_data)
+    assert snapshot["is_downtrend"] == is_downtrend(sample_daily_data)
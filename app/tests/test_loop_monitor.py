@@ -0,0 +1,38 @@
+import asyncio
+import time
+
+import pytest
+
+from app.src.core.loop_monitor import LoopLagMonitor
+from app.src.utils.metrics import registry
+
+
+def _blocking_call():
+    time.sleep(0.3)
+
+
+@pytest.mark.asyncio
+async def test_stall_is_attributed_to_the_blocking_call_site():
+    monitor = LoopLagMonitor(interval=0.02, stall_threshold=0.1)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.1)
+        _blocking_call()
+        await asyncio.sleep(0.1)
+    finally:
+        monitor.stop()
+
+    stats = monitor.snapshot()
+    assert stats.stalls == 1
+    assert stats.max_ms >= 250
+    site = next(iter(stats.blockers))
+    assert "in _blocking_call" in site
+    assert "_blocking_call" in str(stats)
+
+    lines = monitor.prometheus_lines()
+    assert "algo_event_loop_stalls_total 1" in lines
+    assert any("algo_event_loop_blocked_samples_total{site=" in line for line in lines)
+
+
+def test_loop_lag_is_exported_with_the_function_metrics():
+    assert "algo_event_loop_lag_seconds_count" in registry.render_prometheus()
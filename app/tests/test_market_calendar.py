@@ -0,0 +1,83 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+import pytz
+
+from app.src.core.market_calendar import MarketCalendar, _parse_session
+from app.src.utils.helpers import use_clock
+
+NY = pytz.timezone("America/New_York")
+
+
+def _calendar() -> MarketCalendar:
+    calendar = MarketCalendar()
+    calendar.load(
+        [
+            _parse_session({"date": "2025-11-26", "open": "09:30", "close": "16:00"}),
+            # Thanksgiving (27th) is absent; the day after is a half day
+            _parse_session({"date": "2025-11-28", "open": "09:30", "close": "13:00"}),
+            _parse_session({"date": "2025-12-01", "open": "09:30", "close": "16:00"}),
+        ],
+        fetched_on=date(2025, 11, 26),
+    )
+    return calendar
+
+
+def test_is_open_respects_holidays_and_half_days():
+    calendar = _calendar()
+    assert calendar.is_open(NY.localize(datetime(2025, 11, 26, 10, 0)))
+    assert not calendar.is_open(NY.localize(datetime(2025, 11, 27, 10, 0)))
+    assert calendar.is_open(NY.localize(datetime(2025, 11, 28, 12, 59)))
+    assert not calendar.is_open(NY.localize(datetime(2025, 11, 28, 13, 30)))
+
+
+def test_next_open_and_close_skip_closed_days():
+    calendar = _calendar()
+    after_half_day = NY.localize(datetime(2025, 11, 28, 14, 0))
+    assert calendar.next_open(after_half_day) == NY.localize(
+        datetime(2025, 12, 1, 9, 30)
+    )
+    assert calendar.next_close(
+        NY.localize(datetime(2025, 11, 27, 8, 0))
+    ) == NY.localize(datetime(2025, 11, 28, 13, 0))
+
+
+def test_seconds_until_active_sleeps_until_lead_before_open():
+    calendar = _calendar()
+    before_open = NY.localize(datetime(2025, 11, 26, 9, 0))
+    assert calendar.seconds_until_active(lead=120, lag=0, now=before_open) == 28 * 60
+    in_lag = NY.localize(datetime(2025, 11, 26, 16, 5))
+    assert calendar.seconds_until_active(lead=0, lag=600, now=in_lag) == 0.0
+    # Long closures are capped so the calendar is re-checked
+    holiday = NY.localize(datetime(2025, 11, 27, 9, 0))
+    assert calendar.seconds_until_active(lead=0, lag=0, now=holiday) == 3600.0
+
+
+@pytest.mark.asyncio
+async def test_fallback_after_a_failed_fetch_is_retried():
+    calendar = MarketCalendar()
+    fetches = []
+
+    async def fetch(start):
+        fetches.append(start)
+        if len(fetches) == 1:
+            raise RuntimeError("status 503")
+        return [
+            _parse_session({"date": "2025-11-28", "open": "09:30", "close": "13:00"})
+        ]
+
+    calendar._fetch = fetch
+    clock = [NY.localize(datetime(2025, 11, 28, 9, 0))]
+    with use_clock(lambda: clock[0]):
+        await calendar.ensure_fresh()
+        # Regular hours stand in, but are not taken as today's calendar
+        assert calendar.fetched_on is None
+        assert calendar.is_open(NY.localize(datetime(2025, 11, 28, 15, 0)))
+        await calendar.ensure_fresh()
+        assert len(fetches) == 1
+
+        clock[0] += timedelta(minutes=2)
+        await calendar.ensure_fresh()
+        assert calendar.fetched_on == date(2025, 11, 28)
+        # The half day closes at 13:00
+        assert not calendar.is_open(NY.localize(datetime(2025, 11, 28, 15, 0)))
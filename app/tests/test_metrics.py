@@ -0,0 +1,53 @@
+import random
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from app.src.utils.helpers import measure_latency
+from app.src.utils.metrics import LatencyHistogram, metrics_app, registry
+
+
+def test_histogram_quantiles_within_bucket_error():
+    rng = random.Random(3)
+    samples = sorted(rng.lognormvariate(-3, 1) for _ in range(20_000))
+    histogram = LatencyHistogram()
+    for seconds in samples:
+        histogram.record(seconds)
+
+    for q in (0.5, 0.95, 0.99):
+        exact = samples[round(q * len(samples)) - 1]
+        assert histogram.quantile(q) == pytest.approx(exact, rel=0.02)
+    assert histogram.count == len(samples)
+    assert LatencyHistogram().quantile(0.99) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_measure_latency_registers_at_decoration_and_counts_errors():
+    class Probe:
+        @staticmethod
+        @measure_latency
+        async def fetch(fail: bool = False):
+            if fail:
+                raise RuntimeError("upstream down")
+            return "ok"
+
+    name = "test_measure_latency_registers_at_decoration_and_counts_errors.<locals>.Probe.fetch"
+    metrics = registry.functions[name]
+    assert metrics.cumulative.count == 0
+
+    assert await Probe.fetch() == "ok"
+    with pytest.raises(RuntimeError):
+        await Probe.fetch(fail=True)
+    assert metrics.cumulative.count == 2
+    assert metrics.errors == 1
+
+    async with TestClient(TestServer(metrics_app())) as client:
+        resp = await client.get("/metrics")
+        body = await resp.text()
+    assert f'algo_function_latency_seconds{{function="{name}",quantile="0.99"}}' in body
+    assert f'algo_function_latency_seconds_count{{function="{name}"}} 2' in body
+    assert f'algo_function_errors_total{{function="{name}"}} 1' in body
+
+    summary = [line for line in registry.interval_summary() if line.startswith(name)]
+    assert summary and "n=2" in summary[0] and "errors=1" in summary[0]
+    assert metrics.interval.count == 0
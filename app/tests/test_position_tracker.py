@@ -1,16 +1,170 @@
-from app.src.position_tracker.dynamodb_tracker import PositionTracker
+import asyncio
+import threading
 
+import pytest
+
+from app.src.config.settings import settings
+from app.src.persistence.repository import PersistenceUnavailableError, get_table
+from app.src.position_tracker import dynamodb_tracker as tracker
+from app.src.position_tracker.dynamodb_tracker import (
+    InactiveTickerTracker,
+    PositionTracker,
+)
 
-def test_position_lifecycle(mock_dynamodb):
-    """Test the full lifecycle of adding, getting, and closing a position."""
-    # The mock_dynamodb fixture is needed to set up the DynamoDB mocks
-    _ = mock_dynamodb  # Explicitly mark as used for linter
 
-    PositionTracker.add_position("AAPL", "buy_to_open", 150.0, "test")
-    pos = PositionTracker.get_position("AAPL")
+@pytest.mark.asyncio
+async def test_position_lifecycle(mock_dynamodb):
+    """Test the full lifecycle of adding, getting, and closing a position."""
+    await PositionTracker.add_position("AAPL", "buy_to_open", 150.0, "test")
+    pos = await PositionTracker.get_position("AAPL")
     assert pos is not None
     assert pos["action"] == "buy_to_open"
     assert pos["entry_price"] == 150.0
-    PositionTracker.close_position("AAPL", "sell_to_close", 160.0, "profit")
-    pos_after_close = PositionTracker.get_position("AAPL")
+    await PositionTracker.close_position("AAPL", "sell_to_close", 160.0, "profit")
+    pos_after_close = await PositionTracker.get_position("AAPL")
     assert pos_after_close is None
+
+    completed = await mock_dynamodb["CompletedTradesForAlgoTrader"].scan()
+    assert completed[0]["completed_trade_count"] == 1
+    assert float(completed[0]["overall_profit_loss_long"]) == 10.0
+
+
+@pytest.mark.asyncio
+async def test_position_lifecycle_on_dynamodb(moto_dynamodb, mocker):
+    """The DynamoDB backend works end to end and never calls boto3 on the loop thread."""
+    loop_thread = threading.get_ident()
+    calls_on_loop = []
+    spy_calls = []
+    original = moto_dynamodb.__class__._make_api_call
+
+    def spy(self, operation_name, api_params):
+        spy_calls.append(operation_name)
+        if threading.get_ident() == loop_thread:
+            calls_on_loop.append(operation_name)
+        return original(self, operation_name, api_params)
+
+    mocker.patch("botocore.client.BaseClient._make_api_call", spy)
+
+    await PositionTracker.add_position("NVDA", "sell_to_open", 100.0, "test")
+    assert await PositionTracker.get_open_positions() == ["NVDA"]
+    await InactiveTickerTracker.log_inactive_ticker(
+        "AMD", "no flow", "no flow", {"rvol": 1.25, "nested": {"vwap": 101.5}}
+    )
+    inactive = await InactiveTickerTracker.get_inactive_ticker("AMD")
+    assert float(inactive["indicators_values"]["nested"]["vwap"]) == 101.5
+
+    await PositionTracker.close_position("NVDA", "buy_to_close", 90.0, "target")
+    assert await PositionTracker.get_position("NVDA") is None
+    assert calls_on_loop == []
+    assert spy_calls
+
+
+@pytest.mark.asyncio
+async def test_position_writes_are_exactly_once(mock_dynamodb, monkeypatch):
+    """Two shard workers racing on one ticker: one open, one close, stale fence rejected."""
+    monkeypatch.setattr(settings, "SCAN_SHARDING", True)  # no position cache
+    assert await PositionTracker.add_position("AMD", "buy_to_open", 100.0, "a", fence=1)
+    assert not await PositionTracker.add_position(
+        "AMD", "buy_to_open", 100.5, "b", fence=2
+    )
+    assert (await PositionTracker.get_position("AMD"))["entry_price"] == 100.0
+
+    # A worker whose lease was since taken over cannot close it
+    await mock_dynamodb["AlgoTraderOpenPositions"].put_item(
+        {
+            "ticker": "AMD",
+            "indicator": settings.INDICATOR_NAME,
+            "action": "buy_to_open",
+            "entry_price": "100.0",
+            "fence": 3,
+        }
+    )
+    assert not await PositionTracker.close_position(
+        "AMD", "sell_to_close", 101.0, "a", fence=2
+    )
+    assert await PositionTracker.close_position(
+        "AMD", "sell_to_close", 101.0, "c", fence=3
+    )
+    assert not await PositionTracker.close_position(
+        "AMD", "sell_to_close", 101.0, "c", fence=3
+    )
+
+    completed = await mock_dynamodb["CompletedTradesForAlgoTrader"].scan()
+    assert completed[0]["completed_trade_count"] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["mock_dynamodb", "moto_dynamodb"])
+async def test_concurrent_closes_all_reach_the_daily_totals(backend, request, mocker):
+    """Every position closes in one gather at TRADING_END; none may be lost."""
+    client = request.getfixturevalue(backend)
+    if backend == "moto_dynamodb":
+        # DynamoDB applies each request atomically; moto needs a lock for that
+        lock = threading.Lock()
+        original = client.__class__._make_api_call
+
+        def atomic(self, operation_name, api_params):
+            with lock:
+                return original(self, operation_name, api_params)
+
+        mocker.patch("botocore.client.BaseClient._make_api_call", atomic)
+    tickers = ["AAPL", "AMD", "NVDA", "TSLA"]
+    for ticker in tickers:
+        await PositionTracker.add_position(ticker, "buy_to_open", 100.0, "test")
+
+    closed = await asyncio.gather(
+        *(
+            PositionTracker.close_position(ticker, "sell_to_close", 101.5, "end")
+            for ticker in tickers
+        )
+    )
+
+    assert all(closed)
+    table = get_table("CompletedTradesForAlgoTrader", ("date", "indicator"))
+    (completed,) = await table.scan()
+    assert completed["completed_trade_count"] == 4
+    assert sorted(t["ticker"] for t in completed["completed_trades"]) == tickers
+    assert float(completed["overall_profit_loss"]) == 6.0
+    assert float(completed["overall_profit_loss_long"]) == 6.0
+    assert float(completed["overall_profit_loss_short"]) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_failed_writes_are_not_reported_as_done(mock_dynamodb, monkeypatch):
+    """No signal may go out for a position the table never opened or closed."""
+    open_table = get_table("AlgoTraderOpenPositions", ("ticker", "indicator"))
+    completed_table = get_table("CompletedTradesForAlgoTrader", ("date", "indicator"))
+    unavailable = PersistenceUnavailableError("DynamoDB not available")
+
+    async def fail(*args, **kwargs):
+        raise unavailable
+
+    with monkeypatch.context() as patch:
+        patch.setattr(open_table, "put_item", fail)
+        assert not await PositionTracker.add_position("AMD", "buy_to_open", 1.0, "a")
+    assert await PositionTracker.add_position("AMD", "buy_to_open", 100.0, "a")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(open_table, "get_item", fail)
+        assert not await PositionTracker.close_position("AMD", "sell_to_close", 1, "x")
+    with monkeypatch.context() as patch:
+        patch.setattr(open_table, "delete_item", fail)
+        assert not await PositionTracker.close_position("AMD", "sell_to_close", 1, "x")
+    assert await PositionTracker.get_position("AMD") is not None
+
+    # Once the open item is gone the close stands; recording it is retried
+    calls = []
+    append_and_add = completed_table.append_and_add
+
+    async def flaky(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            raise unavailable
+        await append_and_add(*args)
+
+    monkeypatch.setattr(tracker, "_COMPLETED_WRITE_BACKOFF_SECONDS", 0)
+    monkeypatch.setattr(completed_table, "append_and_add", flaky)
+    assert await PositionTracker.close_position("AMD", "sell_to_close", 101.0, "x")
+    assert len(calls) == 2
+    (completed,) = await completed_table.scan()
+    assert completed["completed_trade_count"] == 1
@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+
+from app.src.config.settings import settings
+from app.src.core import prescreen as prescreen_module
+from app.src.core.prescreen import prescreen, screen
+from app.src.position_tracker.dynamodb_tracker import PositionTracker
+
+
+def _snapshots() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "price": [50.0, 0.3, 20.0, 30.0, 41.0, 12.0],
+            "open": [52.0, 0.33, 20.1, 30.0, 40.0, 12.0],
+            "day_volume": [5e5, 9e5, 2e6, 5e3, 3e5, 1e6],
+            "prev_close": [50.0, 0.3, 20.0, 28.0, 40.0, float("nan")],
+        },
+        index=["GAP", "PENNY", "FLAT", "THIN", "MOVE", "NEW"],
+    )
+
+
+def test_screen_filters_price_volume_and_gap(monkeypatch):
+    monkeypatch.setattr(settings, "MIN_PRICE", 0.5)
+    monkeypatch.setattr(settings, "PRESCREEN_MIN_VOLUME", 1e5)
+    monkeypatch.setattr(settings, "PRESCREEN_MIN_GAP_PCT", 1.0)
+
+    moves = screen(_snapshots())
+
+    # GAP gapped 4% at the open; MOVE is up 2.5% since; largest move first
+    assert moves.index.tolist() == ["GAP", "MOVE"]
+    assert moves["GAP"] == pytest.approx(4.0)
+
+
+@pytest.mark.asyncio
+async def test_prescreen_keeps_positions_and_earlier_survivors(
+    monkeypatch, mock_dynamodb
+):
+    monkeypatch.setattr(settings, "PRESCREEN_MIN_VOLUME", 1e5)
+    monkeypatch.setattr(settings, "PRESCREEN_MIN_GAP_PCT", 1.0)
+    snapshots = [_snapshots()]
+
+    async def get_snapshots(symbols, chunk_size):
+        return snapshots.pop(0) if snapshots else None
+
+    monkeypatch.setattr(prescreen_module, "get_snapshots", get_snapshots)
+    await PositionTracker.add_position("FLAT", "buy_to_open", 20.0, "test")
+    universe = ["GAP", "PENNY", "FLAT", "THIN", "MOVE", "NEW"]
+
+    assert await prescreen.run(universe) == ["FLAT", "GAP", "MOVE"]
+    # Snapshots unavailable: this session's survivors are scanned again
+    assert await prescreen.run(universe) == ["FLAT", "GAP", "MOVE"]
+    assert await prescreen.run(["MOVE"]) == ["MOVE"]
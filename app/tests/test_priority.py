@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+import pandas as pd
+
+from app.src.config.settings import settings
+from app.src.core import priority
+from app.src.core.priority import COLD, HOT, WARM, classify, scan_priority
+from app.src.data.unusual_whales import signal_cache
+from app.src.utils.helpers import NY, use_clock
+
+NOW = NY.localize(pd.Timestamp("2025-11-04 11:00:03").to_pydatetime())
+
+
+def _snapshot(price: float, rvol: float = 3.0) -> dict:
+    return {
+        "price": price,
+        "rvol": rvol,
+        "orb_high": 102.0,
+        "orb_low": 98.0,
+        "vwap": 100.0,
+    }
+
+
+def test_tiers_follow_distance_to_the_nearest_level(monkeypatch):
+    monkeypatch.setattr(settings, "MIN_RVOL_SCHEDULE", [])
+    monkeypatch.setattr(settings, "MIN_RVOL_OUTSIDE_SCHEDULE", 1.5)
+    with use_clock(lambda: NOW):
+        assert classify("A", _snapshot(101.8), False)[0] == HOT
+        assert classify("A", _snapshot(101.0), False)[0] == WARM
+        assert classify("A", _snapshot(110.0), False)[0] == COLD
+        # Near a level, but RVOL under the threshold
+        assert classify("A", _snapshot(101.8, rvol=1.0), False)[0] == COLD
+        assert classify("A", _snapshot(110.0), True)[0] == HOT
+        assert classify("A", {}, False)[0] == WARM
+
+        # Directional flow doubles the hot distance
+        assert classify("A", _snapshot(101.5), False)[0] == WARM
+        signal_cache.put("flow", "A", "bullish")
+        assert classify("A", _snapshot(101.5), False)[0] == HOT
+
+
+def test_due_tickers_follow_their_tier_and_the_request_budget(monkeypatch):
+    monkeypatch.setattr(settings, "MIN_RVOL_SCHEDULE", [])
+    monkeypatch.setattr(settings, "MIN_RVOL_OUTSIDE_SCHEDULE", 1.5)
+    clock = [NOW]
+    with use_clock(lambda: clock[0]):
+        assert scan_priority.due(["HOT", "COLD", "POS"]) == ["HOT", "COLD", "POS"]
+        scan_priority.update(
+            {"HOT": _snapshot(101.9), "COLD": _snapshot(120.0), "POS": {}}, {"POS"}
+        )
+        clock[0] = NOW + timedelta(seconds=11)
+        assert scan_priority.due(["HOT", "COLD", "POS"]) == ["POS", "HOT"]
+        clock[0] = NOW + timedelta(seconds=301)
+        assert scan_priority.due(["HOT", "COLD", "POS"]) == ["POS", "HOT", "COLD"]
+
+        # 2 tickers evaluated and 60 requests in the last minute: 30 a ticker,
+        # so the 40 left of 100 pay for one. Positions go first.
+        scan_priority.update(
+            {"HOT": _snapshot(101.9), "COLD": _snapshot(120.0)}, {"POS"}
+        )
+        monkeypatch.setattr(settings, "SCAN_REQUEST_BUDGET_PER_MINUTE", 100)
+        monkeypatch.setattr(priority, "requests_in", lambda *args: 60)
+        clock[0] = NOW + timedelta(seconds=320)
+        assert scan_priority.due(["HOT", "COLD", "NEW"]) == ["NEW"]
+        clock[0] = NOW + timedelta(seconds=330)
+        assert scan_priority.due(["HOT", "COLD", "POS"]) == ["POS"]
+
+
+def test_a_scan_that_bails_out_leaves_its_tickers_due():
+    with use_clock(lambda: NOW):
+        assert scan_priority.due(["POS", "HOT"]) == ["POS", "HOT"]
+        # No update: the bar fetch failed
+        assert scan_priority.due(["POS", "HOT"]) == ["POS", "HOT"]
+        scan_priority.update({"POS": {}, "HOT": {}}, {"POS"})
+        assert scan_priority.due(["POS", "HOT"]) == []
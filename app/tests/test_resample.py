@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.src.data import bar_buffer
+from app.src.data.bar_buffer import BarBuffer
+from app.src.data.resample import aggregate_bars
+from app.src.utils.helpers import NY, use_clock
+
+NOW = NY.localize(pd.Timestamp("2025-11-04 10:30").to_pydatetime())
+OPEN = pd.Timestamp("2025-11-04 14:30", tz="UTC")
+
+
+def _minutes(symbol: str, minutes: range, shift: float = 0.0) -> pd.DataFrame:
+    index = pd.MultiIndex.from_tuples(
+        [(symbol, OPEN + pd.Timedelta(minutes=m)) for m in minutes],
+        names=["symbol", "timestamp"],
+    )
+    close = np.array([100.0 + m for m in minutes]) + shift
+    return pd.DataFrame(
+        {
+            "open": close - 0.5,
+            "high": close + 1,
+            "low": close - 1,
+            "close": close,
+            "volume": np.full(len(close), 10.0),
+            "trade_count": np.full(len(close), 2.0),
+            "vwap": close,
+        },
+        index=index,
+    ).astype(np.float32)
+
+
+def test_aggregate_bars_matches_session_bins():
+    bars = aggregate_bars(_minutes("NVDA", range(0, 12)), "5Min")
+
+    nvda = bars.loc["NVDA"]
+    # 9:30, 9:35 and a forming 9:40 bar, labelled by their start
+    assert nvda.index.tolist() == [OPEN + pd.Timedelta(minutes=m) for m in (0, 5, 10)]
+    assert nvda["open"].tolist() == [99.5, 104.5, 109.5]
+    assert nvda["high"].tolist() == [105.0, 110.0, 112.0]
+    assert nvda["close"].tolist() == [104.0, 109.0, 111.0]
+    assert nvda["volume"].tolist() == [50, 50, 20]
+    assert nvda["vwap"].tolist() == [102.0, 107.0, 110.5]
+
+    daily = aggregate_bars(_minutes("NVDA", range(0, 12)), "1Day").loc["NVDA"]
+    assert daily.index.tolist() == [pd.Timestamp("2025-11-04", tz=NY).tz_convert("UTC")]
+    assert daily["volume"].tolist() == [120]
+
+
+@pytest.mark.asyncio
+async def test_resampled_bars_follow_incremental_top_ups(monkeypatch):
+    async def get_bars(symbols, timeframe, limit, chunk_size, start=None):
+        if start is None:
+            return pd.concat([_minutes(s, range(0, 12)) for s in symbols])
+        # The forming 9:41 bar comes back revised, followed by three new minutes
+        return pd.concat([_minutes(s, range(11, 15), shift=0.25) for s in symbols])
+
+    monkeypatch.setattr(bar_buffer, "get_bars", get_bars)
+    buffer = BarBuffer("1Min", limit=13, intraday=True)
+    with use_clock(lambda: NOW):
+        await buffer.refresh(["NVDA"])
+        five = buffer.resampled("5Min")
+        assert len(five.frame) == 3
+        await buffer.refresh(["NVDA", "AMD"])
+
+    # NVDA's history was cut at the limit: its 9:30 bin lost minutes and is
+    # kept as first built; AMD's first bin is complete and kept too
+    nvda = five.frame.loc["NVDA"]
+    assert nvda.index.tolist() == [OPEN + pd.Timedelta(minutes=m) for m in (0, 5, 10)]
+    assert nvda["close"].tolist() == [104.0, 109.0, 114.25]
+    assert nvda["volume"].tolist() == [50, 50, 50]
+    assert five.store().symbols == ["AMD", "NVDA"]
+
+    # Built from scratch, a cut symbol's partial first bin is dropped
+    fresh = BarBuffer("1Min", limit=13, intraday=True)
+    with use_clock(lambda: NOW):
+        assert fresh.restore(buffer.frame, NOW.date())
+    rebuilt = fresh.resampled("5Min").frame.loc["NVDA"]
+    assert rebuilt.index.tolist() == [OPEN + pd.Timedelta(minutes=m) for m in (5, 10)]
+    assert rebuilt.equals(nvda.iloc[1:])
@@ -0,0 +1,75 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from app.src.config.settings import settings
+from app.src.core import scanner
+from app.src.data import bar_buffer
+
+
+def _frame(symbols):
+    index = pd.MultiIndex.from_tuples(
+        [(symbol, pd.Timestamp("2025-01-02 15:00", tz="UTC")) for symbol in symbols],
+        names=["symbol", "timestamp"],
+    )
+    return pd.DataFrame({"close": [1.0] * len(symbols)}, index=index)
+
+
+@pytest.mark.asyncio
+async def test_slow_tickers_time_out_without_blocking_the_scan(monkeypatch):
+    symbols = ["FAST", "SLOW", "BOOM"]
+    monkeypatch.setattr(settings, "WATCHLIST", symbols)
+    monkeypatch.setattr(settings, "BLOCKED_TICKERS", [])
+    monkeypatch.setattr(settings, "SCAN_PERIOD_SECONDS", 0.4)
+    monkeypatch.setattr(settings, "SCAN_MAX_CONCURRENCY", 2)
+
+    async def ensure_fresh():
+        return None
+
+    async def get_bars(symbols, *args, **kwargs):
+        return _frame(symbols)
+
+    async def compute_indicator_snapshots(*args):
+        return {}
+
+    cancelled = []
+    running = 0
+    peak = 0
+
+    async def evaluate_ticker(ticker, df_1m, df_daily, snapshot=None):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            if ticker == "SLOW":
+                await asyncio.sleep(10)
+            if ticker == "BOOM":
+                raise ValueError("bad data")
+        except asyncio.CancelledError:
+            cancelled.append(ticker)
+            raise
+        finally:
+            running -= 1
+
+    monkeypatch.setattr(scanner.market_calendar, "ensure_fresh", ensure_fresh)
+    monkeypatch.setattr(scanner.market_calendar, "is_open", lambda: True)
+    monkeypatch.setattr(scanner, "is_trading_hours", lambda *args: True)
+    monkeypatch.setattr(bar_buffer, "get_bars", get_bars)
+    monkeypatch.setattr(scanner, "evaluate_ticker", evaluate_ticker)
+    monkeypatch.setattr(
+        scanner, "compute_indicator_snapshots", compute_indicator_snapshots
+    )
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    summary = await scanner.scan_once()
+
+    # SLOW is cut at its per-ticker deadline (half the period), not after 10s
+    assert loop.time() - start < 1.0
+    assert summary.scanned == 3
+    assert summary.completed == 1
+    assert summary.timed_out == ["SLOW"]
+    assert summary.failed == ["BOOM"]
+    assert cancelled == ["SLOW"]
+    assert peak <= 2
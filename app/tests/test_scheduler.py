@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from app.src.core.scheduler import COALESCE, SERIAL, SKIP, Scheduler, ScheduledJob
+
+
+async def _noop():
+    return None
+
+
+def test_next_fire_aligns_to_bar_close():
+    job = ScheduledJob(name="scan", func=_noop, period=60, offset=3)
+    # 12:00:10 -> 12:01:03, regardless of when the previous run finished
+    assert job.next_fire(43210.0) == 43263.0
+    # Exactly on a grid point -> the next one
+    assert job.next_fire(43263.0) == 43323.0
+    assert job.next_fire(43262.9) == 43263.0
+
+
+async def _blocked_job(release: asyncio.Event, calls: list):
+    calls.append(1)
+    await release.wait()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "overlap,expected_runs,skipped,coalesced", [(SKIP, 1, 2, 0), (COALESCE, 2, 0, 1)]
+)
+async def test_overlapping_ticks(overlap, expected_runs, skipped, coalesced):
+    release = asyncio.Event()
+    calls: list = []
+    scheduler = Scheduler()
+    job = scheduler.add_job(
+        "scan", lambda: _blocked_job(release, calls), period=60, overlap=overlap
+    )
+
+    for _ in range(3):
+        scheduler._tick(job, 0.0)
+        await asyncio.sleep(0)
+    release.set()
+    while job.running:
+        await asyncio.sleep(0)
+
+    assert len(calls) == expected_runs
+    assert job.stats.runs == expected_runs
+    assert job.stats.skipped == skipped
+    assert job.stats.coalesced == coalesced
+
+
+@pytest.mark.asyncio
+async def test_serial_job_waits_and_shutdown_awaits_it():
+    release = asyncio.Event()
+    calls: list = []
+    scheduler = Scheduler()
+    job = scheduler.add_job(
+        "wheel", lambda: _blocked_job(release, calls), period=0.01, overlap=SERIAL
+    )
+    runner = asyncio.create_task(scheduler.run())
+    while not calls:
+        await asyncio.sleep(0.005)
+    # Many periods pass during the run without a skipped tick or a second run
+    await asyncio.sleep(0.05)
+    assert len(calls) == 1
+    assert job.stats.skipped == 0
+    task = job._task
+
+    runner.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await runner
+    assert task.cancelled()
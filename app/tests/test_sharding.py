@@ -0,0 +1,89 @@
+import asyncio
+
+import fakeredis
+import pytest
+from fakeredis import aioredis
+
+from app.src.core.sharding import HashRing, ShardCoordinator
+
+UNIVERSE = [f"T{i:03d}" for i in range(120)]
+
+
+def _coordinator(server, worker_id, lease_ttl=30.0):
+    redis = aioredis.FakeRedis(server=server, decode_responses=True)
+    return ShardCoordinator(
+        redis, lambda: UNIVERSE, worker_id=worker_id, lease_ttl=lease_ttl
+    )
+
+
+def test_ring_only_moves_the_departed_workers_keys():
+    before = HashRing(["a", "b", "c"])
+    after = HashRing(["a", "b"])
+    for key in UNIVERSE:
+        if before.owner(key) != "c":
+            assert after.owner(key) == before.owner(key)
+
+
+@pytest.mark.asyncio
+async def test_workers_split_the_watchlist_without_overlap():
+    server = fakeredis.FakeServer()
+    a = _coordinator(server, "a")
+    b = _coordinator(server, "b")
+
+    await a.refresh()  # alone: takes everything
+    assert a.owned == set(UNIVERSE)
+
+    await b.refresh()  # joins: a still holds b's share
+    await a.refresh()  # a sees b and releases its share
+    await b.refresh()  # b picks it up
+
+    assert a.owned and b.owned
+    assert a.owned.isdisjoint(b.owned)
+    assert a.owned | b.owned == set(UNIVERSE)
+    assert a.leader != b.leader
+    assert await a.confirm(next(iter(a.owned)))
+    assert not await b.confirm(next(iter(a.owned)))
+
+
+@pytest.mark.asyncio
+async def test_dead_workers_tickers_are_taken_over_after_lease_expiry():
+    server = fakeredis.FakeServer()
+    a = _coordinator(server, "a", lease_ttl=0.2)
+    b = _coordinator(server, "b", lease_ttl=0.2)
+    await a.refresh()
+    await b.refresh()
+    await a.refresh()
+    await b.refresh()
+    assert b.owned != set(UNIVERSE)
+
+    # a stops heartbeating; once its membership and leases lapse b owns everything
+    await asyncio.sleep(0.3)
+    await b.refresh()
+    assert b.owned == set(UNIVERSE)
+    assert b.leader
+
+
+@pytest.mark.asyncio
+async def test_lease_is_handed_over_only_after_in_flight_work():
+    server = fakeredis.FakeServer()
+    a = _coordinator(server, "a")
+    b = _coordinator(server, "b")
+    await a.refresh()
+    await b.refresh()
+    # b's share, still leased by a
+    ticker = next(t for t in UNIVERSE if HashRing(["a", "b"]).owner(t) == "b")
+    first_token = a.tokens[ticker]
+
+    async with a.hold(ticker):
+        await a.refresh()
+        await b.refresh()
+        # a stops scanning it but keeps the lease while the write is in flight
+        assert ticker not in a.owned and ticker in a.draining
+        assert ticker not in b.owned
+        assert await a.confirm(ticker)
+
+    await a.refresh()
+    await b.refresh()
+    assert ticker in b.owned and not a.draining
+    # The new owner writes with a larger fencing token
+    assert b.tokens[ticker] > first_token
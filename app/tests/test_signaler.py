@@ -2,16 +2,59 @@ from unittest.mock import MagicMock
 
 import pytest
 
-from app.src.core.signaler import send_signal
+from app.src.core.outbox import DEAD, DELIVERED, PENDING, SignalOutbox
+from app.src.core.signaler import SignalDispatcher, send_signal
 
 
-@pytest.mark.asyncio
-async def test_signal_payload():
+@pytest.fixture
+def outbox(tmp_path, monkeypatch):
+    box = SignalOutbox(str(tmp_path / "outbox.db"))
+    monkeypatch.setattr("app.src.core.signaler.get_outbox", lambda: box)
+    return box
+
+
+def _session(*statuses):
     session = MagicMock()
-    response = MagicMock(status=200)
-    session.post.return_value.__aenter__.return_value = response
+    responses = [MagicMock(status=status) for status in statuses]
+    for response in responses:
+        response.text.return_value = "error"
+    session.post.return_value.__aenter__.side_effect = responses
+    return session
+
 
-    await send_signal("NVDA", "buy_to_open", "test", 850.0, session)  # type: ignore
+@pytest.mark.asyncio
+async def test_signal_payload(outbox):
+    key = await send_signal("NVDA", "buy_to_open", "test", 850.0)
+    assert await outbox.counts() == {PENDING: 1}
+
+    session = _session(200)
+    assert await SignalDispatcher(session, outbox).dispatch_once() == 1
     payload = session.post.call_args[1]["json"]
     assert payload["ticker_symbol"] == "NVDA"
     assert payload["price"] == "850.0"
+    assert session.post.call_args[1]["headers"]["Idempotency-Key"] == key
+    assert await outbox.counts() == {DELIVERED: 1}
+
+
+@pytest.mark.asyncio
+async def test_failed_signal_is_retried_then_dead_lettered(outbox, monkeypatch):
+    monkeypatch.setattr("app.src.core.signaler.settings.SIGNAL_RETRY_BASE_SECONDS", 0)
+    monkeypatch.setattr("app.src.core.signaler.settings.SIGNAL_MAX_ATTEMPTS", 2)
+    await send_signal("AMD", "sell_to_open", "test", 100.0)
+
+    dispatcher = SignalDispatcher(_session(500, 503), outbox)
+    await dispatcher.dispatch_once()
+    assert await outbox.counts() == {PENDING: 1}
+    await dispatcher.dispatch_once()
+    assert await outbox.counts() == {DEAD: 1}
+
+
+@pytest.mark.asyncio
+async def test_pending_signals_survive_restart(outbox):
+    await send_signal("TSLA", "buy_to_open", "test", 250.0)
+    # Simulate a crash between claim and delivery
+    assert len(await outbox.claim_due(10)) == 1
+
+    reopened = SignalOutbox(outbox.path)
+    records = await reopened.claim_due(10)
+    assert [r.payload["ticker_symbol"] for r in records] == ["TSLA"]
@@ -0,0 +1,147 @@
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+
+from app.src.config.settings import settings
+from app.src.core.state_snapshot import restore_snapshot, save_snapshot
+from app.src.data import bar_buffer
+from app.src.data.bar_buffer import BarBuffer, daily_buffer, minute_buffer
+from app.src.data.unusual_whales import signal_cache
+from app.src.position_tracker.dynamodb_tracker import PositionTracker
+from app.src.utils.helpers import NY, use_clock
+
+NOW = NY.localize(pd.Timestamp("2025-11-04 11:00").to_pydatetime())
+
+
+def _bars(symbol: str, minutes: range) -> pd.DataFrame:
+    index = pd.MultiIndex.from_tuples(
+        [
+            (
+                symbol,
+                pd.Timestamp("2025-11-04 15:00", tz="UTC") + pd.Timedelta(minutes=m),
+            )
+            for m in minutes
+        ],
+        names=["symbol", "timestamp"],
+    )
+    return pd.DataFrame({"close": [float(m) for m in minutes]}, index=index)
+
+
+@pytest.mark.asyncio
+async def test_buffer_tops_up_from_the_newest_bar(monkeypatch):
+    calls = []
+
+    async def get_bars(symbols, timeframe, limit, chunk_size, start=None):
+        calls.append((list(symbols), limit, chunk_size, start))
+        if start is None:
+            return pd.concat([_bars(s, range(0, 3)) for s in symbols])
+        # The newest bar held comes back revised, with one new bar after it
+        frame = pd.concat([_bars(s, range(2, 4)) for s in symbols])
+        frame["close"] += 0.5
+        return frame
+
+    monkeypatch.setattr(bar_buffer, "get_bars", get_bars)
+    buffer = BarBuffer("1Min", limit=3, intraday=True)
+    with use_clock(lambda: NOW):
+        await buffer.refresh(["AMD", "NVDA"])
+        frame = await buffer.refresh(["AMD", "NVDA", "TSLA"])
+
+    assert calls[0][:3] == (["AMD", "NVDA"], 3, 1)
+    assert calls[1][0] == ["TSLA"] and calls[1][3] is None
+    assert calls[2][0] == ["AMD", "NVDA"]
+    assert calls[2][1:3] == (
+        3 * settings.BAR_INCREMENTAL_CHUNK,
+        settings.BAR_INCREMENTAL_CHUNK,
+    )
+    assert calls[2][3] == pd.Timestamp("2025-11-04 15:02", tz="UTC")
+    # Last ``limit`` bars per symbol, the re-fetched bar replacing the held one
+    assert frame.loc["NVDA", "close"].tolist() == [1.0, 2.5, 3.5]
+    assert frame.loc["TSLA", "close"].tolist() == [0.0, 1.0, 2.0]
+
+    # A new session starts with a full fetch
+    with use_clock(lambda: NOW + timedelta(days=1)):
+        await buffer.refresh(["AMD"])
+    assert calls[-1][3] is None
+
+
+@pytest.mark.asyncio
+async def test_buffer_drops_symbols_whose_top_up_chunk_failed(monkeypatch):
+    async def get_bars(symbols, timeframe, limit, chunk_size, start=None):
+        if start is None:
+            return pd.concat([_bars(s, range(0, 3)) for s in symbols])
+        # NVDA's chunk failed; get_bars returns the chunks that succeeded
+        return _bars("AMD", range(2, 4))
+
+    monkeypatch.setattr(bar_buffer, "get_bars", get_bars)
+    buffer = BarBuffer("1Min", limit=3, intraday=True)
+    with use_clock(lambda: NOW):
+        await buffer.refresh(["AMD", "NVDA"])
+        frame = await buffer.refresh(["AMD", "NVDA"], retain=["AMD", "NVDA"])
+        # NVDA is missing from this scan rather than evaluated on stale bars
+        assert frame.index.get_level_values(0).unique().tolist() == ["AMD"]
+        assert frame.loc["AMD", "close"].tolist() == [1.0, 2.0, 3.0]
+
+        calls = []
+
+        async def full_fetch(symbols, timeframe, limit, chunk_size, start=None):
+            calls.append((list(symbols), start))
+            return pd.concat([_bars(s, range(1, 4)) for s in symbols])
+
+        monkeypatch.setattr(bar_buffer, "get_bars", full_fetch)
+        await buffer.refresh(["AMD", "NVDA"])
+    assert (["NVDA"], None) in calls
+
+
+@pytest.mark.asyncio
+async def test_snapshot_restores_only_fresh_state(tmp_path, monkeypatch, mock_dynamodb):
+    monkeypatch.setattr(settings, "STATE_SNAPSHOT_BACKEND", "file")
+    monkeypatch.setattr(settings, "STATE_SNAPSHOT_PATH", str(tmp_path / "state.pkl"))
+    clock = [NOW]
+    with use_clock(lambda: clock[0]):
+        minute_buffer.restore(_bars("NVDA", range(3)), NOW.date())
+        daily_buffer.restore(_bars("NVDA", range(2)), NOW.date())
+        signal_cache.put("flow", "NVDA", "bullish")
+        signal_cache.put("iv_rank", "NVDA", 42.0)
+        await PositionTracker.add_position("NVDA", "buy_to_open", 100.0, "test")
+        assert await save_snapshot()
+
+        minute_buffer.clear()
+        daily_buffer.clear()
+        signal_cache.clear()
+        clock[0] = NOW + timedelta(seconds=90)
+        assert await restore_snapshot()
+        assert len(minute_buffer.frame) == 3
+        # Flow is past its TTL, the IV rank is not
+        assert signal_cache.get("flow", "NVDA") == (False, None)
+        assert signal_cache.get("iv_rank", "NVDA") == (True, 42.0)
+        position = await PositionTracker.get_position("NVDA")
+        assert position["entry_price"] == 100.0
+
+        # Next day: yesterday's minute bars are dropped, daily bars kept
+        minute_buffer.clear()
+        daily_buffer.clear()
+        clock[0] = NOW + timedelta(days=1)
+        assert await restore_snapshot()
+        assert minute_buffer.frame is None
+        assert len(daily_buffer.frame) == 2
+
+        monkeypatch.setattr(settings, "STATE_SNAPSHOT_MAX_AGE_SECONDS", 3600)
+        daily_buffer.clear()
+        assert not await restore_snapshot()
+        assert daily_buffer.frame is None
+
+
+@pytest.mark.asyncio
+async def test_position_cache_serves_reads_after_a_full_load(mock_dynamodb):
+    await PositionTracker.add_position("NVDA", "buy_to_open", 100.0, "test")
+    table = mock_dynamodb["AlgoTraderOpenPositions"]
+    assert await PositionTracker.load_positions()
+
+    # Written behind the cache's back: not seen, since the cache is complete
+    table.items.clear()
+    assert (await PositionTracker.get_position("NVDA"))["entry_price"] == 100.0
+    assert await PositionTracker.get_position("AMD") is None
+
+    await PositionTracker.close_position("NVDA", "sell_to_close", 101.0, "test")
+    assert await PositionTracker.get_position("NVDA") is None
@@ -0,0 +1,60 @@
+import asyncio
+import json
+
+import pytest
+
+from app.src.config.settings import settings
+from app.src.utils.helpers import measure_latency
+from app.src.utils.tracing import span, start_trace, write_traces
+
+
+@measure_latency
+async def _lookup(delay: float):
+    await asyncio.sleep(delay)
+
+
+async def _evaluate(ticker: str, delay: float):
+    with start_trace("evaluate_ticker", ticker=ticker) as root:
+        with span("bar_slice"):
+            pass
+        await asyncio.gather(_lookup(delay), _lookup(0))
+    return root
+
+
+@pytest.mark.asyncio
+async def test_slowest_ticker_trees_are_written_as_jsonl(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(settings, "TRACE_PATH", str(path))
+
+    with start_trace("scan_once") as scan:
+        with span("evaluate"):
+            roots = await asyncio.gather(
+                *(
+                    _evaluate(t, d)
+                    for t, d in [("AAA", 0.0), ("BBB", 0.05), ("CCC", 0.02)]
+                )
+            )
+    write_traces(scan, roots, "2025-11-04T11:00:00-05:00", k=2)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["kind"] for line in lines] == ["scan", "ticker", "ticker"]
+    assert [line["attrs"]["ticker"] for line in lines[1:]] == ["BBB", "CCC"]
+    # Ticker trees are their own roots, not children of the scan's "evaluate" stage
+    assert lines[0]["children"][0]["name"] == "evaluate"
+    assert "children" not in lines[0]["children"][0]
+    slowest = lines[1]
+    assert [child["name"] for child in slowest["children"]] == [
+        "bar_slice",
+        "_lookup",
+        "_lookup",
+    ]
+    assert slowest["children"][1]["duration_ms"] >= 40
+
+
+@pytest.mark.asyncio
+async def test_tracing_disabled_records_nothing(monkeypatch):
+    monkeypatch.setattr(settings, "TRACE_PATH", "")
+    with start_trace("scan_once") as scan:
+        with span("evaluate") as stage:
+            await _lookup(0)
+    assert scan is None and stage is None